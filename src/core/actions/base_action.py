@@ -78,6 +78,31 @@ class BaseAction(ActionInterface, ABC):
         """
         pass
 
+    def get_batch_step(self) -> Optional[Dict[str, Any]]:
+        """
+        Describe the action as one step of a batched DOM script
+
+        Actions that amount to a single DOM operation return a step dictionary
+        (e.g. {"op": "click", "selector": "#submit"}) so that a DomBatchAction
+        can run them together with neighbouring steps in one script call.
+
+        Returns:
+            Step dictionary, or None if the action cannot be batched
+        """
+        return None
+
+    def create_batch_result(self, outcome: Dict[str, Any]) -> ActionResult:
+        """
+        Create the result of the action from the outcome of its batched step
+
+        Args:
+            outcome: Outcome reported by the batch script for the step
+
+        Returns:
+            Result of the action execution
+        """
+        return ActionResult.create_success(f"Executed action: {self.description}")
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert the action to a dictionary
@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional
 from src.core.actions.base_action import BaseAction
 from src.core.actions.action_interface import ActionResult
 from src.core.actions.action_factory import ActionFactory
+from src.core.utils.element_cache import get_element_cache, next_page_generation
 
 
 @ActionFactory.register("click")
@@ -53,13 +54,42 @@ class ClickAction(BaseAction):
             return ActionResult.create_failure("No browser driver in context")
 
         try:
-            # Find the element and click it
-            element = driver.find_element_by_css_selector(self.selector)
-            element.click()
-            return ActionResult.create_success(f"Clicked element: {self.selector}")
+            # Find the element and click it, reusing the element located by an earlier
+            # step on the same page generation
+            cache = get_element_cache(context, require_generation=True)
+            if cache is not None:
+                cache.with_element(driver, self.selector, lambda element: element.click())
+            else:
+                element = driver.find_element_by_css_selector(self.selector)
+                element.click()
+            # The click may have navigated or changed the page
+            return ActionResult.create_success(
+                f"Clicked element: {self.selector}", next_page_generation(context)
+            )
         except Exception as e:
             return ActionResult.create_failure(f"Failed to click element: {str(e)}")
 
+    def get_batch_step(self) -> Optional[Dict[str, Any]]:
+        """
+        Describe the click as a step of a batched DOM script
+
+        Returns:
+            Step dictionary
+        """
+        return {"op": "click", "selector": self.selector}
+
+    def create_batch_result(self, outcome: Dict[str, Any]) -> ActionResult:
+        """
+        Create the result of the click from the outcome of its batched step
+
+        Args:
+            outcome: Outcome reported by the batch script for the step
+
+        Returns:
+            Result of the action execution
+        """
+        return ActionResult.create_success(f"Clicked element: {self.selector}")
+
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert the action to a dictionary
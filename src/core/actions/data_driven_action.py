@@ -5,6 +5,7 @@ import logging
 from src.core.actions.base_action import BaseAction
 from src.core.actions.action_interface import ActionResult
 from src.core.actions.action_factory import ActionFactory
+from src.core.actions.dom_batch_action import DomBatchAction, group_dom_actions, execute_expanded
 from src.core.data.sources.base import DataSource, DataSourceFactory
 from src.core.data.mapping.mapper import DataMapper
 from src.core.data.mapping.variable_mapper import VariableMapper
@@ -30,7 +31,9 @@ class DataDrivenAction(BaseAction):
         continue_on_error: bool = True,
         max_errors: Optional[int] = None,
         results_variable_name: Optional[str] = None,
-        action_id: Optional[str] = None
+        action_id: Optional[str] = None,
+        mapping_batch_size: Optional[int] = None,
+        batch_dom_actions: bool = False
     ):
         """
         Initialize the data-driven action
@@ -44,6 +47,8 @@ class DataDrivenAction(BaseAction):
             max_errors: Maximum number of errors before stopping
             results_variable_name: Name of the variable to store results in
             action_id: Optional unique identifier (generated if not provided)
+            mapping_batch_size: Number of records to map together (None to map one at a time)
+            batch_dom_actions: Whether to run consecutive batchable DOM actions in one script call
         """
         super().__init__(description, action_id)
         self.data_source = data_source
@@ -52,6 +57,8 @@ class DataDrivenAction(BaseAction):
         self.continue_on_error = continue_on_error
         self.max_errors = max_errors
         self.results_variable_name = results_variable_name
+        self.mapping_batch_size = mapping_batch_size
+        self.batch_dom_actions = batch_dom_actions
         self.logger = logging.getLogger(self.__class__.__name__)
         
     @property
@@ -74,18 +81,25 @@ class DataDrivenAction(BaseAction):
             data_source=self.data_source,
             data_mapper=self.data_mapper,
             continue_on_error=self.continue_on_error,
-            max_errors=self.max_errors
+            max_errors=self.max_errors,
+            batch_size=self.mapping_batch_size
         )
         
         # Create an iteration context
         iteration_context = DataIterationContext()
         
+        # Plan the actions once for all records
+        body = group_dom_actions(self.actions) if self.batch_dom_actions else self.actions
+
         # Define the execute function
         def execute_record(record_context: Dict[str, Any]) -> Dict[str, Any]:
             # Execute each action in sequence
-            for action in self.actions:
-                result = action.execute(record_context)
+            for action in body:
+                results = execute_expanded(action, record_context)
+                result = results[-1]
                 if not result.success:
+                    if isinstance(action, DomBatchAction) and action.actions:
+                        action = action.actions[len(results) - 1]
                     return {
                         "success": False,
                         "message": f"Action '{action.description}' failed: {result.message}",
@@ -147,6 +161,8 @@ class DataDrivenAction(BaseAction):
             "continue_on_error": self.continue_on_error,
             "max_errors": self.max_errors,
             "results_variable_name": self.results_variable_name,
+            "mapping_batch_size": self.mapping_batch_size,
+            "batch_dom_actions": self.batch_dom_actions,
             "data_source_type": self.data_source.__class__.__name__,
             "data_mapper_type": self.data_mapper.__class__.__name__
         })
@@ -192,5 +208,7 @@ class DataDrivenAction(BaseAction):
             continue_on_error=data.get("continue_on_error", True),
             max_errors=data.get("max_errors"),
             results_variable_name=data.get("results_variable_name"),
-            action_id=data.get("id")
+            action_id=data.get("id"),
+            mapping_batch_size=data.get("mapping_batch_size"),
+            batch_dom_actions=data.get("batch_dom_actions", False)
         )
@@ -0,0 +1,299 @@
+"""Batched execution of consecutive DOM actions"""
+import uuid
+from typing import Dict, Any, List, Optional
+
+from src.core.actions.base_action import BaseAction
+from src.core.actions.action_interface import ActionResult
+from src.core.actions.action_factory import ActionFactory
+from src.core.utils.element_cache import next_page_generation, apply_page_generation
+
+
+# Script running a list of DOM steps in order; it stops at the first step that
+# fails and reports one outcome per attempted step. It records its progress in
+# the page, so an interrupted run can tell which steps may already have acted.
+_BATCH_SCRIPT = """
+var steps = arguments[0];
+var progress = {id: arguments[1], started: 0, done: 0};
+window.__autoclickBatch = progress;
+var outcomes = [];
+for (var i = 0; i < steps.length; i++) {
+    var step = steps[i];
+    progress.started = i + 1;
+    try {
+        var element = document.querySelector(step.selector);
+        if (!element) {
+            outcomes.push({ok: false, error: "Element not found: " + step.selector});
+            break;
+        }
+        if (step.op === "click") {
+            if (element.scrollIntoView) {
+                element.scrollIntoView({block: "center", inline: "center"});
+            }
+            element.click();
+            progress.done = i + 1;
+            outcomes.push({ok: true});
+        } else {
+            outcomes.push({ok: false, error: "Unsupported operation: " + step.op});
+            break;
+        }
+    } catch (e) {
+        outcomes.push({ok: false, error: String(e)});
+        break;
+    }
+}
+return outcomes;
+"""
+
+# Script reading the progress recorded by a batch run
+_PROGRESS_SCRIPT = """
+var progress = window.__autoclickBatch;
+return progress && progress.id === arguments[0] ? {started: progress.started, done: progress.done} : null;
+"""
+
+
+@ActionFactory.register("dom_batch")
+class DomBatchAction(BaseAction):
+    """
+    Action that runs a sequence of batchable DOM actions in one script call
+
+    Every action must describe itself with get_batch_step(). The steps are sent
+    to the browser together, saving one WebDriver round-trip per action, and a
+    result is still produced for each action. If a step fails inside the
+    script, the remaining actions are executed individually so that they get
+    their usual retries and error messages.
+
+    If the script call itself fails, the batch reads the progress the script
+    recorded in the page. Only actions that provably never started are then
+    executed individually; if a step may have acted (e.g. a click opened an
+    alert or navigated away) or the progress cannot be read, the batch fails
+    rather than risk repeating a click.
+
+    Note that batched clicks are dispatched by the page's JavaScript rather
+    than by WebDriver, and that steps following a click that navigates away
+    still run against the old page, so only enable batching for steps that
+    stay on the page.
+    """
+
+    def __init__(
+        self,
+        description: str,
+        actions: Optional[List[BaseAction]] = None,
+        action_id: Optional[str] = None
+    ):
+        """
+        Initialize the DOM batch action
+
+        Args:
+            description: Human-readable description of the action
+            actions: Batchable actions to run in order
+            action_id: Optional unique identifier (generated if not provided)
+        """
+        super().__init__(description, action_id)
+        self.actions = actions or []
+
+    @property
+    def type(self) -> str:
+        """Get the action type"""
+        return "dom_batch"
+
+    def _execute(self, context: Dict[str, Any]) -> ActionResult:
+        """
+        Execute the action
+
+        Args:
+            context: Execution context containing browser, etc.
+
+        Returns:
+            Result of the action execution, with the result of each action under "results"
+        """
+        results = self.execute_batch(context)
+        failed = [result for result in results if not result.success]
+        if failed:
+            return ActionResult.create_failure(
+                f"DOM batch failed: {failed[0].message}",
+                {"results": results, "failed_result": failed[0]}
+            )
+        return ActionResult.create_success(
+            f"Executed {len(results)} DOM actions",
+            {"results": results}
+        )
+
+    def execute_batch(self, context: Dict[str, Any]) -> List[ActionResult]:
+        """
+        Run the actions, stopping at the first failure
+
+        Args:
+            context: Execution context containing browser, etc.
+
+        Returns:
+            Result of each executed action, in order
+        """
+        results: List[ActionResult] = []
+        driver = context.get("driver")
+        steps = [action.get_batch_step() for action in self.actions]
+
+        if driver and self.actions and all(step is not None for step in steps):
+            batch_id = str(uuid.uuid4())
+            try:
+                outcomes = driver.execute_script(_BATCH_SCRIPT, steps, batch_id)
+            except Exception as e:
+                progress = self._read_progress(driver, batch_id)
+                if progress is None or progress["started"] > progress["done"]:
+                    # A step may have acted without completing; replaying it could repeat it
+                    return self._interrupted_results(progress, e)
+                self.logger.warning(
+                    f"Batched DOM script failed after {progress['done']} steps, "
+                    f"executing the remaining actions individually: {str(e)}"
+                )
+                outcomes = [{"ok": True}] * progress["done"]
+
+            for action, outcome in zip(self.actions, outcomes if isinstance(outcomes, list) else []):
+                if not isinstance(outcome, dict) or not outcome.get("ok"):
+                    # Let the action retry on its own and report its own error
+                    break
+                results.append(action.create_batch_result(outcome))
+
+        page_change = next_page_generation(context) if results else {}
+        if page_change:
+            # The batched steps may have changed the page; record it in their results
+            # and do not let the remaining actions reuse elements located before them
+            results = [ActionResult.create_success(result.message, dict(result.data or {}, **page_change))
+                       for result in results]
+            context = dict(context, **page_change)
+
+        for action in self.actions[len(results):]:
+            result = action.execute(context)
+            results.append(result)
+            if not result.success:
+                break
+            apply_page_generation(context, result.data)
+
+        return results
+
+    def _read_progress(self, driver: Any, batch_id: str) -> Optional[Dict[str, int]]:
+        """
+        Read the progress an interrupted batch script recorded in the page
+
+        Args:
+            driver: WebDriver the script ran in
+            batch_id: ID passed to the script
+
+        Returns:
+            Dictionary with the number of started and completed steps, or None
+            if it cannot be read (e.g. the page was left or an alert is open)
+        """
+        try:
+            progress = driver.execute_script(_PROGRESS_SCRIPT, batch_id)
+        except Exception as e:
+            self.logger.debug(f"Cannot read DOM batch progress: {str(e)}")
+            return None
+        if not isinstance(progress, dict):
+            return None
+        return {"started": int(progress.get("started", 0)), "done": int(progress.get("done", 0))}
+
+    def _interrupted_results(self, progress: Optional[Dict[str, int]], error: Exception) -> List[ActionResult]:
+        """
+        Report a batch whose script was interrupted where replaying could repeat a step
+
+        Args:
+            progress: Progress recorded by the script, or None if unknown
+            error: Error raised by the script call
+
+        Returns:
+            Results of the steps known to have completed, followed by a failure
+            for the step that may or may not have acted
+        """
+        done = progress["done"] if progress else 0
+        results = [action.create_batch_result({"ok": True}) for action in self.actions[:done]]
+        action = self.actions[done]
+        message = (
+            f"DOM batch was interrupted at {action.description}; "
+            f"not retried as it may already have run: {str(error)}"
+        )
+        self.logger.error(message)
+        results.append(ActionResult.create_failure(message))
+        return results
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the action to a dictionary"""
+        data = super().to_dict()
+        data["actions"] = [action.to_dict() for action in self.actions]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DomBatchAction':
+        """
+        Create an action from a dictionary
+
+        Args:
+            data: Dictionary representation of the action
+
+        Returns:
+            Instantiated action
+        """
+        actions = [
+            ActionFactory.get_instance().create_action(action_data)
+            for action_data in data.get("actions", [])
+        ]
+        return cls(
+            description=data.get("description", ""),
+            actions=actions,
+            action_id=data.get("id")
+        )
+
+
+def group_dom_actions(actions: List[BaseAction], min_batch_size: int = 2) -> List[BaseAction]:
+    """
+    Replace runs of consecutive batchable DOM actions with DomBatchActions
+
+    Args:
+        actions: Actions to group
+        min_batch_size: Minimum length of a run worth batching
+
+    Returns:
+        New list of actions; actions outside batched runs are kept as they are
+    """
+    grouped: List[BaseAction] = []
+    run: List[BaseAction] = []
+
+    def flush() -> None:
+        if len(run) >= max(min_batch_size, 1):
+            descriptions = ", ".join(action.description for action in run)
+            grouped.append(DomBatchAction(f"Batched DOM actions: {descriptions}", list(run)))
+        else:
+            grouped.extend(run)
+        run.clear()
+
+    for action in actions:
+        if not isinstance(action, DomBatchAction) and action.get_batch_step() is not None:
+            run.append(action)
+            continue
+        flush()
+        grouped.append(action)
+    flush()
+
+    return grouped
+
+
+def execute_expanded(action: BaseAction, context: Dict[str, Any]) -> List[ActionResult]:
+    """
+    Execute an action, expanding a DomBatchAction into the results of its actions
+
+    A page generation reported by the results is stored in the context, so
+    the actions run after them (e.g. in a loop body) do not reuse elements
+    located before a click.
+
+    Args:
+        action: Action to execute
+        context: Execution context
+
+    Returns:
+        Results of the executed actions
+    """
+    if isinstance(action, DomBatchAction) and action.actions:
+        results = action.execute_batch(context)
+    else:
+        results = [action.execute(context)]
+    for result in results:
+        apply_page_generation(context, result.data)
+    return results
@@ -4,6 +4,7 @@ from typing import Dict, Any, List, Optional, Iterable
 from src.core.actions.base_action import BaseAction
 from src.core.actions.action_interface import ActionResult
 from src.core.actions.action_factory import ActionFactory
+from src.core.actions.dom_batch_action import group_dom_actions, execute_expanded
 
 
 @ActionFactory.register("for_each")
@@ -16,7 +17,8 @@ class ForEachAction(BaseAction):
         collection_variable: str,
         item_variable: str,
         actions: List[BaseAction],
-        action_id: Optional[str] = None
+        action_id: Optional[str] = None,
+        batch_dom_actions: bool = False
     ):
         """
         Initialize the for-each loop action
@@ -27,11 +29,13 @@ class ForEachAction(BaseAction):
             item_variable: Name of the variable to store the current item
             actions: Actions to execute for each item
             action_id: Optional unique identifier (generated if not provided)
+            batch_dom_actions: Whether to run consecutive batchable DOM actions in one script call
         """
         super().__init__(description, action_id)
         self.collection_variable = collection_variable
         self.item_variable = item_variable
         self.actions = actions
+        self.batch_dom_actions = batch_dom_actions
 
     @property
     def type(self) -> str:
@@ -61,6 +65,9 @@ class ForEachAction(BaseAction):
                 f"Collection variable is not iterable: {self.collection_variable}"
             )
 
+        # Plan the body once; batched runs still report one result per action
+        body = group_dom_actions(self.actions) if self.batch_dom_actions else self.actions
+
         # Initialize loop variables
         all_results = []
         index = 0
@@ -78,7 +85,7 @@ class ForEachAction(BaseAction):
 
             # Execute the actions
             iteration_results = []
-            for action in self.actions:
+            for action in body:
                 # Check for break
                 if context.get("loop_break", False):
                     break
@@ -89,8 +96,9 @@ class ForEachAction(BaseAction):
                     break
 
                 # Execute the action
-                result = action.execute(context)
-                iteration_results.append(result)
+                results = execute_expanded(action, context)
+                iteration_results.extend(results)
+                result = results[-1]
 
                 # If an action fails, exit the loop
                 if not result.success:
@@ -127,7 +135,8 @@ class ForEachAction(BaseAction):
         data.update({
             "collection_variable": self.collection_variable,
             "item_variable": self.item_variable,
-            "actions": [action.to_dict() for action in self.actions]
+            "actions": [action.to_dict() for action in self.actions],
+            "batch_dom_actions": self.batch_dom_actions
         })
         return data
 
@@ -156,5 +165,6 @@ class ForEachAction(BaseAction):
             collection_variable=data.get("collection_variable", ""),
             item_variable=data.get("item_variable", ""),
             actions=actions,
-            action_id=data.get("id")
+            action_id=data.get("id"),
+            batch_dom_actions=data.get("batch_dom_actions", False)
         )
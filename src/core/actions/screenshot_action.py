@@ -1,11 +1,14 @@
 """Action for capturing screenshots"""
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Union
 
 from src.core.actions.base_action import BaseAction
 from src.core.actions.action_interface import ActionResult
 from src.core.actions.action_factory import ActionFactory
 from src.core.utils.screenshot_manager import ScreenshotManager
 from src.core.utils.screenshot_capture import CaptureMode
+from src.core.utils.screenshot_encoding import EncodingProfileRegistry
+from src.core.utils.screenshot_retention import RetentionPolicy
+from src.core.utils.element_cache import get_element_cache
 
 
 @ActionFactory.register("screenshot")
@@ -20,6 +23,11 @@ class ScreenshotAction(BaseAction):
         selector: Optional[str] = None,
         region: Optional[Tuple[int, int, int, int]] = None,
         screenshot_dir: Optional[str] = None,
+        async_writes: bool = False,
+        deduplicate: bool = False,
+        encoding: Optional[Union[str, Dict[str, Any]]] = None,
+        near_duplicate_threshold: Optional[int] = None,
+        retention: Optional[RetentionPolicy] = None,
         action_id: Optional[str] = None
     ):
         """
@@ -32,10 +40,21 @@ class ScreenshotAction(BaseAction):
             selector: CSS selector for the element to capture (required for "element" mode)
             region: Region to capture as (x, y, width, height) (required for "region" mode)
             screenshot_dir: Directory to store screenshots (uses default if not provided)
+            async_writes: Whether to return as soon as the screenshot is grabbed and
+                write it in the background (see ScreenshotManager.flush)
+            deduplicate: Whether to store identical screenshots only once
+            encoding: Name of a registered encoding profile (e.g. "webp" or "thumbnail")
+                or a profile dictionary (uses the global default profile if not provided)
+            near_duplicate_threshold: Maximum number of differing perceptual hash bits for
+                deduplicated screenshots to be stored once (None for identical screenshots only);
+                applies when the directory's shared manager is created
+            retention: Limits to enforce on the directory's screenshots in the background;
+                applies from the first action that starts enforcing one for the directory
             action_id: Optional unique identifier (generated if not provided)
 
         Raises:
-            ValueError: If required parameters are missing for the selected mode
+            ValueError: If required parameters are missing for the selected mode, or a
+                near-duplicate threshold is given without deduplicate
         """
         super().__init__(description, action_id)
         self.name = name
@@ -43,6 +62,11 @@ class ScreenshotAction(BaseAction):
         self.selector = selector
         self.region = region
         self.screenshot_dir = screenshot_dir
+        self.async_writes = async_writes
+        self.deduplicate = deduplicate
+        self.encoding = encoding
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.retention = retention
 
         # Validate parameters based on mode
         self._validate_parameters()
@@ -55,6 +79,13 @@ class ScreenshotAction(BaseAction):
         if self.mode_str == "region" and not self.region:
             raise ValueError("Region is required for 'region' capture mode")
 
+        if self.near_duplicate_threshold is not None and not self.deduplicate:
+            raise ValueError("A near-duplicate threshold requires deduplicate")
+
+        if self.encoding is not None:
+            # Resolve once so unknown profile names and bad settings fail early
+            EncodingProfileRegistry.get(self.encoding)
+
     @property
     def type(self) -> str:
         """Get the action type"""
@@ -76,22 +107,35 @@ class ScreenshotAction(BaseAction):
             return ActionResult.create_failure("No browser driver in context")
 
         try:
-            # Create the screenshot manager
-            manager = ScreenshotManager(self.screenshot_dir)
-
-            # Find the element if in element mode
-            element = self._find_element(driver) if self.mode_str == "element" else None
-
-            # Capture the screenshot
-            screenshot_path = manager.capture_and_save(
-                driver=driver,
-                name=self.name,
-                mode=self._get_capture_mode(),
-                element=element,
-                region=self.region,
-                metadata=self._create_metadata()
+            # Reuse the long-lived manager of the directory (and its worker pool)
+            manager = ScreenshotManager.shared(
+                self.screenshot_dir or "screenshots",
+                content_addressed=self.deduplicate,
+                near_duplicate_threshold=self.near_duplicate_threshold,
+                retention=self.retention
             )
 
+            def capture(element: Optional[Any]) -> str:
+                return manager.capture_and_save(
+                    driver=driver,
+                    name=self.name,
+                    mode=self._get_capture_mode(),
+                    element=element,
+                    region=self.region,
+                    metadata=self._create_metadata(context),
+                    background=self.async_writes,
+                    encoding=self.encoding
+                )
+
+            # Capture the screenshot, finding the element first if in element mode
+            cache = get_element_cache(context, require_generation=True) if self.mode_str == "element" else None
+            if cache is not None:
+                # A cached element that went stale is located again and captured once more
+                screenshot_path = cache.with_element(driver, self.selector, capture)
+            else:
+                element = self._find_element(driver) if self.mode_str == "element" else None
+                screenshot_path = capture(element)
+
             return ActionResult.create_success(
                 f"Screenshot captured: {screenshot_path}",
                 {"screenshot_path": screenshot_path}
@@ -116,10 +160,11 @@ class ScreenshotAction(BaseAction):
         else:
             return CaptureMode.FULL_SCREEN
 
-    def _create_metadata(self) -> Dict[str, Any]:
+    def _create_metadata(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Create metadata for the screenshot"""
         return {
             "action_id": self.id,
+            "workflow_id": context.get("workflow_id"),
             "description": self.description,
             "mode": self.mode_str,
             "selector": self.selector,
@@ -134,7 +179,12 @@ class ScreenshotAction(BaseAction):
             "mode": self.mode_str,
             "selector": self.selector,
             "region": self.region,
-            "screenshot_dir": self.screenshot_dir
+            "screenshot_dir": self.screenshot_dir,
+            "async_writes": self.async_writes,
+            "deduplicate": self.deduplicate,
+            "encoding": self.encoding,
+            "near_duplicate_threshold": self.near_duplicate_threshold,
+            "retention": self.retention.to_dict() if self.retention else None
         })
         return data
 
@@ -156,5 +206,10 @@ class ScreenshotAction(BaseAction):
             selector=data.get("selector"),
             region=data.get("region"),
             screenshot_dir=data.get("screenshot_dir"),
+            async_writes=data.get("async_writes", False),
+            deduplicate=data.get("deduplicate", False),
+            encoding=data.get("encoding"),
+            near_duplicate_threshold=data.get("near_duplicate_threshold"),
+            retention=RetentionPolicy.from_dict(data["retention"]) if data.get("retention") else None,
             action_id=data.get("id")
         )
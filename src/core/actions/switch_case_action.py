@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from src.core.actions.base_action import BaseAction
 from src.core.actions.action_interface import ActionResult
 from src.core.conditions.condition_interface import ConditionInterface
+from src.core.conditions.condition_cache import ConditionCache
+from src.core.conditions.dom_probe import dom_probe_scope
 from src.core.actions.action_factory import ActionFactory
 from src.core.expressions.expression_parser import parse_expression
 
@@ -62,7 +64,9 @@ class SwitchCaseAction(BaseAction):
         description: str,
         cases: List[CaseBranch],
         default_actions: Optional[List[BaseAction]] = None,
-        action_id: Optional[str] = None
+        action_id: Optional[str] = None,
+        memoize_conditions: bool = False,
+        batch_dom_probes: bool = False
     ):
         """
         Initialize the switch-case action
@@ -72,10 +76,21 @@ class SwitchCaseAction(BaseAction):
             cases: List of case branches to evaluate
             default_actions: Actions to execute if no case matches (optional)
             action_id: Optional unique identifier (generated if not provided)
+            memoize_conditions: Whether to reuse case results while their variables are unchanged
+            batch_dom_probes: Whether to resolve the selectors of all cases in one script call
         """
         super().__init__(description, action_id)
         self.cases = cases
         self.default_actions = default_actions or []
+        self.memoize_conditions = memoize_conditions
+        self.batch_dom_probes = batch_dom_probes
+        self.condition_cache: Optional[ConditionCache] = None
+        if memoize_conditions:
+            # All cases share one cache so the hit rate covers the whole switch
+            self.condition_cache = ConditionCache()
+            for case in cases:
+                if hasattr(case.condition, "enable_memoization"):
+                    case.condition.enable_memoization(self.condition_cache)
 
     @property
     def type(self) -> str:
@@ -92,19 +107,49 @@ class SwitchCaseAction(BaseAction):
         Returns:
             Result of the action execution
         """
-        # Evaluate each case in order
-        for i, case in enumerate(self.cases):
-            # Evaluate the condition
-            condition_result = case.condition.evaluate(context)
-
-            if condition_result:
-                # Condition is true, execute this case's actions
-                case_description = case.description or f"Case {i+1}"
-                return self._execute_branch(case.actions, context, case_description)
+        # Find the first matching case
+        matched = self._match_case(context)
+        if matched is not None:
+            # Condition is true, execute this case's actions
+            i, case = matched
+            case_description = case.description or f"Case {i+1}"
+            return self._execute_branch(case.actions, context, case_description)
 
         # No case matched, execute default actions
         return self._execute_branch(self.default_actions, context, "default")
 
+    def _match_case(self, context: Dict[str, Any]) -> Optional[Tuple[int, CaseBranch]]:
+        """
+        Evaluate the cases in order and find the first one whose condition is true
+
+        Args:
+            context: Execution context
+
+        Returns:
+            Index and case branch of the first match, or None if no case matches
+        """
+        if not self.batch_dom_probes:
+            return self._first_true_case(context)
+
+        # Probe the selectors of all cases at once; results are valid for this evaluation only
+        with dom_probe_scope(context, [case.condition for case in self.cases]):
+            return self._first_true_case(context)
+
+    def _first_true_case(self, context: Dict[str, Any]) -> Optional[Tuple[int, CaseBranch]]:
+        """
+        Evaluate each case in order
+
+        Args:
+            context: Execution context
+
+        Returns:
+            Index and case branch of the first match, or None if no case matches
+        """
+        for i, case in enumerate(self.cases):
+            if case.condition.evaluate(context):
+                return i, case
+        return None
+
     def _execute_branch(
         self,
         actions: List[BaseAction],
@@ -158,7 +203,9 @@ class SwitchCaseAction(BaseAction):
         data = super().to_dict()
         data.update({
             "cases": [case.to_dict() for case in self.cases],
-            "default_actions": [action.to_dict() for action in self.default_actions]
+            "default_actions": [action.to_dict() for action in self.default_actions],
+            "memoize_conditions": self.memoize_conditions,
+            "batch_dom_probes": self.batch_dom_probes
         })
         return data
 
@@ -198,5 +245,7 @@ class SwitchCaseAction(BaseAction):
             description=data.get("description", ""),
             cases=cases,
             default_actions=default_actions,
-            action_id=data.get("id")
+            action_id=data.get("id"),
+            memoize_conditions=data.get("memoize_conditions", False),
+            batch_dom_probes=data.get("batch_dom_probes", False)
         )
@@ -0,0 +1,107 @@
+"""Action that waits until a condition is met"""
+from typing import Dict, Any, Optional
+
+from src.core.actions.base_action import BaseAction
+from src.core.actions.action_interface import ActionResult
+from src.core.conditions.condition_interface import ConditionInterface
+from src.core.conditions.condition_waiter import ConditionWaiter, PollingStrategy
+from src.core.actions.action_factory import ActionFactory
+
+
+@ActionFactory.register("wait_for_condition")
+class WaitForConditionAction(BaseAction):
+    """Action that blocks until a condition is met or a timeout expires"""
+
+    def __init__(
+        self,
+        description: str,
+        condition: ConditionInterface,
+        timeout: float = 10.0,
+        strategy: PollingStrategy = PollingStrategy.ADAPTIVE,
+        initial_interval: float = 0.05,
+        max_interval: float = 1.0,
+        use_mutation_observer: bool = True,
+        action_id: Optional[str] = None
+    ):
+        """
+        Initialize the wait for condition action
+
+        Args:
+            description: Human-readable description of the action
+            condition: Condition to wait for
+            timeout: Maximum time to wait (seconds)
+            strategy: Strategy for spacing polls
+            initial_interval: Delay before the second poll (seconds)
+            max_interval: Upper bound for the delay between polls (seconds)
+            use_mutation_observer: Whether to wait for DOM mutations in the page between polls
+            action_id: Optional unique identifier (generated if not provided)
+        """
+        super().__init__(description, action_id)
+        self.condition = condition
+        self.waiter = ConditionWaiter(
+            timeout=timeout,
+            strategy=strategy,
+            initial_interval=initial_interval,
+            max_interval=max_interval,
+            use_mutation_observer=use_mutation_observer
+        )
+
+    @property
+    def type(self) -> str:
+        """Get the action type"""
+        return "wait_for_condition"
+
+    def _execute(self, context: Dict[str, Any]) -> ActionResult:
+        """
+        Execute the action
+
+        Args:
+            context: Execution context containing variables, browser, etc.
+
+        Returns:
+            Result of the action execution
+        """
+        result = self.waiter.wait(self.condition, context)
+        data = dict(self.waiter.last_wait)
+
+        if result:
+            return ActionResult.create_success(result.message, data)
+        return ActionResult.create_failure(result.message, data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the action to a dictionary"""
+        data = super().to_dict()
+        data.update({
+            "condition": self.condition.to_dict() if hasattr(self.condition, "to_dict") else {"type": "unknown"},
+            "timeout": self.waiter.timeout,
+            "strategy": self.waiter.strategy.name,
+            "initial_interval": self.waiter.initial_interval,
+            "max_interval": self.waiter.max_interval,
+            "use_mutation_observer": self.waiter.use_mutation_observer
+        })
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'WaitForConditionAction':
+        """
+        Create an action from a dictionary
+
+        Args:
+            data: Dictionary representation of the action
+
+        Returns:
+            Instantiated action
+        """
+        from src.core.conditions.condition_factory import ConditionFactory
+        condition = ConditionFactory.create_condition(data.get("condition", {}))
+
+        return cls(
+            description=data.get("description", ""),
+            condition=condition,
+            timeout=data.get("timeout", 10.0),
+            strategy=PollingStrategy[data.get("strategy", "ADAPTIVE")],
+            initial_interval=data.get("initial_interval", 0.05),
+            max_interval=data.get("max_interval", 1.0),
+            use_mutation_observer=data.get("use_mutation_observer", True),
+            action_id=data.get("id")
+        )
@@ -3,7 +3,9 @@ from typing import Dict, Any, List, Optional
 
 from src.core.actions.base_action import BaseAction
 from src.core.actions.action_interface import ActionResult
-from src.core.conditions.condition_interface import ConditionInterface
+from src.core.conditions.condition_interface import ConditionInterface, ConditionResult
+from src.core.conditions.condition_cache import ConditionCache
+from src.core.conditions.dom_probe import dom_probe_scope
 from src.core.actions.action_factory import ActionFactory
 
 
@@ -17,7 +19,9 @@ class WhileLoopAction(BaseAction):
         condition: ConditionInterface,
         actions: List[BaseAction],
         max_iterations: Optional[int] = None,
-        action_id: Optional[str] = None
+        action_id: Optional[str] = None,
+        memoize_conditions: bool = False,
+        batch_dom_probes: bool = False
     ):
         """
         Initialize the while loop action
@@ -28,11 +32,18 @@ class WhileLoopAction(BaseAction):
             actions: Actions to execute in each iteration
             max_iterations: Maximum number of iterations (None for unlimited)
             action_id: Optional unique identifier (generated if not provided)
+            memoize_conditions: Whether to reuse the condition result while its variables are unchanged
+            batch_dom_probes: Whether to resolve all selectors of the condition in one script call
         """
         super().__init__(description, action_id)
         self.condition = condition
         self.actions = actions
         self.max_iterations = max_iterations
+        self.memoize_conditions = memoize_conditions
+        self.batch_dom_probes = batch_dom_probes
+        self.condition_cache: Optional[ConditionCache] = None
+        if memoize_conditions and hasattr(condition, "enable_memoization"):
+            self.condition_cache = condition.enable_memoization()
 
     @property
     def type(self) -> str:
@@ -67,7 +78,7 @@ class WhileLoopAction(BaseAction):
                 )
 
             # Evaluate the condition
-            condition_result = self.condition.evaluate(context)
+            condition_result = self._evaluate_condition(context)
             if not condition_result:
                 # Condition is false, exit the loop
                 return ActionResult.create_success(
@@ -112,13 +123,31 @@ class WhileLoopAction(BaseAction):
             iteration += 1
             context["loop_iteration"] = iteration
 
+    def _evaluate_condition(self, context: Dict[str, Any]) -> ConditionResult:
+        """
+        Evaluate the loop condition, probing its selectors in one call if enabled
+
+        Args:
+            context: Execution context
+
+        Returns:
+            Result of the condition evaluation
+        """
+        if not self.batch_dom_probes:
+            return self.condition.evaluate(context)
+
+        with dom_probe_scope(context, [self.condition]):
+            return self.condition.evaluate(context)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the action to a dictionary"""
         data = super().to_dict()
         data.update({
             "condition": self.condition.to_dict() if hasattr(self.condition, "to_dict") else {"type": "unknown"},
             "actions": [action.to_dict() for action in self.actions],
-            "max_iterations": self.max_iterations
+            "max_iterations": self.max_iterations,
+            "memoize_conditions": self.memoize_conditions,
+            "batch_dom_probes": self.batch_dom_probes
         })
         return data
 
@@ -152,5 +181,7 @@ class WhileLoopAction(BaseAction):
             condition=condition,
             actions=actions,
             max_iterations=data.get("max_iterations"),
-            action_id=data.get("id")
+            action_id=data.get("id"),
+            memoize_conditions=data.get("memoize_conditions", False),
+            batch_dom_probes=data.get("batch_dom_probes", False)
         )
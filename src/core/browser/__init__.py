@@ -0,0 +1,10 @@
+"""Browser session management"""
+from src.core.browser.driver_pool import DriverPool, DriverLease
+from src.core.browser.fake_driver import FakeDriver, FakeDriverError
+
+__all__ = [
+    'DriverPool',
+    'DriverLease',
+    'FakeDriver',
+    'FakeDriverError'
+]
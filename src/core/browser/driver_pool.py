@@ -0,0 +1,360 @@
+"""Pool of warm browser sessions"""
+import time
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from src.core.utils.element_cache import ElementCache
+
+
+class _PooledSession:
+    """A browser session owned by the pool"""
+
+    def __init__(self, driver: Any, launch_time: float):
+        """Initialize the session record"""
+        self.driver = driver
+        self.launch_time = launch_time
+        self.uses = 0
+
+
+class DriverLease:
+    """
+    A browser session leased from a DriverPool
+
+    Release the lease when the run is done, or use it as a context manager,
+    which yields the driver and releases it on exit.
+    """
+
+    def __init__(self, pool: 'DriverPool', session: _PooledSession, wait_time: float):
+        """
+        Initialize the lease
+
+        Args:
+            pool: Pool the session was leased from
+            session: Leased session
+            wait_time: Time spent waiting for the session (seconds)
+        """
+        self.pool = pool
+        self.driver = session.driver
+        self.wait_time = wait_time
+        self.released = False
+        self._session = session
+
+    def release(self, broken: bool = False) -> None:
+        """
+        Return the session to the pool
+
+        Args:
+            broken: Whether the session is known to be unusable and must be replaced
+        """
+        self.pool.release(self, broken)
+
+    def __enter__(self) -> Any:
+        """Enter context manager, returning the driver"""
+        return self.driver
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Exit context manager, releasing the lease"""
+        self.release()
+
+
+class DriverPool:
+    """
+    Keeps browser sessions running and leases them to workflow runs
+
+    start() launches the sessions up front so a run does not pay the browser
+    start-up cost. Between leases a session's windows are replaced by a
+    fresh one, the browser's cookies and the storage of every origin its
+    windows visited are cleared through the Chrome DevTools protocol, and it
+    is navigated to a blank page. Drivers without DevTools access (such as
+    Firefox) cannot be cleared browser-wide, so their sessions are replaced
+    by fresh ones instead of being reused. Sessions that fail a health check
+    or the reset, or that reached max_uses, are quit and replaced in the
+    background.
+
+    Drivers come from driver_factory, so tests can plug in a FakeDriver.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], Any],
+        size: int = 2,
+        max_uses: Optional[int] = 50,
+        reset_between_leases: bool = True,
+        blank_url: str = "about:blank"
+    ):
+        """
+        Initialize the driver pool
+
+        Args:
+            driver_factory: Callable that launches a browser session and returns its driver
+            size: Maximum number of sessions
+            max_uses: Number of leases after which a session is replaced, or None for no limit
+            reset_between_leases: Whether to clear windows, cookies and storage between leases
+            blank_url: URL sessions are navigated to when they are reset
+
+        Raises:
+            ValueError: If size or max_uses is less than 1
+        """
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if max_uses is not None and max_uses < 1:
+            raise ValueError("max_uses must be at least 1")
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.driver_factory = driver_factory
+        self.size = size
+        self.max_uses = max_uses
+        self.reset_between_leases = reset_between_leases
+        self.blank_url = blank_url
+
+        self._available = threading.Condition()
+        self._idle: Deque[_PooledSession] = deque()
+        self._total = 0
+        self._leased = 0
+        self._closed = False
+        self._metrics = {
+            "leases": 0,
+            "launches": 0,
+            "launch_failures": 0,
+            "recycled": 0,
+            "crashed": 0,
+            "launch_time_total": 0.0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0
+        }
+
+    def start(self) -> None:
+        """
+        Launch sessions until the pool is full, in parallel
+
+        Launch failures are logged and retried on the next acquire().
+        """
+        with self._available:
+            missing = self.size - self._total
+            self._total += missing
+        threads = [threading.Thread(target=self._replenish_reserved, daemon=True) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def acquire(self, timeout: Optional[float] = None) -> DriverLease:
+        """
+        Lease a healthy session, launching one if the pool is not full
+
+        Args:
+            timeout: Maximum time to wait for a session (seconds), or None to wait indefinitely
+
+        Returns:
+            Lease of the session
+
+        Raises:
+            TimeoutError: If no session became available in time
+            RuntimeError: If the pool is closed
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+
+        while True:
+            with self._available:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                ready = self._available.wait_for(
+                    lambda: self._closed or self._idle or self._total < self.size, remaining
+                )
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if not ready:
+                    raise TimeoutError(f"No browser session available within {timeout} seconds")
+                if self._idle:
+                    session = self._idle.popleft()
+                else:
+                    # Reserve a slot and launch outside the lock
+                    self._total += 1
+                    session = None
+
+            if session is None:
+                session = self._launch()
+            elif not self._is_healthy(session.driver):
+                self.logger.warning("Discarding crashed browser session")
+                self._discard(session, crashed=True)
+                continue
+
+            wait_time = time.monotonic() - start
+            session.uses += 1
+            with self._available:
+                self._leased += 1
+                self._metrics["leases"] += 1
+                self._metrics["wait_time_total"] += wait_time
+                self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], wait_time)
+            return DriverLease(self, session, wait_time)
+
+    def release(self, lease: DriverLease, broken: bool = False) -> None:
+        """
+        Return a leased session, resetting or replacing it
+
+        Args:
+            lease: Lease returned by acquire()
+            broken: Whether the session is known to be unusable and must be replaced
+        """
+        with self._available:
+            if lease.released:
+                return
+            lease.released = True
+            self._leased -= 1
+            closed = self._closed
+
+        session = lease._session
+        if broken or closed:
+            self._discard(session, crashed=broken)
+            return
+        if self.max_uses is not None and session.uses >= self.max_uses:
+            self._discard(session)
+            return
+
+        if self.reset_between_leases and not hasattr(session.driver, "execute_cdp_cmd"):
+            # The next run must not see this run's cookies or storage
+            self._discard(session)
+            return
+
+        try:
+            if self.reset_between_leases:
+                self._reset(session.driver)
+            elif not self._is_healthy(session.driver):
+                raise RuntimeError("health check failed")
+        except Exception as e:
+            self.logger.warning(f"Replacing browser session that failed to reset: {str(e)}")
+            self._discard(session, crashed=True)
+            return
+
+        with self._available:
+            if not self._closed:
+                self._idle.append(session)
+                self._available.notify()
+                return
+        self._discard(session)
+
+    def close(self) -> None:
+        """Quit the idle sessions; leased sessions are quit when they are released"""
+        with self._available:
+            self._closed = True
+            sessions = list(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+        for session in sessions:
+            self._quit(session.driver)
+        with self._available:
+            self._total -= len(sessions)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get pool metrics
+
+        Returns:
+            Dictionary with the pool size, idle and leased session counts, lease,
+            launch, recycle and crash counters, and launch and wait times (seconds)
+        """
+        with self._available:
+            metrics = dict(self._metrics)
+            metrics.update({
+                "size": self.size,
+                "sessions": self._total,
+                "idle": len(self._idle),
+                "leased": self._leased
+            })
+        metrics["wait_time_avg"] = metrics["wait_time_total"] / metrics["leases"] if metrics["leases"] else 0.0
+        metrics["launch_time_avg"] = (
+            metrics["launch_time_total"] / metrics["launches"] if metrics["launches"] else 0.0
+        )
+        return metrics
+
+    def _launch(self) -> _PooledSession:
+        """Launch a session for a slot already counted in _total"""
+        start = time.monotonic()
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._available:
+                self._total -= 1
+                self._metrics["launch_failures"] += 1
+                self._available.notify()
+            raise
+        launch_time = time.monotonic() - start
+        with self._available:
+            self._metrics["launches"] += 1
+            self._metrics["launch_time_total"] += launch_time
+        return _PooledSession(driver, launch_time)
+
+    def _replenish_reserved(self) -> None:
+        """Launch a session into the idle queue for a slot already counted in _total"""
+        try:
+            session = self._launch()
+        except Exception as e:
+            self.logger.error(f"Error launching browser session: {str(e)}")
+            return
+        with self._available:
+            if not self._closed:
+                self._idle.append(session)
+                self._available.notify()
+                return
+        self._discard(session)
+
+    def _discard(self, session: _PooledSession, crashed: bool = False) -> None:
+        """Quit a session, free its slot and launch a replacement in the background"""
+        self._quit(session.driver)
+        with self._available:
+            self._total -= 1
+            self._metrics["crashed" if crashed else "recycled"] += 1
+            replace = not self._closed and self._total < self.size
+            if replace:
+                self._total += 1
+            self._available.notify()
+        if replace:
+            threading.Thread(target=self._replenish_reserved, daemon=True).start()
+
+    def _reset(self, driver: Any) -> None:
+        """
+        Replace the windows of a session and clear its cookies and storage browser-wide
+
+        Storage is cleared for every origin in the windows' navigation
+        histories; opening a fresh window drops the old windows' session
+        storage.
+        """
+        origins = set()
+        old_handles: List[str] = driver.window_handles
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            history = driver.execute_cdp_cmd("Page.getNavigationHistory", {})
+            for entry in history["entries"]:
+                parts = urlsplit(entry["url"])
+                if parts.scheme in ("http", "https"):
+                    origins.add(f"{parts.scheme}://{parts.netloc}")
+
+        driver.switch_to.new_window("tab")
+        fresh_handle = driver.current_window_handle
+        for handle in old_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(fresh_handle)
+
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        for origin in sorted(origins):
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+        driver.get(self.blank_url)
+        ElementCache.invalidate_driver(driver)
+
+    def _is_healthy(self, driver: Any) -> bool:
+        """Check that a session still answers commands"""
+        try:
+            return bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _quit(self, driver: Any) -> None:
+        """Quit a driver, ignoring errors from sessions that already died"""
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.debug(f"Error quitting browser session: {str(e)}")
@@ -0,0 +1,233 @@
+"""In-memory stand-in for a Selenium WebDriver"""
+import time
+import itertools
+from urllib.parse import urlsplit
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class FakeDriverError(Exception):
+    """Error raised by a FakeDriver whose session has crashed or quit"""
+    pass
+
+
+class _FakeSwitchTo:
+    """Window switching of a FakeDriver"""
+
+    def __init__(self, driver: 'FakeDriver'):
+        """Initialize the switcher"""
+        self._driver = driver
+
+    def window(self, handle: str) -> None:
+        """
+        Switch to a window
+
+        Args:
+            handle: Handle of the window
+
+        Raises:
+            FakeDriverError: If the window does not exist
+        """
+        self._driver._check_alive()
+        if handle not in self._driver._windows:
+            raise FakeDriverError(f"No such window: {handle}")
+        self._driver.current_window_handle = handle
+
+    def new_window(self, type_hint: Optional[str] = None) -> None:
+        """
+        Open a new, empty window and switch to it
+
+        Args:
+            type_hint: "tab" or "window" (ignored)
+        """
+        self.window(self._driver.open_window())
+
+
+class FakeDriver:
+    """
+    Fake browser session for tests and local runs
+
+    Implements the parts of the WebDriver API the driver pool uses (windows,
+    cookies, web storage, navigation, quit) and the Chrome DevTools commands
+    it sends, without launching a browser. Plug it into a DriverPool with a
+    factory such as ``lambda: FakeDriver()``.
+
+    Like a browser, it keeps cookies and local storage per origin and session
+    storage per window and origin; the WebDriver cookie commands and the
+    local_storage and session_storage attributes see only the current page's.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, launch_delay: float = 0.0):
+        """
+        Initialize the fake driver
+
+        Args:
+            launch_delay: Time to sleep to simulate browser start-up (seconds)
+        """
+        if launch_delay:
+            time.sleep(launch_delay)
+        self.session_id = f"fake-{next(self._ids)}"
+        self._window_ids = itertools.count(1)
+        self._windows: List[str] = [self._new_handle()]
+        self.current_window_handle = self._windows[0]
+        self._history: Dict[str, List[str]] = {self.current_window_handle: ["about:blank"]}
+        self.cookies: List[Dict[str, Any]] = []
+        self._local_storage: Dict[str, Dict[str, str]] = {}
+        self._session_storage: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self.scripts: List[str] = []
+        self.crashed = False
+        self.quit_called = False
+
+    @property
+    def window_handles(self) -> List[str]:
+        """Get the handles of the open windows"""
+        self._check_alive()
+        return list(self._windows)
+
+    @property
+    def switch_to(self) -> _FakeSwitchTo:
+        """Get the window switcher"""
+        return _FakeSwitchTo(self)
+
+    @property
+    def current_url(self) -> str:
+        """Get the URL of the current window"""
+        return self._history[self.current_window_handle][-1]
+
+    @property
+    def local_storage(self) -> Dict[str, str]:
+        """Get the local storage of the current page's origin"""
+        return self._local_storage.setdefault(self._origin(self.current_url), {})
+
+    @property
+    def session_storage(self) -> Dict[str, str]:
+        """Get the session storage of the current window and page's origin"""
+        key = (self.current_window_handle, self._origin(self.current_url))
+        return self._session_storage.setdefault(key, {})
+
+    def get(self, url: str) -> None:
+        """Navigate the current window to a URL"""
+        self._check_alive()
+        self._history[self.current_window_handle].append(url)
+
+    def open_window(self) -> str:
+        """
+        Open a new window (as a page would with window.open)
+
+        Returns:
+            Handle of the new window
+        """
+        self._check_alive()
+        handle = self._new_handle()
+        self._windows.append(handle)
+        self._history[handle] = ["about:blank"]
+        return handle
+
+    def close(self) -> None:
+        """Close the current window, dropping its session storage"""
+        self._check_alive()
+        handle = self.current_window_handle
+        self._windows.remove(handle)
+        self._session_storage = {
+            key: storage for key, storage in self._session_storage.items() if key[0] != handle
+        }
+
+    def add_cookie(self, cookie: Dict[str, Any]) -> None:
+        """Add a cookie for the current page's host unless it names a domain"""
+        self._check_alive()
+        cookie = dict(cookie)
+        cookie.setdefault("domain", urlsplit(self.current_url).hostname)
+        self.cookies.append(cookie)
+
+    def get_cookies(self) -> List[Dict[str, Any]]:
+        """Get the cookies of the current page's host"""
+        self._check_alive()
+        host = urlsplit(self.current_url).hostname
+        return [dict(cookie) for cookie in self.cookies if cookie["domain"] == host]
+
+    def delete_all_cookies(self) -> None:
+        """Delete the cookies of the current page's host"""
+        self._check_alive()
+        host = urlsplit(self.current_url).hostname
+        self.cookies = [cookie for cookie in self.cookies if cookie["domain"] != host]
+
+    def execute_script(self, script: str, *args: Any) -> Optional[Any]:
+        """
+        Record a script; scripts clearing web storage clear the fake storage
+
+        Args:
+            script: JavaScript source
+            *args: Script arguments
+
+        Returns:
+            None
+        """
+        self._check_alive()
+        self.scripts.append(script)
+        if "localStorage.clear()" in script:
+            self.local_storage.clear()
+        if "sessionStorage.clear()" in script:
+            self.session_storage.clear()
+        return None
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a Chrome DevTools command
+
+        Supports Network.clearBrowserCookies, Storage.clearDataForOrigin and
+        Page.getNavigationHistory.
+
+        Args:
+            cmd: Command name
+            cmd_args: Command parameters
+
+        Returns:
+            Command result
+
+        Raises:
+            FakeDriverError: If the command is not supported
+        """
+        self._check_alive()
+        if cmd == "Network.clearBrowserCookies":
+            self.cookies = []
+            return {}
+        if cmd == "Storage.clearDataForOrigin":
+            types = cmd_args["storageTypes"].split(",")
+            origin = cmd_args["origin"]
+            if "all" in types or "local_storage" in types:
+                self._local_storage.pop(origin, None)
+            if "all" in types or "cookies" in types:
+                host = urlsplit(origin).hostname
+                self.cookies = [cookie for cookie in self.cookies if cookie["domain"] != host]
+            return {}
+        if cmd == "Page.getNavigationHistory":
+            history = self._history[self.current_window_handle]
+            return {
+                "currentIndex": len(history) - 1,
+                "entries": [{"id": i, "url": url} for i, url in enumerate(history)]
+            }
+        raise FakeDriverError(f"Unsupported DevTools command: {cmd}")
+
+    def crash(self) -> None:
+        """Simulate the browser process dying"""
+        self.crashed = True
+
+    def quit(self) -> None:
+        """End the session"""
+        self.quit_called = True
+
+    def _new_handle(self) -> str:
+        """Create a window handle"""
+        return f"{self.session_id}-window-{next(self._window_ids)}"
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        """Get the origin of a URL"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _check_alive(self) -> None:
+        """Raise if the session can no longer take commands"""
+        if self.crashed or self.quit_called:
+            raise FakeDriverError(f"Session {self.session_id} is not available")
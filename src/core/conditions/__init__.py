@@ -12,34 +12,41 @@ from src.core.conditions.element_exists_condition import ElementExistsCondition
 from src.core.conditions.text_contains_condition import TextContainsCondition
 from src.core.conditions.condition_factory import ConditionFactory as LegacyConditionFactory
 
-# Import new interfaces
-from .interfaces import (
-    ICondition, ICompoundCondition, IConditionFactory,
-    IConditionProvider, IConditionRegistry, IConditionResolver
-)
-
-# Import new exceptions
-from .exceptions import (
-    ConditionError, ConditionNotFoundError, ConditionTypeNotFoundError,
-    ConditionValidationError, ConditionEvaluationError, ConditionProviderError,
-    ConditionRegistryError, ConditionResolverError, ConditionFactoryError
-)
-
-# Import new implementations
-from .base_condition_new import BaseCondition
-from .compound_condition_base import CompoundCondition
-from .compound_conditions import AndCondition, OrCondition, NotCondition
-from .condition_provider import BaseConditionProvider
-from .condition_registry import ConditionRegistry
-from .condition_resolver import ConditionResolver
-from .condition_factory_new import ConditionFactory
-from .standard_provider import StandardConditionProvider
-from .standard_conditions import TrueCondition, FalseCondition
-from .variable_provider import VariableConditionProvider
-from .variable_conditions import (
-    VariableCompareCondition, VariableExistsCondition,
-    VariableEmptyCondition, VariableTypeCondition
-)
+try:
+    # Import new interfaces
+    from .interfaces import (
+        ICondition, ICompoundCondition, IConditionFactory,
+        IConditionProvider, IConditionRegistry, IConditionResolver
+    )
+
+    # Import new exceptions
+    from .exceptions import (
+        ConditionError, ConditionNotFoundError, ConditionTypeNotFoundError,
+        ConditionValidationError, ConditionEvaluationError, ConditionProviderError,
+        ConditionRegistryError, ConditionResolverError, ConditionFactoryError
+    )
+
+    # Import new implementations
+    from .base_condition_new import BaseCondition
+    from .compound_condition_base import CompoundCondition
+    from .compound_conditions import AndCondition, OrCondition, NotCondition
+    from .condition_provider import BaseConditionProvider
+    from .condition_registry import ConditionRegistry
+    from .condition_resolver import ConditionResolver
+    from .condition_factory_new import ConditionFactory
+    from .standard_provider import StandardConditionProvider
+    from .standard_conditions import TrueCondition, FalseCondition
+    from .variable_provider import VariableConditionProvider
+    from .variable_conditions import (
+        VariableCompareCondition, VariableExistsCondition,
+        VariableEmptyCondition, VariableTypeCondition
+    )
+except ImportError:
+    # The new condition framework needs src.core.context.interfaces; without it
+    # only the legacy components (and modules imported directly) are available
+    _NEW_FRAMEWORK = False
+else:
+    _NEW_FRAMEWORK = True
 
 __all__ = [
     # Legacy interfaces
@@ -66,32 +73,35 @@ __all__ = [
 
     # Legacy factory
     'LegacyConditionFactory',
+]
 
-    # New interfaces
-    'ICondition', 'ICompoundCondition', 'IConditionFactory',
-    'IConditionProvider', 'IConditionRegistry', 'IConditionResolver',
+if _NEW_FRAMEWORK:
+    __all__ += [
+        # New interfaces
+        'ICondition', 'ICompoundCondition', 'IConditionFactory',
+        'IConditionProvider', 'IConditionRegistry', 'IConditionResolver',
 
-    # New exceptions
-    'ConditionError', 'ConditionNotFoundError', 'ConditionTypeNotFoundError',
-    'ConditionValidationError', 'ConditionEvaluationError', 'ConditionProviderError',
-    'ConditionRegistryError', 'ConditionResolverError', 'ConditionFactoryError',
+        # New exceptions
+        'ConditionError', 'ConditionNotFoundError', 'ConditionTypeNotFoundError',
+        'ConditionValidationError', 'ConditionEvaluationError', 'ConditionProviderError',
+        'ConditionRegistryError', 'ConditionResolverError', 'ConditionFactoryError',
 
-    # New base classes
-    'BaseCondition',
+        # New base classes
+        'BaseCondition',
 
-    # New compound conditions
-    'CompoundCondition', 'AndCondition', 'OrCondition', 'NotCondition',
+        # New compound conditions
+        'CompoundCondition', 'AndCondition', 'OrCondition', 'NotCondition',
 
-    # New provider components
-    'BaseConditionProvider', 'ConditionRegistry', 'ConditionResolver',
+        # New provider components
+        'BaseConditionProvider', 'ConditionRegistry', 'ConditionResolver',
 
-    # New factory
-    'ConditionFactory',
+        # New factory
+        'ConditionFactory',
 
-    # Standard conditions
-    'StandardConditionProvider', 'TrueCondition', 'FalseCondition',
+        # Standard conditions
+        'StandardConditionProvider', 'TrueCondition', 'FalseCondition',
 
-    # Variable conditions
-    'VariableConditionProvider', 'VariableCompareCondition',
-    'VariableExistsCondition', 'VariableEmptyCondition', 'VariableTypeCondition'
-]
+        # Variable conditions
+        'VariableConditionProvider', 'VariableCompareCondition',
+        'VariableExistsCondition', 'VariableEmptyCondition', 'VariableTypeCondition'
+    ]
@@ -0,0 +1,144 @@
+"""Cost-based evaluation ordering for composite conditions"""
+import threading
+import time
+from typing import Dict, Any, List, Tuple
+
+from src.core.conditions.condition_interface import ConditionInterface, ConditionResult
+
+
+class ChildStatistics:
+    """Runtime statistics of one subcondition"""
+
+    def __init__(self):
+        """Initialize the statistics"""
+        self.evaluations = 0
+        self.true_count = 0
+        self.total_cost = 0.0
+
+    @property
+    def average_cost(self) -> float:
+        """Get the average evaluation time in seconds"""
+        return self.total_cost / self.evaluations if self.evaluations else 0.0
+
+    def probability(self, value: bool) -> float:
+        """
+        Get the smoothed probability that the subcondition evaluates to a value
+
+        Args:
+            value: Outcome to get the probability of
+
+        Returns:
+            Laplace-smoothed probability of the outcome
+        """
+        count = self.true_count if value else self.evaluations - self.true_count
+        return (count + 1) / (self.evaluations + 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the statistics to a dictionary"""
+        return {
+            "evaluations": self.evaluations,
+            "true_rate": self.true_count / self.evaluations if self.evaluations else 0.0,
+            "average_cost": self.average_cost
+        }
+
+
+class AdaptiveOrdering:
+    """
+    Reorders the subconditions of an AND/OR condition to minimise expected cost
+
+    Each subcondition's average cost and true/false rate are recorded at runtime.
+    Subconditions are then evaluated by increasing cost per chance of
+    short-circuiting. Only subconditions marked pure are moved: impure ones keep
+    their position and act as barriers, so side effects happen in the declared order.
+    """
+
+    def __init__(self, short_circuit_value: bool):
+        """
+        Initialize the ordering
+
+        Args:
+            short_circuit_value: Subcondition value that ends evaluation
+                (False for AND, True for OR)
+        """
+        self.short_circuit_value = short_circuit_value
+        self._statistics: Dict[int, ChildStatistics] = {}
+        self._lock = threading.Lock()
+
+    def order(self, conditions: List[ConditionInterface]) -> List[ConditionInterface]:
+        """
+        Get the subconditions in the order they should be evaluated
+
+        Args:
+            conditions: Subconditions in declaration order
+
+        Returns:
+            Subconditions in evaluation order
+        """
+        ordered: List[ConditionInterface] = []
+        run: List[ConditionInterface] = []
+        with self._lock:
+            for condition in conditions:
+                if getattr(condition, "is_pure", False):
+                    run.append(condition)
+                    continue
+                ordered.extend(sorted(run, key=self._rank))
+                run = []
+                ordered.append(condition)
+            ordered.extend(sorted(run, key=self._rank))
+        return ordered
+
+    def evaluate(self, condition: ConditionInterface, context: Dict[str, Any]) -> ConditionResult:
+        """
+        Evaluate a subcondition and record its cost and outcome
+
+        Args:
+            condition: Subcondition to evaluate
+            context: Execution context
+
+        Returns:
+            Result of the subcondition
+        """
+        start = time.perf_counter()
+        result = condition.evaluate(context)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            statistics = self._statistics.setdefault(id(condition), ChildStatistics())
+            statistics.evaluations += 1
+            statistics.total_cost += elapsed
+            if result:
+                statistics.true_count += 1
+        return result
+
+    def get_statistics(self, conditions: List[ConditionInterface]) -> List[Dict[str, Any]]:
+        """
+        Get the recorded statistics of subconditions
+
+        Args:
+            conditions: Subconditions to get statistics for
+
+        Returns:
+            List of statistics dictionaries in the order of the given subconditions
+        """
+        with self._lock:
+            return [
+                self._statistics.get(id(condition), ChildStatistics()).to_dict()
+                for condition in conditions
+            ]
+
+    def _rank(self, condition: ConditionInterface) -> Tuple[int, float]:
+        """
+        Get the sort key of a subcondition
+
+        Subconditions without samples sort first so their cost gets measured.
+
+        Args:
+            condition: Subcondition to rank
+
+        Returns:
+            Sort key (lower is evaluated earlier)
+        """
+        statistics = self._statistics.get(id(condition))
+        if statistics is None or not statistics.evaluations:
+            return (0, 0.0)
+        return (1, statistics.average_cost / statistics.probability(self.short_circuit_value))
@@ -1,9 +1,10 @@
 """Base class for conditions in the automation system"""
 import uuid
 from abc import abstractmethod
-from typing import Dict, Any, Optional, TypeVar, Generic
+from typing import Dict, Any, Optional, Set, TypeVar, Generic
 
 from src.core.conditions.condition_interface import ConditionInterface, ConditionResult
+from src.core.conditions.condition_cache import ConditionCache
 
 
 T = TypeVar('T')
@@ -22,6 +23,58 @@ class BaseCondition(ConditionInterface[T], Generic[T]):
         """
         self.id = condition_id or str(uuid.uuid4())
         self.description = description or self.__class__.__name__
+        self._memo_cache: Optional[ConditionCache] = None
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """
+        Get the names of the context variables the condition reads
+
+        Returns:
+            Set of variable names, or None if unknown (the condition is then never memoized)
+        """
+        return None
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether the condition reads the page through the browser driver"""
+        return False
+
+    @property
+    def is_pure(self) -> bool:
+        """
+        Get whether evaluating the condition is free of side effects
+
+        Pure conditions may be reordered inside adaptive AND/OR conditions.
+        """
+        return False
+
+    @property
+    def memo_cache(self) -> Optional[ConditionCache]:
+        """Get the memoization cache (None if memoization is disabled)"""
+        return self._memo_cache
+
+    def enable_memoization(self, cache: Optional[ConditionCache] = None) -> ConditionCache:
+        """
+        Reuse the last result while the variables the condition depends on are unchanged
+
+        DOM-based conditions are only memoized when the context supplies a page
+        generation counter under the "page_generation" key.
+
+        Args:
+            cache: Cache to store results in (a private cache is created if not provided)
+
+        Returns:
+            The cache used by the condition
+        """
+        self._memo_cache = cache or ConditionCache()
+        return self._memo_cache
+
+    def disable_memoization(self) -> None:
+        """Stop memoizing results and drop the cached result"""
+        if self._memo_cache is not None:
+            self._memo_cache.invalidate(self.id)
+        self._memo_cache = None
 
     def evaluate(self, context: Dict[str, Any]) -> ConditionResult[T]:
         """
@@ -33,11 +86,25 @@ class BaseCondition(ConditionInterface[T], Generic[T]):
         Returns:
             Result of the condition evaluation
         """
+        cache = self._memo_cache
+        stamp = None
+        if cache is not None:
+            stamp = ConditionCache.make_stamp(context, self.dependencies, self.depends_on_dom)
+            if stamp is not None:
+                cached = cache.get(self.id, stamp)
+                if cached is not None:
+                    return cached
+
         try:
-            return self._evaluate(context)
+            result = self._evaluate(context)
         except Exception as e:
             return ConditionResult.create_failure(f"Error evaluating condition: {str(e)}")
 
+        # Only successful results are cached so transient errors are retried
+        if stamp is not None and result.success:
+            cache.put(self.id, stamp, result)
+        return result
+
     @abstractmethod
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[T]:
         """
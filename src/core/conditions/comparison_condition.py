@@ -1,6 +1,6 @@
 """Comparison conditions for comparing values"""
 from enum import Enum, auto
-from typing import Dict, Any, Optional, Union, TypeVar, Generic, cast
+from typing import Dict, Any, Optional, Set, Union, TypeVar, Generic, cast
 
 from src.core.conditions.condition_interface import ConditionResult
 from src.core.conditions.base_condition import BaseCondition
@@ -58,6 +58,20 @@ class ComparisonCondition(BaseCondition[bool], Generic[T]):
         """Get the condition type"""
         return "comparison"
 
+    @property
+    def is_pure(self) -> bool:
+        """Get whether the condition is free of side effects"""
+        return True
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """Get the names of the variables referenced by the comparison"""
+        return {
+            value[1:]
+            for value in (self.left_value, self.right_value)
+            if isinstance(value, str) and value.startswith("$")
+        }
+
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
         """
         Evaluate the comparison with the given context
@@ -1,8 +1,28 @@
 """Composite conditions for combining multiple conditions"""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Iterable
 
 from src.core.conditions.condition_interface import ConditionInterface, ConditionResult, BooleanCondition
 from src.core.conditions.base_condition import BaseCondition
+from src.core.conditions.adaptive_ordering import AdaptiveOrdering
+
+
+def _combined_dependencies(conditions: Iterable[ConditionInterface]) -> Optional[Set[str]]:
+    """
+    Combine the variable dependencies of subconditions
+
+    Args:
+        conditions: Subconditions to combine
+
+    Returns:
+        Union of the dependencies, or None if any subcondition's dependencies are unknown
+    """
+    combined: Set[str] = set()
+    for condition in conditions:
+        dependencies = getattr(condition, "dependencies", None)
+        if dependencies is None:
+            return None
+        combined.update(dependencies)
+    return combined
 
 
 class AndCondition(BaseCondition[bool]):
@@ -12,7 +32,8 @@ class AndCondition(BaseCondition[bool]):
         self,
         *conditions: ConditionInterface,
         description: Optional[str] = None,
-        condition_id: Optional[str] = None
+        condition_id: Optional[str] = None,
+        adaptive: bool = False
     ):
         """
         Initialize the AND condition
@@ -21,6 +42,7 @@ class AndCondition(BaseCondition[bool]):
             *conditions: Subconditions to combine with AND logic
             description: Human-readable description of the condition
             condition_id: Optional unique identifier (generated if not provided)
+            adaptive: Whether to reorder pure subconditions by measured cost and outcome
         """
         super().__init__(
             description or "AND condition",
@@ -29,12 +51,38 @@ class AndCondition(BaseCondition[bool]):
         if not conditions:
             raise ValueError("AND condition requires at least one subcondition")
         self.conditions = list(conditions)
+        self.adaptive = adaptive
+        self._ordering = AdaptiveOrdering(short_circuit_value=False)
 
     @property
     def type(self) -> str:
         """Get the condition type"""
         return "and"
 
+    @property
+    def is_pure(self) -> bool:
+        """Get whether all subconditions are free of side effects"""
+        return all(getattr(condition, "is_pure", False) for condition in self.conditions)
+
+    def get_child_statistics(self) -> List[Dict[str, Any]]:
+        """
+        Get the runtime statistics recorded for each subcondition in adaptive mode
+
+        Returns:
+            List of statistics dictionaries in declaration order
+        """
+        return self._ordering.get_statistics(self.conditions)
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """Get the combined dependencies of the subconditions"""
+        return _combined_dependencies(self.conditions)
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether any subcondition reads the page"""
+        return any(getattr(condition, "depends_on_dom", False) for condition in self.conditions)
+
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
         """
         Evaluate all subconditions with AND logic
@@ -46,8 +94,8 @@ class AndCondition(BaseCondition[bool]):
             Result of the condition evaluation
         """
         results = []
-        for condition in self.conditions:
-            result = condition.evaluate(context)
+        for condition in self._evaluation_order():
+            result = self._evaluate_child(condition, context)
             results.append(result)
             
             # Short-circuit evaluation: if any condition is False, the AND is False
@@ -63,6 +111,18 @@ class AndCondition(BaseCondition[bool]):
             "All conditions in AND are True"
         )
 
+    def _evaluation_order(self) -> List[ConditionInterface]:
+        """Get the subconditions in the order they should be evaluated"""
+        if self.adaptive:
+            return self._ordering.order(self.conditions)
+        return self.conditions
+
+    def _evaluate_child(self, condition: ConditionInterface, context: Dict[str, Any]) -> ConditionResult:
+        """Evaluate a subcondition, recording its cost and outcome in adaptive mode"""
+        if self.adaptive:
+            return self._ordering.evaluate(condition, context)
+        return condition.evaluate(context)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the condition to a dictionary"""
         data = super().to_dict()
@@ -70,6 +130,7 @@ class AndCondition(BaseCondition[bool]):
             condition.to_dict() if hasattr(condition, "to_dict") else {"type": "unknown"}
             for condition in self.conditions
         ]
+        data["adaptive"] = self.adaptive
         return data
 
 
@@ -80,7 +141,8 @@ class OrCondition(BaseCondition[bool]):
         self,
         *conditions: ConditionInterface,
         description: Optional[str] = None,
-        condition_id: Optional[str] = None
+        condition_id: Optional[str] = None,
+        adaptive: bool = False
     ):
         """
         Initialize the OR condition
@@ -89,6 +151,7 @@ class OrCondition(BaseCondition[bool]):
             *conditions: Subconditions to combine with OR logic
             description: Human-readable description of the condition
             condition_id: Optional unique identifier (generated if not provided)
+            adaptive: Whether to reorder pure subconditions by measured cost and outcome
         """
         super().__init__(
             description or "OR condition",
@@ -97,12 +160,38 @@ class OrCondition(BaseCondition[bool]):
         if not conditions:
             raise ValueError("OR condition requires at least one subcondition")
         self.conditions = list(conditions)
+        self.adaptive = adaptive
+        self._ordering = AdaptiveOrdering(short_circuit_value=True)
 
     @property
     def type(self) -> str:
         """Get the condition type"""
         return "or"
 
+    @property
+    def is_pure(self) -> bool:
+        """Get whether all subconditions are free of side effects"""
+        return all(getattr(condition, "is_pure", False) for condition in self.conditions)
+
+    def get_child_statistics(self) -> List[Dict[str, Any]]:
+        """
+        Get the runtime statistics recorded for each subcondition in adaptive mode
+
+        Returns:
+            List of statistics dictionaries in declaration order
+        """
+        return self._ordering.get_statistics(self.conditions)
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """Get the combined dependencies of the subconditions"""
+        return _combined_dependencies(self.conditions)
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether any subcondition reads the page"""
+        return any(getattr(condition, "depends_on_dom", False) for condition in self.conditions)
+
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
         """
         Evaluate all subconditions with OR logic
@@ -114,8 +203,8 @@ class OrCondition(BaseCondition[bool]):
             Result of the condition evaluation
         """
         failure_messages = []
-        for condition in self.conditions:
-            result = condition.evaluate(context)
+        for condition in self._evaluation_order():
+            result = self._evaluate_child(condition, context)
             
             # Short-circuit evaluation: if any condition is True, the OR is True
             if result:
@@ -132,6 +221,18 @@ class OrCondition(BaseCondition[bool]):
             f"All conditions in OR are False: {'; '.join(failure_messages)}"
         )
 
+    def _evaluation_order(self) -> List[ConditionInterface]:
+        """Get the subconditions in the order they should be evaluated"""
+        if self.adaptive:
+            return self._ordering.order(self.conditions)
+        return self.conditions
+
+    def _evaluate_child(self, condition: ConditionInterface, context: Dict[str, Any]) -> ConditionResult:
+        """Evaluate a subcondition, recording its cost and outcome in adaptive mode"""
+        if self.adaptive:
+            return self._ordering.evaluate(condition, context)
+        return condition.evaluate(context)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the condition to a dictionary"""
         data = super().to_dict()
@@ -139,6 +240,7 @@ class OrCondition(BaseCondition[bool]):
             condition.to_dict() if hasattr(condition, "to_dict") else {"type": "unknown"}
             for condition in self.conditions
         ]
+        data["adaptive"] = self.adaptive
         return data
 
 
@@ -170,6 +272,21 @@ class NotCondition(BaseCondition[bool]):
         """Get the condition type"""
         return "not"
 
+    @property
+    def is_pure(self) -> bool:
+        """Get whether the negated condition is free of side effects"""
+        return getattr(self.condition, "is_pure", False)
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """Get the dependencies of the negated condition"""
+        return _combined_dependencies([self.condition])
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether the negated condition reads the page"""
+        return getattr(self.condition, "depends_on_dom", False)
+
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
         """
         Evaluate the subcondition and negate the result
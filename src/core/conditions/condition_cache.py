@@ -0,0 +1,175 @@
+"""Memoization cache for condition results"""
+import copy
+import threading
+from typing import Dict, Any, Optional, Tuple, Iterable
+
+from src.core.conditions.condition_interface import ConditionResult
+
+
+# Context key holding the page generation counter for DOM-based conditions
+PAGE_GENERATION_KEY = "page_generation"
+
+# Value types that cannot change in place and can be stamped without copying
+_IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+class _Missing:
+    """Marker for a dependency that is absent from the context"""
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, _Missing)
+
+    def __hash__(self) -> int:
+        return 0
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+_MISSING = _Missing()
+
+
+class ConditionCache:
+    """
+    Thread-safe cache of the last result of memoized conditions
+
+    Each entry holds the last successful ConditionResult of a condition together
+    with the version stamp of the variables it depends on. A stamp is a snapshot
+    of each dependency's value (plus the page generation for DOM-based conditions),
+    so a cached result is reused only while none of those inputs have changed.
+    """
+
+    def __init__(self):
+        """Initialize the condition cache"""
+        self._entries: Dict[str, Tuple[Tuple[Any, ...], ConditionResult]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_stamp(
+        context: Dict[str, Any],
+        dependencies: Optional[Iterable[str]],
+        depends_on_dom: bool = False
+    ) -> Optional[Tuple[Any, ...]]:
+        """
+        Build the version stamp of a condition's inputs
+
+        Args:
+            context: Execution context containing variables, browser, etc.
+            dependencies: Names of the variables the condition reads (None if unknown)
+            depends_on_dom: Whether the condition reads the page
+
+        Returns:
+            Tuple stamp, or None if the condition cannot be memoized in this context
+        """
+        if dependencies is None:
+            return None
+
+        stamp = []
+        if depends_on_dom:
+            generation = context.get(PAGE_GENERATION_KEY)
+            if generation is None:
+                # Without a page generation counter we cannot know if the DOM changed
+                return None
+            stamp.append((PAGE_GENERATION_KEY, generation))
+
+        for name in sorted(dependencies):
+            value = context.get(name, _MISSING)
+            if not isinstance(value, _IMMUTABLE_TYPES) and value is not _MISSING:
+                # Snapshot mutable values so in-place changes are detected
+                try:
+                    value = copy.deepcopy(value)
+                except Exception:
+                    return None
+            stamp.append((name, value))
+
+        return tuple(stamp)
+
+    def get(self, condition_id: str, stamp: Tuple[Any, ...]) -> Optional[ConditionResult]:
+        """
+        Get the cached result of a condition if its stamp still matches
+
+        Args:
+            condition_id: ID of the condition
+            stamp: Current version stamp of the condition's inputs
+
+        Returns:
+            Cached result, or None on a cache miss
+        """
+        with self._lock:
+            entry = self._entries.get(condition_id)
+            if entry is not None:
+                try:
+                    matches = entry[0] == stamp
+                except Exception:
+                    matches = False
+                if matches:
+                    self._hits += 1
+                    return entry[1]
+            self._misses += 1
+            return None
+
+    def put(self, condition_id: str, stamp: Tuple[Any, ...], result: ConditionResult) -> None:
+        """
+        Store the result of a condition
+
+        Args:
+            condition_id: ID of the condition
+            stamp: Version stamp the result was computed with
+            result: Result of the condition evaluation
+        """
+        with self._lock:
+            self._entries[condition_id] = (stamp, result)
+
+    def invalidate(self, condition_id: Optional[str] = None) -> None:
+        """
+        Drop cached results
+
+        Args:
+            condition_id: ID of the condition to drop (None to drop all)
+        """
+        with self._lock:
+            if condition_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(condition_id, None)
+
+    def reset_stats(self) -> None:
+        """Reset the hit and miss counters"""
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        """Get the number of cache hits"""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Get the number of cache misses"""
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups served from the cache"""
+        with self._lock:
+            total = self._hits + self._misses
+            return self._hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit rate and number of entries
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+                "entries": len(self._entries)
+            }
@@ -0,0 +1,265 @@
+"""Wait engine for polling conditions until they are met"""
+import threading
+import time
+from enum import Enum, auto
+from typing import Dict, Any, Optional
+
+from src.core.conditions.condition_interface import ConditionInterface, ConditionResult
+
+
+# Context key holding a threading.Event that cancels waits when set
+CANCEL_EVENT_KEY = "cancel_event"
+
+# Script that resolves as soon as the DOM changes, or after the given number of milliseconds
+_MUTATION_WAIT_SCRIPT = """
+var timeoutMs = arguments[0];
+var callback = arguments[arguments.length - 1];
+var done = false;
+var observer = null;
+function finish(changed) {
+    if (done) { return; }
+    done = true;
+    if (observer) { observer.disconnect(); }
+    callback(changed);
+}
+try {
+    observer = new MutationObserver(function() { finish(true); });
+    observer.observe(document.documentElement || document, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+} catch (e) {
+    finish(false);
+}
+setTimeout(function() { finish(false); }, timeoutMs);
+"""
+
+
+class PollingStrategy(Enum):
+    """Strategies for spacing condition polls"""
+    FIXED = auto()        # Poll at a constant interval
+    EXPONENTIAL = auto()  # Grow the interval by the backoff factor after each poll
+    ADAPTIVE = auto()     # Exponential, starting from the observed time-to-ready of the condition
+
+
+class ConditionWaiter:
+    """
+    Waits until a condition is met, with a deadline and cancellation
+
+    Polls are spaced according to the polling strategy. When mutation observation
+    is enabled and the condition reads the page, the waiter blocks inside the
+    browser until the DOM changes (or the poll interval elapses) instead of
+    sleeping, so a condition is re-checked as soon as the page renders. Polls
+    woken by mutations are still at least min_observer_interval apart, so a
+    page that mutates constantly (animations, tickers) does not make the
+    waiter spin.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        strategy: PollingStrategy = PollingStrategy.EXPONENTIAL,
+        initial_interval: float = 0.05,
+        max_interval: float = 1.0,
+        backoff_factor: float = 2.0,
+        use_mutation_observer: bool = False,
+        min_observer_interval: float = 0.02
+    ):
+        """
+        Initialize the condition waiter
+
+        Args:
+            timeout: Maximum time to wait (seconds)
+            strategy: Strategy for spacing polls
+            initial_interval: Delay before the second poll (seconds)
+            max_interval: Upper bound for the delay between polls (seconds)
+            backoff_factor: Growth factor of the delay for exponential and adaptive polling
+            use_mutation_observer: Whether to wait for DOM mutations in the page between polls
+            min_observer_interval: Minimum time between polls woken by DOM mutations (seconds)
+
+        Raises:
+            ValueError: If the timing parameters are invalid
+        """
+        if timeout < 0:
+            raise ValueError("Timeout cannot be negative")
+        if initial_interval <= 0 or max_interval < initial_interval:
+            raise ValueError("Intervals must be positive and max_interval >= initial_interval")
+        if backoff_factor < 1.0:
+            raise ValueError("Backoff factor must be at least 1.0")
+        if min_observer_interval < 0:
+            raise ValueError("Minimum observer interval cannot be negative")
+
+        self.timeout = timeout
+        self.strategy = strategy
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.use_mutation_observer = use_mutation_observer
+        self.min_observer_interval = min_observer_interval
+        self._cancel_event = threading.Event()
+        self._ready_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.last_wait: Dict[str, Any] = {}
+
+    def cancel(self) -> None:
+        """Cancel the wait in progress (and any wait started before reset())"""
+        self._cancel_event.set()
+
+    def reset(self) -> None:
+        """Clear a previous cancellation"""
+        self._cancel_event.clear()
+
+    def wait(
+        self,
+        condition: ConditionInterface,
+        context: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> ConditionResult[bool]:
+        """
+        Poll a condition until it is met, the deadline passes or the wait is cancelled
+
+        Args:
+            condition: Condition to wait for
+            context: Execution context; a threading.Event under "cancel_event" also cancels the wait
+            timeout: Maximum time to wait (seconds), overriding the waiter's timeout
+
+        Returns:
+            Success with value True once the condition is met, success with value False
+            on timeout, or a failure if the wait was cancelled
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        interval = self._first_interval(condition)
+        polls = 0
+        observer_polls = 0
+        external_cancel = context.get(CANCEL_EVENT_KEY)
+        observe = self.use_mutation_observer and bool(getattr(condition, "depends_on_dom", False))
+
+        while True:
+            if self._is_cancelled(external_cancel):
+                return self._finish(start, polls, observer_polls, ConditionResult.create_failure(
+                    f"Wait cancelled after {polls} polls"
+                ))
+
+            polls += 1
+            poll_start = time.monotonic()
+            result = condition.evaluate(context)
+            if result:
+                self._record_ready_time(condition, time.monotonic() - start)
+                return self._finish(start, polls, observer_polls, ConditionResult.create_success(
+                    True,
+                    f"Condition met after {time.monotonic() - start:.3f}s ({polls} polls)"
+                ))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return self._finish(start, polls, observer_polls, ConditionResult.create_success(
+                    False,
+                    f"Timed out after {timeout}s waiting for condition ({polls} polls): {result.message}"
+                ))
+
+            delay = min(interval, remaining)
+            if observe:
+                observed = self._wait_for_mutation(context, delay)
+                if observed is None:
+                    # The driver cannot run async scripts; fall back to sleeping
+                    observe = False
+                    self._sleep(delay, external_cancel)
+                else:
+                    observer_polls += 1
+                    # Constant mutations would otherwise wake the waiter immediately
+                    spacing = min(self.min_observer_interval, delay) - (time.monotonic() - poll_start)
+                    if spacing > 0:
+                        self._sleep(spacing, external_cancel)
+            else:
+                self._sleep(delay, external_cancel)
+
+            if self.strategy != PollingStrategy.FIXED:
+                interval = min(interval * self.backoff_factor, self.max_interval)
+
+    def get_expected_ready_time(self, condition: ConditionInterface) -> Optional[float]:
+        """
+        Get the smoothed time it took the condition to become true in previous waits
+
+        Args:
+            condition: Condition to look up
+
+        Returns:
+            Expected time to ready (seconds), or None if never observed
+        """
+        with self._lock:
+            return self._ready_times.get(self._condition_key(condition))
+
+    def _first_interval(self, condition: ConditionInterface) -> float:
+        """Get the delay before the second poll"""
+        if self.strategy == PollingStrategy.ADAPTIVE:
+            expected = self.get_expected_ready_time(condition)
+            if expected is not None:
+                # Aim the early polls at a fraction of the usual render time
+                return min(max(expected / 4, self.initial_interval), self.max_interval)
+        return self.initial_interval
+
+    def _record_ready_time(self, condition: ConditionInterface, elapsed: float) -> None:
+        """Update the smoothed time-to-ready of a condition"""
+        key = self._condition_key(condition)
+        with self._lock:
+            previous = self._ready_times.get(key)
+            self._ready_times[key] = elapsed if previous is None else 0.7 * previous + 0.3 * elapsed
+
+    def _wait_for_mutation(self, context: Dict[str, Any], delay: float) -> Optional[bool]:
+        """
+        Block in the page until the DOM changes or the delay elapses
+
+        Args:
+            context: Execution context containing the browser driver
+            delay: Maximum time to wait (seconds)
+
+        Returns:
+            True if the DOM changed, False if the delay elapsed, None if unsupported
+        """
+        driver = context.get("driver")
+        if not driver or not hasattr(driver, "execute_async_script"):
+            return None
+        try:
+            return bool(driver.execute_async_script(_MUTATION_WAIT_SCRIPT, int(delay * 1000)))
+        except Exception:
+            return None
+
+    def _sleep(self, delay: float, external_cancel: Any) -> None:
+        """Sleep for the delay, waking early if the wait is cancelled"""
+        if isinstance(external_cancel, threading.Event):
+            end = time.monotonic() + delay
+            while not self._cancel_event.is_set() and not external_cancel.is_set():
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return
+                external_cancel.wait(min(remaining, 0.05))
+        else:
+            self._cancel_event.wait(delay)
+
+    def _is_cancelled(self, external_cancel: Any) -> bool:
+        """Check whether the wait was cancelled"""
+        if self._cancel_event.is_set():
+            return True
+        return isinstance(external_cancel, threading.Event) and external_cancel.is_set()
+
+    def _finish(
+        self,
+        start: float,
+        polls: int,
+        observer_polls: int,
+        result: ConditionResult[bool]
+    ) -> ConditionResult[bool]:
+        """Record statistics about the finished wait and return its result"""
+        self.last_wait = {
+            "elapsed": time.monotonic() - start,
+            "polls": polls,
+            "observer_polls": observer_polls,
+            "met": bool(result)
+        }
+        return result
+
+    @staticmethod
+    def _condition_key(condition: ConditionInterface) -> str:
+        """Get the key used to remember the time-to-ready of a condition"""
+        return str(getattr(condition, "id", id(condition)))
@@ -0,0 +1,187 @@
+"""Batched DOM probing for element-based conditions"""
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+
+# Context key under which the active probe is published to conditions
+DOM_PROBE_KEY = "dom_probe"
+
+# Script resolving existence, text and attributes of many selectors at once
+_PROBE_SCRIPT = """
+var selectors = arguments[0];
+var attributes = arguments[1];
+var results = {};
+for (var i = 0; i < selectors.length; i++) {
+    var selector = selectors[i];
+    try {
+        var elements = document.querySelectorAll(selector);
+        var entry = {exists: elements.length > 0, count: elements.length, text: null, attributes: {}};
+        if (elements.length > 0) {
+            var element = elements[0];
+            entry.text = element.innerText !== undefined ? element.innerText : element.textContent;
+            for (var j = 0; j < attributes.length; j++) {
+                entry.attributes[attributes[j]] = element.getAttribute(attributes[j]);
+            }
+        }
+        results[selector] = entry;
+    } catch (e) {
+        results[selector] = {error: String(e)};
+    }
+}
+return results;
+"""
+
+
+class DomProbe:
+    """
+    Resolves the state of many CSS selectors in a single script round-trip
+
+    Element-based conditions look up their selector in the probe published in the
+    context and fall back to querying the driver themselves when it is absent or
+    has no usable entry for the selector.
+    """
+
+    def __init__(self, driver: Any, attributes: Optional[Iterable[str]] = None):
+        """
+        Initialize the DOM probe
+
+        Args:
+            driver: Browser driver used to run the probe script
+            attributes: Names of attributes to read from the first matching element
+        """
+        self.driver = driver
+        self.attributes = list(attributes or [])
+        self._pending: List[str] = []
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self.round_trips = 0
+
+    def add_selectors(self, selectors: Iterable[str]) -> None:
+        """
+        Queue selectors to be resolved by the next call to resolve()
+
+        Args:
+            selectors: CSS selectors to probe
+        """
+        for selector in selectors:
+            if selector and selector not in self._results and selector not in self._pending:
+                self._pending.append(selector)
+
+    def resolve(self) -> None:
+        """
+        Resolve all pending selectors with one execute_script call
+
+        If the script fails, the pending selectors are left unresolved so that
+        conditions fall back to querying the driver individually.
+        """
+        if not self._pending:
+            return
+
+        selectors, self._pending = self._pending, []
+        self.round_trips += 1
+        try:
+            results = self.driver.execute_script(_PROBE_SCRIPT, selectors, self.attributes)
+        except Exception:
+            return
+
+        if isinstance(results, dict):
+            for selector, entry in results.items():
+                if isinstance(entry, dict) and "error" not in entry:
+                    self._results[selector] = entry
+
+    def get(self, selector: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the probed state of a selector
+
+        Args:
+            selector: CSS selector
+
+        Returns:
+            Dictionary with "exists", "count", "text" and "attributes", or None if not probed
+        """
+        return self._results.get(selector)
+
+    @staticmethod
+    def collect_selectors(conditions: Iterable[Any]) -> List[str]:
+        """
+        Collect the selectors needed by condition trees
+
+        Args:
+            conditions: Root conditions to walk
+
+        Returns:
+            Unique selectors in the order they were found
+        """
+        selectors: List[str] = []
+        stack = list(conditions)[::-1]
+        while stack:
+            condition = stack.pop()
+            if getattr(condition, "depends_on_dom", False):
+                selector = getattr(condition, "selector", None)
+                if isinstance(selector, str) and selector not in selectors:
+                    selectors.append(selector)
+            children = list(getattr(condition, "conditions", None) or [])
+            child = getattr(condition, "condition", None)
+            if child is not None:
+                children.append(child)
+            stack.extend(reversed(children))
+        return selectors
+
+
+def get_probe_entry(context: Dict[str, Any], selector: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the probed state of a selector from the probe published in the context
+
+    Args:
+        context: Execution context
+        selector: CSS selector
+
+    Returns:
+        Probed state, or None if no probe is active or the selector was not probed
+    """
+    probe = context.get(DOM_PROBE_KEY)
+    if not isinstance(probe, DomProbe):
+        return None
+    return probe.get(selector)
+
+
+@contextmanager
+def dom_probe_scope(
+    context: Dict[str, Any],
+    conditions: Iterable[Any],
+    attributes: Optional[Iterable[str]] = None
+) -> Iterator[Optional[DomProbe]]:
+    """
+    Publish a probe for the selectors of the given conditions for one evaluation
+
+    The probe results are only valid while the scope is active; the probe is
+    removed from the context on exit. Nested scopes reuse the outer probe.
+
+    Args:
+        context: Execution context containing the browser driver
+        conditions: Conditions that will be evaluated inside the scope
+        attributes: Names of attributes to read from matching elements
+
+    Yields:
+        The active probe, or None if there is no driver or nothing to probe
+    """
+    existing = context.get(DOM_PROBE_KEY)
+    if isinstance(existing, DomProbe):
+        existing.add_selectors(DomProbe.collect_selectors(conditions))
+        existing.resolve()
+        yield existing
+        return
+
+    driver = context.get("driver")
+    selectors = DomProbe.collect_selectors(conditions)
+    if not driver or not selectors:
+        yield None
+        return
+
+    probe = DomProbe(driver, attributes)
+    probe.add_selectors(selectors)
+    probe.resolve()
+    context[DOM_PROBE_KEY] = probe
+    try:
+        yield probe
+    finally:
+        context.pop(DOM_PROBE_KEY, None)
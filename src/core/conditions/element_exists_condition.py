@@ -1,8 +1,9 @@
 """Condition for checking if an element exists in the DOM"""
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
 
 from src.core.conditions.condition_interface import ConditionResult
 from src.core.conditions.base_condition import BaseCondition
+from src.core.conditions.dom_probe import get_probe_entry
 
 
 class ElementExistsCondition(BaseCondition[bool]):
@@ -33,6 +34,21 @@ class ElementExistsCondition(BaseCondition[bool]):
         """Get the condition type"""
         return "element_exists"
 
+    @property
+    def is_pure(self) -> bool:
+        """Get whether the condition is free of side effects"""
+        return True
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """Get the names of the variables read by the condition (none, it reads the page)"""
+        return set()
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether the condition reads the page"""
+        return True
+
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
         """
         Check if the element exists in the DOM
@@ -49,9 +65,15 @@ class ElementExistsCondition(BaseCondition[bool]):
             return ConditionResult.create_failure("No browser driver in context")
 
         try:
-            # Find the element
-            elements = driver.find_elements_by_css_selector(self.selector)
-            exists = len(elements) > 0
+            # Use the batched probe result if one is active, otherwise query the
+            # driver; cached elements are not used, since scripts remove elements
+            # (spinners, toasts) without the page generation changing
+            probed = get_probe_entry(context, self.selector)
+            if probed is not None:
+                exists = bool(probed.get("exists"))
+            else:
+                elements = driver.find_elements_by_css_selector(self.selector)
+                exists = len(elements) > 0
 
             if exists:
                 return ConditionResult.create_success(
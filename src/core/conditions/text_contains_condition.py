@@ -1,8 +1,10 @@
 """Condition for checking if an element's text contains a specific string"""
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set, List
 
 from src.core.conditions.condition_interface import ConditionResult
 from src.core.conditions.base_condition import BaseCondition
+from src.core.conditions.dom_probe import get_probe_entry
+from src.core.utils.element_cache import get_element_cache
 
 
 class TextContainsCondition(BaseCondition[bool]):
@@ -39,6 +41,21 @@ class TextContainsCondition(BaseCondition[bool]):
         """Get the condition type"""
         return "text_contains"
 
+    @property
+    def is_pure(self) -> bool:
+        """Get whether the condition is free of side effects"""
+        return True
+
+    @property
+    def dependencies(self) -> Optional[Set[str]]:
+        """Get the names of the variables read by the condition (none, it reads the page)"""
+        return set()
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether the condition reads the page"""
+        return True
+
     def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
         """
         Check if the element's text contains the specified string
@@ -55,17 +72,24 @@ class TextContainsCondition(BaseCondition[bool]):
             return ConditionResult.create_failure("No browser driver in context")
 
         try:
-            # Find the element
-            elements = driver.find_elements_by_css_selector(self.selector)
-            if not elements:
+            # Use the batched probe result if one is active, otherwise the elements
+            # cached for the current page generation, otherwise query the driver
+            probed = get_probe_entry(context, self.selector)
+            cache = get_element_cache(context, require_generation=True)
+            if probed is not None:
+                element_text = (probed.get("text") or "") if probed.get("exists") else None
+            elif cache is not None:
+                # Reading the text of a stale cached element locates it again
+                element_text = cache.with_elements(driver, self.selector, self._first_text)
+            else:
+                element_text = self._first_text(driver.find_elements_by_css_selector(self.selector))
+
+            if element_text is None:
                 return ConditionResult.create_success(
                     False,
                     f"Element not found: {self.selector}"
                 )
 
-            # Get the element's text
-            element_text = elements[0].text
-
             # Check if the text contains the specified string
             if self.case_sensitive:
                 contains = self.text in element_text
@@ -87,6 +111,11 @@ class TextContainsCondition(BaseCondition[bool]):
                 f"Error checking text: {str(e)}"
             )
 
+    @staticmethod
+    def _first_text(elements: List[Any]) -> Optional[str]:
+        """Get the text of the first element, or None if there are no elements"""
+        return elements[0].text if elements else None
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the condition to a dictionary"""
         data = super().to_dict()
@@ -3,10 +3,32 @@ import uuid
 from typing import Dict, Any, Optional, List, Set, Callable
 
 from src.core.context.execution_state import ExecutionState, ExecutionStateEnum, StateChangeEvent
-from src.core.context.variable_storage import VariableStorage, VariableScope, VariableChangeEvent
+from src.core.context.variable_storage import VariableStorage, VariableScope, VariableChangeEvent, VariableSnapshot
 from src.core.context.context_options import ContextOptions
 
 
+class ContextSnapshot:
+    """Read-only view of an execution context at one point in time"""
+
+    def __init__(self, context_id: str, state: Dict[str, Any], variables: VariableSnapshot):
+        """
+        Initialize the snapshot
+
+        Args:
+            context_id: ID of the context
+            state: Dictionary representation of the execution state
+            variables: Snapshot of the context's variables
+        """
+        self.id = context_id
+        self.state = state
+        self.variables = variables
+
+    @property
+    def current_state(self) -> ExecutionStateEnum:
+        """Get the execution state at the time of the snapshot"""
+        return ExecutionStateEnum[self.state["current_state"]]
+
+
 class ExecutionContext:
     """Context for executing actions with variable storage and state tracking"""
 
@@ -155,6 +177,19 @@ class ExecutionContext:
         """
         return self._state_change_history.copy()
 
+    def snapshot(self) -> ContextSnapshot:
+        """
+        Take a consistent read-only view of the context without copying its variables
+
+        Unlike clone(), this takes constant time in the number of variables,
+        so checkpoint writers and reports can read a stable view while the
+        workflow keeps running.
+
+        Returns:
+            Snapshot of the context's ID, state and variables
+        """
+        return ContextSnapshot(self.id, self.state.to_dict(), self.variables.snapshot())
+
     def clone(self, include_children: bool = False) -> 'ExecutionContext':
         """
         Create a clone of this context
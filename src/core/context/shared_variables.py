@@ -0,0 +1,311 @@
+"""Large read-only variables shared between worker processes through shared memory"""
+import atexit
+import pickle
+import logging
+import threading
+import functools
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.core.context.variable_storage import LazyValue
+
+
+class SharedVariableHandle:
+    """
+    Reference to a value published in a shared memory segment
+
+    Handles are small and pickle cheaply, so they can be sent to every
+    worker in place of the value.
+    """
+
+    # Kinds of published values
+    KIND_BYTES = "bytes"
+    KIND_PICKLE = "pickle"
+
+    def __init__(
+        self,
+        segment: str,
+        kind: str,
+        size: int,
+        buffers: Optional[List[Tuple[int, int]]] = None
+    ):
+        """
+        Initialize the handle
+
+        Args:
+            segment: Name of the shared memory segment
+            kind: "bytes" for raw bytes, "pickle" for a pickled value
+            size: Length of the raw bytes or pickle stream at the start of the segment
+            buffers: Offsets and lengths of the pickle's out-of-band buffers
+        """
+        self.segment = segment
+        self.kind = kind
+        self.size = size
+        self.buffers = buffers or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the handle to a dictionary
+
+        Returns:
+            Dictionary representation of the handle
+        """
+        return {
+            "segment": self.segment,
+            "kind": self.kind,
+            "size": self.size,
+            "buffers": [list(buffer) for buffer in self.buffers]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SharedVariableHandle':
+        """
+        Create a handle from a dictionary
+
+        Args:
+            data: Dictionary representation of the handle
+
+        Returns:
+            Instantiated handle
+        """
+        return cls(
+            segment=data["segment"],
+            kind=data["kind"],
+            size=data["size"],
+            buffers=[tuple(buffer) for buffer in data.get("buffers", [])]
+        )
+
+
+class SharedValue(LazyValue):
+    """
+    Variable value read from a shared memory segment
+
+    Store it in a VariableStorage like any value; pickling it (e.g. with the
+    context sent to a worker) only pickles its handle. The segment is
+    attached and the value loaded on first read, once per process.
+
+    Bytes-like values are read as read-only memoryviews of the segment, so
+    no process copies them. Other values are unpickled from the segment,
+    with buffers of types supporting pickle protocol 5 (such as numpy
+    arrays) mapped without copying. Shared values are read-only: reads
+    return the loaded value itself, not a copy.
+    """
+
+    copy_on_read = False
+
+    def __init__(self, handle: SharedVariableHandle):
+        """
+        Initialize the shared value
+
+        Args:
+            handle: Handle returned when the value was published
+        """
+        super().__init__(functools.partial(_load_shared, handle))
+        self.handle = handle
+
+    def __reduce__(self):
+        """Pickle only the handle"""
+        return (SharedValue, (self.handle,))
+
+
+class SharedVariablePublisher:
+    """
+    Publishes large read-only variables into shared memory
+
+    The process that starts the workers publishes the values and puts the
+    returned SharedValue objects into the contexts (or sends them to the
+    workers); the workers read the values from the same memory instead of
+    each receiving a pickled copy. Workers must be started by the
+    publishing process, so its resource tracker owns the segments.
+
+    The publisher owns the segments: unpublish() or close() removes them,
+    after which workers can no longer attach to them. Values already loaded
+    by a worker stay readable until it exits.
+    """
+
+    # Alignment of out-of-band buffers in a segment
+    ALIGNMENT = 64
+
+    def __init__(self):
+        """Initialize the publisher"""
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+        self._values: Dict[str, SharedValue] = {}
+
+    def publish(self, name: str, value: Any) -> SharedValue:
+        """
+        Publish a value, replacing any value published under the same name
+
+        Args:
+            name: Name to publish the value under
+            value: Value to publish; must not be modified afterwards
+
+        Returns:
+            Shared value referencing the published copy
+        """
+        buffers: List[pickle.PickleBuffer] = []
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            kind = SharedVariableHandle.KIND_BYTES
+            data = memoryview(value).cast("B")
+        else:
+            kind = SharedVariableHandle.KIND_PICKLE
+            data = memoryview(pickle.dumps(value, protocol=5, buffer_callback=buffers.append))
+
+        # Lay out the out-of-band buffers after the pickle stream
+        layout = []
+        offset = len(data)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+        for raw in raw_buffers:
+            offset = -(-offset // self.ALIGNMENT) * self.ALIGNMENT
+            layout.append((offset, raw.nbytes))
+            offset += raw.nbytes
+
+        segment = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        segment.buf[:len(data)] = data
+        for (start, length), raw in zip(layout, raw_buffers):
+            segment.buf[start:start + length] = raw
+
+        handle = SharedVariableHandle(segment.name, kind, len(data), layout)
+        shared = SharedValue(handle)
+        with _attached_lock:
+            _attached[segment.name] = (segment, _NOT_LOADED)
+
+        with self._lock:
+            replaced = self._values.get(name)
+            self._segments[name] = segment
+            self._values[name] = shared
+        if replaced is not None:
+            self._remove(replaced.handle.segment)
+
+        self.logger.info(f"Published shared variable {name} ({segment.size} bytes)")
+        return shared
+
+    def get(self, name: str) -> Optional[SharedValue]:
+        """
+        Get a published value
+
+        Args:
+            name: Name the value was published under
+
+        Returns:
+            Shared value, or None if nothing is published under the name
+        """
+        with self._lock:
+            return self._values.get(name)
+
+    def get_names(self) -> List[str]:
+        """
+        Get the names of the published values
+
+        Returns:
+            List of names
+        """
+        with self._lock:
+            return list(self._values)
+
+    @property
+    def total_bytes(self) -> int:
+        """Get the size of all published segments in bytes"""
+        with self._lock:
+            return sum(segment.size for segment in self._segments.values())
+
+    def unpublish(self, name: str) -> bool:
+        """
+        Remove a published value
+
+        Args:
+            name: Name the value was published under
+
+        Returns:
+            True if the value was removed, False if nothing is published under the name
+        """
+        with self._lock:
+            shared = self._values.pop(name, None)
+            self._segments.pop(name, None)
+        if shared is None:
+            return False
+        self._remove(shared.handle.segment)
+        return True
+
+    def close(self) -> None:
+        """Remove all published values"""
+        for name in self.get_names():
+            self.unpublish(name)
+
+    def __enter__(self) -> 'SharedVariablePublisher':
+        """Use the publisher as a context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Remove all published values when leaving the context"""
+        self.close()
+
+    def _remove(self, segment_name: str) -> None:
+        """
+        Unlink a segment and drop this process's mapping of it
+
+        Args:
+            segment_name: Name of the segment
+        """
+        with _attached_lock:
+            segment, _ = _attached.pop(segment_name, (None, None))
+            if segment is None:
+                return
+            segment.unlink()
+            _retired.append(segment)
+        _close_retired()
+
+
+# Segments attached by this process and their loaded values, by segment name
+_NOT_LOADED = object()
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, Any]] = {}
+_attached_lock = threading.Lock()
+
+# Removed segments whose memory values read in this process may still point into
+_retired: List[shared_memory.SharedMemory] = []
+
+
+@atexit.register
+def _close_retired() -> None:
+    """Close the removed segments no loaded value points into any more"""
+    with _attached_lock:
+        for segment in list(_retired):
+            try:
+                segment.close()
+                _retired.remove(segment)
+            except BufferError:
+                # Still in use; closing it now would invalidate those values
+                pass
+
+
+def _load_shared(handle: SharedVariableHandle) -> Any:
+    """
+    Attach to a published value's segment and load the value once per process
+
+    Args:
+        handle: Handle of the value
+
+    Returns:
+        The value
+
+    Raises:
+        FileNotFoundError: If the segment was removed by the publisher
+    """
+    with _attached_lock:
+        segment, value = _attached.get(handle.segment, (None, _NOT_LOADED))
+        if value is not _NOT_LOADED:
+            return value
+        if segment is None:
+            segment = shared_memory.SharedMemory(name=handle.segment)
+
+        buf = segment.buf.toreadonly()
+        if handle.kind == SharedVariableHandle.KIND_BYTES:
+            value = buf[:handle.size]
+        else:
+            value = pickle.loads(
+                buf[:handle.size],
+                buffers=[buf[start:start + length] for start, length in handle.buffers]
+            )
+        _attached[handle.segment] = (segment, value)
+        return value
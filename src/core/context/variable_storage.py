@@ -1,8 +1,10 @@
 """Variable storage for the execution context"""
 import copy
 import re
+import threading
 from enum import Enum, auto
-from typing import Dict, Any, Optional, List, Callable, Union, Set, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Callable, Union, Set, Tuple, Mapping
 
 
 class VariableScope(Enum):
@@ -12,6 +14,73 @@ class VariableScope(Enum):
     LOCAL = auto()     # Variables available only to the current context
 
 
+class LazyValue:
+    """
+    Variable value produced on first access
+
+    Restored contexts hold their variables as lazy values so only the
+    variables a workflow reads are decoded. The storage resolves them
+    transparently; callers never see a LazyValue from get() or get_all().
+
+    The loaded value is kept and must not be modified, as the storage only
+    hands out copies of it (or the value itself, for subclasses whose values
+    are read-only). If two threads load a value at once both run the loader
+    and one result is kept.
+    """
+
+    _NOT_LOADED = object()
+
+    # Whether reads return a copy of the loaded value
+    copy_on_read = True
+
+    def __init__(self, loader: Callable[[], Any]):
+        """
+        Initialize the lazy value
+
+        Args:
+            loader: Function returning the value
+        """
+        self._loader = loader
+        self._value = self._NOT_LOADED
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the value has been loaded"""
+        return self._value is not self._NOT_LOADED
+
+    def get(self) -> Any:
+        """
+        Get the value, loading it on the first call
+
+        Returns:
+            The value
+        """
+        if self._value is self._NOT_LOADED:
+            self._value = self._loader()
+        return self._value
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> 'LazyValue':
+        """Lazy values are immutable, so copies share them"""
+        return self
+
+
+def _resolve(value: Any) -> Any:
+    """Get the value behind a stored value, loading it if it is lazy"""
+    return value.get() if isinstance(value, LazyValue) else value
+
+
+def _copy_out(value: Any) -> Any:
+    """Get a copy of a stored value for a caller, loading it if it is lazy"""
+    if isinstance(value, LazyValue):
+        return copy.deepcopy(value.get()) if value.copy_on_read else value.get()
+    return copy.deepcopy(value)
+
+
+def _resolve_all(variables: Dict[str, Any]) -> Dict[str, Any]:
+    """Get copies of the values of a scope, loading lazy ones"""
+    return {name: _copy_out(value) for name, value in variables.items()}
+
+
 class VariableChangeEvent:
     """Event raised when a variable changes"""
 
@@ -26,17 +95,159 @@ class VariableChangeEvent:
             scope: Scope of the variable
         """
         self.name = name
-        self.old_value = old_value
+        self._old_value = old_value
         self.new_value = new_value
         self.scope = scope
 
+    @property
+    def old_value(self) -> Any:
+        """Get the previous value, loading it if it was never read"""
+        return _resolve(self._old_value)
+
     def __str__(self) -> str:
         """String representation of the variable change event"""
         return f"VariableChangeEvent: {self.scope.name}.{self.name} = {self.new_value}"
 
 
+class VariableSnapshot:
+    """
+    Read-only view of a variable storage at one point in time
+
+    Created by VariableStorage.snapshot(). Later changes to the storage are
+    not visible in the snapshot.
+    """
+
+    def __init__(
+        self,
+        scopes: Dict[VariableScope, Dict[str, Any]],
+        version: int,
+        parent: Optional['VariableSnapshot'] = None
+    ):
+        """
+        Initialize the snapshot
+
+        Args:
+            scopes: Variables by scope; the dictionaries must never be modified again
+            version: Version of the storage the snapshot was taken at
+            parent: Snapshot of the parent storage
+        """
+        self._scopes = scopes
+        self._version = version
+        self._parent = parent
+
+    @property
+    def version(self) -> int:
+        """Get the version of the storage the snapshot was taken at"""
+        return self._version
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        Get a variable value, looking in the local, workflow and global scopes and then the parent
+
+        Args:
+            name: Name of the variable
+            default: Default value if variable doesn't exist
+
+        Returns:
+            Copy of the variable value or default if not found
+        """
+        for scope in (VariableScope.LOCAL, VariableScope.WORKFLOW, VariableScope.GLOBAL):
+            if name in self._scopes[scope]:
+                return _copy_out(self._scopes[scope][name])
+        if self._parent:
+            return self._parent.get(name, default)
+        return default
+
+    def get_scope(self, scope: VariableScope) -> Mapping[str, Any]:
+        """
+        Get the variables of a scope without copying them
+
+        Args:
+            scope: Scope of the variables
+
+        Returns:
+            Read-only mapping of variable names to values; the values themselves
+            must not be modified, and values not read since a restore are
+            LazyValue instances
+        """
+        return MappingProxyType(self._scopes[scope])
+
+    def get_all(self, scope: Optional[VariableScope] = None) -> Dict[str, Any]:
+        """
+        Get copies of all variables in a scope or all scopes
+
+        Args:
+            scope: Scope to get variables from (if None, get from all scopes)
+
+        Returns:
+            Dictionary of variable names and values
+        """
+        if scope:
+            return _resolve_all(self._scopes[scope])
+
+        result = self._parent.get_all() if self._parent else {}
+        for s in (VariableScope.GLOBAL, VariableScope.WORKFLOW, VariableScope.LOCAL):
+            result.update(_resolve_all(self._scopes[s]))
+        return result
+
+    def get_names(self, scope: Optional[VariableScope] = None) -> Set[str]:
+        """
+        Get all variable names in a scope or all scopes
+
+        Args:
+            scope: Scope to get variable names from (if None, get from all scopes)
+
+        Returns:
+            Set of variable names
+        """
+        if scope:
+            return set(self._scopes[scope])
+        names = self._parent.get_names() if self._parent else set()
+        for scope_vars in self._scopes.values():
+            names.update(scope_vars)
+        return names
+
+    def has(self, name: str, scope: Optional[VariableScope] = None) -> bool:
+        """
+        Check if a variable exists
+
+        Args:
+            name: Name of the variable
+            scope: Scope to check (if None, check all scopes and the parent)
+
+        Returns:
+            True if the variable exists, False otherwise
+        """
+        if scope:
+            return name in self._scopes[scope]
+        if any(name in scope_vars for scope_vars in self._scopes.values()):
+            return True
+        return self._parent.has(name) if self._parent else False
+
+    def count(self, scope: Optional[VariableScope] = None) -> int:
+        """
+        Count the variables of a scope or of all scopes of this storage
+
+        Args:
+            scope: Scope to count (if None, count all scopes)
+
+        Returns:
+            Number of variables
+        """
+        if scope:
+            return len(self._scopes[scope])
+        return sum(len(scope_vars) for scope_vars in self._scopes.values())
+
+
 class VariableStorage:
-    """Storage for variables with scoping"""
+    """
+    Storage for variables with scoping
+
+    Scopes are copied on write after a snapshot: snapshot() hands out the
+    current scope dictionaries in constant time, and the next change of a
+    scope replaces its dictionary with a copy instead of modifying the one
+    the snapshot holds.
+    """
 
     def __init__(self, parent: Optional['VariableStorage'] = None):
         """
@@ -51,6 +262,10 @@ class VariableStorage:
             VariableScope.LOCAL: {}
         }
         self._parent = parent
+        # Scopes whose dictionaries are held by snapshots; copied before the next change
+        self._shared: Set[VariableScope] = set()
+        self._version = 0
+        self._lock = threading.Lock()
         self._variable_change_listeners: List[Callable[[VariableChangeEvent], None]] = []
         self._variable_name_pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
@@ -67,15 +282,15 @@ class VariableStorage:
         """
         # Check local scope first
         if name in self._variables[VariableScope.LOCAL]:
-            return copy.deepcopy(self._variables[VariableScope.LOCAL][name])
+            return _copy_out(self._variables[VariableScope.LOCAL][name])
 
         # Then check workflow scope
         if name in self._variables[VariableScope.WORKFLOW]:
-            return copy.deepcopy(self._variables[VariableScope.WORKFLOW][name])
+            return _copy_out(self._variables[VariableScope.WORKFLOW][name])
 
         # Then check global scope
         if name in self._variables[VariableScope.GLOBAL]:
-            return copy.deepcopy(self._variables[VariableScope.GLOBAL][name])
+            return _copy_out(self._variables[VariableScope.GLOBAL][name])
 
         # If we have a parent, check there
         if self._parent:
@@ -98,13 +313,17 @@ class VariableStorage:
         """
         self._validate_variable_name(name)
 
-        # Get the old value (if any)
-        old_value = None
-        if name in self._variables[scope]:
-            old_value = self._variables[scope][name]
+        # Make a deep copy to prevent modification
+        new_value = copy.deepcopy(value)
+
+        with self._lock:
+            variables = self._writable_scope(scope)
 
-        # Set the new value (make a deep copy to prevent modification)
-        self._variables[scope][name] = copy.deepcopy(value)
+            # Get the old value (if any)
+            old_value = variables.get(name)
+
+            # Set the new value
+            variables[name] = new_value
 
         # Notify listeners
         self._notify_variable_change(VariableChangeEvent(name, old_value, value, scope))
@@ -122,21 +341,13 @@ class VariableStorage:
         """
         deleted = False
 
-        if scope:
-            # Delete from specific scope
-            if name in self._variables[scope]:
-                old_value = self._variables[scope][name]
-                del self._variables[scope][name]
-                self._notify_variable_change(VariableChangeEvent(name, old_value, None, scope))
-                deleted = True
-        else:
-            # Delete from all scopes
-            for s in VariableScope:
-                if name in self._variables[s]:
-                    old_value = self._variables[s][name]
-                    del self._variables[s][name]
-                    self._notify_variable_change(VariableChangeEvent(name, old_value, None, s))
-                    deleted = True
+        for s in ([scope] if scope else list(VariableScope)):
+            with self._lock:
+                if name not in self._variables[s]:
+                    continue
+                old_value = self._writable_scope(s).pop(name)
+            self._notify_variable_change(VariableChangeEvent(name, old_value, None, s))
+            deleted = True
 
         return deleted
 
@@ -147,11 +358,14 @@ class VariableStorage:
         Args:
             scope: Scope to clear
         """
-        # Create a copy of the variables to notify about
-        variables = list(self._variables[scope].items())
+        with self._lock:
+            # Keep the old variables to notify about
+            variables = list(self._variables[scope].items())
 
-        # Clear the scope
-        self._variables[scope].clear()
+            # Clear the scope (replacing it leaves snapshots untouched)
+            self._variables[scope] = {}
+            self._shared.discard(scope)
+            self._version += 1
 
         # Notify listeners
         for name, old_value in variables:
@@ -162,6 +376,25 @@ class VariableStorage:
         for scope in VariableScope:
             self.clear_scope(scope)
 
+    def load(self, variables: Dict[VariableScope, Dict[str, Any]]) -> None:
+        """
+        Replace the variables of scopes in bulk, e.g. when restoring a context
+
+        Unlike set(), the values are neither copied nor validated and no
+        listeners are notified, so restoring a large context costs one
+        dictionary per scope. The values may be LazyValue instances, which are
+        loaded when first read.
+
+        Args:
+            variables: Variables by scope; the storage takes ownership of the
+                dictionaries and values, so the caller must not keep using them
+        """
+        with self._lock:
+            for scope, scope_vars in variables.items():
+                self._variables[scope] = scope_vars
+                self._shared.discard(scope)
+            self._version += 1
+
     def get_all(self, scope: Optional[VariableScope] = None) -> Dict[str, Any]:
         """
         Get all variables in a scope or all scopes
@@ -176,7 +409,7 @@ class VariableStorage:
 
         if scope:
             # Get from specific scope
-            result.update(copy.deepcopy(self._variables[scope]))
+            result.update(_resolve_all(self._variables[scope]))
         else:
             # Get from all scopes (local overrides workflow overrides global)
             if self._parent:
@@ -184,13 +417,13 @@ class VariableStorage:
                 result.update(self._parent.get_all())
 
             # Add global variables
-            result.update(copy.deepcopy(self._variables[VariableScope.GLOBAL]))
+            result.update(_resolve_all(self._variables[VariableScope.GLOBAL]))
 
             # Add workflow variables
-            result.update(copy.deepcopy(self._variables[VariableScope.WORKFLOW]))
+            result.update(_resolve_all(self._variables[VariableScope.WORKFLOW]))
 
             # Add local variables
-            result.update(copy.deepcopy(self._variables[VariableScope.LOCAL]))
+            result.update(_resolve_all(self._variables[VariableScope.LOCAL]))
 
         return result
 
@@ -269,6 +502,69 @@ class VariableStorage:
         # Not found
         return None
 
+    @property
+    def version(self) -> int:
+        """Get the number of changes made to the storage so far"""
+        return self._version
+
+    def snapshot(self) -> VariableSnapshot:
+        """
+        Take a consistent read-only view of the variables in constant time
+
+        Nothing is copied when the snapshot is taken; the first change of each
+        scope afterwards copies that scope's dictionary once. The snapshot can
+        be read from any thread while the storage keeps changing.
+
+        Returns:
+            Snapshot of the variables (and of the parent storage, if any)
+        """
+        parent = self._parent.snapshot() if self._parent else None
+        with self._lock:
+            scopes = dict(self._variables)
+            self._shared.update(VariableScope)
+            return VariableSnapshot(scopes, self._version, parent)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Get the state to pickle or deep copy, without the lock
+
+        Returns:
+            Instance attributes except the lock; no scope is shared with a snapshot
+        """
+        with self._lock:
+            state = dict(self.__dict__)
+        del state["_lock"]
+        state["_shared"] = set()
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restore a pickled or deep copied storage with a new lock
+
+        Args:
+            state: State returned by __getstate__()
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _writable_scope(self, scope: VariableScope) -> Dict[str, Any]:
+        """
+        Get a scope's dictionary for a change, copying it if a snapshot holds it
+
+        Must be called with the lock held; counts the change.
+
+        Args:
+            scope: Scope about to change
+
+        Returns:
+            Dictionary of the scope that may be modified
+        """
+        if scope in self._shared:
+            self._variables[scope] = dict(self._variables[scope])
+            self._shared.discard(scope)
+        self._version += 1
+        return self._variables[scope]
+
     def add_variable_change_listener(self, listener: Callable[[VariableChangeEvent], None]) -> None:
         """
         Add a listener for variable change events
@@ -344,7 +640,7 @@ class VariableStorage:
         """
         return {
             "variables": {
-                scope.name: copy.deepcopy(variables)
+                scope.name: _resolve_all(variables)
                 for scope, variables in self._variables.items()
             }
         }
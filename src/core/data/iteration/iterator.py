@@ -1,5 +1,6 @@
 """Data iteration components"""
-from typing import Dict, Any, List, Optional, Iterator, Callable
+from typing import Dict, Any, List, Optional, Iterator, Callable, Tuple
+import itertools
 import logging
 
 from src.core.data.sources.base import DataSource
@@ -58,7 +59,8 @@ class DataIterator:
         data_source: DataSource,
         data_mapper: DataMapper,
         continue_on_error: bool = True,
-        max_errors: Optional[int] = None
+        max_errors: Optional[int] = None,
+        batch_size: Optional[int] = None
     ):
         """
         Initialize the data iterator
@@ -68,11 +70,14 @@ class DataIterator:
             data_mapper: Mapper to map records to the execution context
             continue_on_error: Whether to continue iterating after an error
             max_errors: Maximum number of errors before stopping
+            batch_size: Number of records to map together with the mapper's
+                        map_batch (None to map records one at a time)
         """
         self.data_source = data_source
         self.data_mapper = data_mapper
         self.continue_on_error = continue_on_error
         self.max_errors = max_errors
+        self.batch_size = batch_size
         self.logger = logging.getLogger(self.__class__.__name__)
         
     def iterate(
@@ -95,11 +100,8 @@ class DataIterator:
         
         # Open the data source
         with self.data_source:
-            # Iterate through the records
-            for i, record in enumerate(self.data_source.get_records()):
-                # Map the record to the context
-                context = self.data_mapper.map_record(record, base_context)
-                
+            # Iterate through the mapped records
+            for i, record, context in self._map_records(base_context):
                 try:
                     # Execute the function
                     result = execute_func(context)
@@ -159,3 +161,35 @@ class DataIterator:
                     if self.max_errors is not None and error_count >= self.max_errors:
                         self.logger.warning(f"Stopping iteration after {error_count} errors")
                         break
+                        
+    def _map_records(self, base_context: Dict[str, Any]) -> Iterator[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Map the records of the data source to execution contexts
+        
+        Args:
+            base_context: Base execution context
+            
+        Returns:
+            Iterator over (record index, record, mapped context) tuples
+        """
+        records = iter(self.data_source.get_records())
+        
+        # Mapping writes into a shared variables object, so a record mapped
+        # ahead of time would be overwritten by the next one; map each record
+        # just before it is used
+        shared_variables = "variables" in base_context and hasattr(base_context["variables"], "set")
+        
+        if not self.batch_size or shared_variables or not hasattr(self.data_mapper, "map_batch"):
+            for i, record in enumerate(records):
+                yield i, record, self.data_mapper.map_record(record, base_context)
+            return
+            
+        index = 0
+        while True:
+            chunk = list(itertools.islice(records, self.batch_size))
+            if not chunk:
+                return
+            contexts = self.data_mapper.map_batch(chunk, base_context, self.batch_size)
+            for record, context in zip(chunk, contexts):
+                yield index, record, context
+                index += 1
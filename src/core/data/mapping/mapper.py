@@ -1,6 +1,12 @@
 """Data mapping interfaces"""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; without it column transforms run per element
+    np = None
 
 
 class DataMapper(ABC):
@@ -49,7 +55,8 @@ class FieldMapping:
         field_name: str,
         variable_name: str,
         transform_function: Optional[callable] = None,
-        default_value: Any = None
+        default_value: Any = None,
+        vectorized: bool = False
     ):
         """
         Initialize the field mapping
@@ -59,11 +66,14 @@ class FieldMapping:
             variable_name: Name of the variable in the execution context
             transform_function: Optional function to transform the field value
             default_value: Default value to use if the field is missing
+            vectorized: Whether the transform function also accepts a NumPy array
+                        of values and returns an array of the same length
         """
         self.field_name = field_name
         self.variable_name = variable_name
         self.transform_function = transform_function
         self.default_value = default_value
+        self.vectorized = vectorized
         
     def apply(self, record: Dict[str, Any]) -> Any:
         """
@@ -87,3 +97,60 @@ class FieldMapping:
                 value = self.default_value
                 
         return value
+    
+    def apply_column(self, records: Sequence[Dict[str, Any]]) -> List[Any]:
+        """
+        Apply the mapping to a column of records at once
+        
+        Equivalent to calling apply() on each record. Vectorized transforms are
+        called once on the whole column when NumPy is available; otherwise, or if
+        the vectorized call fails, the transform is applied per element.
+        
+        Args:
+            records: Records to map
+            
+        Returns:
+            Mapped values in record order
+        """
+        values = [record.get(self.field_name, self.default_value) for record in records]
+        if not self.transform_function:
+            return values
+        
+        # Missing values are not transformed, matching apply()
+        positions = [i for i, value in enumerate(values) if value is not None]
+        if not positions:
+            return values
+        
+        if self.vectorized and np is not None:
+            transformed = self._transform_array([values[i] for i in positions])
+            if transformed is not None:
+                for i, value in zip(positions, transformed):
+                    values[i] = value
+                return values
+        
+        for i in positions:
+            try:
+                values[i] = self.transform_function(values[i])
+            except Exception:
+                values[i] = self.default_value
+        return values
+    
+    def _transform_array(self, values: List[Any]) -> Optional[List[Any]]:
+        """
+        Apply the transform function to a NumPy array of values
+        
+        Args:
+            values: Values to transform
+            
+        Returns:
+            Transformed values as Python objects, or None if the transform
+            does not support arrays
+        """
+        try:
+            result = self.transform_function(np.asarray(values))
+        except Exception:
+            return None
+        
+        if not isinstance(result, np.ndarray) or result.shape != (len(values),):
+            return None
+        return result.tolist()
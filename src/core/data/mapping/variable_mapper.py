@@ -1,5 +1,6 @@
 """Variable mapper implementation"""
-from typing import Dict, Any, List, Optional
+from collections import ChainMap
+from typing import Dict, Any, List, Optional, Sequence, MutableMapping
 import logging
 
 from src.core.data.mapping.mapper import DataMapper, FieldMapping
@@ -37,7 +38,8 @@ class VariableMapper(DataMapper):
         field_name: str,
         variable_name: Optional[str] = None,
         transform_function: Optional[callable] = None,
-        default_value: Any = None
+        default_value: Any = None,
+        vectorized: bool = False
     ) -> None:
         """
         Add a simple field mapping
@@ -48,9 +50,10 @@ class VariableMapper(DataMapper):
                            (defaults to the field name if not provided)
             transform_function: Optional function to transform the field value
             default_value: Default value to use if the field is missing
+            vectorized: Whether the transform function accepts NumPy arrays
         """
         variable_name = variable_name or field_name
-        mapping = FieldMapping(field_name, variable_name, transform_function, default_value)
+        mapping = FieldMapping(field_name, variable_name, transform_function, default_value, vectorized)
         self.add_mapping(mapping)
         
     def map_record(self, record: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
@@ -81,6 +84,48 @@ class VariableMapper(DataMapper):
                 
         return updated_context
         
+    def map_batch(
+        self,
+        records: Sequence[Dict[str, Any]],
+        context: Dict[str, Any],
+        chunk_size: int = 1000
+    ) -> List[MutableMapping[str, Any]]:
+        """
+        Map a batch of records to the execution context
+        
+        Each mapping is applied column-wise across a chunk of records. Instead of
+        copying the context per record, each record gets a lightweight overlay
+        holding only its mapped variables on top of the shared base context;
+        writes to an overlay do not affect the base context or other records.
+        
+        A variables object in the context is shared by every record, so with
+        one the records are mapped into it in turn and it ends up holding the
+        last record's values; use map_record() just before each record runs
+        instead.
+        
+        Args:
+            records: Records to map
+            context: Base execution context
+            chunk_size: Number of records mapped together
+            
+        Returns:
+            One context per record, in record order
+        """
+        if "variables" in context and hasattr(context["variables"], "set"):
+            # A variables object is shared and updated in place, so overlays
+            # cannot isolate records from each other
+            return [self.map_record(record, context) for record in records]
+        
+        contexts: List[MutableMapping[str, Any]] = []
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            columns = [(mapping.variable_name, mapping.apply_column(chunk)) for mapping in self.mappings]
+            for i in range(len(chunk)):
+                overlay = {name: values[i] for name, values in columns}
+                contexts.append(ChainMap(overlay, context))
+                
+        return contexts
+        
     def get_field_mappings(self) -> Dict[str, str]:
         """
         Get the field mappings
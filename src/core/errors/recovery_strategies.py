@@ -172,19 +172,25 @@ class WaitAndRetryStrategy(RecoveryStrategy):
         self,
         max_retries: int = 3,
         wait_seconds: float = 2.0,
-        applicable_error_types: Optional[Set[ErrorType]] = None
+        applicable_error_types: Optional[Set[ErrorType]] = None,
+        backoff_factor: float = 1.0,
+        max_wait_seconds: Optional[float] = None
     ):
         """
         Initialize the wait and retry strategy
         
         Args:
             max_retries: Maximum number of retry attempts
-            wait_seconds: Time to wait between retries (seconds)
+            wait_seconds: Time to wait before the first retry (seconds)
             applicable_error_types: Error types this strategy can handle (None for all)
+            backoff_factor: Factor the wait grows by after each retry (1.0 for a fixed wait)
+            max_wait_seconds: Upper bound for the wait between retries (None for no bound)
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self.max_retries = max_retries
         self.wait_seconds = wait_seconds
+        self.backoff_factor = backoff_factor
+        self.max_wait_seconds = max_wait_seconds
         self.applicable_error_types = applicable_error_types or {
             ErrorType.ELEMENT_NOT_FOUND,
             ErrorType.ELEMENT_NOT_VISIBLE,
@@ -229,16 +235,36 @@ class WaitAndRetryStrategy(RecoveryStrategy):
         # Increment the retry count
         context["retry_count"] = retry_count + 1
         
-        # Wait before retrying
-        if self.wait_seconds > 0:
-            self.logger.info(f"Waiting {self.wait_seconds} seconds before retry")
-            time.sleep(self.wait_seconds)
+        # Wait before retrying, backing off on repeated attempts
+        wait_seconds = self.get_wait_seconds(retry_count)
+        if wait_seconds > 0:
+            self.logger.info(f"Waiting {wait_seconds} seconds before retry")
+            cancel_event = context.get("cancel_event")
+            if cancel_event is not None and hasattr(cancel_event, "wait"):
+                cancel_event.wait(wait_seconds)
+            else:
+                time.sleep(wait_seconds)
             
         return RecoveryResult.create_success(
             f"Waiting and retrying operation (attempt {retry_count + 1} of {self.max_retries})",
             {
                 "retry_count": retry_count + 1,
                 "max_retries": self.max_retries,
-                "wait_seconds": self.wait_seconds
+                "wait_seconds": wait_seconds
             }
         )
+
+    def get_wait_seconds(self, retry_count: int) -> float:
+        """
+        Get the time to wait before a retry
+        
+        Args:
+            retry_count: Number of retries already attempted
+            
+        Returns:
+            Time to wait (seconds)
+        """
+        wait_seconds = self.wait_seconds * (self.backoff_factor ** retry_count)
+        if self.max_wait_seconds is not None:
+            wait_seconds = min(wait_seconds, self.max_wait_seconds)
+        return wait_seconds
@@ -0,0 +1,64 @@
+"""Crash-safe file writes for state and checkpoint files"""
+import os
+import tempfile
+from enum import Enum, auto
+
+
+class Durability(Enum):
+    """How hard a write tries to survive a crash"""
+    NONE = auto()  # Atomic rename only; a power loss may lose recent writes
+    FILE = auto()  # fsync the file before renaming it into place
+    FULL = auto()  # Also fsync the directory, so the rename itself is durable
+
+
+def write_atomic(file_path: str, data: bytes, durability: Durability = Durability.NONE) -> None:
+    """
+    Write a file so that readers see either the old or the new contents
+
+    The data is written to a temporary file in the same directory and renamed
+    over the target, so a crash never leaves a truncated file behind.
+
+    Args:
+        file_path: Path of the file
+        data: Contents to write
+        durability: Whether to fsync the file and its directory
+    """
+    directory = os.path.dirname(file_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if durability is not Durability.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if durability is Durability.FULL:
+        sync_directory(directory)
+
+
+def sync_directory(directory: str) -> None:
+    """
+    fsync a directory so that renames and deletions in it are durable
+
+    Does nothing on platforms that cannot open directories (Windows).
+
+    Args:
+        directory: Path of the directory
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
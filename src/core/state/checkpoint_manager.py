@@ -1,41 +1,206 @@
 """Checkpoint management functionality for saving and restoring workflow execution points"""
 import os
-import json
 import uuid
 import logging
+import threading
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from src.core.context.execution_context import ExecutionContext
+from src.core.context.variable_storage import VariableStorage, VariableScope, VariableChangeEvent
 from src.core.state.state_persistence import StatePersistence
+from src.core.state.state_codec import StateCodec
+from src.core.state.context_data import capture_context, pack_context_data, unpack_context_data, restore_context
+from src.core.state.atomic_write import Durability, sync_directory as sync_dir
+from src.core.state.state_index import StateIndex
 from src.core.state.checkpoint_interface import CheckpointInterface
 from src.core.state.checkpoint import Checkpoint
 from src.core.state.checkpoint_manager_interface import CheckpointManagerInterface
 
 
+class _DeltaChain:
+    """Variables of a context changed since the last checkpoint of a workflow"""
+
+    def __init__(self, storage: VariableStorage, head_id: str):
+        """
+        Start tracking changes of a variable storage
+
+        Args:
+            storage: Variable storage of the checkpointed context
+            head_id: ID of the newest checkpoint of the chain
+        """
+        self.storage = storage
+        self.head_id = head_id
+        self.length = 0
+        self._changed: Set[Tuple[VariableScope, str]] = set()
+        self._lock = threading.Lock()
+        storage.add_variable_change_listener(self._on_variable_change)
+
+    def _on_variable_change(self, event: VariableChangeEvent) -> None:
+        """Remember the changed variable"""
+        with self._lock:
+            self._changed.add((event.scope, event.name))
+
+    def take_changes(self) -> Set[Tuple[VariableScope, str]]:
+        """Get the variables changed since the last call and start over"""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+        return changed
+
+    def detach(self) -> None:
+        """Stop tracking changes"""
+        self.storage.remove_variable_change_listener(self._on_variable_change)
+
+
+class PendingCheckpoint:
+    """A checkpoint captured from a context but not written yet"""
+
+    def __init__(self, record: Dict[str, Any], context_data: Dict[str, Any]):
+        """
+        Initialize the pending checkpoint
+
+        Args:
+            record: Checkpoint record (id, workflow_id, timestamp, name, data, parent_id)
+            context_data: Captured context, either full or a delta on the parent checkpoint
+        """
+        self.record = record
+        self.context_data = context_data
+
+    @property
+    def checkpoint_id(self) -> str:
+        """Get the ID of the checkpoint"""
+        return self.record["id"]
+
+    @property
+    def workflow_id(self) -> str:
+        """Get the ID of the workflow"""
+        return self.record["workflow_id"]
+
+    @property
+    def name(self) -> Optional[str]:
+        """Get the name of the checkpoint"""
+        return self.record.get("name")
+
+    def absorb(self, older: 'PendingCheckpoint') -> None:
+        """
+        Take over an older checkpoint of the same workflow that will not be written
+
+        A delta based on the older checkpoint is rebased onto the older one's
+        parent (or becomes a full checkpoint) so no changes are lost.
+
+        Args:
+            older: Unwritten checkpoint this one supersedes
+        """
+        if self.record.get("parent_id") != older.checkpoint_id:
+            return
+
+        if "variables" in older.context_data:
+            variables = {scope: dict(scope_vars) for scope, scope_vars in older.context_data["variables"].items()}
+            _apply_delta(variables, self.context_data)
+            self.context_data = {
+                "id": self.context_data["id"],
+                "state": self.context_data["state"],
+                "variables": variables
+            }
+        else:
+            changes = {scope: dict(scope_vars) for scope, scope_vars in older.context_data["changes"].items()}
+            deleted = {scope: set(names) for scope, names in older.context_data["deleted"].items()}
+            for scope, names in self.context_data["deleted"].items():
+                for name in names:
+                    changes.get(scope, {}).pop(name, None)
+                deleted.setdefault(scope, set()).update(names)
+            for scope, scope_vars in self.context_data["changes"].items():
+                changes.setdefault(scope, {}).update(scope_vars)
+                deleted.get(scope, set()).difference_update(scope_vars)
+            self.context_data = dict(
+                self.context_data,
+                parent_id=older.context_data["parent_id"],
+                changes=changes,
+                deleted={scope: sorted(names) for scope, names in deleted.items() if names}
+            )
+        self.record["parent_id"] = older.record.get("parent_id")
+
+
+def _apply_delta(variables: Dict[str, Dict[str, Any]], delta: Dict[str, Any]) -> None:
+    """Apply the deletions and changes of a delta to variables by scope"""
+    for scope, names in delta.get("deleted", {}).items():
+        for name in names:
+            variables.get(scope, {}).pop(name, None)
+    for scope, scope_vars in delta.get("changes", {}).items():
+        variables.setdefault(scope, {}).update(scope_vars)
+
+
 class CheckpointManager(CheckpointManagerInterface):
     """
     Manages checkpoints for workflow execution
 
     This class provides methods to create checkpoints during workflow execution
     and restore from them later, enabling advanced pause/resume functionality.
+
+    With delta checkpoints enabled, the first checkpoint of a workflow saves the
+    whole context and later ones only the variables that changed since the
+    previous checkpoint (collected from VariableChangeEvents), so their cost
+    follows the rate of change rather than the size of the context. Restoring
+    a delta replays the chain from its base; after max_chain_length deltas the
+    next checkpoint starts a new chain with a full save.
+
+    With an index, checkpoint records are also kept in an SQLite database in
+    the directory, so listing a workflow's checkpoints or finding one by name
+    does not read every checkpoint file.
     """
 
-    def __init__(self, checkpoint_dir: str = "checkpoints"):
+    INDEX_NAME = "index.sqlite3"
+
+    def __init__(
+        self,
+        checkpoint_dir: str = "checkpoints",
+        delta_checkpoints: bool = False,
+        max_chain_length: int = 10,
+        codec: Optional[StateCodec] = None,
+        use_index: bool = False,
+        durability: Durability = Durability.NONE
+    ):
         """
         Initialize the checkpoint manager
 
         Args:
             checkpoint_dir: Directory to store checkpoint files
+            delta_checkpoints: Whether to save only the changed variables after the first checkpoint
+            max_chain_length: Maximum number of delta checkpoints before the next full checkpoint
+            codec: Codec for checkpoint files (pickle with zlib compression if not provided;
+                JSON files of earlier versions are always readable)
+            use_index: Whether to index checkpoint records in a database in the directory
+            durability: Whether to fsync checkpoint files (files are always replaced atomically)
+
+        Raises:
+            ValueError: If max_chain_length is less than 1
         """
+        if max_chain_length < 1:
+            raise ValueError("max_chain_length must be at least 1")
+
         self.checkpoint_dir = checkpoint_dir
+        self.delta_checkpoints = delta_checkpoints
+        self.max_chain_length = max_chain_length
+        self.codec = codec or StateCodec()
+        self.durability = durability
         self.logger = logging.getLogger(self.__class__.__name__)
 
+        # Open delta chains by workflow ID
+        self._chains: Dict[str, _DeltaChain] = {}
+        self._chains_lock = threading.Lock()
+
         # Create the checkpoint directory if it doesn't exist
         os.makedirs(self.checkpoint_dir, exist_ok=True)
 
         # Create a state persistence instance for handling context serialization
-        self.state_persistence = StatePersistence(checkpoint_dir)
+        self.state_persistence = StatePersistence(checkpoint_dir, self.codec)
+
+        self.index: Optional[StateIndex] = None
+        if use_index:
+            self.index = StateIndex(os.path.join(self.checkpoint_dir, self.INDEX_NAME))
+            if self.index.checkpoint_count() == 0:
+                # Index checkpoints written before the index existed
+                self.index.rebuild_checkpoints(self.checkpoint_dir, self.codec)
 
     def create_checkpoint(
         self,
@@ -56,40 +221,142 @@ class CheckpointManager(CheckpointManagerInterface):
         Returns:
             ID of the created checkpoint
         """
+        pending = self.prepare_checkpoint(workflow_id, context, data, name)
+        self.write_checkpoint(pending)
+        return pending.checkpoint_id
+
+    def prepare_checkpoint(
+        self,
+        workflow_id: str,
+        context: ExecutionContext,
+        data: Dict[str, Any],
+        name: Optional[str] = None
+    ) -> PendingCheckpoint:
+        """
+        Capture a checkpoint of a context without writing it
+
+        This only takes a snapshot of the context (and picks the changed
+        variables, for a delta), so it is cheap enough to run on the
+        workflow's thread; write_checkpoint() does the serialization and I/O.
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context to save
+            data: Additional data to save with the checkpoint (e.g., action index)
+            name: Optional name for the checkpoint
+
+        Returns:
+            Captured checkpoint
+        """
         # Generate a unique ID for the checkpoint
         checkpoint_id = str(uuid.uuid4())
 
         # Create a timestamp
         timestamp = datetime.now().isoformat()
 
-        # Create the checkpoint data
-        checkpoint_data = {
+        chain = self._continue_chain(workflow_id, context) if self.delta_checkpoints else None
+        if chain is not None:
+            parent_id = chain.head_id
+            context_data = self._capture_context_delta(context, parent_id, chain.take_changes())
+            chain.head_id = checkpoint_id
+            chain.length += 1
+        else:
+            parent_id = None
+            if self.delta_checkpoints:
+                # Track changes from before the capture so none are missed
+                self._start_chain(workflow_id, context, checkpoint_id)
+            context_data = capture_context(context)
+
+        record = {
             "id": checkpoint_id,
             "workflow_id": workflow_id,
             "timestamp": timestamp,
             "name": name,
-            "data": data
+            "data": data,
+            "parent_id": parent_id
         }
+        return PendingCheckpoint(record, context_data)
 
-        # Create the filename
-        filename = f"{checkpoint_id}.checkpoint"
-        file_path = os.path.join(self.checkpoint_dir, filename)
+    def write_checkpoint(self, pending: PendingCheckpoint, sync_directory: bool = True) -> None:
+        """
+        Write a captured checkpoint
 
-        try:
-            # Save the checkpoint data
-            with open(file_path, 'w') as f:
-                json.dump(checkpoint_data, f, indent=2)
+        The context file is written before the checkpoint file, each with an
+        atomic rename, so a listed checkpoint always has a complete context.
 
-            # Save the context state
-            context_file = os.path.join(self.checkpoint_dir, f"{checkpoint_id}.context")
-            self._save_context(context_file, context)
+        Args:
+            pending: Checkpoint returned by prepare_checkpoint()
+            sync_directory: Whether to fsync the directory at the end when the durability
+                is FULL (batch writers sync it once per batch instead)
 
-            self.logger.info(f"Created checkpoint {checkpoint_id}")
-            return checkpoint_id
+        Raises:
+            Exception: If the checkpoint cannot be written; the workflow's delta chain
+                is ended so its next checkpoint is a full one
+        """
+        durability = Durability.FILE if self.durability is Durability.FULL else self.durability
+        context_file = os.path.join(self.checkpoint_dir, f"{pending.checkpoint_id}.context")
+        try:
+            self.codec.write(context_file, pack_context_data(pending.context_data, self.codec), durability)
+            self._write_record(pending.record, durability)
+            if sync_directory and self.durability is Durability.FULL:
+                sync_dir(self.checkpoint_dir)
+            self.logger.info(f"Created checkpoint {pending.checkpoint_id}")
         except Exception as e:
+            # The changes captured for this checkpoint are lost; start over with a full save
+            self.end_chain(pending.workflow_id)
             self.logger.error(f"Error creating checkpoint: {str(e)}")
             raise
 
+    def end_chain(self, workflow_id: str) -> None:
+        """
+        Stop tracking the changes of a workflow's context
+
+        The next checkpoint of the workflow saves the whole context. Call this
+        when a workflow run ends so the manager lets go of its context.
+
+        Args:
+            workflow_id: ID of the workflow
+        """
+        with self._chains_lock:
+            chain = self._chains.pop(workflow_id, None)
+        if chain is not None:
+            chain.detach()
+
+    def _continue_chain(self, workflow_id: str, context: ExecutionContext) -> Optional[_DeltaChain]:
+        """
+        Get the delta chain a new checkpoint of a workflow can extend
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context to save
+
+        Returns:
+            The chain, or None if the checkpoint must be a full one
+        """
+        with self._chains_lock:
+            chain = self._chains.get(workflow_id)
+        if chain is None:
+            return None
+        if chain.storage is not context.variables or chain.length >= self.max_chain_length:
+            # Different context, or chain too long to replay cheaply
+            self.end_chain(workflow_id)
+            return None
+        return chain
+
+    def _start_chain(self, workflow_id: str, context: ExecutionContext, checkpoint_id: str) -> None:
+        """
+        Start a delta chain at a full checkpoint
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context being saved
+            checkpoint_id: ID of the full checkpoint
+        """
+        self.end_chain(workflow_id)
+        chain = _DeltaChain(context.variables, checkpoint_id)
+        with self._chains_lock:
+            self._chains[workflow_id] = chain
+
     def restore_from_checkpoint(self, checkpoint_id: str) -> Tuple[ExecutionContext, Dict[str, Any]]:
         """
         Restore from a checkpoint
@@ -116,8 +383,7 @@ class CheckpointManager(CheckpointManagerInterface):
 
         try:
             # Load the checkpoint data
-            with open(checkpoint_file, 'r') as f:
-                checkpoint_data = json.load(f)
+            checkpoint_data = self.codec.read(checkpoint_file)
 
             # Load the context
             context = self._load_context(context_file)
@@ -128,16 +394,20 @@ class CheckpointManager(CheckpointManagerInterface):
             self.logger.error(f"Error restoring from checkpoint: {str(e)}")
             raise ValueError(f"Invalid checkpoint: {str(e)}")
 
-    def get_checkpoints_for_workflow(self, workflow_id: str) -> List[Dict[str, Any]]:
+    def get_checkpoints_for_workflow(self, workflow_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get all checkpoints for a workflow
 
         Args:
             workflow_id: ID of the workflow
+            limit: Maximum number of checkpoints to return (the newest ones)
 
         Returns:
-            List of checkpoint data dictionaries
+            List of checkpoint data dictionaries, newest first
         """
+        if self.index:
+            return self.index.get_checkpoints(workflow_id, limit=limit)
+
         checkpoints = []
 
         # Iterate through all checkpoint files
@@ -148,8 +418,7 @@ class CheckpointManager(CheckpointManagerInterface):
             file_path = os.path.join(self.checkpoint_dir, filename)
             try:
                 # Load the checkpoint data
-                with open(file_path, 'r') as f:
-                    checkpoint_data = json.load(f)
+                checkpoint_data = self.codec.read(file_path)
 
                 # Check if it's for the specified workflow
                 if checkpoint_data["workflow_id"] == workflow_id:
@@ -160,7 +429,7 @@ class CheckpointManager(CheckpointManagerInterface):
         # Sort by timestamp (newest first)
         checkpoints.sort(key=lambda x: x["timestamp"], reverse=True)
 
-        return checkpoints
+        return checkpoints if limit is None else checkpoints[:limit]
 
     def get_checkpoint_by_name(self, workflow_id: str, name: str) -> Optional[Dict[str, Any]]:
         """
@@ -173,6 +442,10 @@ class CheckpointManager(CheckpointManagerInterface):
         Returns:
             Checkpoint data dictionary, or None if not found
         """
+        if self.index:
+            checkpoints = self.index.get_checkpoints(workflow_id, name=name, limit=1)
+            return checkpoints[0] if checkpoints else None
+
         checkpoints = self.get_checkpoints_for_workflow(workflow_id)
 
         # Find the checkpoint with the specified name
@@ -204,8 +477,7 @@ class CheckpointManager(CheckpointManagerInterface):
 
         try:
             # Load the checkpoint data
-            with open(checkpoint_file, 'r') as f:
-                data = json.load(f)
+            data = self.codec.read(checkpoint_file)
 
             # Load the context
             context = self._load_context(context_file)
@@ -242,6 +514,10 @@ class CheckpointManager(CheckpointManagerInterface):
         context_file = os.path.join(self.checkpoint_dir, f"{checkpoint_id}.context")
 
         try:
+            # Deltas built on this checkpoint must not lose their base
+            checkpoint_data = self.codec.read(checkpoint_file)
+            self._materialize_children(checkpoint_data)
+
             # Delete the checkpoint file
             os.remove(checkpoint_file)
 
@@ -249,12 +525,58 @@ class CheckpointManager(CheckpointManagerInterface):
             if os.path.exists(context_file):
                 os.remove(context_file)
 
+            if self.index:
+                self.index.remove_checkpoints([checkpoint_id])
+
+            # A chain whose head is gone must start over
+            with self._chains_lock:
+                workflows = [wf for wf, chain in self._chains.items() if chain.head_id == checkpoint_id]
+            for workflow_id in workflows:
+                self.end_chain(workflow_id)
+
             self.logger.info(f"Deleted checkpoint {checkpoint_id}")
             return True
         except Exception as e:
             self.logger.error(f"Error deleting checkpoint {checkpoint_id}: {str(e)}")
             return False
 
+    def _materialize_children(self, checkpoint_data: Dict[str, Any]) -> None:
+        """
+        Rewrite the deltas based on a checkpoint as full checkpoints
+
+        Args:
+            checkpoint_data: Checkpoint that is about to be deleted
+        """
+        checkpoint_id = checkpoint_data["id"]
+        if self.index:
+            children = self.index.get_children(checkpoint_id)
+        else:
+            children = [
+                child for child in self.get_checkpoints_for_workflow(checkpoint_data["workflow_id"])
+                if child.get("parent_id") == checkpoint_id
+            ]
+
+        for child in children:
+            child_context_file = os.path.join(self.checkpoint_dir, f"{child['id']}.context")
+            self._save_context(child_context_file, self._load_context(child_context_file))
+            child["parent_id"] = None
+            self._write_record(child)
+
+    def _write_record(self, checkpoint_data: Dict[str, Any], durability: Optional[Durability] = None) -> None:
+        """
+        Write a checkpoint record file after its context file, and index it
+
+        Args:
+            checkpoint_data: Checkpoint record
+            durability: Durability of the write (uses the manager's if not provided)
+        """
+        file_path = self.get_checkpoint_file(checkpoint_data["id"])
+        self.codec.write(file_path, checkpoint_data, durability or self.durability)
+        if self.index:
+            context_file = os.path.join(self.checkpoint_dir, f"{checkpoint_data['id']}.context")
+            size = os.path.getsize(file_path) + os.path.getsize(context_file)
+            self.index.add_checkpoint(checkpoint_data, size)
+
     def get_checkpoint_file(self, checkpoint_id: str) -> str:
         """
         Get the file path for a checkpoint
@@ -275,78 +597,92 @@ class CheckpointManager(CheckpointManagerInterface):
             file_path: Path to save the context to
             context: Execution context to save
         """
-        # Create the context data
-        context_data = {
-            "id": context.id,
-            "state": context.state.to_dict(),
-            "variables": {
-                "global": self._get_variables_by_scope(context, "GLOBAL"),
-                "workflow": self._get_variables_by_scope(context, "WORKFLOW"),
-                "local": self._get_variables_by_scope(context, "LOCAL")
-            }
-        }
-
-        # Save the context data
-        with open(file_path, 'w') as f:
-            json.dump(context_data, f, indent=2)
+        self.codec.write(file_path, pack_context_data(capture_context(context), self.codec), self.durability)
 
-    def _load_context(self, file_path: str) -> ExecutionContext:
+    def _capture_context_delta(
+        self,
+        context: ExecutionContext,
+        parent_id: str,
+        changed: Set[Tuple[VariableScope, str]]
+    ) -> Dict[str, Any]:
         """
-        Load an execution context from a file
+        Capture the variables changed since the parent checkpoint
 
         Args:
-            file_path: Path to load the context from
+            context: Execution context to capture
+            parent_id: ID of the checkpoint the delta applies to
+            changed: Scopes and names of the changed variables
 
         Returns:
-            Loaded execution context
+            Delta data to save
         """
-        # Load the context data
-        with open(file_path, 'r') as f:
-            context_data = json.load(f)
-
-        # Create a new execution context
-        context = ExecutionContext(context_id=context_data["id"])
-
-        # Restore the state
-        context.state = context.state.from_dict(context_data["state"])
-
-        # Restore the variables
-        self._restore_variables(context, context_data["variables"])
-
-        return context
+        snapshot = context.snapshot()
+        changes: Dict[str, Dict[str, Any]] = {}
+        deleted: Dict[str, List[str]] = {}
+        for scope, name in changed:
+            scope_vars = snapshot.variables.get_scope(scope)
+            if name in scope_vars:
+                changes.setdefault(scope.name.lower(), {})[name] = scope_vars[name]
+            else:
+                deleted.setdefault(scope.name.lower(), []).append(name)
+
+        return {
+            "id": snapshot.id,
+            "state": snapshot.state,
+            "parent_id": parent_id,
+            "changes": changes,
+            "deleted": deleted
+        }
 
-    def _get_variables_by_scope(self, context: ExecutionContext, scope_name: str) -> Dict[str, Any]:
+    def _load_context(self, file_path: str) -> ExecutionContext:
         """
-        Get variables by scope
+        Load an execution context from a file
+
+        A delta is applied on top of its parent checkpoint's context, going
+        back along the chain to the last full checkpoint. Variables saved
+        individually are only decoded when the restored context reads them.
 
         Args:
-            context: Execution context
-            scope_name: Name of the scope (GLOBAL, WORKFLOW, LOCAL)
+            file_path: Path to load the context from
 
         Returns:
-            Dictionary of variables in the specified scope
-        """
-        from src.core.context.variable_storage import VariableScope
-
-        # Get the scope enum
-        scope = VariableScope[scope_name]
+            Loaded execution context
 
-        # Get the variables for the scope
-        return context.variables._variables[scope]
+        Raises:
+            FileNotFoundError: If a checkpoint of the chain is missing
+        """
+        context_data, variables = self._load_context_data(file_path)
+        return restore_context(dict(context_data, variables=variables))
 
-    def _restore_variables(self, context: ExecutionContext, variables: Dict[str, Dict[str, Any]]) -> None:
+    def _load_context_data(self, file_path: str) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
         """
-        Restore variables to an execution context
+        Read a context file and resolve its variables along the delta chain
 
         Args:
-            context: Execution context
-            variables: Dictionary of variables by scope
-        """
-        from src.core.context.variable_storage import VariableScope
+            file_path: Path of the context file
 
-        # Restore variables for each scope
-        for scope_name, scope_vars in variables.items():
-            # Convert scope name to uppercase to match enum member names
-            scope = VariableScope[scope_name.upper()]
-            for name, value in scope_vars.items():
-                context.variables.set(name, value, scope)
+        Returns:
+            Tuple of (context data, variables by scope)
+        """
+        context_data = unpack_context_data(self.codec.read(file_path))
+
+        # Walk back to the full checkpoint
+        deltas = []
+        visited = set()
+        current = context_data
+        while "parent_id" in current:
+            deltas.append(current)
+            if current["parent_id"] in visited:
+                raise ValueError(f"Checkpoint delta chain is cyclic at {current['parent_id']}")
+            visited.add(current["parent_id"])
+            parent_file = os.path.join(self.checkpoint_dir, f"{current['parent_id']}.context")
+            if not os.path.exists(parent_file):
+                raise FileNotFoundError(f"Context file not found for checkpoint: {current['parent_id']}")
+            current = unpack_context_data(self.codec.read(parent_file))
+
+        # Replay the deltas, oldest first
+        variables = {scope: dict(scope_vars) for scope, scope_vars in current["variables"].items()}
+        for delta in reversed(deltas):
+            _apply_delta(variables, delta)
+
+        return context_data, variables
@@ -0,0 +1,209 @@
+"""Background writing of workflow checkpoints"""
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.state.atomic_write import Durability, sync_directory
+from src.core.state.checkpoint_manager import CheckpointManager, PendingCheckpoint
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints on a background thread
+
+    submit() captures the checkpoint on the caller's thread, which only copies
+    variable references, and returns its ID at once. A worker thread then
+    serializes and writes the queued checkpoints. When a workflow submits a
+    new checkpoint while an unnamed one of it is still queued, the new one
+    absorbs the queued one, so a workflow that checkpoints faster than the
+    disk keeps up only writes its latest state. Named checkpoints are always
+    written, since they are looked up by name later.
+
+    Managers with a write_checkpoints() method get each batch in one call,
+    which lets a database-backed manager commit it in one transaction.
+
+    Call flush() before reading checkpoints back and close() at shutdown.
+    """
+
+    def __init__(self, checkpoint_manager: CheckpointManager):
+        """
+        Initialize the checkpoint writer
+
+        Args:
+            checkpoint_manager: Checkpoint manager that captures and writes the checkpoints
+
+        Raises:
+            ValueError: If the checkpoint manager cannot capture checkpoints separately from writing them
+        """
+        if not hasattr(checkpoint_manager, "prepare_checkpoint") or \
+                not hasattr(checkpoint_manager, "write_checkpoint"):
+            raise ValueError("Checkpoint manager does not support background writing")
+
+        self.checkpoint_manager = checkpoint_manager
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._queue: List[PendingCheckpoint] = []
+        self._in_progress = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._metrics = {"submitted": 0, "written": 0, "coalesced": 0, "failed": 0}
+
+        # Last checkpoint of each workflow that could not be written (worker thread only)
+        self._failed: Dict[str, PendingCheckpoint] = {}
+
+        self._thread = threading.Thread(target=self._run, name="CheckpointWriter", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        workflow_id: str,
+        context: ExecutionContext,
+        data: Dict[str, Any],
+        name: Optional[str] = None
+    ) -> str:
+        """
+        Capture a checkpoint and queue it for writing
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context to save
+            data: Additional data to save with the checkpoint (e.g., action index)
+            name: Optional name for the checkpoint
+
+        Returns:
+            ID of the checkpoint; it cannot be restored before it is written
+            (use flush() to wait for it), and a later unnamed checkpoint of the
+            same workflow may replace it
+
+        Raises:
+            RuntimeError: If the writer is closed
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Checkpoint writer is closed")
+
+            # Capture under the lock so the queue follows the order of the chain
+            pending = self.checkpoint_manager.prepare_checkpoint(workflow_id, context, data, name)
+            self._metrics["submitted"] += 1
+
+            previous = self._find_queued(workflow_id)
+            if previous is not None and previous.name is None:
+                pending.absorb(previous)
+                self._queue.remove(previous)
+                self._metrics["coalesced"] += 1
+
+            self._queue.append(pending)
+            self._condition.notify_all()
+
+        return pending.checkpoint_id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all submitted checkpoints are written
+
+        Args:
+            timeout: Maximum time to wait in seconds (waits indefinitely if not provided)
+
+        Returns:
+            True if all checkpoints were written (or failed), False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._in_progress, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Write the queued checkpoints and stop the worker thread
+
+        Args:
+            timeout: Maximum time to wait in seconds (waits indefinitely if not provided)
+
+        Returns:
+            True if the worker finished, False on timeout
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get the writer's counters
+
+        Returns:
+            Dictionary with submitted, written, coalesced, failed and pending counts
+        """
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics["pending"] = len(self._queue) + self._in_progress
+        return metrics
+
+    def _find_queued(self, workflow_id: str) -> Optional[PendingCheckpoint]:
+        """Get the newest queued checkpoint of a workflow"""
+        for pending in reversed(self._queue):
+            if pending.workflow_id == workflow_id:
+                return pending
+        return None
+
+    def _run(self) -> None:
+        """Write queued checkpoints until the writer is closed"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                batch, self._queue = self._queue, []
+                self._in_progress = len(batch)
+
+            written = 0
+            try:
+                written = self._write_batch(batch)
+            except Exception as e:
+                # Keep the worker alive; the batch counts as failed and later deltas are rebased
+                self.logger.error(f"Unexpected error writing {len(batch)} checkpoints: {str(e)}", exc_info=True)
+                for pending in batch:
+                    self._failed[pending.workflow_id] = pending
+            finally:
+                with self._condition:
+                    self._in_progress = 0
+                    self._metrics["written"] += written
+                    self._metrics["failed"] += len(batch) - written
+                    self._condition.notify_all()
+
+    def _write_batch(self, batch: List[PendingCheckpoint]) -> int:
+        """
+        Write a batch of checkpoints, syncing the directory once at the end
+
+        Args:
+            batch: Checkpoints in submission order
+
+        Returns:
+            Number of checkpoints written
+        """
+        write_batch = getattr(self.checkpoint_manager, "write_checkpoints", None)
+        if write_batch is not None and not self._failed:
+            try:
+                write_batch(batch)
+                return len(batch)
+            except Exception as e:
+                self.logger.error(f"Error writing batch of {len(batch)} checkpoints, retrying one by one: {str(e)}")
+
+        written = 0
+        for pending in batch:
+            lost = self._failed.pop(pending.workflow_id, None)
+            if lost is not None:
+                # Rebase a delta captured before the failure onto what was written
+                pending.absorb(lost)
+            try:
+                self.checkpoint_manager.write_checkpoint(pending, sync_directory=False)
+                written += 1
+            except Exception as e:
+                self.logger.error(f"Error writing checkpoint {pending.checkpoint_id}: {str(e)}")
+                self._failed[pending.workflow_id] = pending
+
+        # Database-backed managers have no directory; their commits are synced already
+        checkpoint_dir = getattr(self.checkpoint_manager, "checkpoint_dir", None)
+        if written and checkpoint_dir and getattr(self.checkpoint_manager, "durability", None) is Durability.FULL:
+            sync_directory(checkpoint_dir)
+        return written
@@ -0,0 +1,139 @@
+"""Capturing, encoding and restoring execution contexts in state and checkpoint files"""
+import functools
+from typing import Dict, Any
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.context.variable_storage import VariableScope, LazyValue
+from src.core.state.state_codec import StateCodec
+
+
+class EncodedValue(LazyValue):
+    """
+    Variable value kept in its encoded form until it is read
+
+    Saving a context again writes the encoded bytes as they are, so
+    variables a resumed workflow never touched are not decoded at all.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Initialize the encoded value
+
+        Args:
+            data: Value encoded by a StateCodec
+        """
+        super().__init__(functools.partial(StateCodec.decode, data))
+        self.data = data
+
+
+def capture_context(context: ExecutionContext) -> Dict[str, Any]:
+    """
+    Capture the state and variables of an execution context
+
+    The variables are taken from a context snapshot, which copies nothing and
+    does not change when the workflow goes on; encode the result with
+    pack_context_data().
+
+    Args:
+        context: Execution context to capture
+
+    Returns:
+        Context data to save
+    """
+    snapshot = context.snapshot()
+    return {
+        "id": snapshot.id,
+        "state": snapshot.state,
+        "variables": {
+            scope.name.lower(): snapshot.variables.get_scope(scope)
+            for scope in (VariableScope.GLOBAL, VariableScope.WORKFLOW, VariableScope.LOCAL)
+        }
+    }
+
+
+def pack_context_data(context_data: Dict[str, Any], codec: StateCodec) -> Dict[str, Any]:
+    """
+    Turn captured context data into plain data the codec can write
+
+    With the pickle format each variable is encoded on its own (uncompressed;
+    the file as a whole is compressed), so a restore only decodes the
+    variables that are read. JSON files keep the variables inline.
+
+    Full captures hold read-only views of a context snapshot's scopes, so
+    capturing copies nothing; the copy happens here, on the writing thread.
+
+    Args:
+        context_data: Full context data (with "variables") or a delta (with "changes")
+        codec: Codec the data will be written with
+
+    Returns:
+        Context data with plain variable dictionaries
+    """
+    key = "variables" if "variables" in context_data else "changes"
+    if codec.format != "pickle":
+        return dict(context_data, **{key: {
+            scope: {name: _resolve(value) for name, value in scope_vars.items()}
+            for scope, scope_vars in context_data[key].items()
+        }})
+
+    value_codec = StateCodec(codec.format, "none")
+    return dict(context_data, encoded=True, **{key: {
+        scope: {
+            name: value.data if isinstance(value, EncodedValue) else value_codec.encode(_resolve(value))
+            for name, value in scope_vars.items()
+        }
+        for scope, scope_vars in context_data[key].items()
+    }})
+
+
+def unpack_context_data(context_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Wrap the individually encoded variables of read context data as lazy values
+
+    Args:
+        context_data: Context data as read from a file
+
+    Returns:
+        Context data whose variables are decoded on first access
+    """
+    if not context_data.pop("encoded", False):
+        return context_data
+    key = "variables" if "variables" in context_data else "changes"
+    context_data[key] = {
+        scope: {name: EncodedValue(data) for name, data in scope_vars.items()}
+        for scope, scope_vars in context_data[key].items()
+    }
+    return context_data
+
+
+def restore_context(context_data: Dict[str, Any]) -> ExecutionContext:
+    """
+    Create an execution context from unpacked context data
+
+    The ID and state are restored at once; the variables are loaded into the
+    storage in bulk, without notifying listeners, and lazy values stay
+    encoded until the workflow reads them.
+
+    Args:
+        context_data: Full context data returned by unpack_context_data()
+
+    Returns:
+        Restored execution context
+    """
+    context = ExecutionContext(context_id=context_data["id"])
+    context.state = context.state.from_dict(context_data["state"])
+    context.variables.load({
+        VariableScope[scope_name.upper()]: dict(scope_vars)
+        for scope_name, scope_vars in context_data["variables"].items()
+    })
+    return context
+
+
+def _resolve(value: Any) -> Any:
+    """Get the value behind a stored variable, loading it if it is lazy"""
+    if isinstance(value, LazyValue):
+        value = value.get()
+    if isinstance(value, memoryview):
+        # Shared bytes are saved by value, as the segment may be gone on restore
+        return value.tobytes()
+    return value
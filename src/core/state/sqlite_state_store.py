@@ -0,0 +1,712 @@
+"""SQLite storage of workflow states and checkpoints"""
+import os
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.state.state_codec import StateCodec
+from src.core.state.atomic_write import Durability
+from src.core.state.checkpoint import Checkpoint
+from src.core.state.checkpoint_interface import CheckpointInterface
+from src.core.state.checkpoint_manager import PendingCheckpoint
+from src.core.state.context_data import capture_context, pack_context_data, unpack_context_data, restore_context
+from src.core.state.checkpoint_manager_interface import CheckpointManagerInterface
+from src.core.state.state_persistence_interface import StatePersistenceInterface
+
+
+# SQLite synchronous setting for each durability level; WAL mode keeps the
+# database consistent after a crash at any of them
+_SYNCHRONOUS = {
+    Durability.NONE: "NORMAL",
+    Durability.FILE: "FULL",
+    Durability.FULL: "FULL"
+}
+
+# Prefix of the references returned for saved states
+STATE_REFERENCE_PREFIX = "state:"
+
+
+def _connect(db_path: str, durability: Durability) -> sqlite3.Connection:
+    """
+    Open a database in WAL mode
+
+    Args:
+        db_path: Path of the database file
+        durability: Durability of committed transactions
+
+    Returns:
+        Connection usable from any thread (callers serialize access)
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(db_path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(f"PRAGMA synchronous={_SYNCHRONOUS[durability]}")
+    return connection
+
+
+class SqliteStatePersistence(StatePersistenceInterface):
+    """
+    Saves and loads execution states in a single SQLite database
+
+    An alternative to StatePersistence for network filesystems and large
+    numbers of states, where one file per state is slow. States are stored
+    as encoded blobs with indexed workflow and time columns, and cleanup
+    deletes old states with a single statement.
+
+    The "file paths" of this implementation are references of the form
+    "state:<row id>"; pass them back to load_state().
+    """
+
+    DATABASE_NAME = "states.sqlite3"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS states (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workflow_id TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        data BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_states_workflow ON states (workflow_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_states_created ON states (created_at);
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        codec: Optional[StateCodec] = None,
+        durability: Durability = Durability.NONE
+    ):
+        """
+        Initialize the state persistence
+
+        Args:
+            db_path: Path of the SQLite database file (created if missing)
+            codec: Codec for the state blobs (pickle with zlib compression if not provided)
+            durability: Whether committed states must survive a power loss
+        """
+        self.db_path = db_path
+        self.codec = codec or StateCodec()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._connection = _connect(db_path, durability)
+        with self._lock, self._connection:
+            self._connection.executescript(self._SCHEMA)
+
+    def save_state(self, workflow_id: str, context: ExecutionContext) -> str:
+        """
+        Save the current execution state
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context to save
+
+        Returns:
+            Reference to the saved state
+        """
+        return self.save_states([(workflow_id, context)])[0]
+
+    def save_states(self, states: Iterable[Tuple[str, ExecutionContext]]) -> List[str]:
+        """
+        Save several execution states in one transaction
+
+        Args:
+            states: Pairs of (workflow ID, execution context)
+
+        Returns:
+            References to the saved states, in order
+        """
+        rows = []
+        for workflow_id, context in states:
+            state_data = {
+                "workflow_id": workflow_id,
+                "timestamp": datetime.now().isoformat(),
+                "context": pack_context_data(capture_context(context), self.codec)
+            }
+            blob = self.codec.encode(state_data)
+            rows.append((workflow_id, time.time(), len(blob), blob))
+
+        references = []
+        try:
+            with self._lock, self._connection:
+                for row in rows:
+                    cursor = self._connection.execute(
+                        "INSERT INTO states (workflow_id, created_at, size_bytes, data) VALUES (?, ?, ?, ?)",
+                        row
+                    )
+                    references.append(f"{STATE_REFERENCE_PREFIX}{cursor.lastrowid}")
+        except Exception as e:
+            self.logger.error(f"Error saving states to {self.db_path}: {str(e)}")
+            raise
+
+        self.logger.info(f"Saved {len(references)} state(s) to {self.db_path}")
+        return references
+
+    def load_state(self, file_path: str) -> ExecutionContext:
+        """
+        Load an execution state
+
+        Args:
+            file_path: Reference returned by save_state()
+
+        Returns:
+            Loaded execution context
+
+        Raises:
+            FileNotFoundError: If the state doesn't exist
+            ValueError: If the reference or the state is invalid
+        """
+        state_id = self._parse_reference(file_path)
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM states WHERE id = ?", (state_id,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"State not found: {file_path}")
+
+        try:
+            context = restore_context(unpack_context_data(self.codec.decode(row[0])["context"]))
+            self.logger.info(f"Loaded state {file_path}")
+            return context
+        except Exception as e:
+            self.logger.error(f"Error loading state {file_path}: {str(e)}")
+            raise ValueError(f"Invalid state: {str(e)}")
+
+    def get_state_files(self, workflow_id: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Get the states of a workflow
+
+        Args:
+            workflow_id: ID of the workflow
+            limit: Maximum number of states to return (the newest ones)
+
+        Returns:
+            List of state references, newest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM states WHERE workflow_id = ? ORDER BY created_at DESC, id DESC LIMIT ?",
+                (workflow_id, -1 if limit is None else limit)
+            ).fetchall()
+        return [f"{STATE_REFERENCE_PREFIX}{row[0]}" for row in rows]
+
+    def get_latest_state_file(self, workflow_id: str) -> Optional[str]:
+        """
+        Get the latest state of a workflow
+
+        Args:
+            workflow_id: ID of the workflow
+
+        Returns:
+            Reference to the latest state, or None if there are no states
+        """
+        references = self.get_state_files(workflow_id, limit=1)
+        return references[0] if references else None
+
+    def cleanup_old_states(self, workflow_id: str, max_states: int = 10) -> int:
+        """
+        Delete all but the newest states of a workflow in one statement
+
+        Args:
+            workflow_id: ID of the workflow
+            max_states: Maximum number of states to keep
+
+        Returns:
+            Number of states removed
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM states WHERE workflow_id = ? AND id NOT IN ("
+                "SELECT id FROM states WHERE workflow_id = ? ORDER BY created_at DESC, id DESC LIMIT ?)",
+                (workflow_id, workflow_id, max_states)
+            )
+        if cursor.rowcount:
+            self.logger.info(f"Removed {cursor.rowcount} old state(s) of workflow {workflow_id}")
+        return cursor.rowcount
+
+    def delete_state_files(self, file_paths: List[str]) -> Tuple[int, int]:
+        """
+        Delete states in one transaction
+
+        Args:
+            file_paths: References returned by save_state()
+
+        Returns:
+            Tuple of (number of states removed, bytes reclaimed)
+        """
+        rows = [(self._parse_reference(reference),) for reference in file_paths]
+        removed = 0
+        reclaimed = 0
+        with self._lock, self._connection:
+            for row in rows:
+                size = self._connection.execute("SELECT size_bytes FROM states WHERE id = ?", row).fetchone()
+                if size is None:
+                    continue
+                self._connection.execute("DELETE FROM states WHERE id = ?", row)
+                removed += 1
+                reclaimed += size[0]
+        if removed:
+            self.logger.info(f"Removed {removed} state(s) from {self.db_path}")
+        return removed, reclaimed
+
+    def get_state_entries(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the metadata of a workflow's states, newest first
+
+        Args:
+            workflow_id: ID of the workflow
+
+        Returns:
+            Dictionaries with path (the state reference), created_at and size_bytes
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, created_at, size_bytes FROM states "
+                "WHERE workflow_id = ? ORDER BY created_at DESC, id DESC",
+                (workflow_id,)
+            ).fetchall()
+        return [
+            {"path": f"{STATE_REFERENCE_PREFIX}{row[0]}", "created_at": row[1], "size_bytes": row[2]}
+            for row in rows
+        ]
+
+    def get_oldest_states(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the oldest states that are not the newest of their workflow
+
+        Args:
+            limit: Maximum number of states to return
+
+        Returns:
+            Dictionaries with path (the state reference), created_at and size_bytes, oldest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, created_at, size_bytes FROM states AS s WHERE id != ("
+                "SELECT id FROM states WHERE workflow_id = s.workflow_id "
+                "ORDER BY created_at DESC, id DESC LIMIT 1) "
+                "ORDER BY created_at, id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {"path": f"{STATE_REFERENCE_PREFIX}{row[0]}", "created_at": row[1], "size_bytes": row[2]}
+            for row in rows
+        ]
+
+    def get_state_workflows(self) -> List[str]:
+        """
+        Get the IDs of the workflows that have states
+
+        Returns:
+            Workflow IDs
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT workflow_id FROM states").fetchall()
+        return [row[0] for row in rows]
+
+    def state_bytes(self) -> int:
+        """
+        Get the total size of the stored states
+
+        Returns:
+            Size in bytes
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM states").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _parse_reference(reference: str) -> int:
+        """Get the row ID of a state reference"""
+        if not reference.startswith(STATE_REFERENCE_PREFIX):
+            raise ValueError(f"Invalid state reference: {reference}")
+        try:
+            return int(reference[len(STATE_REFERENCE_PREFIX):])
+        except ValueError:
+            raise ValueError(f"Invalid state reference: {reference}")
+
+
+class SqliteCheckpointManager(CheckpointManagerInterface):
+    """
+    Manages checkpoints in a single SQLite database
+
+    An alternative to CheckpointManager for network filesystems and large
+    numbers of checkpoints. Each checkpoint is one row holding its record and
+    its context as encoded blobs, with indexed workflow, name and time
+    columns. Checkpoints always save the whole context.
+
+    Like CheckpointManager, capturing a checkpoint (prepare_checkpoint) is
+    separate from writing it, so a CheckpointWriter can write them in the
+    background; write_checkpoints() commits a batch in one transaction.
+    """
+
+    DATABASE_NAME = "checkpoints.sqlite3"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        id TEXT PRIMARY KEY,
+        workflow_id TEXT NOT NULL,
+        name TEXT,
+        created_at REAL NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        record BLOB NOT NULL,
+        context BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_workflow ON checkpoints (workflow_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_name ON checkpoints (workflow_id, name, created_at);
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints (created_at);
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        codec: Optional[StateCodec] = None,
+        durability: Durability = Durability.NONE
+    ):
+        """
+        Initialize the checkpoint manager
+
+        Args:
+            db_path: Path of the SQLite database file (created if missing)
+            codec: Codec for the checkpoint blobs (pickle with zlib compression if not provided)
+            durability: Whether committed checkpoints must survive a power loss
+        """
+        self.db_path = db_path
+        self.codec = codec or StateCodec()
+        self.durability = durability
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._connection = _connect(db_path, durability)
+        with self._lock, self._connection:
+            self._connection.executescript(self._SCHEMA)
+
+    def create_checkpoint(
+        self,
+        workflow_id: str,
+        context: ExecutionContext,
+        data: Dict[str, Any],
+        name: Optional[str] = None
+    ) -> str:
+        """
+        Create a checkpoint
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context to save
+            data: Additional data to save with the checkpoint (e.g., action index)
+            name: Optional name for the checkpoint
+
+        Returns:
+            ID of the created checkpoint
+        """
+        pending = self.prepare_checkpoint(workflow_id, context, data, name)
+        self.write_checkpoint(pending)
+        return pending.checkpoint_id
+
+    def prepare_checkpoint(
+        self,
+        workflow_id: str,
+        context: ExecutionContext,
+        data: Dict[str, Any],
+        name: Optional[str] = None
+    ) -> PendingCheckpoint:
+        """
+        Capture a checkpoint of a context without writing it
+
+        Args:
+            workflow_id: ID of the workflow
+            context: Execution context to save
+            data: Additional data to save with the checkpoint (e.g., action index)
+            name: Optional name for the checkpoint
+
+        Returns:
+            Captured checkpoint
+        """
+        record = {
+            "id": str(uuid.uuid4()),
+            "workflow_id": workflow_id,
+            "timestamp": datetime.now().isoformat(),
+            "name": name,
+            "data": data,
+            "parent_id": None
+        }
+        return PendingCheckpoint(record, capture_context(context))
+
+    def write_checkpoint(self, pending: PendingCheckpoint, sync_directory: bool = True) -> None:
+        """
+        Write a captured checkpoint
+
+        Args:
+            pending: Checkpoint returned by prepare_checkpoint()
+            sync_directory: Unused; committed transactions are synced according to the durability
+        """
+        self.write_checkpoints([pending])
+
+    def write_checkpoints(self, batch: List[PendingCheckpoint]) -> None:
+        """
+        Write captured checkpoints in one transaction
+
+        Args:
+            batch: Checkpoints returned by prepare_checkpoint()
+
+        Raises:
+            Exception: If the checkpoints cannot be written; none of them are
+        """
+        rows = []
+        for pending in batch:
+            record_blob = self.codec.encode(pending.record)
+            context_blob = self.codec.encode(pack_context_data(pending.context_data, self.codec))
+            rows.append((
+                pending.checkpoint_id,
+                pending.workflow_id,
+                pending.name,
+                time.time(),
+                len(record_blob) + len(context_blob),
+                record_blob,
+                context_blob
+            ))
+
+        try:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO checkpoints "
+                    "(id, workflow_id, name, created_at, size_bytes, record, context) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except Exception as e:
+            self.logger.error(f"Error creating checkpoints: {str(e)}")
+            raise
+
+        for pending in batch:
+            self.logger.info(f"Created checkpoint {pending.checkpoint_id}")
+
+    def restore_from_checkpoint(self, checkpoint_id: str) -> Tuple[ExecutionContext, Dict[str, Any]]:
+        """
+        Restore from a checkpoint
+
+        Args:
+            checkpoint_id: ID of the checkpoint
+
+        Returns:
+            Tuple of (restored context, checkpoint data)
+
+        Raises:
+            FileNotFoundError: If the checkpoint doesn't exist
+            ValueError: If the checkpoint is invalid
+        """
+        row = self._get_row(checkpoint_id)
+        if row is None:
+            raise FileNotFoundError(f"Checkpoint not found: {checkpoint_id}")
+
+        try:
+            record = self.codec.decode(row[0])
+            context = restore_context(unpack_context_data(self.codec.decode(row[1])))
+            self.logger.info(f"Restored from checkpoint {checkpoint_id}")
+            return context, record["data"]
+        except Exception as e:
+            self.logger.error(f"Error restoring from checkpoint: {str(e)}")
+            raise ValueError(f"Invalid checkpoint: {str(e)}")
+
+    def get_checkpoint(self, checkpoint_id: str) -> Optional[CheckpointInterface]:
+        """
+        Get a checkpoint by ID
+
+        Args:
+            checkpoint_id: ID of the checkpoint
+
+        Returns:
+            Checkpoint, or None if not found
+        """
+        row = self._get_row(checkpoint_id)
+        if row is None:
+            return None
+
+        try:
+            record = self.codec.decode(row[0])
+            return Checkpoint(
+                checkpoint_id=record["id"],
+                workflow_id=record["workflow_id"],
+                timestamp=record.get("timestamp", ""),
+                name=record.get("name"),
+                data=record.get("data", {}),
+                context=restore_context(unpack_context_data(self.codec.decode(row[1])))
+            )
+        except Exception as e:
+            self.logger.error(f"Error loading checkpoint {checkpoint_id}: {str(e)}")
+            return None
+
+    def get_checkpoints_for_workflow(self, workflow_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get all checkpoints for a workflow
+
+        Args:
+            workflow_id: ID of the workflow
+            limit: Maximum number of checkpoints to return (the newest ones)
+
+        Returns:
+            List of checkpoint data dictionaries, newest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT record FROM checkpoints WHERE workflow_id = ? "
+                "ORDER BY created_at DESC, rowid DESC LIMIT ?",
+                (workflow_id, -1 if limit is None else limit)
+            ).fetchall()
+        return [self.codec.decode(row[0]) for row in rows]
+
+    def get_checkpoint_by_name(self, workflow_id: str, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a checkpoint by name
+
+        Args:
+            workflow_id: ID of the workflow
+            name: Name of the checkpoint
+
+        Returns:
+            Checkpoint data dictionary of the newest checkpoint with the name, or None if not found
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT record FROM checkpoints WHERE workflow_id = ? AND name = ? "
+                "ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                (workflow_id, name)
+            ).fetchone()
+        return self.codec.decode(row[0]) if row else None
+
+    def delete_checkpoint(self, checkpoint_id: str) -> bool:
+        """
+        Delete a checkpoint
+
+        Args:
+            checkpoint_id: ID of the checkpoint
+
+        Returns:
+            True if the checkpoint was deleted, False otherwise
+        """
+        try:
+            return self.delete_checkpoints([checkpoint_id]) == 1
+        except Exception as e:
+            self.logger.error(f"Error deleting checkpoint {checkpoint_id}: {str(e)}")
+            return False
+
+    def delete_checkpoints(self, checkpoint_ids: Iterable[str]) -> int:
+        """
+        Delete checkpoints in one transaction
+
+        Args:
+            checkpoint_ids: IDs of the checkpoints
+
+        Returns:
+            Number of checkpoints deleted
+        """
+        rows = [(checkpoint_id,) for checkpoint_id in checkpoint_ids]
+        with self._lock, self._connection:
+            cursor = self._connection.executemany("DELETE FROM checkpoints WHERE id = ?", rows)
+        return cursor.rowcount
+
+    def cleanup_old_checkpoints(self, workflow_id: str, max_checkpoints: int = 10) -> int:
+        """
+        Delete all but the newest checkpoints of a workflow in one statement
+
+        Args:
+            workflow_id: ID of the workflow
+            max_checkpoints: Maximum number of checkpoints to keep
+
+        Returns:
+            Number of checkpoints removed
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM checkpoints WHERE workflow_id = ? AND id NOT IN ("
+                "SELECT id FROM checkpoints WHERE workflow_id = ? "
+                "ORDER BY created_at DESC, rowid DESC LIMIT ?)",
+                (workflow_id, workflow_id, max_checkpoints)
+            )
+        if cursor.rowcount:
+            self.logger.info(f"Removed {cursor.rowcount} old checkpoint(s) of workflow {workflow_id}")
+        return cursor.rowcount
+
+    def get_checkpoint_entries(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the metadata of a workflow's checkpoints, newest first
+
+        Args:
+            workflow_id: ID of the workflow
+
+        Returns:
+            Dictionaries with id, name, created_at and size_bytes
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, name, created_at, size_bytes FROM checkpoints "
+                "WHERE workflow_id = ? ORDER BY created_at DESC, rowid DESC",
+                (workflow_id,)
+            ).fetchall()
+        return [{"id": row[0], "name": row[1], "created_at": row[2], "size_bytes": row[3]} for row in rows]
+
+    def get_oldest_checkpoints(self, limit: int, exclude_named: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get the oldest checkpoints that are not the newest of their workflow
+
+        Args:
+            limit: Maximum number of checkpoints to return
+            exclude_named: Whether to skip named checkpoints
+
+        Returns:
+            Dictionaries with id, name, created_at and size_bytes, oldest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, name, created_at, size_bytes FROM checkpoints AS c "
+                "WHERE (? = 0 OR name IS NULL) AND rowid != ("
+                "SELECT rowid FROM checkpoints WHERE workflow_id = c.workflow_id "
+                "ORDER BY created_at DESC, rowid DESC LIMIT 1) "
+                "ORDER BY created_at, rowid LIMIT ?",
+                (int(exclude_named), limit)
+            ).fetchall()
+        return [{"id": row[0], "name": row[1], "created_at": row[2], "size_bytes": row[3]} for row in rows]
+
+    def get_checkpoint_workflows(self) -> List[str]:
+        """
+        Get the IDs of the workflows that have checkpoints
+
+        Returns:
+            Workflow IDs
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT workflow_id FROM checkpoints").fetchall()
+        return [row[0] for row in rows]
+
+    def checkpoint_bytes(self) -> int:
+        """
+        Get the total size of the stored checkpoints
+
+        Returns:
+            Size in bytes
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM checkpoints"
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def _get_row(self, checkpoint_id: str) -> Optional[Tuple[bytes, bytes]]:
+        """Get the record and context blobs of a checkpoint"""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT record, context FROM checkpoints WHERE id = ?", (checkpoint_id,)
+            ).fetchone()
@@ -0,0 +1,172 @@
+"""Encoding of state and checkpoint files"""
+import json
+import zlib
+import pickle
+import struct
+from typing import Any, Dict, Optional
+
+from src.core.state.atomic_write import Durability, write_atomic
+
+try:
+    import zstandard
+except ImportError:
+    # zstandard is optional; without it only zlib compression is available
+    zstandard = None
+
+
+# Header of encoded files: magic, header version, format ID, compression ID
+MAGIC = b"ACST"
+HEADER_VERSION = 1
+_HEADER = struct.Struct(">4sBBB")
+
+# IDs stored in the header; never reuse or renumber them
+FORMATS: Dict[str, int] = {"json": 1, "pickle": 2}
+COMPRESSIONS: Dict[str, int] = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+class StateCodec:
+    """
+    Encodes state and checkpoint payloads to bytes and back
+
+    Encoded data starts with a small header naming the format and compression,
+    so a codec reads files written with any other settings. Data without the
+    header is read as the original JSON files.
+
+    The "pickle" format (protocol 5) is much faster than JSON and keeps values
+    JSON cannot hold (datetimes, bytes, sets, tuples). Like any pickle, only
+    load files this application wrote.
+    """
+
+    def __init__(self, format: str = "pickle", compression: str = "zlib", level: Optional[int] = None):
+        """
+        Initialize the codec
+
+        Args:
+            format: Serialization format ("pickle" or "json")
+            compression: Compression ("zlib", "zstd" or "none")
+            level: Compression level (uses the compressor's default if not provided)
+
+        Raises:
+            ValueError: If the format or compression is unknown
+            ImportError: If zstd compression is requested but zstandard is not installed
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown state format: {format}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown state compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+
+        self.format = format
+        self.compression = compression
+        self.level = level
+
+    def encode(self, obj: Any) -> bytes:
+        """
+        Encode an object
+
+        Args:
+            obj: Object to encode
+
+        Returns:
+            Header followed by the encoded payload
+        """
+        if self.format == "pickle":
+            payload = pickle.dumps(obj, protocol=5)
+        else:
+            payload = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+        if self.compression == "zlib":
+            payload = zlib.compress(payload, 1 if self.level is None else self.level)
+        elif self.compression == "zstd":
+            payload = zstandard.ZstdCompressor(level=3 if self.level is None else self.level).compress(payload)
+
+        header = _HEADER.pack(MAGIC, HEADER_VERSION, FORMATS[self.format], COMPRESSIONS[self.compression])
+        return header + payload
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """
+        Decode data written by any codec, or legacy JSON
+
+        Args:
+            data: Encoded data
+
+        Returns:
+            Decoded object
+
+        Raises:
+            ValueError: If the header names an unsupported version, format or compression
+        """
+        if not data.startswith(MAGIC):
+            return json.loads(data.decode("utf-8"))
+
+        _, version, format_id, compression_id = _HEADER.unpack_from(data)
+        if version > HEADER_VERSION:
+            raise ValueError(f"Unsupported state file version: {version}")
+        payload = memoryview(data)[_HEADER.size:]
+
+        if compression_id == COMPRESSIONS["zlib"]:
+            payload = zlib.decompress(payload)
+        elif compression_id == COMPRESSIONS["zstd"]:
+            if zstandard is None:
+                raise ValueError("State file is zstd-compressed but zstandard is not installed")
+            payload = zstandard.ZstdDecompressor().decompress(bytes(payload))
+        elif compression_id != COMPRESSIONS["none"]:
+            raise ValueError(f"Unsupported state file compression: {compression_id}")
+
+        if format_id == FORMATS["pickle"]:
+            return pickle.loads(payload)
+        if format_id == FORMATS["json"]:
+            return json.loads(bytes(payload).decode("utf-8"))
+        raise ValueError(f"Unsupported state file format: {format_id}")
+
+    def write(self, file_path: str, obj: Any, durability: Durability = Durability.NONE) -> None:
+        """
+        Encode an object to a file, replacing it atomically
+
+        Args:
+            file_path: Path of the file
+            obj: Object to encode
+            durability: Whether to fsync the file and its directory
+        """
+        write_atomic(file_path, self.encode(obj), durability)
+
+    def read(self, file_path: str) -> Any:
+        """
+        Decode a file written by any codec, or a legacy JSON file
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            Decoded object
+        """
+        with open(file_path, 'rb') as f:
+            return self.decode(f.read())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the codec settings to a dictionary
+
+        Returns:
+            Dictionary representation of the codec
+        """
+        return {"format": self.format, "compression": self.compression, "level": self.level}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StateCodec':
+        """
+        Create a codec from a dictionary
+
+        Args:
+            data: Dictionary representation of the codec
+
+        Returns:
+            Instantiated codec
+        """
+        return cls(
+            format=data.get("format", "pickle"),
+            compression=data.get("compression", "zlib"),
+            level=data.get("level")
+        )
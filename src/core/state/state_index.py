@@ -0,0 +1,414 @@
+"""SQLite index of state files and checkpoints"""
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+
+from src.core.state.state_codec import StateCodec
+
+
+# State filenames: {workflow_id}_YYYYmmdd_HHMMSS_mmm.state, optionally with a _N collision suffix
+_STATE_FILENAME_PATTERN = re.compile(r"^(?P<workflow_id>.*)_\d{8}_\d{6}_\d{3}(?:_\d+)?\.state$")
+
+
+class StateIndex:
+    """
+    SQLite index of state files and checkpoint records
+
+    Per-workflow, by-name and latest-N queries are answered from the index
+    instead of listing the directory and reading every file. Checkpoint
+    records are stored in the index itself; their contexts stay in the
+    checkpoint files.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        id TEXT PRIMARY KEY,
+        workflow_id TEXT NOT NULL,
+        name TEXT,
+        parent_id TEXT,
+        created_at REAL NOT NULL,
+        size_bytes INTEGER,
+        record BLOB NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_workflow ON checkpoints (workflow_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_name ON checkpoints (workflow_id, name, created_at);
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_parent ON checkpoints (parent_id);
+    CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints (created_at);
+    CREATE TABLE IF NOT EXISTS states (
+        path TEXT PRIMARY KEY,
+        workflow_id TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        size_bytes INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS idx_states_workflow ON states (workflow_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_states_created ON states (created_at);
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the state index
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._codec = StateCodec()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self._SCHEMA)
+
+    def add_checkpoint(self, record: Dict[str, Any], size_bytes: Optional[int] = None) -> None:
+        """
+        Add or replace a checkpoint record
+
+        Args:
+            record: Checkpoint record (id, workflow_id, timestamp, name, data, parent_id)
+            size_bytes: Total size of the checkpoint's files
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints "
+                "(id, workflow_id, name, parent_id, created_at, size_bytes, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record["id"],
+                    record["workflow_id"],
+                    record.get("name"),
+                    record.get("parent_id"),
+                    self._parse_timestamp(record.get("timestamp")),
+                    size_bytes,
+                    self._codec.encode(record)
+                )
+            )
+
+    def remove_checkpoints(self, checkpoint_ids: Iterable[str]) -> int:
+        """
+        Remove checkpoint records
+
+        Args:
+            checkpoint_ids: IDs of the checkpoints to remove
+
+        Returns:
+            Number of records removed
+        """
+        rows = [(checkpoint_id,) for checkpoint_id in checkpoint_ids]
+        with self._lock, self._connection:
+            cursor = self._connection.executemany("DELETE FROM checkpoints WHERE id = ?", rows)
+            return cursor.rowcount
+
+    def get_checkpoints(
+        self,
+        workflow_id: str,
+        name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the checkpoint records of a workflow, newest first
+
+        Args:
+            workflow_id: ID of the workflow
+            name: Only checkpoints with this name
+            limit: Maximum number of records to return
+
+        Returns:
+            Checkpoint records
+        """
+        sql = "SELECT record FROM checkpoints WHERE workflow_id = ?"
+        params: List[Any] = [workflow_id]
+        if name is not None:
+            sql += " AND name = ?"
+            params.append(name)
+        sql += " ORDER BY created_at DESC, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [self._codec.decode(row[0]) for row in rows]
+
+    def get_children(self, checkpoint_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the records of the delta checkpoints based on a checkpoint
+
+        Args:
+            checkpoint_id: ID of the parent checkpoint
+
+        Returns:
+            Checkpoint records
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT record FROM checkpoints WHERE parent_id = ?", (checkpoint_id,)
+            ).fetchall()
+        return [self._codec.decode(row[0]) for row in rows]
+
+    def checkpoint_count(self) -> int:
+        """
+        Get the number of indexed checkpoints
+
+        Returns:
+            Number of checkpoint records
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    def get_checkpoint_entries(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the metadata of a workflow's checkpoints, newest first
+
+        Args:
+            workflow_id: ID of the workflow
+
+        Returns:
+            Dictionaries with id, name, parent_id, created_at and size_bytes
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, name, parent_id, created_at, size_bytes FROM checkpoints "
+                "WHERE workflow_id = ? ORDER BY created_at DESC, id",
+                (workflow_id,)
+            ).fetchall()
+        return [
+            {"id": row[0], "name": row[1], "parent_id": row[2], "created_at": row[3], "size_bytes": row[4] or 0}
+            for row in rows
+        ]
+
+    def get_checkpoint_workflows(self) -> List[str]:
+        """
+        Get the IDs of the workflows that have checkpoints
+
+        Returns:
+            Workflow IDs
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT workflow_id FROM checkpoints").fetchall()
+        return [row[0] for row in rows]
+
+    def get_oldest_checkpoints(self, limit: int, exclude_named: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get the oldest checkpoints that are not the newest of their workflow
+
+        Args:
+            limit: Maximum number of checkpoints to return
+            exclude_named: Whether to skip named checkpoints
+
+        Returns:
+            Dictionaries with id, name, parent_id, created_at and size_bytes, oldest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, name, parent_id, created_at, size_bytes FROM checkpoints AS c "
+                "WHERE (? = 0 OR name IS NULL) AND id != ("
+                "SELECT id FROM checkpoints WHERE workflow_id = c.workflow_id "
+                "ORDER BY created_at DESC, id LIMIT 1) "
+                "ORDER BY created_at, id LIMIT ?",
+                (int(exclude_named), limit)
+            ).fetchall()
+        return [
+            {"id": row[0], "name": row[1], "parent_id": row[2], "created_at": row[3], "size_bytes": row[4] or 0}
+            for row in rows
+        ]
+
+    def checkpoint_bytes(self) -> int:
+        """
+        Get the total size of the indexed checkpoints
+
+        Returns:
+            Size in bytes
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM checkpoints").fetchone()[0]
+
+    def add_state(
+        self,
+        path: str,
+        workflow_id: str,
+        created_at: Optional[float] = None,
+        size_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Add or replace a state file
+
+        Args:
+            path: Path of the state file, as it should be returned by queries
+            workflow_id: ID of the workflow the state belongs to
+            created_at: Creation time as a POSIX timestamp (now if not provided)
+            size_bytes: Size of the state file
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO states (path, workflow_id, created_at, size_bytes) VALUES (?, ?, ?, ?)",
+                (path, workflow_id, time.time() if created_at is None else created_at, size_bytes)
+            )
+
+    def remove_states(self, paths: Iterable[str]) -> int:
+        """
+        Remove state files from the index
+
+        Args:
+            paths: Paths of the state files
+
+        Returns:
+            Number of state files removed
+        """
+        rows = [(path,) for path in paths]
+        with self._lock, self._connection:
+            cursor = self._connection.executemany("DELETE FROM states WHERE path = ?", rows)
+            return cursor.rowcount
+
+    def get_state_files(self, workflow_id: str, limit: Optional[int] = None, offset: int = 0) -> List[str]:
+        """
+        Get the state files of a workflow, newest first
+
+        Args:
+            workflow_id: ID of the workflow
+            limit: Maximum number of files to return
+            offset: Number of newest files to skip
+
+        Returns:
+            Paths of the state files
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path FROM states WHERE workflow_id = ? ORDER BY created_at DESC, path DESC "
+                "LIMIT ? OFFSET ?",
+                (workflow_id, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def state_count(self) -> int:
+        """
+        Get the number of indexed state files
+
+        Returns:
+            Number of state files
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM states").fetchone()[0]
+
+    def get_state_entries(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the metadata of a workflow's state files, newest first
+
+        Args:
+            workflow_id: ID of the workflow
+
+        Returns:
+            Dictionaries with path, created_at and size_bytes
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, created_at, size_bytes FROM states "
+                "WHERE workflow_id = ? ORDER BY created_at DESC, path DESC",
+                (workflow_id,)
+            ).fetchall()
+        return [{"path": row[0], "created_at": row[1], "size_bytes": row[2] or 0} for row in rows]
+
+    def get_state_workflows(self) -> List[str]:
+        """
+        Get the IDs of the workflows that have state files
+
+        Returns:
+            Workflow IDs
+        """
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT workflow_id FROM states").fetchall()
+        return [row[0] for row in rows]
+
+    def get_oldest_states(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the oldest state files that are not the newest of their workflow
+
+        Args:
+            limit: Maximum number of state files to return
+
+        Returns:
+            Dictionaries with path, created_at and size_bytes, oldest first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, created_at, size_bytes FROM states AS s WHERE path != ("
+                "SELECT path FROM states WHERE workflow_id = s.workflow_id "
+                "ORDER BY created_at DESC, path DESC LIMIT 1) "
+                "ORDER BY created_at, path LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [{"path": row[0], "created_at": row[1], "size_bytes": row[2] or 0} for row in rows]
+
+    def state_bytes(self) -> int:
+        """
+        Get the total size of the indexed state files
+
+        Returns:
+            Size in bytes
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM states").fetchone()[0]
+
+    def rebuild_checkpoints(self, checkpoint_dir: str, codec: StateCodec) -> int:
+        """
+        Index the checkpoint files of a directory
+
+        Args:
+            checkpoint_dir: Directory containing the checkpoint files
+            codec: Codec to read the checkpoint files with
+
+        Returns:
+            Number of checkpoints indexed
+        """
+        count = 0
+        for entry in os.scandir(checkpoint_dir):
+            if not entry.name.endswith(".checkpoint"):
+                continue
+            try:
+                record = codec.read(entry.path)
+                context_file = os.path.join(checkpoint_dir, f"{record['id']}.context")
+                size = entry.stat().st_size + (os.path.getsize(context_file) if os.path.exists(context_file) else 0)
+                self.add_checkpoint(record, size)
+                count += 1
+            except Exception as e:
+                self.logger.error(f"Error indexing checkpoint {entry.name}: {str(e)}")
+        return count
+
+    def rebuild_states(self, state_dir: str) -> int:
+        """
+        Index the state files of a directory, dated by modification time
+
+        Args:
+            state_dir: Directory containing the state files
+
+        Returns:
+            Number of state files indexed
+        """
+        count = 0
+        for entry in os.scandir(state_dir):
+            match = _STATE_FILENAME_PATTERN.match(entry.name)
+            if not match:
+                continue
+            stat = entry.stat()
+            self.add_state(entry.path, match.group("workflow_id"), stat.st_mtime, stat.st_size)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _parse_timestamp(value: Any) -> float:
+        """Convert an ISO timestamp to a POSIX timestamp, defaulting to now"""
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value).timestamp()
+            except ValueError:
+                pass
+        return time.time()
@@ -1,10 +1,14 @@
 """Factory for creating state management components"""
+import os
 from typing import Optional
 
 from src.core.state.state_persistence_interface import StatePersistenceInterface
 from src.core.state.state_persistence import StatePersistence
+from src.core.state.state_codec import StateCodec
+from src.core.state.atomic_write import Durability
 from src.core.state.checkpoint_manager_interface import CheckpointManagerInterface
 from src.core.state.checkpoint_manager import CheckpointManager
+from src.core.state.sqlite_state_store import SqliteStatePersistence, SqliteCheckpointManager
 from src.core.state.workflow_state_manager_interface import WorkflowStateManagerInterface
 from src.core.state.workflow_state_manager import WorkflowStateManager
 
@@ -15,40 +19,89 @@ class StateManagementFactory:
     
     This class provides methods to create instances of state persistence,
     checkpoint manager, and workflow state manager with proper dependencies.
+
+    The "file" backend stores each state and checkpoint in its own files; the
+    "sqlite" backend stores them in one SQLite database in the directory.
     """
+
+    BACKENDS = ("file", "sqlite")
     
     @staticmethod
-    def create_state_persistence(state_dir: str = "states") -> StatePersistenceInterface:
+    def create_state_persistence(
+        state_dir: str = "states",
+        codec: Optional[StateCodec] = None,
+        use_index: bool = False,
+        durability: Durability = Durability.NONE,
+        backend: str = "file"
+    ) -> StatePersistenceInterface:
         """
         Create a state persistence instance
         
         Args:
             state_dir: Directory to store state files
+            codec: Codec for state files (uses the default binary codec if not provided)
+            use_index: Whether to index state files in a database in the directory
+            durability: Whether to fsync state files (files are always replaced atomically)
+            backend: Storage backend ("file" or "sqlite"; use_index only applies to "file")
             
         Returns:
             State persistence instance
+
+        Raises:
+            ValueError: If the backend is unknown
         """
-        return StatePersistence(state_dir)
+        StateManagementFactory._check_backend(backend)
+        if backend == "sqlite":
+            db_path = os.path.join(state_dir, SqliteStatePersistence.DATABASE_NAME)
+            return SqliteStatePersistence(db_path, codec, durability)
+        return StatePersistence(state_dir, codec, use_index, durability)
     
     @staticmethod
-    def create_checkpoint_manager(checkpoint_dir: str = "checkpoints") -> CheckpointManagerInterface:
+    def create_checkpoint_manager(
+        checkpoint_dir: str = "checkpoints",
+        delta_checkpoints: bool = False,
+        max_chain_length: int = 10,
+        codec: Optional[StateCodec] = None,
+        use_index: bool = False,
+        durability: Durability = Durability.NONE,
+        backend: str = "file"
+    ) -> CheckpointManagerInterface:
         """
         Create a checkpoint manager instance
         
         Args:
             checkpoint_dir: Directory to store checkpoint files
+            delta_checkpoints: Whether to save only the changed variables after the first checkpoint
+            max_chain_length: Maximum number of delta checkpoints before the next full checkpoint
+            codec: Codec for checkpoint files (uses the default binary codec if not provided)
+            use_index: Whether to index checkpoint records in a database in the directory
+            durability: Whether to fsync checkpoint files (files are always replaced atomically)
+            backend: Storage backend ("file" or "sqlite"; the sqlite backend always saves
+                full checkpoints, so delta_checkpoints, max_chain_length and use_index
+                only apply to "file")
             
         Returns:
             Checkpoint manager instance
+
+        Raises:
+            ValueError: If the backend is unknown
         """
-        return CheckpointManager(checkpoint_dir)
+        StateManagementFactory._check_backend(backend)
+        if backend == "sqlite":
+            db_path = os.path.join(checkpoint_dir, SqliteCheckpointManager.DATABASE_NAME)
+            return SqliteCheckpointManager(db_path, codec, durability)
+        return CheckpointManager(
+            checkpoint_dir, delta_checkpoints, max_chain_length, codec, use_index, durability
+        )
     
     @staticmethod
     def create_workflow_state_manager(
         state_dir: str = "states",
         checkpoint_dir: str = "checkpoints",
         state_persistence: Optional[StatePersistenceInterface] = None,
-        checkpoint_manager: Optional[CheckpointManagerInterface] = None
+        checkpoint_manager: Optional[CheckpointManagerInterface] = None,
+        async_checkpoints: bool = False,
+        backend: str = "file"
     ) -> WorkflowStateManagerInterface:
         """
         Create a workflow state manager instance
@@ -58,19 +111,36 @@ class StateManagementFactory:
             checkpoint_dir: Directory to store checkpoint files
             state_persistence: Optional state persistence instance
             checkpoint_manager: Optional checkpoint manager instance
+            async_checkpoints: Whether to write checkpoints on a background thread
+            backend: Storage backend of the components created here ("file" or "sqlite")
             
         Returns:
             Workflow state manager instance
         """
         # Create dependencies if not provided
         if state_persistence is None:
-            state_persistence = StateManagementFactory.create_state_persistence(state_dir)
+            state_persistence = StateManagementFactory.create_state_persistence(state_dir, backend=backend)
         
         if checkpoint_manager is None:
-            checkpoint_manager = StateManagementFactory.create_checkpoint_manager(checkpoint_dir)
+            checkpoint_manager = StateManagementFactory.create_checkpoint_manager(checkpoint_dir, backend=backend)
         
         # Create and return the workflow state manager
         return WorkflowStateManager(
             state_persistence=state_persistence,
-            checkpoint_manager=checkpoint_manager
+            checkpoint_manager=checkpoint_manager,
+            async_checkpoints=async_checkpoints
         )
+
+    @staticmethod
+    def _check_backend(backend: str) -> None:
+        """
+        Check that a storage backend is known
+
+        Args:
+            backend: Name of the backend
+
+        Raises:
+            ValueError: If the backend is unknown
+        """
+        if backend not in StateManagementFactory.BACKENDS:
+            raise ValueError(f"Unknown state backend: {backend}")
@@ -1,12 +1,15 @@
 """State persistence functionality for saving and loading execution state"""
 import os
-import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import List, Optional, Tuple
 
 from src.core.context.execution_context import ExecutionContext
 from src.core.state.state_persistence_interface import StatePersistenceInterface
+from src.core.state.state_codec import StateCodec
+from src.core.state.context_data import capture_context, pack_context_data, unpack_context_data, restore_context
+from src.core.state.state_index import StateIndex
+from src.core.state.atomic_write import Durability
 
 
 class StatePersistence(StatePersistenceInterface):
@@ -15,21 +18,46 @@ class StatePersistence(StatePersistenceInterface):
 
     This class provides methods to save the current execution state to a file
     and load it back later, enabling workflow pause and resume functionality.
+
+    With an index, state files are also recorded in an SQLite database in the
+    directory, so finding a workflow's latest states does not list the
+    directory and stat every file.
     """
 
-    def __init__(self, state_dir: str = "states"):
+    INDEX_NAME = "index.sqlite3"
+
+    def __init__(
+        self,
+        state_dir: str = "states",
+        codec: Optional[StateCodec] = None,
+        use_index: bool = False,
+        durability: Durability = Durability.NONE
+    ):
         """
         Initialize the state persistence
 
         Args:
             state_dir: Directory to store state files
+            codec: Codec for state files (pickle with zlib compression if not provided;
+                JSON files of earlier versions are always readable)
+            use_index: Whether to index state files in a database in the directory
+            durability: Whether to fsync state files (files are always replaced atomically)
         """
         self.state_dir = state_dir
+        self.codec = codec or StateCodec()
+        self.durability = durability
         self.logger = logging.getLogger(self.__class__.__name__)
 
         # Create the state directory if it doesn't exist
         os.makedirs(self.state_dir, exist_ok=True)
 
+        self.index: Optional[StateIndex] = None
+        if use_index:
+            self.index = StateIndex(os.path.join(self.state_dir, self.INDEX_NAME))
+            if self.index.state_count() == 0:
+                # Index state files written before the index existed
+                self.index.rebuild_states(self.state_dir)
+
     def save_state(self, workflow_id: str, context: ExecutionContext) -> str:
         """
         Save the current execution state to a file
@@ -47,26 +75,24 @@ class StatePersistence(StatePersistenceInterface):
         # Create the filename
         filename = f"{workflow_id}_{timestamp}.state"
         file_path = os.path.join(self.state_dir, filename)
+        counter = 1
+        while os.path.exists(file_path):
+            # Saved twice within a millisecond; keep both states
+            file_path = os.path.join(self.state_dir, f"{workflow_id}_{timestamp}_{counter}.state")
+            counter += 1
 
-        # Create the state data
+        # Create the state data from a snapshot, so changes made while saving are not mixed in
         state_data = {
             "workflow_id": workflow_id,
             "timestamp": datetime.now().isoformat(),
-            "context": {
-                "id": context.id,
-                "state": context.state.to_dict(),
-                "variables": {
-                    "global": self._get_variables_by_scope(context, "GLOBAL"),
-                    "workflow": self._get_variables_by_scope(context, "WORKFLOW"),
-                    "local": self._get_variables_by_scope(context, "LOCAL")
-                }
-            }
+            "context": pack_context_data(capture_context(context), self.codec)
         }
 
         # Save the state to a file
         try:
-            with open(file_path, 'w') as f:
-                json.dump(state_data, f, indent=2)
+            self.codec.write(file_path, state_data, self.durability)
+            if self.index:
+                self.index.add_state(file_path, workflow_id, size_bytes=os.path.getsize(file_path))
 
             self.logger.info(f"Saved state to {file_path}")
             return file_path
@@ -92,18 +118,9 @@ class StatePersistence(StatePersistenceInterface):
             raise FileNotFoundError(f"State file not found: {file_path}")
 
         try:
-            # Load the state data
-            with open(file_path, 'r') as f:
-                state_data = json.load(f)
-
-            # Create a new execution context
-            context = ExecutionContext(context_id=state_data["context"]["id"])
-
-            # Restore the state
-            context.state = context.state.from_dict(state_data["context"]["state"])
-
-            # Restore the variables
-            self._restore_variables(context, state_data["context"]["variables"])
+            # Load the state data; variables are decoded when the context reads them
+            state_data = self.codec.read(file_path)
+            context = restore_context(unpack_context_data(state_data["context"]))
 
             self.logger.info(f"Loaded state from {file_path}")
             return context
@@ -111,16 +128,20 @@ class StatePersistence(StatePersistenceInterface):
             self.logger.error(f"Error loading state from {file_path}: {str(e)}")
             raise ValueError(f"Invalid state file: {str(e)}")
 
-    def get_state_files(self, workflow_id: str) -> List[str]:
+    def get_state_files(self, workflow_id: str, limit: Optional[int] = None) -> List[str]:
         """
         Get all state files for a workflow
 
         Args:
             workflow_id: ID of the workflow
+            limit: Maximum number of files to return (the newest ones)
 
         Returns:
             List of state file paths, sorted by timestamp (newest first)
         """
+        if self.index:
+            return self.index.get_state_files(workflow_id, limit=limit)
+
         # Get all state files for the workflow
         files = []
         for filename in os.listdir(self.state_dir):
@@ -130,7 +151,7 @@ class StatePersistence(StatePersistenceInterface):
         # Sort by modification time (newest first)
         files.sort(key=os.path.getmtime, reverse=True)
 
-        return files
+        return files if limit is None else files[:limit]
 
     def get_latest_state_file(self, workflow_id: str) -> Optional[str]:
         """
@@ -142,7 +163,7 @@ class StatePersistence(StatePersistenceInterface):
         Returns:
             Path to the latest state file, or None if no state files exist
         """
-        files = self.get_state_files(workflow_id)
+        files = self.get_state_files(workflow_id, limit=1)
         return files[0] if files else None
 
     def cleanup_old_states(self, workflow_id: str, max_states: int = 10) -> int:
@@ -156,60 +177,43 @@ class StatePersistence(StatePersistenceInterface):
         Returns:
             Number of state files removed
         """
-        files = self.get_state_files(workflow_id)
-
-        # If we have more files than the maximum, remove the oldest ones
-        if len(files) > max_states:
-            # Get the files to remove (oldest first)
-            # Note: files are already sorted by modification time (newest first)
-            to_remove = files[max_states:]
-
-            # Remove the files
-            removed_count = 0
-            for file_path in to_remove:
-                try:
-                    os.remove(file_path)
-                    removed_count += 1
-                    self.logger.info(f"Removed old state file: {file_path}")
-                except Exception as e:
-                    self.logger.error(f"Error removing state file {file_path}: {str(e)}")
+        if self.index:
+            # Only the files beyond the newest max_states are read from the index
+            to_remove = self.index.get_state_files(workflow_id, offset=max_states)
+        else:
+            # Note: files are sorted by modification time (newest first)
+            to_remove = self.get_state_files(workflow_id)[max_states:]
 
-            return removed_count
+        removed, _ = self.delete_state_files(to_remove)
+        return removed
 
-        return 0
-
-    def _get_variables_by_scope(self, context: ExecutionContext, scope_name: str) -> Dict[str, Any]:
+    def delete_state_files(self, file_paths: List[str]) -> Tuple[int, int]:
         """
-        Get variables by scope
+        Delete state files and drop them from the index in one transaction
 
         Args:
-            context: Execution context
-            scope_name: Name of the scope (GLOBAL, WORKFLOW, LOCAL)
+            file_paths: Paths of the state files
 
         Returns:
-            Dictionary of variables in the specified scope
-        """
-        from src.core.context.variable_storage import VariableScope
-
-        # Get the scope enum
-        scope = VariableScope[scope_name]
-
-        # Get the variables for the scope
-        return context.variables._variables[scope]
-
-    def _restore_variables(self, context: ExecutionContext, variables: Dict[str, Dict[str, Any]]) -> None:
-        """
-        Restore variables to an execution context
-
-        Args:
-            context: Execution context
-            variables: Dictionary of variables by scope
-        """
-        from src.core.context.variable_storage import VariableScope
-
-        # Restore variables for each scope
-        for scope_name, scope_vars in variables.items():
-            # Convert scope name to uppercase to match enum member names
-            scope = VariableScope[scope_name.upper()]
-            for name, value in scope_vars.items():
-                context.variables.set(name, value, scope)
+            Tuple of (number of files removed, bytes reclaimed)
+        """
+        removed = 0
+        reclaimed = 0
+        forgotten = []
+        for file_path in file_paths:
+            try:
+                size = os.path.getsize(file_path)
+                os.remove(file_path)
+                removed += 1
+                reclaimed += size
+                forgotten.append(file_path)
+                self.logger.info(f"Removed old state file: {file_path}")
+            except FileNotFoundError:
+                # Already gone; just drop it from the index
+                forgotten.append(file_path)
+            except Exception as e:
+                self.logger.error(f"Error removing state file {file_path}: {str(e)}")
+
+        if self.index and forgotten:
+            self.index.remove_states(forgotten)
+        return removed, reclaimed
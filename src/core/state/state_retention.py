@@ -0,0 +1,426 @@
+"""Background retention for saved states and checkpoints"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+
+from src.core.state.state_persistence import StatePersistence
+from src.core.state.checkpoint_manager import CheckpointManager
+from src.core.state.sqlite_state_store import SqliteStatePersistence, SqliteCheckpointManager
+
+
+class StateRetentionPolicy:
+    """Limits on the states and checkpoints kept for each workflow"""
+
+    def __init__(
+        self,
+        keep_last: Optional[int] = None,
+        keep_hourly: Optional[int] = None,
+        keep_daily: Optional[int] = None,
+        max_total_bytes: Optional[int] = None,
+        keep_named: bool = True
+    ):
+        """
+        Initialize the retention policy
+
+        keep_last, keep_hourly and keep_daily are combined: an item is kept if
+        any of them selects it, and without any of them no item is removed by
+        age. The newest item of each workflow is always kept.
+
+        Args:
+            keep_last: Number of newest items kept per workflow
+            keep_hourly: Number of hours for which the newest item of the hour is kept
+            keep_daily: Number of days for which the newest item of the day is kept
+            max_total_bytes: Maximum total size of states and checkpoints, oldest removed first
+            keep_named: Whether named checkpoints are exempt from removal
+
+        Raises:
+            ValueError: If a limit is negative
+        """
+        for limit in (keep_last, keep_hourly, keep_daily, max_total_bytes):
+            if limit is not None and limit < 0:
+                raise ValueError("Retention limits cannot be negative")
+
+        self.keep_last = keep_last
+        self.keep_hourly = keep_hourly
+        self.keep_daily = keep_daily
+        self.max_total_bytes = max_total_bytes
+        self.keep_named = keep_named
+
+    @property
+    def thins(self) -> bool:
+        """Get whether the policy removes items by count or age"""
+        return any(limit is not None for limit in (self.keep_last, self.keep_hourly, self.keep_daily))
+
+    def select_kept(self, created_at: List[float]) -> Set[int]:
+        """
+        Select the items of a workflow to keep by count and age
+
+        Args:
+            created_at: Creation times of the items as POSIX timestamps, newest first
+
+        Returns:
+            Positions of the kept items
+        """
+        if not self.thins:
+            return set(range(len(created_at)))
+
+        kept = set(range(min(len(created_at), max(self.keep_last or 0, 1))))
+        for bucket_format, count in (("%Y-%m-%d %H", self.keep_hourly), ("%Y-%m-%d", self.keep_daily)):
+            if not count:
+                continue
+            buckets: Set[str] = set()
+            for position, timestamp in enumerate(created_at):
+                bucket = datetime.fromtimestamp(timestamp).strftime(bucket_format)
+                if bucket in buckets:
+                    continue
+                if len(buckets) >= count:
+                    break
+                buckets.add(bucket)
+                kept.add(position)
+        return kept
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the policy to a dictionary"""
+        return {
+            "keep_last": self.keep_last,
+            "keep_hourly": self.keep_hourly,
+            "keep_daily": self.keep_daily,
+            "max_total_bytes": self.max_total_bytes,
+            "keep_named": self.keep_named
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StateRetentionPolicy':
+        """
+        Create a policy from a dictionary
+
+        Args:
+            data: Dictionary representation of the policy
+
+        Returns:
+            Instantiated policy
+        """
+        return cls(
+            keep_last=data.get("keep_last"),
+            keep_hourly=data.get("keep_hourly"),
+            keep_daily=data.get("keep_daily"),
+            max_total_bytes=data.get("max_total_bytes"),
+            keep_named=data.get("keep_named", True)
+        )
+
+
+class StateRetentionService:
+    """
+    Enforces a retention policy on saved states and checkpoints
+
+    Works with indexed file backends (StatePersistence and CheckpointManager
+    with use_index=True) and with the SQLite backends. The items to remove
+    are chosen by queries on the index or database, without listing the
+    directories or reading any file, and deleted in small batches with a
+    pause between them, so a large backlog is worked off without I/O spikes.
+    The size limit takes the oldest removable items with one ordered query
+    per batch. The service can run periodically on a background thread or
+    be driven with run_once().
+
+    Checkpoint files are deleted newest first, so a removed delta
+    checkpoint's parent is removed after it and only the deltas that are
+    kept have to be rewritten as full checkpoints.
+    """
+
+    def __init__(
+        self,
+        policy: StateRetentionPolicy,
+        state_persistence: Optional[Union[StatePersistence, SqliteStatePersistence]] = None,
+        checkpoint_manager: Optional[Union[CheckpointManager, SqliteCheckpointManager]] = None,
+        interval: float = 300.0,
+        batch_size: int = 50,
+        batch_pause: float = 0.05
+    ):
+        """
+        Initialize the retention service
+
+        Args:
+            policy: Limits to enforce
+            state_persistence: State persistence to enforce the policy on (SQLite or with an index)
+            checkpoint_manager: Checkpoint manager to enforce the policy on (SQLite or with an index)
+            interval: Time between background runs (seconds)
+            batch_size: Maximum number of items deleted per batch
+            batch_pause: Pause between deletion batches (seconds)
+
+        Raises:
+            ValueError: If a file component has no index, neither is given, or the batch size is less than 1
+        """
+        if state_persistence is None and checkpoint_manager is None:
+            raise ValueError("State retention requires a state persistence or a checkpoint manager")
+        for component in (state_persistence, checkpoint_manager):
+            if component is not None and _catalog(component) is None:
+                raise ValueError("State retention requires components with an index")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.policy = policy
+        self.state_persistence = state_persistence
+        self.checkpoint_manager = checkpoint_manager
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {
+            "runs": 0,
+            "states_removed": 0,
+            "checkpoints_removed": 0,
+            "bytes_reclaimed": 0,
+            "last_run_at": None,
+            "last_run_duration": None,
+            "last_run_bytes_reclaimed": 0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Get whether the background thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start enforcing the policy periodically on a background thread"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="state-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread after the current batch
+
+        Args:
+            timeout: Maximum time to wait for the thread to finish (seconds)
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Enforce the policy now, deleting in batches until every limit is met
+
+        Returns:
+            Dictionary with the number of states and checkpoints removed and the bytes
+            reclaimed by this run
+        """
+        with self._run_lock:
+            start = time.monotonic()
+            totals = {"states_removed": 0, "checkpoints_removed": 0, "bytes_reclaimed": 0}
+
+            if self.policy.thins:
+                for kind, workflow_id in self._workflows():
+                    if self._stop_event.is_set():
+                        break
+                    entries = self._entries(kind, workflow_id)
+                    kept = self.policy.select_kept([entry["created_at"] for entry in entries])
+                    doomed = [
+                        entry for position, entry in enumerate(entries)
+                        if position not in kept and not entry["protected"]
+                    ]
+                    self._delete_in_batches(kind, doomed, totals)
+
+            if self.policy.max_total_bytes is not None:
+                self._enforce_size(totals)
+
+            with self._metrics_lock:
+                self._metrics["runs"] += 1
+                self._metrics["states_removed"] += totals["states_removed"]
+                self._metrics["checkpoints_removed"] += totals["checkpoints_removed"]
+                self._metrics["bytes_reclaimed"] += totals["bytes_reclaimed"]
+                self._metrics["last_run_at"] = time.time()
+                self._metrics["last_run_duration"] = time.monotonic() - start
+                self._metrics["last_run_bytes_reclaimed"] = totals["bytes_reclaimed"]
+
+            if totals["states_removed"] or totals["checkpoints_removed"]:
+                self.logger.info(
+                    f"Removed {totals['states_removed']} states and {totals['checkpoints_removed']} checkpoints, "
+                    f"reclaimed {totals['bytes_reclaimed']} bytes"
+                )
+            return totals
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get retention metrics
+
+        Returns:
+            Dictionary with runs, states and checkpoints removed and bytes reclaimed in
+            total, and the time, duration and bytes reclaimed of the last run
+        """
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _run_loop(self) -> None:
+        """Run the policy until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.logger.error(f"Error enforcing state retention: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def _workflows(self) -> List[Tuple[str, str]]:
+        """Get (kind, workflow ID) pairs of every indexed workflow"""
+        workflows = []
+        if self.state_persistence is not None:
+            workflows += [("state", wf) for wf in _catalog(self.state_persistence).get_state_workflows()]
+        if self.checkpoint_manager is not None:
+            workflows += [("checkpoint", wf) for wf in _catalog(self.checkpoint_manager).get_checkpoint_workflows()]
+        return workflows
+
+    def _entries(self, kind: str, workflow_id: str) -> List[Dict[str, Any]]:
+        """
+        Get a workflow's states or checkpoints from the index, newest first
+
+        Args:
+            kind: "state" or "checkpoint"
+            workflow_id: ID of the workflow
+
+        Returns:
+            Dictionaries with key (path or ID), created_at, size_bytes and whether
+            the item is protected from removal
+        """
+        if kind == "state":
+            records = _catalog(self.state_persistence).get_state_entries(workflow_id)
+        else:
+            records = _catalog(self.checkpoint_manager).get_checkpoint_entries(workflow_id)
+        entries = [self._entry(kind, record) for record in records]
+        if entries:
+            entries[0]["protected"] = True
+        return entries
+
+    def _entry(self, kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a state or checkpoint record of an index query to a retention entry"""
+        if kind == "state":
+            return {"key": record["path"], "created_at": record["created_at"],
+                    "size_bytes": record["size_bytes"], "protected": False}
+        return {"key": record["id"], "created_at": record["created_at"], "size_bytes": record["size_bytes"],
+                "protected": self.policy.keep_named and record["name"] is not None}
+
+    def _total_bytes(self) -> int:
+        """Get the total size of the indexed states and checkpoints"""
+        total = 0
+        if self.state_persistence is not None:
+            total += _catalog(self.state_persistence).state_bytes()
+        if self.checkpoint_manager is not None:
+            total += _catalog(self.checkpoint_manager).checkpoint_bytes()
+        return total
+
+    def _oldest(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Get the oldest unprotected states and checkpoints, at most one batch
+
+        Returns:
+            (kind, entry) pairs, oldest first
+        """
+        candidates = []
+        if self.state_persistence is not None:
+            records = _catalog(self.state_persistence).get_oldest_states(self.batch_size)
+            candidates += [("state", self._entry("state", record)) for record in records]
+        if self.checkpoint_manager is not None:
+            records = _catalog(self.checkpoint_manager).get_oldest_checkpoints(
+                self.batch_size, exclude_named=self.policy.keep_named
+            )
+            candidates += [("checkpoint", self._entry("checkpoint", record)) for record in records]
+        candidates.sort(key=lambda candidate: candidate[1]["created_at"])
+        return candidates[:self.batch_size]
+
+    def _enforce_size(self, totals: Dict[str, int]) -> None:
+        """Remove the oldest unprotected items until the total size is within the limit"""
+        excess = self._total_bytes() - self.policy.max_total_bytes
+        while excess > 0 and not self._stop_event.is_set():
+            batch: Dict[str, List[Dict[str, Any]]] = {"state": [], "checkpoint": []}
+            needed = excess
+            for kind, entry in self._oldest():
+                batch[kind].append(entry)
+                needed -= entry["size_bytes"]
+                if needed <= 0:
+                    break
+            if not batch["state"] and not batch["checkpoint"]:
+                self.logger.warning("Cannot meet the size limit without removing protected states")
+                return
+
+            removed = 0
+            reclaimed = totals["bytes_reclaimed"]
+            for kind, entries in batch.items():
+                removed += self._delete(kind, entries, totals)
+            excess -= totals["bytes_reclaimed"] - reclaimed
+            if not removed:
+                return
+            if excess > 0:
+                self._stop_event.wait(self.batch_pause)
+
+    def _delete_in_batches(self, kind: str, entries: List[Dict[str, Any]], totals: Dict[str, int]) -> None:
+        """Delete items in batches with a pause between them"""
+        for start in range(0, len(entries), self.batch_size):
+            if self._stop_event.is_set():
+                return
+            if start:
+                self._stop_event.wait(self.batch_pause)
+            self._delete(kind, entries[start:start + self.batch_size], totals)
+
+    def _delete(self, kind: str, entries: List[Dict[str, Any]], totals: Dict[str, int]) -> int:
+        """
+        Delete a batch of states or checkpoints
+
+        Args:
+            kind: "state" or "checkpoint"
+            entries: Items to delete
+            totals: Counters of the run to update
+
+        Returns:
+            Number of items removed
+        """
+        if not entries:
+            return 0
+
+        if kind == "state":
+            removed, reclaimed = self.state_persistence.delete_state_files([entry["key"] for entry in entries])
+            totals["states_removed"] += removed
+        elif isinstance(self.checkpoint_manager, SqliteCheckpointManager):
+            before = self.checkpoint_manager.checkpoint_bytes()
+            removed = self.checkpoint_manager.delete_checkpoints([entry["key"] for entry in entries])
+            reclaimed = max(before - self.checkpoint_manager.checkpoint_bytes(), 0)
+            totals["checkpoints_removed"] += removed
+        else:
+            index = self.checkpoint_manager.index
+            before = index.checkpoint_bytes()
+            removed = 0
+            for entry in sorted(entries, key=lambda e: e["created_at"], reverse=True):
+                if self.checkpoint_manager.delete_checkpoint(entry["key"]):
+                    removed += 1
+                elif not os.path.exists(self.checkpoint_manager.get_checkpoint_file(entry["key"])):
+                    # Drop records whose files are gone so they are not retried forever
+                    index.remove_checkpoints([entry["key"]])
+            # Rewritten child deltas grow, so measure what the index lost
+            reclaimed = max(before - index.checkpoint_bytes(), 0)
+            totals["checkpoints_removed"] += removed
+
+        totals["bytes_reclaimed"] += reclaimed
+        return removed
+
+
+def _catalog(component: Any) -> Any:
+    """
+    Get the object answering a component's retention queries
+
+    Args:
+        component: State persistence or checkpoint manager
+
+    Returns:
+        The component's index for file backends (None if it has none), the component itself for SQLite backends
+    """
+    if isinstance(component, (SqliteStatePersistence, SqliteCheckpointManager)):
+        return component
+    return component.index
@@ -5,6 +5,7 @@ from datetime import datetime
 
 from src.core.context.execution_context import ExecutionContext
 from src.core.context.execution_state import ExecutionStateEnum
+from src.core.context.variable_storage import VariableScope, LazyValue
 
 
 class StateVisualizer:
@@ -26,13 +27,14 @@ class StateVisualizer:
         Returns:
             Dictionary with state summary information
         """
+        variables = context.variables.snapshot()
         return {
             "context_id": context.id,
             "state": context.state.current_state.name,
             "variable_count": {
-                "global": len(context.variables._variables[1]),  # GLOBAL scope
-                "workflow": len(context.variables._variables[2]),  # WORKFLOW scope
-                "local": len(context.variables._variables[3])  # LOCAL scope
+                "global": variables.count(VariableScope.GLOBAL),
+                "workflow": variables.count(VariableScope.WORKFLOW),
+                "local": variables.count(VariableScope.LOCAL)
             },
             "state_history_count": len(context.state.state_history),
             "has_parent": context.parent is not None,
@@ -78,26 +80,26 @@ class StateVisualizer:
         Returns:
             Dictionary of variables by scope
         """
-        from src.core.context.variable_storage import VariableScope
-        
+        # Read from a snapshot so a running workflow cannot change the scopes mid-iteration
+        variables = context.variables.snapshot()
         result = {}
         
         if include_global:
             result["global"] = {
                 name: StateVisualizer._format_value(value)
-                for name, value in context.variables._variables[VariableScope.GLOBAL].items()
+                for name, value in variables.get_scope(VariableScope.GLOBAL).items()
             }
         
         if include_workflow:
             result["workflow"] = {
                 name: StateVisualizer._format_value(value)
-                for name, value in context.variables._variables[VariableScope.WORKFLOW].items()
+                for name, value in variables.get_scope(VariableScope.WORKFLOW).items()
             }
         
         if include_local:
             result["local"] = {
                 name: StateVisualizer._format_value(value)
-                for name, value in context.variables._variables[VariableScope.LOCAL].items()
+                for name, value in variables.get_scope(VariableScope.LOCAL).items()
             }
         
         return result
@@ -157,7 +159,7 @@ class StateVisualizer:
         result = {
             "id": context.id,
             "state": context.state.current_state.name,
-            "variable_count": sum(len(vars) for vars in context.variables._variables.values()),
+            "variable_count": context.variables.snapshot().count(),
             "children": []
         }
         
@@ -192,6 +194,10 @@ class StateVisualizer:
         Returns:
             Formatted value
         """
+        if isinstance(value, LazyValue):
+            # Not read since the context was restored
+            value = value.get()
+
         if value is None:
             return None
         elif isinstance(value, (str, int, float, bool)):
@@ -6,6 +6,7 @@ from src.core.context.execution_context import ExecutionContext
 from src.core.state.workflow_state_manager_interface import WorkflowStateManagerInterface
 from src.core.state.state_persistence_interface import StatePersistenceInterface
 from src.core.state.checkpoint_manager_interface import CheckpointManagerInterface
+from src.core.state.checkpoint_writer import CheckpointWriter
 
 
 class WorkflowStateManager(WorkflowStateManagerInterface):
@@ -14,12 +15,18 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
     
     This class coordinates between state persistence and checkpoint management
     to provide a unified interface for workflow state operations.
+
+    With asynchronous checkpoints, create_checkpoint() only captures the
+    context and a CheckpointWriter writes it in the background. Reading
+    checkpoints back waits for pending writes first; call flush() before
+    shutting down.
     """
     
     def __init__(
         self,
         state_persistence: StatePersistenceInterface,
-        checkpoint_manager: CheckpointManagerInterface
+        checkpoint_manager: CheckpointManagerInterface,
+        async_checkpoints: bool = False
     ):
         """
         Initialize the workflow state manager
@@ -27,10 +34,15 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
         Args:
             state_persistence: State persistence implementation
             checkpoint_manager: Checkpoint manager implementation
+            async_checkpoints: Whether to write checkpoints on a background thread
+
+        Raises:
+            ValueError: If async_checkpoints is set and the checkpoint manager does not support it
         """
         self.logger = logging.getLogger(self.__class__.__name__)
         self._state_persistence = state_persistence
         self._checkpoint_manager = checkpoint_manager
+        self._checkpoint_writer = CheckpointWriter(checkpoint_manager) if async_checkpoints else None
     
     def save_workflow_state(self, workflow_id: str, context: ExecutionContext) -> str:
         """
@@ -107,6 +119,8 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
             IOError: If the checkpoint cannot be created
         """
         try:
+            if self._checkpoint_writer is not None:
+                return self._checkpoint_writer.submit(workflow_id, context, data, name)
             return self._checkpoint_manager.create_checkpoint(
                 workflow_id, context, data, name
             )
@@ -129,6 +143,7 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
             ValueError: If the checkpoint is invalid
         """
         try:
+            self.flush()
             return self._checkpoint_manager.restore_from_checkpoint(checkpoint_id)
         except Exception as e:
             self.logger.error(f"Error restoring from checkpoint: {str(e)}")
@@ -145,6 +160,7 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
             List of checkpoint data dictionaries
         """
         try:
+            self.flush()
             return self._checkpoint_manager.get_checkpoints_for_workflow(workflow_id)
         except Exception as e:
             self.logger.error(f"Error getting checkpoints: {str(e)}")
@@ -162,6 +178,7 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
             Checkpoint data dictionary, or None if not found
         """
         try:
+            self.flush()
             return self._checkpoint_manager.get_checkpoint_by_name(workflow_id, name)
         except Exception as e:
             self.logger.error(f"Error getting checkpoint by name: {str(e)}")
@@ -178,11 +195,23 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
             True if the checkpoint was deleted, False otherwise
         """
         try:
+            self.flush()
             return self._checkpoint_manager.delete_checkpoint(checkpoint_id)
         except Exception as e:
             self.logger.error(f"Error deleting checkpoint: {str(e)}")
             return False
     
+    def end_chain(self, workflow_id: str) -> None:
+        """
+        Stop tracking a workflow's context for delta checkpoints
+
+        Args:
+            workflow_id: ID of the workflow
+        """
+        end_chain = getattr(self._checkpoint_manager, "end_chain", None)
+        if end_chain is not None:
+            end_chain(workflow_id)
+
     def cleanup_old_states(self, workflow_id: str, max_states: int = 10) -> int:
         """
         Clean up old state files for a workflow
@@ -199,3 +228,17 @@ class WorkflowStateManager(WorkflowStateManagerInterface):
         except Exception as e:
             self.logger.error(f"Error cleaning up old states: {str(e)}")
             return 0
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all asynchronously created checkpoints are written
+        
+        Args:
+            timeout: Maximum time to wait in seconds (waits indefinitely if not provided)
+            
+        Returns:
+            True if no writes are pending, False on timeout
+        """
+        if self._checkpoint_writer is None:
+            return True
+        return self._checkpoint_writer.flush(timeout)
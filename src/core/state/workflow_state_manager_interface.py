@@ -113,3 +113,16 @@ class WorkflowStateManagerInterface(ABC):
             True if the checkpoint was deleted, False otherwise
         """
         pass
+
+    def end_chain(self, workflow_id: str) -> None:
+        """
+        Stop tracking a workflow's context for delta checkpoints
+
+        Call this when a workflow run ends so the manager lets go of the
+        run's context; the next checkpoint of the workflow is a full one.
+        Managers that keep no such state do nothing.
+
+        Args:
+            workflow_id: ID of the workflow
+        """
+        pass
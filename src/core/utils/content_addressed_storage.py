@@ -0,0 +1,547 @@
+"""Content-addressed screenshot storage"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+from io import BytesIO
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Set, Tuple
+
+from PIL import Image
+
+from src.core.utils.screenshot_capture import read_png_size
+from src.core.utils.screenshot_catalog import ScreenshotCatalog
+from src.core.utils.screenshot_encoding import IMAGE_EXTENSIONS
+from src.core.utils.screenshot_storage import ScreenshotStorage, Encoding
+
+
+def perceptual_hash(image: Image.Image) -> int:
+    """
+    Compute a 64-bit difference hash of an image
+
+    Images that look alike (e.g. pages that differ only in a clock) have
+    hashes that differ in few bits.
+
+    Args:
+        image: Image to hash
+
+    Returns:
+        Perceptual hash as an integer
+    """
+    pixels = image.convert("L").resize((9, 8)).tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+class ContentAddressedStorage(ScreenshotStorage):
+    """
+    Stores each unique screenshot once, keyed by the SHA-256 of its encoded bytes
+
+    Blobs live under blobs/<xx>/<hash>.<ext>, in the format of the capture's
+    encoding profile. Every capture still gets its own
+    path in the screenshot directory, created as a hard link to the blob (or
+    a copy where the file system cannot link), so callers can open it like
+    any other screenshot. Capture metadata goes to the catalog if the
+    storage has one, else to an append-only manifest instead of a sidecar
+    file per screenshot; the manifest is compacted as captures are deleted.
+
+    With a near-duplicate threshold, captures whose perceptual hash is within
+    that many bits of a stored blob reuse the stored blob. The hashes are
+    indexed in threshold + 1 bands: two hashes within the threshold agree
+    exactly on at least one band, so only blobs sharing a band are compared.
+    """
+
+    MANIFEST_NAME = "captures.jsonl"
+    BLOB_DIR_NAME = "blobs"
+
+    def __init__(
+        self,
+        screenshot_dir: str = "screenshots",
+        near_duplicate_threshold: Optional[int] = None,
+        use_catalog: bool = False,
+        encoding: Optional[Encoding] = None
+    ):
+        """
+        Initialize the content-addressed storage
+
+        Args:
+            screenshot_dir: Directory to store screenshots
+            near_duplicate_threshold: Maximum number of differing perceptual hash bits
+                for two captures to share a blob, or None to only share identical bytes
+            use_catalog: Whether to also index captures in a catalog for queries
+            encoding: Encoding profile for screenshots saved without one
+                (the global default profile if not provided)
+        """
+        super().__init__(screenshot_dir, use_catalog, encoding)
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.blob_dir = os.path.join(self.screenshot_dir, self.BLOB_DIR_NAME)
+        self.manifest_path = os.path.join(self.screenshot_dir, self.MANIFEST_NAME)
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._manifest_lines = 0
+        self._blob_hashes: Dict[str, Optional[int]] = {}
+        self._bands = self._band_layout(near_duplicate_threshold)
+        self._phash_index: Dict[Tuple[int, int], Set[str]] = {}
+        self._bytes_written = 0
+        self._bytes_deduplicated = 0
+        if self.catalog:
+            self._load_catalog()
+        else:
+            self._load_manifest()
+
+    def save_image(
+        self,
+        image: Image.Image,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Save an image, storing its pixels only if no identical blob exists
+
+        Args:
+            image: PIL Image to save
+            name: Base name for the screenshot
+            metadata: Optional metadata to associate with the screenshot
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+
+        Returns:
+            Path to the saved screenshot
+        """
+        profile = self.resolve_encoding(encoding)
+        file_path = self.reserve_path(name, profile.extension)
+        try:
+            return self.write_image(image, file_path, metadata, encoding=profile)
+        finally:
+            self.release_path(file_path)
+
+    def save_png_bytes(
+        self,
+        png_data: bytes,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Save PNG bytes, storing them only if no identical blob exists
+
+        Args:
+            png_data: PNG bytes, e.g. as returned by the driver
+            name: Base name for the screenshot
+            metadata: Optional metadata to associate with the screenshot
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+
+        Returns:
+            Path to the saved screenshot
+        """
+        profile = self.resolve_encoding(encoding)
+        file_path = self.reserve_path(name, profile.extension)
+        try:
+            return self.write_png_bytes(png_data, file_path, metadata, encoding=profile)
+        finally:
+            self.release_path(file_path)
+
+    def write_image(
+        self,
+        image: Image.Image,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        fsync: bool = False,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Encode an image and store it under the given capture path
+
+        Args:
+            image: PIL Image to save
+            file_path: Path of the capture
+            metadata: Optional metadata to associate with the screenshot
+            fsync: Whether to flush new blobs and the manifest to disk before returning
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+
+        Returns:
+            Path to the saved screenshot
+        """
+        data, image = self.resolve_encoding(encoding).encode(image)
+        return self._store(data, file_path, metadata, fsync, image)
+
+    def write_png_bytes(
+        self,
+        png_data: bytes,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        fsync: bool = False,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Store PNG bytes under the given capture path
+
+        Args:
+            png_data: PNG bytes, e.g. as returned by the driver
+            file_path: Path of the capture
+            metadata: Optional metadata to associate with the screenshot
+            fsync: Whether to flush new blobs and the manifest to disk before returning
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+
+        Returns:
+            Path to the saved screenshot
+        """
+        profile = self.resolve_encoding(encoding)
+        if not profile.is_passthrough:
+            return self.write_image(Image.open(BytesIO(png_data)), file_path, metadata, fsync, profile)
+        return self._store(png_data, file_path, metadata, fsync)
+
+    def get_screenshots(self) -> List[str]:
+        """
+        Get all captures that still exist, newest first
+
+        Returns:
+            List of screenshot file paths
+        """
+        if self.catalog:
+            return super().get_screenshots()
+        with self._lock:
+            records = sorted(self._records.values(), key=lambda r: r["timestamp"], reverse=True)
+        paths = [os.path.join(self.screenshot_dir, record["path"]) for record in records]
+        return [path for path in paths if os.path.exists(path)]
+
+    def get_metadata(self, screenshot_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get metadata for a capture from the manifest
+
+        Args:
+            screenshot_path: Path to the screenshot
+
+        Returns:
+            Metadata dictionary, or None if the capture is unknown
+        """
+        if self.catalog:
+            return super().get_metadata(screenshot_path)
+        with self._lock:
+            record = self._records.get(os.path.basename(screenshot_path))
+        if record is None:
+            return super().get_metadata(screenshot_path)
+        return dict(record["metadata"])
+
+    def get_blob_hash(self, screenshot_path: str) -> Optional[str]:
+        """
+        Get the hash of the blob a capture refers to
+
+        Args:
+            screenshot_path: Path to the screenshot
+
+        Returns:
+            Blob hash, or None if the capture is unknown
+        """
+        if self.catalog:
+            return self.catalog.get_content_hash(screenshot_path)
+        with self._lock:
+            record = self._records.get(os.path.basename(screenshot_path))
+        return record["hash"] if record else None
+
+    def get_blob_path(self, blob_hash: str, extension: str = ".png") -> str:
+        """
+        Get the path of a blob
+
+        Args:
+            blob_hash: Blob hash
+            extension: File extension of the blob's format
+
+        Returns:
+            Path to the blob file
+        """
+        return os.path.join(self.blob_dir, blob_hash[:2], f"{blob_hash}{extension}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get storage counters
+
+        Returns:
+            Dictionary with the number of captures and unique blobs, and the bytes
+            written and saved by deduplication since the storage was opened
+        """
+        captures = self.catalog.count() if self.catalog else None
+        with self._lock:
+            return {
+                "captures": len(self._records) if captures is None else captures,
+                "unique_blobs": len(self._blob_hashes),
+                "bytes_written": self._bytes_written,
+                "bytes_deduplicated": self._bytes_deduplicated
+            }
+
+    def forget(self, screenshot_paths: List[str]) -> None:
+        """
+        Drop deleted captures from the catalog or the manifest
+
+        Args:
+            screenshot_paths: Paths of captures that were deleted
+        """
+        super().forget(screenshot_paths)
+        if self.catalog or not screenshot_paths:
+            return
+        with self._lock:
+            for path in screenshot_paths:
+                self._records.pop(os.path.basename(path), None)
+            # Rewriting the manifest once stale lines outnumber live ones keeps it
+            # proportional to the captures at amortized constant cost per delete
+            if self._manifest_lines > 2 * len(self._records):
+                self._compact_manifest()
+
+    def collect_garbage(self) -> int:
+        """
+        Delete blobs that no remaining capture refers to
+
+        Captures deleted without forget() are dropped from the manifest first.
+
+        Returns:
+            Number of bytes reclaimed
+        """
+        if self.catalog:
+            referenced = set(self.catalog.content_hashes())
+        else:
+            with self._lock:
+                records = list(self._records.values())
+            missing = [
+                record["path"] for record in records
+                if not os.path.exists(os.path.join(self.screenshot_dir, record["path"]))
+            ]
+            with self._lock:
+                for path in missing:
+                    self._records.pop(path, None)
+                if self._manifest_lines > len(self._records):
+                    self._compact_manifest()
+                referenced = {record["hash"] for record in self._records.values()}
+
+        reclaimed = 0
+        for prefix in os.listdir(self.blob_dir):
+            prefix_dir = os.path.join(self.blob_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for filename in os.listdir(prefix_dir):
+                blob_hash, extension = os.path.splitext(filename)
+                if extension not in IMAGE_EXTENSIONS or blob_hash in referenced:
+                    continue
+                # Captures linked to the blob since the scan keep their own link to
+                # the data, and the next capture with this hash rewrites the blob
+                blob_path = os.path.join(prefix_dir, filename)
+                try:
+                    size = os.path.getsize(blob_path)
+                    os.remove(blob_path)
+                    reclaimed += size
+                except OSError as e:
+                    self.logger.error(f"Error removing blob {blob_path}: {str(e)}")
+                    continue
+                with self._lock:
+                    self._forget_blob(blob_hash)
+        return reclaimed
+
+    def _store(
+        self,
+        data: bytes,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]],
+        fsync: bool,
+        image: Optional[Image.Image] = None
+    ) -> str:
+        """Store a blob if needed, link the capture path to it and append a manifest record"""
+        try:
+            extension = os.path.splitext(file_path)[1].lower()
+            exact_hash = hashlib.sha256(data).hexdigest()
+            phash = None
+            if self.near_duplicate_threshold is not None:
+                if image is None:
+                    image = Image.open(BytesIO(data))
+                phash = perceptual_hash(image)
+
+            with self._lock:
+                blob_hash = exact_hash
+                if exact_hash not in self._blob_hashes and phash is not None:
+                    near_hash = self._find_near_duplicate(phash)
+                    if near_hash and os.path.exists(self.get_blob_path(near_hash, extension)):
+                        blob_hash = near_hash
+                is_new = blob_hash not in self._blob_hashes
+                if is_new:
+                    self._remember_blob(blob_hash, phash)
+                    self._bytes_written += len(data)
+                else:
+                    self._bytes_deduplicated += len(data)
+
+            blob_path = self.get_blob_path(blob_hash, extension)
+            if is_new or not os.path.exists(blob_path):
+                self._write_blob(blob_path, data, fsync)
+            try:
+                self._link(blob_path, file_path)
+            except FileNotFoundError:
+                # The blob was garbage collected after the existence check
+                blob_hash = exact_hash
+                blob_path = self.get_blob_path(blob_hash, extension)
+                self._write_blob(blob_path, data, fsync)
+                self._link(blob_path, file_path)
+
+            width, height = (image.width, image.height) if image is not None else read_png_size(data)
+            record_metadata = dict(metadata or {})
+            record_metadata.setdefault("timestamp", datetime.now().isoformat())
+            record_metadata.setdefault("width", width)
+            record_metadata.setdefault("height", height)
+            record = {
+                "path": os.path.basename(file_path),
+                "hash": blob_hash,
+                "timestamp": record_metadata["timestamp"],
+                "metadata": record_metadata
+            }
+            if phash is not None:
+                record["phash"] = format(phash, "016x")
+            if self.catalog:
+                self.catalog.add(
+                    file_path,
+                    ScreenshotCatalog.name_from_filename(file_path),
+                    record_metadata,
+                    size_bytes=len(data),
+                    content_hash=blob_hash,
+                    phash=record.get("phash")
+                )
+            else:
+                self._append_record(record, fsync)
+
+            self.logger.info(f"Screenshot saved to {file_path} (blob {blob_hash[:12]})")
+            return file_path
+        except Exception as e:
+            self.logger.error(f"Error saving screenshot: {str(e)}")
+            raise
+
+    def _find_near_duplicate(self, phash: int) -> Optional[str]:
+        """Find a stored blob whose perceptual hash is within the threshold (lock held)"""
+        candidates: Set[str] = set()
+        for key in self._phash_keys(phash):
+            candidates.update(self._phash_index.get(key, ()))
+
+        best_hash, best_distance = None, self.near_duplicate_threshold + 1
+        for blob_hash in candidates:
+            distance = bin(self._blob_hashes[blob_hash] ^ phash).count("1")
+            if distance < best_distance:
+                best_hash, best_distance = blob_hash, distance
+        return best_hash
+
+    @staticmethod
+    def _band_layout(threshold: Optional[int]) -> List[Tuple[int, int]]:
+        """Split the 64 hash bits into threshold + 1 bands, as (shift, mask) pairs"""
+        if threshold is None:
+            return []
+        count = max(1, min(threshold + 1, 64))
+        bands, shift = [], 0
+        for band in range(count):
+            width = 64 // count + (1 if band < 64 % count else 0)
+            bands.append((shift, (1 << width) - 1))
+            shift += width
+        return bands
+
+    def _phash_keys(self, phash: int) -> List[Tuple[int, int]]:
+        """Get the near-duplicate index keys of a perceptual hash"""
+        return [(band, (phash >> shift) & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def _remember_blob(self, blob_hash: str, phash: Optional[int]) -> None:
+        """Record a stored blob and index its perceptual hash (lock held)"""
+        self._blob_hashes[blob_hash] = phash
+        if phash is not None:
+            for key in self._phash_keys(phash):
+                self._phash_index.setdefault(key, set()).add(blob_hash)
+
+    def _forget_blob(self, blob_hash: str) -> None:
+        """Drop a deleted blob and its index entries (lock held)"""
+        phash = self._blob_hashes.pop(blob_hash, None)
+        if phash is None:
+            return
+        for key in self._phash_keys(phash):
+            blobs = self._phash_index.get(key)
+            if blobs is not None:
+                blobs.discard(blob_hash)
+                if not blobs:
+                    del self._phash_index[key]
+
+    def _write_blob(self, blob_path: str, data: bytes, fsync: bool) -> None:
+        """Write a blob atomically so a crash never leaves a partial blob behind"""
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, blob_path)
+
+    def _link(self, blob_path: str, file_path: str) -> None:
+        """Create the capture path as a hard link to the blob, copying if linking fails"""
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        try:
+            os.link(blob_path, file_path)
+        except OSError:
+            shutil.copyfile(blob_path, file_path)
+
+    def _append_record(self, record: Dict[str, Any], fsync: bool) -> None:
+        """Append a capture record to the manifest"""
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with open(self.manifest_path, 'a') as f:
+                f.write(line)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._records[record["path"]] = record
+            self._manifest_lines += 1
+
+    def _compact_manifest(self) -> None:
+        """Rewrite the manifest with only the current records (lock held)"""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w') as f:
+            for record in self._records.values():
+                f.write(json.dumps(record) + "\n")
+        os.replace(temp_path, self.manifest_path)
+        self._manifest_lines = len(self._records)
+
+    def _load_manifest(self) -> None:
+        """Load the capture records and known blobs from the manifest"""
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted write
+                    continue
+                self._records[record["path"]] = record
+                self._manifest_lines += 1
+                if record["hash"] not in self._blob_hashes:
+                    phash = record.get("phash")
+                    self._remember_blob(record["hash"], int(phash, 16) if phash else None)
+
+    def _load_catalog(self) -> None:
+        """Load the known blobs from the catalog, moving a manifest's records into it"""
+        if os.path.exists(self.manifest_path):
+            # Captures written before the catalog was enabled
+            self._load_manifest()
+            for record in self._records.values():
+                file_path = os.path.join(self.screenshot_dir, record["path"])
+                if not os.path.exists(file_path):
+                    continue
+                self.catalog.add(
+                    file_path,
+                    ScreenshotCatalog.name_from_filename(file_path),
+                    record["metadata"],
+                    size_bytes=os.path.getsize(file_path),
+                    content_hash=record["hash"],
+                    phash=record.get("phash")
+                )
+            os.remove(self.manifest_path)
+            self._records.clear()
+            self._manifest_lines = 0
+        for blob_hash, phash in self.catalog.content_hashes().items():
+            if blob_hash not in self._blob_hashes:
+                self._remember_blob(blob_hash, int(phash, 16) if phash else None)
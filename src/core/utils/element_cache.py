@@ -0,0 +1,329 @@
+"""Per-page cache of located elements"""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# Context key of the page generation counter; the same key ConditionCache stamps
+# DOM-based conditions with. Whoever navigates or rebuilds the page bumps it.
+PAGE_GENERATION_KEY = "page_generation"
+
+
+def is_stale_error(error: BaseException) -> bool:
+    """
+    Check whether an error means an element reference went stale
+
+    Matches Selenium's StaleElementReferenceException (and subclasses) by name,
+    so Selenium does not have to be importable.
+
+    Args:
+        error: Error raised while using an element
+
+    Returns:
+        True if the element is no longer attached to the page
+    """
+    return any(cls.__name__ == "StaleElementReferenceException" for cls in type(error).__mro__)
+
+
+class ElementCache:
+    """
+    Elements located on the current page of one driver, keyed by selector
+
+    Consecutive steps that target the same selector reuse the located element
+    instead of asking the driver again. The cache is cleared when the page
+    generation in the context changes or when invalidate() is called after a
+    navigation; a cached element that went stale anyway is located again and
+    the operation retried once.
+
+    A cached element may still be attached but no longer be the element the
+    selector matches, so actions only use the cache when the context tracks
+    page generations (see get_element_cache()); set "page_generation" in the
+    context to opt in, and have anything that changes the page bump it (see
+    next_page_generation()).
+
+    Use ElementCache.for_driver() to get the cache shared by everything using
+    a driver.
+    """
+
+    _caches: ClassVar['weakref.WeakKeyDictionary[Any, ElementCache]'] = weakref.WeakKeyDictionary()
+    _caches_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the element cache
+
+        Args:
+            max_entries: Maximum number of selectors to remember (least recently used go first)
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], Any]' = OrderedDict()
+        self._generation: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale_retries = 0
+
+    @classmethod
+    def for_driver(cls, driver: Any) -> Optional['ElementCache']:
+        """
+        Get the cache of a driver, creating it on first use
+
+        Args:
+            driver: Browser driver
+
+        Returns:
+            The driver's cache, or None if the driver cannot be tracked
+        """
+        with cls._caches_lock:
+            try:
+                cache = cls._caches.get(driver)
+                if cache is None:
+                    cache = cls()
+                    cls._caches[driver] = cache
+                return cache
+            except TypeError:
+                # Not weak-referenceable (or unhashable); go without a cache
+                return None
+
+    @classmethod
+    def invalidate_driver(cls, driver: Any) -> None:
+        """
+        Forget the elements located with a driver, e.g. after it navigated
+
+        Args:
+            driver: Browser driver
+        """
+        with cls._caches_lock:
+            try:
+                cache = cls._caches.get(driver)
+            except TypeError:
+                return
+        if cache is not None:
+            cache.invalidate()
+
+    def sync_generation(self, generation: Optional[Any]) -> None:
+        """
+        Clear the cache if the page generation changed
+
+        Args:
+            generation: Current page generation, or None if unknown
+        """
+        if generation is None:
+            return
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+
+    def find_element(self, driver: Any, selector: str) -> Any:
+        """
+        Locate the first element matching a selector, reusing a cached element
+
+        Args:
+            driver: Browser driver
+            selector: CSS selector
+
+        Returns:
+            The element, or whatever the driver returned if nothing was found
+        """
+        with self._lock:
+            element = self._get(("element", selector))
+            if element is None:
+                elements = self._get(("elements", selector))
+                element = elements[0] if elements else None
+            if element is not None:
+                self._hits += 1
+                return element
+            self._misses += 1
+
+        element = driver.find_element_by_css_selector(selector)
+        if element:
+            with self._lock:
+                self._put(("element", selector), element)
+        return element
+
+    def find_elements(self, driver: Any, selector: str) -> List[Any]:
+        """
+        Locate all elements matching a selector, reusing a cached non-empty result
+
+        Empty results are not cached, since an element that is missing now
+        may appear at any moment.
+
+        Args:
+            driver: Browser driver
+            selector: CSS selector
+
+        Returns:
+            Matching elements
+        """
+        with self._lock:
+            elements = self._get(("elements", selector))
+            if elements:
+                self._hits += 1
+                return elements
+            self._misses += 1
+
+        elements = driver.find_elements_by_css_selector(selector)
+        if elements:
+            with self._lock:
+                self._put(("elements", selector), elements)
+        return elements
+
+    def with_element(self, driver: Any, selector: str, operation: Callable[[Any], T]) -> T:
+        """
+        Run an operation on the element matching a selector, retrying once if it was stale
+
+        Args:
+            driver: Browser driver
+            selector: CSS selector
+            operation: Callable taking the element
+
+        Returns:
+            Result of the operation
+
+        Raises:
+            ValueError: If no element matches the selector
+        """
+        element = self._require(self.find_element(driver, selector), selector)
+        try:
+            return operation(element)
+        except Exception as e:
+            if not is_stale_error(e):
+                raise
+        with self._lock:
+            self._stale_retries += 1
+        self.invalidate(selector)
+        return operation(self._require(self.find_element(driver, selector), selector))
+
+    def with_elements(self, driver: Any, selector: str, operation: Callable[[List[Any]], T]) -> T:
+        """
+        Run an operation on the elements matching a selector, retrying once if they were stale
+
+        Args:
+            driver: Browser driver
+            selector: CSS selector
+            operation: Callable taking the list of elements (possibly empty)
+
+        Returns:
+            Result of the operation
+        """
+        elements = self.find_elements(driver, selector)
+        try:
+            return operation(elements)
+        except Exception as e:
+            if not is_stale_error(e):
+                raise
+        with self._lock:
+            self._stale_retries += 1
+        self.invalidate(selector)
+        return operation(self.find_elements(driver, selector))
+
+    def invalidate(self, selector: Optional[str] = None) -> None:
+        """
+        Forget cached elements
+
+        Args:
+            selector: Selector to forget, or None to forget everything
+        """
+        with self._lock:
+            if selector is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(("element", selector), None)
+                self._entries.pop(("elements", selector), None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, stale retries and entries
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "stale_retries": self._stale_retries,
+                "entries": len(self._entries)
+            }
+
+    def _get(self, key: Tuple[str, str]) -> Any:
+        """Get an entry and mark it recently used (lock held)"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: Tuple[str, str], value: Any) -> None:
+        """Store an entry, evicting the least recently used one if full (lock held)"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _require(element: Any, selector: str) -> Any:
+        """Raise if no element was found"""
+        if not element:
+            raise ValueError(f"Element not found: {selector}")
+        return element
+
+
+def get_element_cache(context: Dict[str, Any], require_generation: bool = False) -> Optional[ElementCache]:
+    """
+    Get the element cache of the driver in a context, synced to the context's page generation
+
+    Args:
+        context: Execution context containing the browser driver
+        require_generation: Whether to only use the cache when the context has a page
+            generation, for callers that read elements without interacting with them
+            (and so would not notice a stale element)
+
+    Returns:
+        The element cache, or None if there is no driver or caching does not apply
+    """
+    driver = context.get("driver")
+    generation = context.get(PAGE_GENERATION_KEY)
+    if not driver or (require_generation and generation is None):
+        return None
+    cache = ElementCache.for_driver(driver)
+    if cache is not None:
+        cache.sync_generation(generation)
+    return cache
+
+
+def next_page_generation(context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the result data recording that an action may have changed the page
+
+    Actions that interact with the page (such as clicks, which may navigate
+    or rebuild it) return this as result data, so the workflow engine (or the
+    loop running the action, see apply_page_generation()) stores the bumped
+    generation and cached elements and DOM conditions are not reused
+    afterwards.
+
+    Args:
+        context: Execution context of the action
+
+    Returns:
+        Dictionary with the next page generation, or an empty dictionary if
+        the context does not track page generations
+    """
+    generation = context.get(PAGE_GENERATION_KEY)
+    if generation is None:
+        return {}
+    return {PAGE_GENERATION_KEY: generation + 1}
+
+
+def apply_page_generation(context: Dict[str, Any], data: Any) -> None:
+    """
+    Record in a context the page generation reported in an action's result data
+
+    Args:
+        context: Execution context the next actions run with
+        data: Result data of the action that ran
+    """
+    if isinstance(data, dict) and PAGE_GENERATION_KEY in data:
+        context[PAGE_GENERATION_KEY] = data[PAGE_GENERATION_KEY]
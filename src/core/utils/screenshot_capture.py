@@ -1,7 +1,9 @@
 """Screenshot capture functionality"""
+import base64
+import struct
 import logging
 from enum import Enum, auto
-from typing import Optional, Tuple, Any
+from typing import Optional, Tuple, Any, List, Dict
 
 try:
     from PIL import Image
@@ -14,6 +16,44 @@ except ImportError:
     )
 
 
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Script that scrolls an element into view and returns its viewport rectangle,
+# the scroll offset and the device pixel ratio
+_ELEMENT_RECT_SCRIPT = """
+var element = arguments[0];
+var rect = element.getBoundingClientRect();
+if (rect.bottom < 0 || rect.right < 0 || rect.top > window.innerHeight || rect.left > window.innerWidth) {
+    element.scrollIntoView({block: 'nearest', inline: 'nearest'});
+    rect = element.getBoundingClientRect();
+}
+return {
+    left: rect.left, top: rect.top, width: rect.width, height: rect.height,
+    scrollX: window.pageXOffset, scrollY: window.pageYOffset,
+    dpr: window.devicePixelRatio || 1
+};
+"""
+
+
+def read_png_size(png_data: bytes) -> Tuple[int, int]:
+    """
+    Read the dimensions of a PNG image from its header without decoding it
+
+    Args:
+        png_data: PNG bytes
+
+    Returns:
+        Image size as (width, height)
+
+    Raises:
+        ValueError: If the data does not start with a PNG header
+    """
+    # The IHDR chunk always comes first: signature, length, "IHDR", width, height
+    if len(png_data) < 24 or not png_data.startswith(PNG_SIGNATURE) or png_data[12:16] != b"IHDR":
+        raise ValueError("Data is not a PNG image")
+    return struct.unpack(">II", png_data[16:24])
+
+
 class CaptureMode(Enum):
     """Modes for capturing screenshots"""
     FULL_SCREEN = auto()
@@ -21,6 +61,32 @@ class CaptureMode(Enum):
     REGION = auto()
 
 
+class RawCapture:
+    """
+    Screenshot bytes grabbed from the driver, not yet decoded
+
+    Holds everything needed to produce the final image without touching
+    the driver again, so decoding and cropping can run on another thread.
+    Captures without a crop box are written as-is and never decoded.
+    """
+
+    def __init__(self, png_data: bytes, box: Optional[Tuple[int, int, int, int]] = None):
+        """
+        Initialize the raw capture
+
+        Args:
+            png_data: PNG bytes returned by the driver
+            box: Crop box as (left, top, right, bottom), or None for the whole page
+        """
+        self.png_data = png_data
+        self.box = box
+
+    @property
+    def needs_decode(self) -> bool:
+        """Get whether the image has to be decoded before it can be written"""
+        return self.box is not None
+
+
 class ScreenshotCapture:
     """
     Captures screenshots in different modes
@@ -63,6 +129,9 @@ class ScreenshotCapture:
         """
         Capture a screenshot of an element
         
+        Uses the driver's per-element screenshot when available, then a
+        DevTools clip capture, and only then crops a full-page capture.
+        
         Args:
             driver: Selenium WebDriver instance
             element: WebElement to capture
@@ -80,23 +149,39 @@ class ScreenshotCapture:
             raise ValueError("Element cannot be None")
             
         try:
-            # Capture full screen first
-            img = self.capture_full_screen(driver)
+            return self.decode(self._grab_element(driver, element))
+        except Exception as e:
+            self.logger.error(f"Error capturing element: {str(e)}")
+            raise
+    
+    def capture_regions(self, driver: Any, regions: List[Tuple[int, int, int, int]]) -> List[Image.Image]:
+        """
+        Capture several regions of the same page from a single screenshot
+        
+        The page is captured and decoded once and every region is cropped
+        from that frame.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            regions: Regions to capture, as passed to capture_region()
             
-            # Get element location and size
-            location = element.location
-            size = element.size
+        Returns:
+            PIL Image objects, one per region
+            
+        Raises:
+            ValueError: If driver is None or no regions are given
+        """
+        if driver is None:
+            raise ValueError("Driver cannot be None")
             
-            # Calculate coordinates
-            left = location['x']
-            top = location['y']
-            right = left + size['width']
-            bottom = top + size['height']
+        if not regions:
+            raise ValueError("Regions cannot be empty")
             
-            # Crop the image
-            return img.crop((left, top, right, bottom))
+        try:
+            frame = self.capture_full_screen(driver)
+            return [frame.crop(region) for region in regions]
         except Exception as e:
-            self.logger.error(f"Error capturing element: {str(e)}")
+            self.logger.error(f"Error capturing regions: {str(e)}")
             raise
     
     def capture_region(self, driver: Any, region: Tuple[int, int, int, int]) -> Image.Image:
@@ -159,3 +244,143 @@ class ScreenshotCapture:
             return self.capture_region(driver, region)
         else:
             raise ValueError(f"Unsupported capture mode: {mode}")
+
+    def grab(
+        self,
+        driver: Any,
+        mode: CaptureMode = CaptureMode.FULL_SCREEN,
+        element: Optional[Any] = None,
+        region: Optional[Tuple[int, int, int, int]] = None
+    ) -> RawCapture:
+        """
+        Grab the raw screenshot bytes and crop box without decoding the image
+
+        Everything that needs the driver (the screenshot itself and the element
+        geometry) happens here; decode() does the rest.
+
+        Args:
+            driver: Selenium WebDriver instance
+            mode: Capture mode (full screen, element, region)
+            element: WebElement to capture (required for ELEMENT mode)
+            region: Region to capture (required for REGION mode)
+
+        Returns:
+            Raw capture to pass to decode()
+
+        Raises:
+            ValueError: If required parameters are missing for the selected mode
+        """
+        if driver is None:
+            raise ValueError("Driver cannot be None")
+
+        if mode == CaptureMode.FULL_SCREEN:
+            box = None
+        elif mode == CaptureMode.ELEMENT:
+            if element is None:
+                raise ValueError("Element cannot be None")
+            return self._grab_element(driver, element)
+        elif mode == CaptureMode.REGION:
+            if region is None:
+                raise ValueError("Region cannot be None")
+            box = tuple(region)
+        else:
+            raise ValueError(f"Unsupported capture mode: {mode}")
+
+        return RawCapture(driver.get_screenshot_as_png(), box)
+
+    def decode(self, raw: RawCapture) -> Image.Image:
+        """
+        Decode a raw capture into an image, cropping it if needed
+
+        Args:
+            raw: Raw capture returned by grab()
+
+        Returns:
+            PIL Image object
+        """
+        image = Image.open(BytesIO(raw.png_data))
+        if raw.box is not None:
+            return image.crop(raw.box)
+        return image
+    
+    def _grab_element(self, driver: Any, element: Any) -> RawCapture:
+        """
+        Grab the screenshot of an element, preferring captures of just the element
+        
+        Args:
+            driver: Selenium WebDriver instance
+            element: WebElement to capture
+            
+        Returns:
+            Raw capture of the element (with a crop box only for the full-page fallback)
+        """
+        # The driver's own element screenshot handles scrolling and pixel ratio
+        try:
+            png_data = element.screenshot_as_png
+            if isinstance(png_data, bytes):
+                return RawCapture(png_data)
+        except Exception as e:
+            self.logger.debug(f"Element screenshot not supported: {str(e)}")
+        
+        rect = self._get_element_rect(driver, element)
+        
+        # Ask DevTools to capture only the element's rectangle
+        if rect is not None and hasattr(driver, "execute_cdp_cmd"):
+            try:
+                response = driver.execute_cdp_cmd("Page.captureScreenshot", {
+                    "format": "png",
+                    "captureBeyondViewport": True,
+                    "clip": {
+                        "x": rect["left"] + rect["scrollX"],
+                        "y": rect["top"] + rect["scrollY"],
+                        "width": rect["width"],
+                        "height": rect["height"],
+                        "scale": 1
+                    }
+                })
+                if isinstance(response, dict) and isinstance(response.get("data"), str):
+                    return RawCapture(base64.b64decode(response["data"]))
+            except Exception as e:
+                self.logger.debug(f"Clip capture not supported: {str(e)}")
+        
+        # Fall back to cropping the viewport screenshot
+        if rect is not None:
+            dpr = rect["dpr"]
+            box = (
+                round(rect["left"] * dpr),
+                round(rect["top"] * dpr),
+                round((rect["left"] + rect["width"]) * dpr),
+                round((rect["top"] + rect["height"]) * dpr)
+            )
+        else:
+            location = element.location
+            size = element.size
+            box = (
+                location['x'],
+                location['y'],
+                location['x'] + size['width'],
+                location['y'] + size['height']
+            )
+        return RawCapture(driver.get_screenshot_as_png(), box)
+    
+    def _get_element_rect(self, driver: Any, element: Any) -> Optional[Dict[str, float]]:
+        """
+        Get the viewport rectangle, scroll offset and pixel ratio of an element
+        
+        Args:
+            driver: Selenium WebDriver instance
+            element: WebElement to measure
+            
+        Returns:
+            Rectangle dictionary, or None if the driver cannot run scripts
+        """
+        try:
+            rect = driver.execute_script(_ELEMENT_RECT_SCRIPT, element)
+        except Exception as e:
+            self.logger.debug(f"Could not measure element: {str(e)}")
+            return None
+        
+        keys = ("left", "top", "width", "height", "scrollX", "scrollY", "dpr")
+        if not isinstance(rect, dict) or not all(isinstance(rect.get(key), (int, float)) for key in keys):
+            return None
+        return rect
@@ -0,0 +1,433 @@
+"""Indexed catalog of saved screenshots"""
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+from src.core.utils.screenshot_encoding import IMAGE_EXTENSIONS
+
+
+# Screenshot filenames: name_YYYYmmdd_HHMMSS_mmm.<ext>, optionally with a _N collision suffix
+_FILENAME_PATTERN = re.compile(
+    r"^(?P<name>.*)_\d{8}_\d{6}_\d{3}(?:_\d+)?\.(?:png|webp|jpe?g)$", re.IGNORECASE
+)
+
+
+class ScreenshotCatalog:
+    """
+    SQLite index of screenshots and their metadata
+
+    Screenshots are indexed by creation time, workflow, action and name, so
+    "latest" and time-range queries are index lookups instead of a directory
+    scan, and metadata is read from the catalog instead of sidecar files.
+    Content-addressed storage also records the blob each screenshot refers to.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS screenshots (
+        path TEXT PRIMARY KEY,
+        name TEXT,
+        workflow_id TEXT,
+        action_id TEXT,
+        created_at REAL NOT NULL,
+        size_bytes INTEGER,
+        metadata TEXT,
+        content_hash TEXT,
+        phash TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_screenshots_created ON screenshots (created_at);
+    CREATE INDEX IF NOT EXISTS idx_screenshots_workflow ON screenshots (workflow_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_screenshots_action ON screenshots (action_id, created_at);
+    CREATE INDEX IF NOT EXISTS idx_screenshots_name ON screenshots (name, created_at);
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize the screenshot catalog
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self._SCHEMA)
+            # Catalogs created before blobs were recorded lack their columns
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(screenshots)")}
+            for column in ("content_hash", "phash"):
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE screenshots ADD COLUMN {column} TEXT")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_screenshots_content ON screenshots (content_hash)"
+            )
+
+    def add(
+        self,
+        path: str,
+        name: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[float] = None,
+        size_bytes: Optional[int] = None,
+        content_hash: Optional[str] = None,
+        phash: Optional[str] = None
+    ) -> None:
+        """
+        Add or replace a screenshot in the catalog
+
+        Args:
+            path: Path to the screenshot
+            name: Base name the screenshot was saved under
+            metadata: Metadata of the screenshot; "workflow_id" and "action_id" are indexed
+            created_at: Creation time as a POSIX timestamp (now if not provided)
+            size_bytes: Size of the screenshot file
+            content_hash: Hash of the blob the screenshot refers to, for content-addressed storage
+            phash: Perceptual hash of the blob as a hex string, if computed
+        """
+        metadata = metadata or {}
+        if created_at is None:
+            created_at = self._parse_timestamp(metadata.get("timestamp"))
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO screenshots "
+                "(path, name, workflow_id, action_id, created_at, size_bytes, metadata, content_hash, phash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    os.path.abspath(path),
+                    name,
+                    metadata.get("workflow_id"),
+                    metadata.get("action_id"),
+                    created_at,
+                    size_bytes,
+                    json.dumps(metadata, default=str),
+                    content_hash,
+                    phash
+                )
+            )
+
+    def remove(self, paths: Iterable[str]) -> int:
+        """
+        Remove screenshots from the catalog
+
+        Args:
+            paths: Paths of the screenshots to remove
+
+        Returns:
+            Number of screenshots removed
+        """
+        rows = [(os.path.abspath(path),) for path in paths]
+        with self._lock, self._connection:
+            cursor = self._connection.executemany("DELETE FROM screenshots WHERE path = ?", rows)
+            return cursor.rowcount
+
+    def get_metadata(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata of a screenshot
+
+        Args:
+            path: Path to the screenshot
+
+        Returns:
+            Metadata dictionary, or None if the screenshot is not in the catalog
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT metadata FROM screenshots WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]) if row[0] else {}
+
+    def get_content_hash(self, path: str) -> Optional[str]:
+        """
+        Get the hash of the blob a screenshot refers to
+
+        Args:
+            path: Path to the screenshot
+
+        Returns:
+            Blob hash, or None if the screenshot is unknown or not content-addressed
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content_hash FROM screenshots WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def content_hashes(self) -> Dict[str, Optional[str]]:
+        """
+        Get the blobs the catalogued screenshots refer to
+
+        Returns:
+            Perceptual hash (hex string, or None) by blob hash
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT content_hash, MAX(phash) FROM screenshots "
+                "WHERE content_hash IS NOT NULL GROUP BY content_hash"
+            ).fetchall()
+        return dict(rows)
+
+    def contains(self, path: str) -> bool:
+        """
+        Check whether a screenshot is in the catalog
+
+        Args:
+            path: Path to the screenshot
+
+        Returns:
+            True if the screenshot is in the catalog
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM screenshots WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        return row is not None
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        workflow_id: Optional[str] = None,
+        action_id: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = True
+    ) -> List[str]:
+        """
+        Find screenshots matching the given filters
+
+        Args:
+            start: Earliest creation time (POSIX timestamp, inclusive)
+            end: Latest creation time (POSIX timestamp, exclusive)
+            workflow_id: Only screenshots taken by this workflow
+            action_id: Only screenshots taken by this action
+            name: Only screenshots saved under this base name
+            limit: Maximum number of screenshots to return
+            newest_first: Whether to order the results newest first
+
+        Returns:
+            Paths of the matching screenshots
+        """
+        return [row[0] for row in self._select("path", start, end, workflow_id, action_id, name, limit, newest_first)]
+
+    def query_records(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        workflow_id: Optional[str] = None,
+        action_id: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Find screenshots matching the given filters, with their catalog fields
+
+        Args:
+            start: Earliest creation time (POSIX timestamp, inclusive)
+            end: Latest creation time (POSIX timestamp, exclusive)
+            workflow_id: Only screenshots taken by this workflow
+            action_id: Only screenshots taken by this action
+            name: Only screenshots saved under this base name
+            limit: Maximum number of screenshots to return
+            newest_first: Whether to order the results newest first
+
+        Returns:
+            Dictionaries with path, name, workflow_id, action_id, created_at and size_bytes
+        """
+        columns = ("path", "name", "workflow_id", "action_id", "created_at", "size_bytes")
+        rows = self._select(", ".join(columns), start, end, workflow_id, action_id, name, limit, newest_first)
+        return [dict(zip(columns, row)) for row in rows]
+
+    def latest(self, workflow_id: Optional[str] = None, action_id: Optional[str] = None) -> Optional[str]:
+        """
+        Get the most recent screenshot
+
+        Args:
+            workflow_id: Only consider screenshots taken by this workflow
+            action_id: Only consider screenshots taken by this action
+
+        Returns:
+            Path of the most recent screenshot, or None if there is none
+        """
+        paths = self.query(workflow_id=workflow_id, action_id=action_id, limit=1)
+        return paths[0] if paths else None
+
+    def query_workflow_overflow(self, max_per_workflow: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find screenshots beyond the newest max_per_workflow of each workflow, oldest first
+
+        Screenshots without a workflow are not counted.
+
+        Args:
+            max_per_workflow: Number of screenshots to keep per workflow
+            limit: Maximum number of screenshots to return
+
+        Returns:
+            Dictionaries with path, created_at and size_bytes
+        """
+        sql = (
+            "SELECT path, created_at, size_bytes FROM ("
+            "SELECT path, created_at, size_bytes, ROW_NUMBER() OVER "
+            "(PARTITION BY workflow_id ORDER BY created_at DESC) AS position "
+            "FROM screenshots WHERE workflow_id IS NOT NULL"
+            ") WHERE position > ? ORDER BY created_at ASC"
+        )
+        return self._select_records(sql, [max_per_workflow], limit)
+
+    def query_size_overflow(self, max_total_bytes: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find the oldest screenshots that have to go to bring the total size under a limit
+
+        Args:
+            max_total_bytes: Maximum total size of the screenshots to keep
+            limit: Maximum number of screenshots to return
+
+        Returns:
+            Dictionaries with path, created_at and size_bytes, oldest first
+        """
+        sql = (
+            "SELECT path, created_at, size_bytes FROM ("
+            "SELECT path, created_at, size_bytes, SUM(COALESCE(size_bytes, 0)) OVER "
+            "(ORDER BY created_at DESC, path ROWS UNBOUNDED PRECEDING) AS kept_bytes "
+            "FROM screenshots"
+            ") WHERE kept_bytes > ? ORDER BY created_at ASC"
+        )
+        return self._select_records(sql, [max_total_bytes], limit)
+
+    def total_bytes(self) -> int:
+        """
+        Get the total size of the screenshots in the catalog
+
+        Returns:
+            Total size in bytes
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM screenshots"
+            ).fetchone()[0]
+
+    def count(self) -> int:
+        """
+        Get the number of screenshots in the catalog
+
+        Returns:
+            Number of screenshots
+        """
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM screenshots").fetchone()[0]
+
+    def rebuild(self, screenshot_dir: str) -> int:
+        """
+        Add the screenshots of a directory that are missing from the catalog
+
+        Used when a catalog is first opened on a directory that already holds
+        screenshots. Creation times come from the sidecar metadata or the file
+        modification time.
+
+        Args:
+            screenshot_dir: Directory to scan
+
+        Returns:
+            Number of screenshots added
+        """
+        added = 0
+        for filename in os.listdir(screenshot_dir):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(screenshot_dir, filename)
+            if self.contains(path):
+                continue
+            metadata = {}
+            if os.path.exists(path + ".json"):
+                try:
+                    with open(path + ".json", 'r') as f:
+                        metadata = json.load(f)
+                except Exception as e:
+                    self.logger.error(f"Error loading metadata: {str(e)}")
+            stat = os.stat(path)
+            created_at = self._parse_timestamp(metadata.get("timestamp"), default=stat.st_mtime)
+            self.add(path, self.name_from_filename(filename), metadata, created_at, stat.st_size)
+            added += 1
+        return added
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def _select(
+        self,
+        columns: str,
+        start: Optional[float],
+        end: Optional[float],
+        workflow_id: Optional[str],
+        action_id: Optional[str],
+        name: Optional[str],
+        limit: Optional[int],
+        newest_first: bool
+    ) -> List[Tuple]:
+        """Run an indexed select with the given filters"""
+        clauses, params = [], []
+        for column, value in (("workflow_id", workflow_id), ("action_id", action_id), ("name", name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("created_at < ?")
+            params.append(end)
+
+        sql = f"SELECT {columns} FROM screenshots"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at " + ("DESC" if newest_first else "ASC")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _select_records(self, sql: str, params: List[Any], limit: Optional[int]) -> List[Dict[str, Any]]:
+        """Run a select returning path, created_at and size_bytes rows"""
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = params + [limit]
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [{"path": row[0], "created_at": row[1], "size_bytes": row[2]} for row in rows]
+
+    @staticmethod
+    def _parse_timestamp(value: Any, default: Optional[float] = None) -> float:
+        """Convert an ISO timestamp from metadata to a POSIX timestamp"""
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value).timestamp()
+            except ValueError:
+                pass
+        return default if default is not None else datetime.now().timestamp()
+
+    @staticmethod
+    def name_from_filename(filename: str) -> str:
+        """
+        Get the base name a screenshot was saved under from its filename
+
+        Args:
+            filename: Screenshot filename or path
+
+        Returns:
+            Base name (the filename without extension if it does not follow the naming scheme)
+        """
+        filename = os.path.basename(filename)
+        match = _FILENAME_PATTERN.match(filename)
+        return match.group("name") if match else os.path.splitext(filename)[0]
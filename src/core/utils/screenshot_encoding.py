@@ -0,0 +1,291 @@
+"""Encoding profiles for saved screenshots"""
+import threading
+from io import BytesIO
+from typing import Dict, Any, Optional, Union, List, Tuple, BinaryIO, ClassVar
+
+from PIL import Image
+
+
+# File extensions of the formats screenshots can be saved in
+IMAGE_EXTENSIONS = (".png", ".webp", ".jpg", ".jpeg")
+
+
+class EncodingProfile:
+    """
+    How a screenshot is encoded when it is written
+
+    A profile picks the file format (PNG, WebP or JPEG), the quality of the
+    lossy formats, the PNG compression level, an optional downscale (a scale
+    factor and/or maximum dimensions, keeping the aspect ratio) and an
+    optional conversion to grayscale.
+    """
+
+    # Format name -> (PIL format, file extension)
+    FORMATS: ClassVar[Dict[str, Tuple[str, str]]] = {
+        "png": ("PNG", ".png"),
+        "webp": ("WEBP", ".webp"),
+        "jpeg": ("JPEG", ".jpg")
+    }
+
+    def __init__(
+        self,
+        format: str = "png",
+        quality: Optional[int] = None,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        scale: Optional[float] = None,
+        compress_level: Optional[int] = None,
+        grayscale: bool = False
+    ):
+        """
+        Initialize the encoding profile
+
+        Args:
+            format: File format ("png", "webp" or "jpeg")
+            quality: Quality of lossy formats from 1 to 100 (the encoder's default if not provided)
+            max_width: Maximum width in pixels
+            max_height: Maximum height in pixels
+            scale: Factor to scale the image by, from 0 (exclusive) to 1
+            compress_level: PNG compression level from 0 (fastest) to 9 (smallest)
+            grayscale: Whether to convert the image to grayscale
+
+        Raises:
+            ValueError: If a setting is out of range
+        """
+        format = format.lower()
+        if format == "jpg":
+            format = "jpeg"
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {format}")
+        if quality is not None and not 1 <= quality <= 100:
+            raise ValueError("quality must be between 1 and 100")
+        if compress_level is not None and not 0 <= compress_level <= 9:
+            raise ValueError("compress_level must be between 0 and 9")
+        if scale is not None and not 0 < scale <= 1:
+            raise ValueError("scale must be greater than 0 and at most 1")
+        for dimension in (max_width, max_height):
+            if dimension is not None and dimension < 1:
+                raise ValueError("Maximum dimensions must be at least 1")
+
+        self.format = format
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.scale = scale
+        self.compress_level = compress_level
+        self.grayscale = grayscale
+
+    @property
+    def extension(self) -> str:
+        """Get the file extension of the format"""
+        return self.FORMATS[self.format][1]
+
+    @property
+    def is_passthrough(self) -> bool:
+        """Get whether PNG bytes from the driver can be written as they are"""
+        return (
+            self.format == "png"
+            and self.compress_level is None
+            and not self.grayscale
+            and self.scale is None
+            and self.max_width is None
+            and self.max_height is None
+        )
+
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """
+        Apply the profile's downscale and color conversion to an image
+
+        Args:
+            image: Image to prepare
+
+        Returns:
+            Prepared image (the same image if the profile changes nothing)
+        """
+        size = self._target_size(image.width, image.height) if self._resizes else None
+        if size and size != (image.width, image.height):
+            # reducing_gap downsamples in large steps first, which is much faster on big pages
+            image = image.resize(size, Image.LANCZOS, reducing_gap=2.0)
+        if self.grayscale and image.mode != "L":
+            image = image.convert("L")
+        elif self.format == "jpeg" and image.mode not in ("RGB", "L"):
+            # JPEG has no alpha channel
+            image = image.convert("RGB")
+        return image
+
+    def save(self, image: Image.Image, fp: Union[str, BinaryIO]) -> Image.Image:
+        """
+        Prepare an image and write it encoded with this profile
+
+        Args:
+            image: Image to save
+            fp: Path or binary file to write to
+
+        Returns:
+            The prepared image that was written
+        """
+        image = self.prepare(image)
+        image.save(fp, **self.save_options())
+        return image
+
+    def encode(self, image: Image.Image) -> Tuple[bytes, Image.Image]:
+        """
+        Prepare an image and encode it in memory
+
+        Args:
+            image: Image to encode
+
+        Returns:
+            Tuple of the encoded bytes and the prepared image
+        """
+        buffer = BytesIO()
+        image = self.save(image, buffer)
+        return buffer.getvalue(), image
+
+    def save_options(self) -> Dict[str, Any]:
+        """
+        Get the keyword arguments for PIL's Image.save
+
+        Returns:
+            Dictionary of save options
+        """
+        options: Dict[str, Any] = {"format": self.FORMATS[self.format][0]}
+        if self.format == "png":
+            if self.compress_level is not None:
+                options["compress_level"] = self.compress_level
+        elif self.quality is not None:
+            options["quality"] = self.quality
+        return options
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the profile to a dictionary"""
+        return {
+            "format": self.format,
+            "quality": self.quality,
+            "max_width": self.max_width,
+            "max_height": self.max_height,
+            "scale": self.scale,
+            "compress_level": self.compress_level,
+            "grayscale": self.grayscale
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EncodingProfile':
+        """
+        Create a profile from a dictionary
+
+        Args:
+            data: Dictionary representation of the profile
+
+        Returns:
+            Instantiated profile
+        """
+        return cls(
+            format=data.get("format", "png"),
+            quality=data.get("quality"),
+            max_width=data.get("max_width"),
+            max_height=data.get("max_height"),
+            scale=data.get("scale"),
+            compress_level=data.get("compress_level"),
+            grayscale=data.get("grayscale", False)
+        )
+
+    @property
+    def _resizes(self) -> bool:
+        """Get whether the profile may change the image size"""
+        return self.scale is not None or self.max_width is not None or self.max_height is not None
+
+    def _target_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Compute the downscaled size, keeping the aspect ratio"""
+        factor = self.scale if self.scale is not None else 1.0
+        if self.max_width is not None:
+            factor = min(factor, self.max_width / width)
+        if self.max_height is not None:
+            factor = min(factor, self.max_height / height)
+        if factor >= 1.0:
+            return width, height
+        return max(1, round(width * factor)), max(1, round(height * factor))
+
+
+class EncodingProfileRegistry:
+    """
+    Named encoding profiles and the global default
+
+    Actions select a profile by name (or give one inline); storages without
+    a profile of their own use the global default.
+    """
+
+    _registry: ClassVar[Dict[str, EncodingProfile]] = {
+        "png": EncodingProfile(),
+        "png_fast": EncodingProfile(compress_level=1),
+        "webp": EncodingProfile("webp", quality=70),
+        "jpeg": EncodingProfile("jpeg", quality=70),
+        "thumbnail": EncodingProfile("jpeg", quality=70, scale=0.5)
+    }
+    _default: ClassVar[EncodingProfile] = _registry["png"]
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def register(cls, name: str, profile: EncodingProfile) -> None:
+        """
+        Register a named profile, replacing any profile of that name
+
+        Args:
+            name: Name actions select the profile by
+            profile: Profile to register
+        """
+        with cls._lock:
+            cls._registry[name] = profile
+
+    @classmethod
+    def get(cls, profile: Optional[Union[str, Dict[str, Any], EncodingProfile]] = None) -> EncodingProfile:
+        """
+        Resolve a profile name, dictionary or profile
+
+        Args:
+            profile: Registered name, profile dictionary, profile, or None for the default
+
+        Returns:
+            The resolved profile
+
+        Raises:
+            ValueError: If the name is not registered or the dictionary is invalid
+        """
+        if profile is None:
+            return cls.get_default()
+        if isinstance(profile, EncodingProfile):
+            return profile
+        if isinstance(profile, dict):
+            return EncodingProfile.from_dict(profile)
+        with cls._lock:
+            resolved = cls._registry.get(profile)
+        if resolved is None:
+            raise ValueError(f"Unknown screenshot encoding profile: {profile}")
+        return resolved
+
+    @classmethod
+    def get_default(cls) -> EncodingProfile:
+        """Get the global default profile"""
+        with cls._lock:
+            return cls._default
+
+    @classmethod
+    def set_default(cls, profile: Union[str, Dict[str, Any], EncodingProfile]) -> None:
+        """
+        Set the global default profile
+
+        Args:
+            profile: Registered name, profile dictionary or profile
+
+        Raises:
+            ValueError: If the name is not registered or the dictionary is invalid
+        """
+        resolved = cls.get(profile)
+        with cls._lock:
+            cls._default = resolved
+
+    @classmethod
+    def get_registered_names(cls) -> List[str]:
+        """Get the names of the registered profiles"""
+        with cls._lock:
+            return list(cls._registry.keys())
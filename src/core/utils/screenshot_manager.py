@@ -1,10 +1,15 @@
 """Screenshot management functionality"""
+import os
 import logging
-from typing import List, Optional, Tuple, Dict, Any
+import threading
+from typing import List, Optional, Tuple, Dict, Any, ClassVar
 
 from src.core.utils.screenshot_capture import ScreenshotCapture, CaptureMode
-from src.core.utils.screenshot_storage import ScreenshotStorage
+from src.core.utils.screenshot_storage import ScreenshotStorage, Encoding
+from src.core.utils.content_addressed_storage import ContentAddressedStorage
 from src.core.utils.screenshot_cleaner import ScreenshotCleaner
+from src.core.utils.screenshot_pipeline import ScreenshotPipeline
+from src.core.utils.screenshot_retention import RetentionPolicy, ScreenshotRetentionService
 
 
 class ScreenshotManager:
@@ -12,23 +17,156 @@ class ScreenshotManager:
     Manager for capturing, storing, and cleaning up screenshots
 
     This class uses composition to delegate to specialized classes
-    for each responsibility.
+    for each responsibility. Screenshots can be written in the background
+    through a ScreenshotPipeline; call flush() before reading them back.
     """
 
-    def __init__(self, screenshot_dir: str = "screenshots"):
+    # Long-lived managers shared by actions, keyed by screenshot directory and storage layout
+    _shared: ClassVar[Dict[Tuple[str, bool], 'ScreenshotManager']] = {}
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        screenshot_dir: str = "screenshots",
+        async_writes: bool = False,
+        max_workers: int = 2,
+        queue_limit: int = 16,
+        storage: Optional[ScreenshotStorage] = None
+    ):
         """
         Initialize the screenshot manager
 
         Args:
             screenshot_dir: Directory to store screenshots
+            async_writes: Whether to decode and write screenshots in the background by default
+            max_workers: Number of background worker threads
+            queue_limit: Maximum number of screenshots waiting to be written
+            storage: Storage backend to use (a ScreenshotStorage for screenshot_dir if not provided)
         """
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.async_writes = async_writes
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._pipeline: Optional[ScreenshotPipeline] = None
+        self._pipeline_lock = threading.Lock()
+        self.retention: Optional[ScreenshotRetentionService] = None
 
         # Create specialized components
         self.capture = ScreenshotCapture()
-        self.storage = ScreenshotStorage(screenshot_dir)
+        self.storage = storage or ScreenshotStorage(screenshot_dir)
         self.cleaner = ScreenshotCleaner()
 
+    @classmethod
+    def shared(
+        cls,
+        screenshot_dir: str = "screenshots",
+        max_workers: int = 2,
+        queue_limit: int = 16,
+        content_addressed: bool = False,
+        near_duplicate_threshold: Optional[int] = None,
+        retention: Optional[RetentionPolicy] = None,
+        retention_interval: float = 60.0
+    ) -> 'ScreenshotManager':
+        """
+        Get the long-lived manager for a screenshot directory, creating it if needed
+
+        Shared managers index their screenshots in a catalog. The worker
+        settings and the near-duplicate threshold only apply when the manager
+        is created. If the directory was removed, a new manager replaces the
+        old one, which is closed.
+
+        A retention policy is enforced in the background from the first call
+        that passes one; later policies for the same manager are ignored, so
+        call start_retention() to change it.
+
+        Args:
+            screenshot_dir: Directory to store screenshots
+            max_workers: Number of background worker threads
+            queue_limit: Maximum number of screenshots waiting to be written
+            content_addressed: Whether to store each unique screenshot only once
+            near_duplicate_threshold: Maximum number of differing perceptual hash bits
+                for content-addressed captures to share a blob (None for identical bytes only)
+            retention: Limits to enforce on the directory's screenshots
+            retention_interval: Time between retention runs (seconds)
+
+        Returns:
+            Manager shared by everyone writing to the directory
+        """
+        key = (os.path.abspath(screenshot_dir), content_addressed)
+        replaced = None
+        with cls._shared_lock:
+            manager = cls._shared.get(key)
+            if manager is None or not os.path.isdir(key[0]):
+                replaced = manager
+                if content_addressed:
+                    storage = ContentAddressedStorage(
+                        screenshot_dir, near_duplicate_threshold, use_catalog=True
+                    )
+                else:
+                    storage = ScreenshotStorage(screenshot_dir, use_catalog=True)
+                manager = cls(screenshot_dir, max_workers=max_workers, queue_limit=queue_limit, storage=storage)
+                cls._shared[key] = manager
+            if retention is not None and manager.retention is None:
+                manager.start_retention(retention, interval=retention_interval)
+        if replaced is not None:
+            # The directory was removed; stop the old manager's workers outside the lock
+            replaced.close()
+        return manager
+
+    @classmethod
+    def flush_all(cls, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the shared managers have written every queued screenshot
+
+        Args:
+            timeout: Maximum time to wait per manager (seconds), or None to wait indefinitely
+
+        Returns:
+            True if every queue drained, False if a timeout expired first
+        """
+        with cls._shared_lock:
+            managers = list(cls._shared.values())
+        return all([manager.flush(timeout) for manager in managers])
+
+    @classmethod
+    def flush_on_workflow_end(cls, engine: Any, timeout: Optional[float] = None) -> None:
+        """
+        Register a listener that flushes the shared managers when a workflow ends
+
+        Screenshots queued by a workflow are then on disk by the time
+        execute_workflow returns. WorkflowEngine flushes the shared managers
+        itself when a run ends; use this with other engines that dispatch
+        workflow events.
+
+        Args:
+            engine: Workflow engine to listen to
+            timeout: Maximum time to wait per manager (seconds), or None to wait indefinitely
+        """
+        logger = logging.getLogger(cls.__name__)
+        end_events = {"WORKFLOW_COMPLETED", "WORKFLOW_FAILED", "WORKFLOW_ABORTED"}
+
+        def flush_listener(event: Any) -> None:
+            if event.event_type.name not in end_events:
+                return
+            if not cls.flush_all(timeout):
+                logger.warning(f"Screenshots of workflow {event.workflow_id} still pending after flush timeout")
+
+        # Listen to all events so the workflow package does not have to be imported here
+        engine.add_event_listener(None, flush_listener)
+
+    @property
+    def pipeline(self) -> ScreenshotPipeline:
+        """Get the background pipeline, starting it on first use"""
+        with self._pipeline_lock:
+            if self._pipeline is None:
+                self._pipeline = ScreenshotPipeline(
+                    self.storage,
+                    self.capture,
+                    max_workers=self.max_workers,
+                    queue_limit=self.queue_limit
+                )
+            return self._pipeline
+
     def capture(self, *args, **kwargs) -> str:
         """
         Capture and save a screenshot (legacy method for backward compatibility)
@@ -45,7 +183,9 @@ class ScreenshotManager:
         mode: CaptureMode = CaptureMode.FULL_SCREEN,
         element: Optional[Any] = None,
         region: Optional[Tuple[int, int, int, int]] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        background: Optional[bool] = None,
+        encoding: Optional[Encoding] = None
     ) -> str:
         """
         Capture and save a screenshot
@@ -57,15 +197,129 @@ class ScreenshotManager:
             element: WebElement to capture (required for ELEMENT mode)
             region: Region to capture as (x, y, width, height) (required for REGION mode)
             metadata: Optional metadata to associate with the screenshot
+            background: Whether to decode and write the screenshot in the background
+                (defaults to the manager's async_writes setting)
+            encoding: Encoding profile, profile name or profile dictionary to save with
+                (the storage's profile if not provided)
 
         Returns:
-            Path to the saved screenshot
+            Path to the saved screenshot (which may still be being written in the background)
         """
+        if self.async_writes if background is None else background:
+            # Only grab the bytes here; decoding and writing happen on the pipeline
+            raw = self.capture.grab(driver, mode, element, region)
+            return self.pipeline.submit(raw, name, metadata, encoding=encoding)
+
+        if mode == CaptureMode.FULL_SCREEN:
+            # The driver already returns PNG, so the default profile writes it without re-encoding
+            raw = self.capture.grab(driver, mode)
+            return self.storage.save_png_bytes(raw.png_data, name, metadata, encoding=encoding)
+
         # Capture the screenshot
         image = self.capture.capture(driver, mode, element, region)
 
         # Save the image
-        return self.storage.save_image(image, name, metadata)
+        return self.storage.save_image(image, name, metadata, encoding=encoding)
+
+    def capture_regions_and_save(
+        self,
+        driver: Any,
+        name: str,
+        regions: List[Tuple[int, int, int, int]],
+        metadata: Optional[Dict[str, Any]] = None,
+        background: Optional[bool] = None,
+        encoding: Optional[Encoding] = None
+    ) -> List[str]:
+        """
+        Capture and save several regions of the current page from one screenshot
+
+        Args:
+            driver: Selenium WebDriver instance
+            name: Base name for the screenshots
+            regions: Regions to capture, as passed to capture_and_save()
+            metadata: Optional metadata to associate with each screenshot
+            background: Whether to decode and write the screenshots in the background
+                (defaults to the manager's async_writes setting)
+            encoding: Encoding profile, profile name or profile dictionary to save with
+                (the storage's profile if not provided)
+
+        Returns:
+            Paths to the saved screenshots, in region order
+        """
+        if self.async_writes if background is None else background:
+            raw = self.capture.grab(driver)
+            return self.pipeline.submit_regions(raw.png_data, regions, name, metadata, encoding=encoding)
+
+        profile = self.storage.resolve_encoding(encoding)
+        paths = []
+        for region, image in zip(regions, self.capture.capture_regions(driver, regions)):
+            region_metadata = dict(metadata, region=list(region)) if metadata is not None else None
+            # Reserve each path so regions saved within one millisecond don't collide
+            file_path = self.storage.reserve_path(name, profile.extension)
+            try:
+                paths.append(self.storage.write_image(image, file_path, region_metadata, encoding=profile))
+            finally:
+                self.storage.release_path(file_path)
+        return paths
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every screenshot queued in the background has been written
+
+        Args:
+            timeout: Maximum time to wait (seconds), or None to wait indefinitely
+
+        Returns:
+            True if the queue drained, False if the timeout expired first
+        """
+        with self._pipeline_lock:
+            pipeline = self._pipeline
+        return pipeline.flush(timeout) if pipeline else True
+
+    def close(self) -> None:
+        """Write any queued screenshots and stop the background workers"""
+        self.stop_retention()
+        with self._pipeline_lock:
+            pipeline, self._pipeline = self._pipeline, None
+        if pipeline:
+            pipeline.shutdown(wait=True)
+
+    def start_retention(
+        self,
+        policy: RetentionPolicy,
+        interval: float = 60.0,
+        batch_size: int = 50,
+        batch_pause: float = 0.05
+    ) -> ScreenshotRetentionService:
+        """
+        Enforce a retention policy on a background thread
+
+        Replaces any retention service already running for this manager.
+
+        Args:
+            policy: Limits to enforce
+            interval: Time between retention runs (seconds)
+            batch_size: Maximum number of screenshots deleted per batch
+            batch_pause: Pause between deletion batches (seconds)
+
+        Returns:
+            The running retention service
+
+        Raises:
+            ValueError: If the storage has no catalog
+        """
+        self.stop_retention()
+        self.retention = ScreenshotRetentionService(
+            self.storage, policy, interval=interval, batch_size=batch_size, batch_pause=batch_pause
+        )
+        self.retention.start()
+        return self.retention
+
+    def stop_retention(self) -> None:
+        """Stop the background retention service, if running"""
+        if self.retention:
+            self.retention.stop()
+            self.retention = None
 
     def get_screenshots(self) -> List[str]:
         """
@@ -74,6 +328,7 @@ class ScreenshotManager:
         Returns:
             List of screenshot file paths
         """
+        self.flush()
         return self.storage.get_screenshots()
 
     def get_latest_screenshot(self) -> Optional[str]:
@@ -83,8 +338,35 @@ class ScreenshotManager:
         Returns:
             Path to the latest screenshot, or None if no screenshots exist
         """
+        self.flush()
         return self.storage.get_latest_screenshot()
 
+    def query_screenshots(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        workflow_id: Optional[str] = None,
+        action_id: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        """
+        Find screenshots by creation time, workflow, action or name, newest first
+
+        Args:
+            start: Earliest creation time (POSIX timestamp, inclusive)
+            end: Latest creation time (POSIX timestamp, exclusive)
+            workflow_id: Only screenshots taken by this workflow
+            action_id: Only screenshots taken by this action
+            name: Only screenshots saved under this base name
+            limit: Maximum number of screenshots to return
+
+        Returns:
+            Paths of the matching screenshots
+        """
+        self.flush()
+        return self.storage.query_screenshots(start, end, workflow_id, action_id, name, limit)
+
     def get_screenshot_path(self, filename: str) -> str:
         """
         Get the full path to a screenshot
@@ -120,4 +402,9 @@ class ScreenshotManager:
             Number of screenshots removed
         """
         screenshots = self.get_screenshots()
-        return self.cleaner.cleanup(screenshots, max_screenshots)
+        removed = self.cleaner.cleanup(screenshots, max_screenshots)
+        self.storage.forget(screenshots[max_screenshots:])
+        if isinstance(self.storage, ContentAddressedStorage):
+            # Captures are links to shared blobs; drop the blobs nothing refers to anymore
+            self.storage.collect_garbage()
+        return removed
@@ -0,0 +1,257 @@
+"""Background pipeline for decoding and writing screenshots"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional, Dict, Any, Tuple
+
+from PIL import Image
+
+from src.core.utils.screenshot_capture import ScreenshotCapture, RawCapture
+from src.core.utils.screenshot_encoding import EncodingProfile
+from src.core.utils.screenshot_storage import ScreenshotStorage, Encoding
+
+
+class ScreenshotPipeline:
+    """
+    Decodes, crops, encodes and writes screenshots on a bounded worker pool
+
+    Full-page captures skip decoding and are written as the driver's PNG bytes
+    unless their encoding profile converts, downscales or recompresses them.
+
+    The caller only grabs the raw bytes from the driver; submit() reserves the
+    output path and returns it straight away. At most queue_limit jobs (single
+    screenshots or region batches) can be in flight at once, after which
+    submitting blocks until a worker finishes, so memory stays bounded when
+    capture outpaces the disk.
+    """
+
+    def __init__(
+        self,
+        storage: ScreenshotStorage,
+        capture: ScreenshotCapture,
+        max_workers: int = 2,
+        queue_limit: int = 16,
+        fsync: bool = True
+    ):
+        """
+        Initialize the screenshot pipeline
+
+        Args:
+            storage: Storage the screenshots are written to
+            capture: Capture used to decode raw screenshots
+            max_workers: Number of background worker threads
+            queue_limit: Maximum number of jobs queued or being written
+            fsync: Whether to flush each screenshot to disk before it counts as written
+
+        Raises:
+            ValueError: If max_workers or queue_limit is less than 1
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if queue_limit < 1:
+            raise ValueError("queue_limit must be at least 1")
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.storage = storage
+        self.capture = capture
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.fsync = fsync
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screenshot")
+        self._slots = threading.Semaphore(queue_limit)
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._errors: List[str] = []
+
+    @property
+    def pending(self) -> int:
+        """Get the number of jobs queued or being written"""
+        with self._idle:
+            return self._pending
+
+    @property
+    def errors(self) -> List[str]:
+        """Get the errors of screenshots that could not be written"""
+        with self._idle:
+            return list(self._errors)
+
+    def submit(
+        self,
+        raw: RawCapture,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Queue a raw capture to be decoded and written
+
+        Args:
+            raw: Raw capture grabbed from the driver
+            name: Base name for the screenshot
+            metadata: Optional metadata to associate with the screenshot
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+
+        Returns:
+            Path the screenshot will be written to
+        """
+        profile = self.storage.resolve_encoding(encoding)
+        file_path = self.storage.reserve_path(name, profile.extension)
+        if metadata is not None:
+            # Copy so later changes by the caller don't leak in, and stamp the capture time
+            metadata = dict(metadata)
+            metadata.setdefault("timestamp", datetime.now().isoformat())
+
+        self._slots.acquire()
+        with self._idle:
+            self._pending += 1
+            self._submitted += 1
+        try:
+            self._executor.submit(self._write, raw, file_path, metadata, profile)
+        except Exception as e:
+            self._finish([file_path], [f"{file_path}: {str(e)}"])
+            raise
+
+        return file_path
+
+    def submit_regions(
+        self,
+        png_data: bytes,
+        regions: List[Tuple[int, int, int, int]],
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        encoding: Optional[Encoding] = None
+    ) -> List[str]:
+        """
+        Queue several regions of one screenshot to be cropped and written
+
+        The screenshot is decoded once for the whole batch, which takes a
+        single queue slot.
+
+        Args:
+            png_data: PNG bytes of the page
+            regions: Regions to crop, as passed to Image.crop()
+            name: Base name for the screenshots
+            metadata: Optional metadata to associate with each screenshot
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+
+        Returns:
+            Paths the screenshots will be written to, in region order
+        """
+        profile = self.storage.resolve_encoding(encoding)
+        file_paths = [self.storage.reserve_path(name, profile.extension) for _ in regions]
+        if metadata is not None:
+            metadata = dict(metadata)
+            metadata.setdefault("timestamp", datetime.now().isoformat())
+
+        self._slots.acquire()
+        with self._idle:
+            self._pending += 1
+            self._submitted += len(regions)
+        try:
+            self._executor.submit(self._write_regions, png_data, list(regions), file_paths, metadata, profile)
+        except Exception as e:
+            self._finish(file_paths, [f"{path}: {str(e)}" for path in file_paths])
+            raise
+
+        return file_paths
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued screenshot has been written
+
+        Args:
+            timeout: Maximum time to wait (seconds), or None to wait indefinitely
+
+        Returns:
+            True if the queue drained, False if the timeout expired first
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker pool
+
+        Args:
+            wait: Whether to wait for queued screenshots to be written
+        """
+        self._executor.shutdown(wait=wait)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get counters for the pipeline
+
+        Returns:
+            Dictionary with submitted, completed, failed and pending counts
+        """
+        with self._idle:
+            return {
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": len(self._errors),
+                "pending": self._pending
+            }
+
+    def _write(
+        self,
+        raw: RawCapture,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]],
+        profile: EncodingProfile
+    ) -> None:
+        """Decode a raw capture and write it to its reserved path (runs on a worker)"""
+        errors = []
+        try:
+            if raw.needs_decode:
+                image = self.capture.decode(raw)
+                self.storage.write_image(image, file_path, metadata, fsync=self.fsync, encoding=profile)
+            else:
+                self.storage.write_png_bytes(raw.png_data, file_path, metadata, fsync=self.fsync, encoding=profile)
+        except Exception as e:
+            self.logger.error(f"Error writing screenshot {file_path}: {str(e)}")
+            errors.append(f"{file_path}: {str(e)}")
+        finally:
+            self._finish([file_path], errors)
+
+    def _write_regions(
+        self,
+        png_data: bytes,
+        regions: List[Tuple[int, int, int, int]],
+        file_paths: List[str],
+        metadata: Optional[Dict[str, Any]],
+        profile: EncodingProfile
+    ) -> None:
+        """Decode a screenshot once and write each region to its reserved path (runs on a worker)"""
+        errors = []
+        try:
+            frame = Image.open(BytesIO(png_data))
+            frame.load()
+            for region, file_path in zip(regions, file_paths):
+                try:
+                    region_metadata = dict(metadata, region=list(region)) if metadata is not None else None
+                    self.storage.write_image(
+                        frame.crop(region), file_path, region_metadata, fsync=self.fsync, encoding=profile
+                    )
+                except Exception as e:
+                    self.logger.error(f"Error writing screenshot {file_path}: {str(e)}")
+                    errors.append(f"{file_path}: {str(e)}")
+        except Exception as e:
+            self.logger.error(f"Error decoding screenshot batch: {str(e)}")
+            errors.extend(f"{file_path}: {str(e)}" for file_path in file_paths)
+        finally:
+            self._finish(file_paths, errors)
+
+    def _finish(self, file_paths: List[str], errors: List[str]) -> None:
+        """Release the queue slot of a job and wake flush() if the queue drained"""
+        for file_path in file_paths:
+            self.storage.release_path(file_path)
+        with self._idle:
+            self._pending -= 1
+            self._completed += len(file_paths) - len(errors)
+            self._errors.extend(errors)
+            self._idle.notify_all()
+        self._slots.release()
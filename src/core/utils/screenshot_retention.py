@@ -0,0 +1,248 @@
+"""Background retention for saved screenshots"""
+import os
+import time
+import logging
+import threading
+from typing import List, Optional, Dict, Any
+
+from src.core.utils.screenshot_storage import ScreenshotStorage
+
+
+class RetentionPolicy:
+    """Limits on the screenshots kept in a storage"""
+
+    def __init__(
+        self,
+        max_total_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        max_per_workflow: Optional[int] = None
+    ):
+        """
+        Initialize the retention policy
+
+        Args:
+            max_total_bytes: Maximum total size of the screenshots, oldest removed first
+            max_age_seconds: Maximum age of a screenshot
+            max_per_workflow: Maximum number of screenshots kept per workflow
+
+        Raises:
+            ValueError: If a limit is negative
+        """
+        for limit in (max_total_bytes, max_age_seconds, max_per_workflow):
+            if limit is not None and limit < 0:
+                raise ValueError("Retention limits cannot be negative")
+
+        self.max_total_bytes = max_total_bytes
+        self.max_age_seconds = max_age_seconds
+        self.max_per_workflow = max_per_workflow
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the policy to a dictionary"""
+        return {
+            "max_total_bytes": self.max_total_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "max_per_workflow": self.max_per_workflow
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RetentionPolicy':
+        """
+        Create a policy from a dictionary
+
+        Args:
+            data: Dictionary representation of the policy
+
+        Returns:
+            Instantiated policy
+        """
+        return cls(
+            max_total_bytes=data.get("max_total_bytes"),
+            max_age_seconds=data.get("max_age_seconds"),
+            max_per_workflow=data.get("max_per_workflow")
+        )
+
+
+class ScreenshotRetentionService:
+    """
+    Enforces a retention policy on a catalogued screenshot storage
+
+    Expired and excess screenshots are found with index queries on the
+    storage's catalog and deleted in small batches with a pause between
+    them, so a large backlog is worked off without I/O spikes. The service
+    can run periodically on a background thread or be driven with run_once().
+    """
+
+    def __init__(
+        self,
+        storage: ScreenshotStorage,
+        policy: RetentionPolicy,
+        interval: float = 60.0,
+        batch_size: int = 50,
+        batch_pause: float = 0.05
+    ):
+        """
+        Initialize the retention service
+
+        Args:
+            storage: Storage to enforce the policy on (must have a catalog)
+            policy: Limits to enforce
+            interval: Time between background runs (seconds)
+            batch_size: Maximum number of screenshots deleted per batch
+            batch_pause: Pause between deletion batches (seconds)
+
+        Raises:
+            ValueError: If the storage has no catalog or the batch size is less than 1
+        """
+        if storage.catalog is None:
+            raise ValueError("Screenshot retention requires a storage with a catalog")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.storage = storage
+        self.policy = policy
+        self.interval = interval
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {
+            "runs": 0,
+            "files_removed": 0,
+            "bytes_reclaimed": 0,
+            "last_run_at": None,
+            "last_run_duration": None,
+            "last_run_bytes_reclaimed": 0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        """Get whether the background thread is running"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start enforcing the policy periodically on a background thread"""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="screenshot-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread after the current batch
+
+        Args:
+            timeout: Maximum time to wait for the thread to finish (seconds)
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> Dict[str, int]:
+        """
+        Enforce the policy now, deleting in batches until every limit is met
+
+        Returns:
+            Dictionary with the number of files removed and bytes reclaimed by this run
+        """
+        with self._run_lock:
+            start = time.monotonic()
+            removed = 0
+            reclaimed = 0
+
+            while not self._stop_event.is_set():
+                batch = self._next_batch()
+                if not batch:
+                    break
+                batch_removed, batch_reclaimed = self._delete_batch(batch)
+                removed += batch_removed
+                reclaimed += batch_reclaimed
+                if len(batch) < self.batch_size:
+                    break
+                self._stop_event.wait(self.batch_pause)
+
+            # Content-addressed storage frees the data once no capture refers to a blob
+            collect_garbage = getattr(self.storage, "collect_garbage", None)
+            if removed and callable(collect_garbage):
+                reclaimed += collect_garbage()
+
+            with self._metrics_lock:
+                self._metrics["runs"] += 1
+                self._metrics["files_removed"] += removed
+                self._metrics["bytes_reclaimed"] += reclaimed
+                self._metrics["last_run_at"] = time.time()
+                self._metrics["last_run_duration"] = time.monotonic() - start
+                self._metrics["last_run_bytes_reclaimed"] = reclaimed
+
+            if removed:
+                self.logger.info(f"Removed {removed} screenshots, reclaimed {reclaimed} bytes")
+            return {"files_removed": removed, "bytes_reclaimed": reclaimed}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get retention metrics
+
+        Returns:
+            Dictionary with runs, files removed and bytes reclaimed in total, and the
+            time, duration and bytes reclaimed of the last run
+        """
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _run_loop(self) -> None:
+        """Run the policy until stopped"""
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                self.logger.error(f"Error enforcing screenshot retention: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def _next_batch(self) -> List[str]:
+        """Find up to batch_size screenshots that violate the policy, oldest first"""
+        catalog = self.storage.catalog
+        paths: List[str] = []
+
+        def take(records: List[Dict[str, Any]]) -> None:
+            for record in records:
+                if len(paths) >= self.batch_size:
+                    return
+                if record["path"] not in paths:
+                    paths.append(record["path"])
+
+        if self.policy.max_age_seconds is not None:
+            cutoff = time.time() - self.policy.max_age_seconds
+            take(catalog.query_records(end=cutoff, limit=self.batch_size, newest_first=False))
+        if self.policy.max_per_workflow is not None and len(paths) < self.batch_size:
+            take(catalog.query_workflow_overflow(self.policy.max_per_workflow, limit=self.batch_size))
+        if self.policy.max_total_bytes is not None and len(paths) < self.batch_size:
+            take(catalog.query_size_overflow(self.policy.max_total_bytes, limit=self.batch_size))
+        return paths
+
+    def _delete_batch(self, paths: List[str]) -> tuple:
+        """Delete a batch of screenshots and drop them from the catalog"""
+        removed = 0
+        reclaimed = 0
+        for path in paths:
+            for file_path in (path, path + ".json"):
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                try:
+                    os.remove(file_path)
+                except OSError as e:
+                    self.logger.error(f"Error removing screenshot {file_path}: {str(e)}")
+                    continue
+                # A hard-linked capture only frees space when its last link goes
+                if stat.st_nlink <= 1:
+                    reclaimed += stat.st_size
+                if file_path == path:
+                    removed += 1
+        # Forget every path, including files that were already gone
+        self.storage.forget(paths)
+        return removed, reclaimed
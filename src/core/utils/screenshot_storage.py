@@ -2,34 +2,72 @@
 import os
 import json
 import logging
+import threading
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from io import BytesIO
+from typing import List, Optional, Dict, Any, Union
 
 from PIL import Image
 
+from src.core.utils.screenshot_capture import read_png_size
+from src.core.utils.screenshot_catalog import ScreenshotCatalog
+from src.core.utils.screenshot_encoding import EncodingProfile, EncodingProfileRegistry, IMAGE_EXTENSIONS
+
+# An encoding profile, the name of a registered profile, or a profile dictionary
+Encoding = Union[EncodingProfile, str, Dict[str, Any]]
+
 
 class ScreenshotStorage:
     """
     Stores and manages screenshot files
     
     This class is responsible only for storing and retrieving screenshots,
-    not for capturing them.
+    not for capturing them. With a catalog, listings and metadata come from
+    an SQLite index instead of directory scans and sidecar files. Screenshots
+    are encoded with an EncodingProfile, given per call or for the storage,
+    falling back to the global default profile.
     """
     
-    def __init__(self, screenshot_dir: str = "screenshots"):
+    CATALOG_NAME = "catalog.sqlite3"
+    
+    def __init__(
+        self,
+        screenshot_dir: str = "screenshots",
+        use_catalog: bool = False,
+        encoding: Optional[Encoding] = None
+    ):
         """
         Initialize the screenshot storage
         
         Args:
             screenshot_dir: Directory to store screenshots
+            use_catalog: Whether to index screenshots in a catalog in the directory
+            encoding: Encoding profile for screenshots saved without one
+                (the global default profile if not provided)
         """
         self.screenshot_dir = screenshot_dir
+        self.encoding = encoding
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._reserved_paths = set()
+        self._reserve_lock = threading.Lock()
         
         # Create the screenshot directory if it doesn't exist
         os.makedirs(self.screenshot_dir, exist_ok=True)
+        
+        self.catalog: Optional[ScreenshotCatalog] = None
+        if use_catalog:
+            self.catalog = ScreenshotCatalog(os.path.join(self.screenshot_dir, self.CATALOG_NAME))
+            if self.catalog.count() == 0:
+                # First use on this directory: index the screenshots already there
+                self.catalog.rebuild(self.screenshot_dir)
     
-    def save_image(self, image: Image.Image, name: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    def save_image(
+        self,
+        image: Image.Image,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        encoding: Optional[Encoding] = None
+    ) -> str:
         """
         Save an image to the screenshot directory
         
@@ -37,21 +75,183 @@ class ScreenshotStorage:
             image: PIL Image to save
             name: Base name for the screenshot
             metadata: Optional metadata to associate with the screenshot
+            encoding: Encoding profile to save with (the storage's profile if not provided)
             
         Returns:
             Path to the saved screenshot
         """
+        profile = self.resolve_encoding(encoding)
+        
         # Generate a filename
-        filename = self._generate_filename(name)
+        filename = self._generate_filename(name, profile.extension)
         file_path = os.path.join(self.screenshot_dir, filename)
         
+        return self.write_image(image, file_path, metadata, encoding=profile)
+    
+    def resolve_encoding(self, encoding: Optional[Encoding] = None) -> EncodingProfile:
+        """
+        Get the encoding profile to save a screenshot with
+        
+        Args:
+            encoding: Profile, profile name or profile dictionary requested for the screenshot
+            
+        Returns:
+            The requested profile, else the storage's profile, else the global default
+            
+        Raises:
+            ValueError: If the profile name is not registered
+        """
+        return EncodingProfileRegistry.get(encoding if encoding is not None else self.encoding)
+    
+    def reserve_path(self, name: str, extension: str = ".png") -> str:
+        """
+        Reserve a unique path for a screenshot that will be written later
+        
+        A reserved path is not handed out again until it is released, even when
+        several screenshots are taken within one millisecond.
+        
+        Args:
+            name: Base name for the screenshot
+            extension: File extension of the encoding the screenshot will be written in
+            
+        Returns:
+            Path the screenshot should be written to
+        """
+        filename = self._generate_filename(name, extension)
+        stem = filename[:-len(extension)]
+        
+        with self._reserve_lock:
+            file_path = os.path.join(self.screenshot_dir, filename)
+            counter = 1
+            while file_path in self._reserved_paths or os.path.exists(file_path):
+                file_path = os.path.join(self.screenshot_dir, f"{stem}_{counter}{extension}")
+                counter += 1
+            self._reserved_paths.add(file_path)
+        
+        return file_path
+    
+    def release_path(self, file_path: str) -> None:
+        """
+        Release a path reserved with reserve_path() once it has been written
+        
+        Args:
+            file_path: Path returned by reserve_path()
+        """
+        with self._reserve_lock:
+            self._reserved_paths.discard(file_path)
+    
+    def write_image(
+        self,
+        image: Image.Image,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        fsync: bool = False,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Write an image and its metadata to the given path
+        
+        Args:
+            image: PIL Image to save
+            file_path: Path to write the screenshot to
+            metadata: Optional metadata to associate with the screenshot
+            fsync: Whether to flush the image to disk before returning
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+            
+        Returns:
+            Path to the saved screenshot
+        """
+        profile = self.resolve_encoding(encoding)
         try:
             # Save the image
-            image.save(file_path)
+            if fsync:
+                with open(file_path, 'wb') as f:
+                    image = profile.save(image, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                image = profile.save(image, file_path)
             self.logger.info(f"Screenshot saved to {file_path}")
             
             # Save metadata if provided
-            if metadata:
+            if metadata or self.catalog:
+                # Copy, so the caller's dictionary is not changed
+                metadata = dict(metadata or {})
+                metadata.setdefault("width", image.width)
+                metadata.setdefault("height", image.height)
+                self._save_metadata(file_path, metadata)
+            
+            return file_path
+        except Exception as e:
+            self.logger.error(f"Error saving screenshot: {str(e)}")
+            raise
+    
+    def save_png_bytes(
+        self,
+        png_data: bytes,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Save encoded PNG bytes to the screenshot directory
+        
+        The bytes are written without decoding them unless the encoding
+        profile converts, downscales or recompresses the image.
+        
+        Args:
+            png_data: PNG bytes, e.g. as returned by the driver
+            name: Base name for the screenshot
+            metadata: Optional metadata to associate with the screenshot
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+            
+        Returns:
+            Path to the saved screenshot
+        """
+        profile = self.resolve_encoding(encoding)
+        file_path = os.path.join(self.screenshot_dir, self._generate_filename(name, profile.extension))
+        return self.write_png_bytes(png_data, file_path, metadata, encoding=profile)
+    
+    def write_png_bytes(
+        self,
+        png_data: bytes,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        fsync: bool = False,
+        encoding: Optional[Encoding] = None
+    ) -> str:
+        """
+        Write encoded PNG bytes and their metadata to the given path
+        
+        Args:
+            png_data: PNG bytes, e.g. as returned by the driver
+            file_path: Path to write the screenshot to
+            metadata: Optional metadata to associate with the screenshot
+            fsync: Whether to flush the image to disk before returning
+            encoding: Encoding profile to save with (the storage's profile if not provided)
+            
+        Returns:
+            Path to the saved screenshot
+        """
+        profile = self.resolve_encoding(encoding)
+        if not profile.is_passthrough:
+            return self.write_image(Image.open(BytesIO(png_data)), file_path, metadata, fsync, profile)
+        
+        try:
+            with open(file_path, 'wb') as f:
+                f.write(png_data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.logger.info(f"Screenshot saved to {file_path}")
+            
+            # Save metadata if provided, reading the size from the PNG header
+            if metadata or self.catalog:
+                # Copy, so the caller's dictionary is not changed
+                metadata = dict(metadata or {})
+                width, height = read_png_size(png_data)
+                metadata.setdefault("width", width)
+                metadata.setdefault("height", height)
                 self._save_metadata(file_path, metadata)
             
             return file_path
@@ -66,10 +266,13 @@ class ScreenshotStorage:
         Returns:
             List of screenshot file paths
         """
-        # Get all PNG files in the screenshot directory
+        if self.catalog:
+            return self.catalog.query()
+        
+        # Get all image files in the screenshot directory
         screenshots = []
         for filename in os.listdir(self.screenshot_dir):
-            if filename.lower().endswith(".png"):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
                 screenshots.append(os.path.join(self.screenshot_dir, filename))
         
         # Sort by modification time (newest first)
@@ -84,9 +287,52 @@ class ScreenshotStorage:
         Returns:
             Path to the latest screenshot, or None if no screenshots exist
         """
+        if self.catalog:
+            return self.catalog.latest()
+        
         screenshots = self.get_screenshots()
         return screenshots[0] if screenshots else None
     
+    def query_screenshots(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        workflow_id: Optional[str] = None,
+        action_id: Optional[str] = None,
+        name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        """
+        Find screenshots by creation time, workflow, action or name, newest first
+        
+        Args:
+            start: Earliest creation time (POSIX timestamp, inclusive)
+            end: Latest creation time (POSIX timestamp, exclusive)
+            workflow_id: Only screenshots taken by this workflow
+            action_id: Only screenshots taken by this action
+            name: Only screenshots saved under this base name
+            limit: Maximum number of screenshots to return
+            
+        Returns:
+            Paths of the matching screenshots
+            
+        Raises:
+            ValueError: If the storage has no catalog
+        """
+        if not self.catalog:
+            raise ValueError("Screenshot queries require a catalog")
+        return self.catalog.query(start, end, workflow_id, action_id, name, limit)
+    
+    def forget(self, screenshot_paths: List[str]) -> None:
+        """
+        Drop deleted screenshots from the catalog
+        
+        Args:
+            screenshot_paths: Paths of screenshots that were deleted
+        """
+        if self.catalog and screenshot_paths:
+            self.catalog.remove(screenshot_paths)
+    
     def get_screenshot_path(self, filename: str) -> str:
         """
         Get the full path to a screenshot
@@ -109,6 +355,11 @@ class ScreenshotStorage:
         Returns:
             Metadata dictionary, or None if no metadata exists
         """
+        if self.catalog:
+            metadata = self.catalog.get_metadata(screenshot_path)
+            if metadata is not None:
+                return metadata
+        
         # Create metadata file path
         metadata_path = screenshot_path + ".json"
         
@@ -122,12 +373,13 @@ class ScreenshotStorage:
         
         return None
     
-    def _generate_filename(self, name: str) -> str:
+    def _generate_filename(self, name: str, extension: str = ".png") -> str:
         """
         Generate a filename for a screenshot
         
         Args:
             name: Base name for the screenshot
+            extension: File extension of the screenshot's format
             
         Returns:
             Generated filename
@@ -138,7 +390,7 @@ class ScreenshotStorage:
         # Add timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
         
-        return f"{name}_{timestamp}.png"
+        return f"{name}_{timestamp}{extension}"
     
     def _save_metadata(self, screenshot_path: str, metadata: Dict[str, Any]) -> None:
         """
@@ -151,8 +403,21 @@ class ScreenshotStorage:
         # Create metadata file path
         metadata_path = screenshot_path + ".json"
         
-        # Add timestamp to metadata
-        metadata["timestamp"] = datetime.now().isoformat()
+        # Add timestamp to metadata (kept if it was recorded at capture time)
+        metadata.setdefault("timestamp", datetime.now().isoformat())
+        
+        # The catalog replaces the sidecar file
+        if self.catalog:
+            try:
+                self.catalog.add(
+                    screenshot_path,
+                    ScreenshotCatalog.name_from_filename(screenshot_path),
+                    metadata,
+                    size_bytes=os.path.getsize(screenshot_path)
+                )
+            except Exception as e:
+                self.logger.error(f"Error cataloguing screenshot: {str(e)}")
+            return
         
         # Save metadata
         try:
@@ -10,52 +10,67 @@ from src.core.workflow.workflow_event import (
     WorkflowStateEvent, ActionEvent, EventDispatcher
 )
 from src.core.workflow.workflow_statistics import WorkflowStatistics
-from src.core.workflow.workflow_service import WorkflowService as LegacyWorkflowService
 
-# Import new components
-from .interfaces import (
-    WorkflowDefinition, ExecutionResult,
-    IWorkflowValidator, IWorkflowExecutor, IWorkflowEngine, IEventBus,
-    IWorkflow, IWorkflowStep, IWorkflowEventBus, IWorkflowEventListener
-)
-from .exceptions import (
-    WorkflowError, WorkflowValidationError, WorkflowExecutionError,
-    ActionExecutionError, WorkflowNotFoundError, InvalidWorkflowDefinitionError,
-    CyclicDependencyError, MissingActionError, InvalidConnectionError
-)
-from .execution_result import ExecutionResult, ActionResult
-from .workflow_validator import WorkflowValidator
-from .workflow_executor import WorkflowExecutor
-from .workflow_engine_new import WorkflowEngine
-from ..events.workflow_events import (
-    WorkflowEvent, WorkflowStartedEvent, WorkflowCompletedEvent, WorkflowFailedEvent,
-    ActionStartedEvent, ActionCompletedEvent, ActionFailedEvent, VariableUpdatedEvent,
-    ValidationEvent, EVENT_WORKFLOW_STARTED, EVENT_WORKFLOW_COMPLETED,
-    EVENT_WORKFLOW_FAILED, EVENT_ACTION_STARTED, EVENT_ACTION_COMPLETED,
-    EVENT_ACTION_FAILED, EVENT_VARIABLE_UPDATED, EVENT_VALIDATION_COMPLETED
-)
-from ..events.event_bus import EventBus
+try:
+    from src.core.workflow.workflow_service import WorkflowService as LegacyWorkflowService
+except ImportError:
+    # The legacy workflow service module is not part of this tree
+    _LEGACY_SERVICE = False
+else:
+    _LEGACY_SERVICE = True
 
-# Import service components
-from .service_interfaces import (
-    IWorkflowQuery, IWorkflowDTO, IWorkflowStepDTO,
-    IWorkflowSerializer, IWorkflowRepository, IWorkflowService
-)
-from .service_exceptions import (
-    WorkflowServiceError, WorkflowNotFoundError as ServiceWorkflowNotFoundError,
-    WorkflowStepNotFoundError, WorkflowValidationError as ServiceWorkflowValidationError,
-    WorkflowExecutionError as ServiceWorkflowExecutionError, WorkflowAlreadyExistsError,
-    WorkflowRepositoryError, WorkflowSerializationError, WorkflowDeserializationError,
-    WorkflowQueryError
-)
-from .workflow_dto import WorkflowDTO, WorkflowStepDTO
-from .workflow_query import (
-    WorkflowQuery, PropertyQuery, AndQuery, OrQuery, NotQuery,
-    AllQuery, NoneQuery, WorkflowQueryBuilder
-)
-from .workflow_serializer_new import WorkflowSerializer
-from .workflow_repository import FileSystemWorkflowRepository, InMemoryWorkflowRepository
-from .workflow_service_new import WorkflowService
+try:
+    # Import new components
+    from .interfaces import (
+        WorkflowDefinition, ExecutionResult,
+        IWorkflowValidator, IWorkflowExecutor, IWorkflowEngine, IEventBus,
+        IWorkflow, IWorkflowStep, IWorkflowEventBus, IWorkflowEventListener
+    )
+    from .exceptions import (
+        WorkflowError, WorkflowValidationError, WorkflowExecutionError,
+        ActionExecutionError, WorkflowNotFoundError, InvalidWorkflowDefinitionError,
+        CyclicDependencyError, MissingActionError, InvalidConnectionError
+    )
+    from .execution_result import ExecutionResult, ActionResult
+    from .workflow_validator import WorkflowValidator
+    from .workflow_executor import WorkflowExecutor
+    from .workflow_engine_new import WorkflowEngine
+    from ..events.workflow_events import (
+        WorkflowEvent, WorkflowStartedEvent, WorkflowCompletedEvent, WorkflowFailedEvent,
+        ActionStartedEvent, ActionCompletedEvent, ActionFailedEvent, VariableUpdatedEvent,
+        ValidationEvent, EVENT_WORKFLOW_STARTED, EVENT_WORKFLOW_COMPLETED,
+        EVENT_WORKFLOW_FAILED, EVENT_ACTION_STARTED, EVENT_ACTION_COMPLETED,
+        EVENT_ACTION_FAILED, EVENT_VARIABLE_UPDATED, EVENT_VALIDATION_COMPLETED
+    )
+    from ..events.event_bus import EventBus
+
+    # Import service components
+    from .service_interfaces import (
+        IWorkflowQuery, IWorkflowDTO, IWorkflowStepDTO,
+        IWorkflowSerializer, IWorkflowRepository, IWorkflowService
+    )
+    from .service_exceptions import (
+        WorkflowServiceError, WorkflowNotFoundError as ServiceWorkflowNotFoundError,
+        WorkflowStepNotFoundError, WorkflowValidationError as ServiceWorkflowValidationError,
+        WorkflowExecutionError as ServiceWorkflowExecutionError, WorkflowAlreadyExistsError,
+        WorkflowRepositoryError, WorkflowSerializationError, WorkflowDeserializationError,
+        WorkflowQueryError
+    )
+    from .workflow_dto import WorkflowDTO, WorkflowStepDTO
+    from .workflow_query import (
+        WorkflowQuery, PropertyQuery, AndQuery, OrQuery, NotQuery,
+        AllQuery, NoneQuery, WorkflowQueryBuilder
+    )
+    from .workflow_serializer_new import WorkflowSerializer
+    from .workflow_repository import FileSystemWorkflowRepository, InMemoryWorkflowRepository
+    from .workflow_service_new import WorkflowService
+except ImportError:
+    # The new workflow framework needs src.core.workflow.interfaces and
+    # src.core.context.interfaces; without them only the legacy components
+    # (and modules imported directly) are available
+    _NEW_FRAMEWORK = False
+else:
+    _NEW_FRAMEWORK = True
 
 __all__ = [
     # Legacy components
@@ -68,50 +83,55 @@ __all__ = [
     'ActionEvent',
     'EventDispatcher',
     'WorkflowStatistics',
-    'LegacyWorkflowService',
+]
 
-    # New interfaces
-    'WorkflowDefinition', 'ExecutionResult',
-    'IWorkflowValidator', 'IWorkflowExecutor', 'IWorkflowEngine', 'IEventBus',
-    'IWorkflow', 'IWorkflowStep', 'IWorkflowEventBus', 'IWorkflowEventListener',
+if _LEGACY_SERVICE:
+    __all__ += ['LegacyWorkflowService']
 
-    # New exceptions
-    'WorkflowError', 'WorkflowValidationError', 'WorkflowExecutionError',
-    'ActionExecutionError', 'WorkflowNotFoundError', 'InvalidWorkflowDefinitionError',
-    'CyclicDependencyError', 'MissingActionError', 'InvalidConnectionError',
+if _NEW_FRAMEWORK:
+    __all__ += [
+        # New interfaces
+        'WorkflowDefinition', 'ExecutionResult',
+        'IWorkflowValidator', 'IWorkflowExecutor', 'IWorkflowEngine', 'IEventBus',
+        'IWorkflow', 'IWorkflowStep', 'IWorkflowEventBus', 'IWorkflowEventListener',
 
-    # New value objects
-    'ExecutionResult', 'ActionResult',
+        # New exceptions
+        'WorkflowError', 'WorkflowValidationError', 'WorkflowExecutionError',
+        'ActionExecutionError', 'WorkflowNotFoundError', 'InvalidWorkflowDefinitionError',
+        'CyclicDependencyError', 'MissingActionError', 'InvalidConnectionError',
 
-    # New implementations
-    'WorkflowValidator', 'WorkflowExecutor', 'WorkflowEngine',
+        # New value objects
+        'ExecutionResult', 'ActionResult',
 
-    # New events
-    'WorkflowEvent', 'WorkflowStartedEvent', 'WorkflowCompletedEvent', 'WorkflowFailedEvent',
-    'ActionStartedEvent', 'ActionCompletedEvent', 'ActionFailedEvent', 'VariableUpdatedEvent',
-    'ValidationEvent', 'EVENT_WORKFLOW_STARTED', 'EVENT_WORKFLOW_COMPLETED',
-    'EVENT_WORKFLOW_FAILED', 'EVENT_ACTION_STARTED', 'EVENT_ACTION_COMPLETED',
-    'EVENT_ACTION_FAILED', 'EVENT_VARIABLE_UPDATED', 'EVENT_VALIDATION_COMPLETED',
+        # New implementations
+        'WorkflowValidator', 'WorkflowExecutor', 'WorkflowEngine',
 
-    # Event bus
-    'EventBus',
+        # New events
+        'WorkflowEvent', 'WorkflowStartedEvent', 'WorkflowCompletedEvent', 'WorkflowFailedEvent',
+        'ActionStartedEvent', 'ActionCompletedEvent', 'ActionFailedEvent', 'VariableUpdatedEvent',
+        'ValidationEvent', 'EVENT_WORKFLOW_STARTED', 'EVENT_WORKFLOW_COMPLETED',
+        'EVENT_WORKFLOW_FAILED', 'EVENT_ACTION_STARTED', 'EVENT_ACTION_COMPLETED',
+        'EVENT_ACTION_FAILED', 'EVENT_VARIABLE_UPDATED', 'EVENT_VALIDATION_COMPLETED',
 
-    # Service interfaces
-    'IWorkflowQuery', 'IWorkflowDTO', 'IWorkflowStepDTO',
-    'IWorkflowSerializer', 'IWorkflowRepository', 'IWorkflowService',
+        # Event bus
+        'EventBus',
 
-    # Service exceptions
-    'WorkflowServiceError', 'ServiceWorkflowNotFoundError',
-    'WorkflowStepNotFoundError', 'ServiceWorkflowValidationError',
-    'ServiceWorkflowExecutionError', 'WorkflowAlreadyExistsError',
-    'WorkflowRepositoryError', 'WorkflowSerializationError',
-    'WorkflowDeserializationError', 'WorkflowQueryError',
+        # Service interfaces
+        'IWorkflowQuery', 'IWorkflowDTO', 'IWorkflowStepDTO',
+        'IWorkflowSerializer', 'IWorkflowRepository', 'IWorkflowService',
 
-    # Service implementations
-    'WorkflowDTO', 'WorkflowStepDTO',
-    'WorkflowQuery', 'PropertyQuery', 'AndQuery', 'OrQuery', 'NotQuery',
-    'AllQuery', 'NoneQuery', 'WorkflowQueryBuilder',
-    'WorkflowSerializer',
-    'FileSystemWorkflowRepository', 'InMemoryWorkflowRepository',
-    'WorkflowService'
-]
+        # Service exceptions
+        'WorkflowServiceError', 'ServiceWorkflowNotFoundError',
+        'WorkflowStepNotFoundError', 'ServiceWorkflowValidationError',
+        'ServiceWorkflowExecutionError', 'WorkflowAlreadyExistsError',
+        'WorkflowRepositoryError', 'WorkflowSerializationError',
+        'WorkflowDeserializationError', 'WorkflowQueryError',
+
+        # Service implementations
+        'WorkflowDTO', 'WorkflowStepDTO',
+        'WorkflowQuery', 'PropertyQuery', 'AndQuery', 'OrQuery', 'NotQuery',
+        'AllQuery', 'NoneQuery', 'WorkflowQueryBuilder',
+        'WorkflowSerializer',
+        'FileSystemWorkflowRepository', 'InMemoryWorkflowRepository',
+        'WorkflowService'
+    ]
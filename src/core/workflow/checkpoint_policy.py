@@ -0,0 +1,181 @@
+"""Policy deciding when the workflow engine takes automatic checkpoints"""
+import time
+from typing import Dict, Any, Iterable, Optional, Callable
+
+from src.core.actions.base_action import BaseAction
+
+
+class CheckpointPolicy:
+    """
+    When to checkpoint a running workflow
+
+    A checkpoint is taken before an action when any enabled trigger fires:
+
+    - every_n_actions: that many actions ran since the last checkpoint
+    - every_seconds: that much time passed since the last checkpoint
+    - expensive_action_types: the next action is of one of these types, so a
+      failure in it does not repeat the work before it
+    - max_overhead_percent: checkpointing would keep the time spent on
+      checkpoints under this share of the run time
+
+    The overhead trigger measures how long checkpoints take and waits until
+    the run has progressed enough to afford the next one. Combined with the
+    action or time triggers it acts as a limit, postponing them while the
+    budget is used up; expensive actions are always checkpointed.
+
+    No checkpoint is taken before any action has run since the last one, as
+    there would be nothing new to save.
+    """
+
+    def __init__(
+        self,
+        every_n_actions: Optional[int] = None,
+        every_seconds: Optional[float] = None,
+        expensive_action_types: Optional[Iterable[str]] = None,
+        max_overhead_percent: Optional[float] = None
+    ):
+        """
+        Initialize the checkpoint policy
+
+        Args:
+            every_n_actions: Number of actions between checkpoints
+            every_seconds: Seconds between checkpoints
+            expensive_action_types: Types of actions to checkpoint before
+            max_overhead_percent: Maximum share of the run time spent on checkpoints
+
+        Raises:
+            ValueError: If a setting is out of range
+        """
+        if every_n_actions is not None and every_n_actions < 1:
+            raise ValueError("every_n_actions must be at least 1")
+        if every_seconds is not None and every_seconds <= 0:
+            raise ValueError("every_seconds must be positive")
+        if max_overhead_percent is not None and not 0 < max_overhead_percent < 100:
+            raise ValueError("max_overhead_percent must be between 0 and 100")
+
+        self.every_n_actions = every_n_actions
+        self.every_seconds = every_seconds
+        self.expensive_action_types = set(expensive_action_types or [])
+        self.max_overhead_percent = max_overhead_percent
+
+    def create_schedule(self, clock: Callable[[], float] = time.monotonic) -> 'CheckpointSchedule':
+        """
+        Create the checkpoint schedule of one workflow run
+
+        Args:
+            clock: Function returning the current time in seconds
+
+        Returns:
+            New checkpoint schedule
+        """
+        return CheckpointSchedule(self, clock)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the policy to a dictionary
+
+        Returns:
+            Dictionary representation of the policy
+        """
+        return {
+            "every_n_actions": self.every_n_actions,
+            "every_seconds": self.every_seconds,
+            "expensive_action_types": sorted(self.expensive_action_types),
+            "max_overhead_percent": self.max_overhead_percent
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CheckpointPolicy':
+        """
+        Create a policy from a dictionary
+
+        Args:
+            data: Dictionary representation of the policy
+
+        Returns:
+            Instantiated policy
+        """
+        return cls(
+            every_n_actions=data.get("every_n_actions"),
+            every_seconds=data.get("every_seconds"),
+            expensive_action_types=data.get("expensive_action_types"),
+            max_overhead_percent=data.get("max_overhead_percent")
+        )
+
+
+class CheckpointSchedule:
+    """Progress of one workflow run against a checkpoint policy"""
+
+    # Weight of the newest measurement in the checkpoint cost estimate
+    COST_SMOOTHING = 0.3
+
+    def __init__(self, policy: CheckpointPolicy, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the schedule
+
+        Args:
+            policy: Checkpoint policy
+            clock: Function returning the current time in seconds
+        """
+        self.policy = policy
+        self._clock = clock
+        self._actions_since = 0
+        self._last_checkpoint = clock()
+        self._cost: Optional[float] = None
+
+    @property
+    def estimated_cost(self) -> Optional[float]:
+        """Get the smoothed duration of a checkpoint in seconds, if any was measured"""
+        return self._cost
+
+    def action_finished(self) -> None:
+        """Record that an action ran"""
+        self._actions_since += 1
+
+    def checkpoint_reason(self, action: BaseAction) -> Optional[str]:
+        """
+        Decide whether to checkpoint before an action
+
+        Args:
+            action: Action about to run
+
+        Returns:
+            Name of the trigger that fired ("expensive", "actions", "interval" or
+            "overhead"), or None if no checkpoint is due
+        """
+        policy = self.policy
+        if self._actions_since == 0:
+            return None
+        if action.type in policy.expensive_action_types:
+            return "expensive"
+
+        within_budget = self._within_budget()
+        if policy.every_n_actions is not None and self._actions_since >= policy.every_n_actions:
+            return "actions" if within_budget else None
+        if policy.every_seconds is not None and self._clock() - self._last_checkpoint >= policy.every_seconds:
+            return "interval" if within_budget else None
+        if policy.max_overhead_percent is not None and policy.every_n_actions is None \
+                and policy.every_seconds is None and within_budget:
+            return "overhead"
+        return None
+
+    def checkpoint_taken(self, duration: float) -> None:
+        """
+        Record a checkpoint
+
+        Args:
+            duration: Time the checkpoint took in seconds
+        """
+        if self._cost is None:
+            self._cost = duration
+        else:
+            self._cost += self.COST_SMOOTHING * (duration - self._cost)
+        self._actions_since = 0
+        self._last_checkpoint = self._clock()
+
+    def _within_budget(self) -> bool:
+        """Whether another checkpoint keeps the overhead under the policy's maximum"""
+        if self.policy.max_overhead_percent is None or self._cost is None:
+            return True
+        elapsed = self._clock() - self._last_checkpoint
+        return elapsed * self.policy.max_overhead_percent / 100 >= self._cost
@@ -1,4 +1,5 @@
 """Implementation of the workflow execution engine"""
+import time
 import uuid
 import logging
 import threading
@@ -7,14 +8,23 @@ from typing import Dict, Any, List, Optional, Callable, Union, Set
 
 from src.core.actions.action_interface import ActionResult
 from src.core.actions.base_action import BaseAction
+from src.core.actions.dom_batch_action import DomBatchAction, group_dom_actions, execute_expanded
+from src.core.browser.driver_pool import DriverPool
 from src.core.context.execution_context import ExecutionContext
 from src.core.context.execution_state import ExecutionStateEnum
+from src.core.state.workflow_state_manager_interface import WorkflowStateManagerInterface
+from src.core.workflow.checkpoint_policy import CheckpointPolicy, CheckpointSchedule
 from src.core.workflow.workflow_engine_interface import WorkflowEngineInterface
 from src.core.workflow.workflow_event import (
     WorkflowEvent, WorkflowEventType, WorkflowStateEvent, ActionEvent, EventDispatcher
 )
 from src.core.workflow.workflow_statistics import WorkflowStatistics
 
+try:
+    from src.core.utils.screenshot_manager import ScreenshotManager
+except ImportError:  # Pillow is optional; without it no screenshots are queued
+    ScreenshotManager = None
+
 
 class WorkflowStatus(Enum):
     """Status of a workflow"""
@@ -29,20 +39,49 @@ class WorkflowStatus(Enum):
 class WorkflowEngine(WorkflowEngineInterface):
     """Engine for executing workflows"""
 
-    def __init__(self):
-        """Initialize the workflow engine"""
+    def __init__(
+        self,
+        driver_pool: Optional[DriverPool] = None,
+        batch_dom_actions: bool = False,
+        state_manager: Optional[WorkflowStateManagerInterface] = None,
+        checkpoint_policy: Optional[CheckpointPolicy] = None,
+        screenshot_flush_timeout: Optional[float] = 30.0
+    ):
+        """
+        Initialize the workflow engine
+
+        Args:
+            driver_pool: Optional pool each workflow run leases its browser driver from
+                (runs whose context already holds a "driver" keep using that driver)
+            batch_dom_actions: Whether to run consecutive batchable DOM actions of a workflow
+                in one script call (each batched action still gets its own result)
+            state_manager: Optional state manager to checkpoint running workflows with
+            checkpoint_policy: When to checkpoint running workflows (requires a state manager);
+                use resume_from_checkpoint() to continue a run from its latest checkpoint
+            screenshot_flush_timeout: Maximum time to wait when a run ends for screenshots
+                queued by the shared screenshot managers to be written (None to wait indefinitely)
+        """
+        self.driver_pool = driver_pool
+        self.batch_dom_actions = batch_dom_actions
+        self.state_manager = state_manager
+        self.checkpoint_policy = checkpoint_policy
+        self.screenshot_flush_timeout = screenshot_flush_timeout
         self.logger = logging.getLogger(f"{self.__class__.__module__}.{self.__class__.__name__}")
         self._event_dispatcher = EventDispatcher()
         self._workflows: Dict[str, Dict[str, Any]] = {}
         self._running_workflows: Set[str] = set()
         self._paused_workflows: Set[str] = set()
         self._workflow_locks: Dict[str, threading.Lock] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
         self._statistics: Dict[str, WorkflowStatistics] = {}
 
     def execute_action(
         self,
         action: BaseAction,
-        context: Union[ExecutionContext, Dict[str, Any]]
+        context: Union[ExecutionContext, Dict[str, Any]],
+        cancel_event: Optional[threading.Event] = None,
+        workflow_id: Optional[str] = None,
+        driver: Optional[Any] = None
     ) -> ActionResult:
         """
         Execute a single action
@@ -50,6 +89,11 @@ class WorkflowEngine(WorkflowEngineInterface):
         Args:
             action: Action to execute
             context: Execution context or context dictionary
+            cancel_event: Optional event set when the workflow is aborted, exposed to
+                the action as "cancel_event" so long waits can stop early
+            workflow_id: Optional ID of the running workflow, exposed to the action
+                as "workflow_id" so artifacts such as screenshots can be attributed to it
+            driver: Optional browser driver leased for the run, exposed to the action as "driver"
 
         Returns:
             Result of the action execution
@@ -62,20 +106,84 @@ class WorkflowEngine(WorkflowEngineInterface):
         else:
             execution_context = context
 
-        # Create a context dictionary for the action
-        action_context = execution_context.variables.get_all()
-
         # Execute the action
         self.logger.info(f"Executing action: {action.description}")
-        result = action.execute(action_context)
+        result = action.execute(self._create_action_context(execution_context, cancel_event, workflow_id, driver))
 
-        # Update the context with any new variables from the result
-        if result.success and result.data:
-            for key, value in result.data.items():
-                execution_context.variables.set(key, value)
+        # Update the context with any new variables from the result (a batch's
+        # data only holds the results of its actions)
+        if result.success and result.data and not isinstance(action, DomBatchAction):
+            self._store_result_data(execution_context, result)
 
         return result
 
+    def _execute_batch(
+        self,
+        batch: DomBatchAction,
+        context: ExecutionContext,
+        cancel_event: Optional[threading.Event] = None,
+        workflow_id: Optional[str] = None,
+        driver: Optional[Any] = None
+    ) -> List[ActionResult]:
+        """
+        Execute a batch of DOM actions, reporting a result for each of them
+
+        Args:
+            batch: Batch to execute
+            context: Execution context
+            cancel_event: Optional event set when the workflow is aborted
+            workflow_id: Optional ID of the running workflow
+            driver: Optional browser driver leased for the run
+
+        Returns:
+            Results of the executed actions, in order; execution stops at the first failure
+        """
+        self.logger.info(f"Executing action: {batch.description}")
+        results = execute_expanded(batch, self._create_action_context(context, cancel_event, workflow_id, driver))
+        for result in results:
+            if result.success and result.data:
+                self._store_result_data(context, result)
+        return results
+
+    def _create_action_context(
+        self,
+        context: ExecutionContext,
+        cancel_event: Optional[threading.Event],
+        workflow_id: Optional[str],
+        driver: Optional[Any]
+    ) -> Dict[str, Any]:
+        """
+        Create the context dictionary an action is executed with
+
+        Args:
+            context: Execution context
+            cancel_event: Optional event set when the workflow is aborted
+            workflow_id: Optional ID of the running workflow
+            driver: Optional browser driver leased for the run
+
+        Returns:
+            Variables of the context plus the run's cancel event, workflow ID and driver
+        """
+        action_context = context.variables.get_all()
+        if cancel_event is not None:
+            action_context["cancel_event"] = cancel_event
+        if workflow_id is not None:
+            action_context["workflow_id"] = workflow_id
+        if driver is not None:
+            action_context["driver"] = driver
+        return action_context
+
+    def _store_result_data(self, context: ExecutionContext, result: ActionResult) -> None:
+        """
+        Store the data of a successful action result as variables
+
+        Args:
+            context: Execution context
+            result: Result of the action
+        """
+        for key, value in result.data.items():
+            context.variables.set(key, value)
+
     def execute_workflow(
         self,
         actions: List[BaseAction],
@@ -98,6 +206,7 @@ class WorkflowEngine(WorkflowEngineInterface):
 
         # Create a lock for this workflow
         self._workflow_locks[workflow_id] = threading.Lock()
+        self._cancel_events[workflow_id] = threading.Event()
 
         # Create execution context if not provided
         if context is None:
@@ -109,22 +218,51 @@ class WorkflowEngine(WorkflowEngineInterface):
         else:
             execution_context = context
 
-        # Initialize workflow state
-        self._workflows[workflow_id] = {
-            "id": workflow_id,
-            "actions": actions,
-            "context": execution_context,
-            "current_index": 0,
-            "status": WorkflowStatus.PENDING,
-            "results": []
-        }
-
-        # Create statistics collector
-        self._statistics[workflow_id] = WorkflowStatistics()
+        self._register_workflow(workflow_id, actions, execution_context)
 
         # Start the workflow
         return self._run_workflow(workflow_id)
 
+    def resume_from_checkpoint(
+        self,
+        checkpoint_id: str,
+        actions: List[BaseAction],
+        workflow_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Continue a workflow run from one of its automatic checkpoints
+
+        The context, the results so far and the position in the workflow are
+        restored, so only the actions after the checkpoint run again.
+
+        Args:
+            checkpoint_id: ID of a checkpoint taken by this engine
+            actions: Actions of the workflow, as passed to execute_workflow()
+            workflow_id: ID to run the workflow under (the checkpointed run's ID if not provided)
+
+        Returns:
+            Dictionary containing workflow execution results
+
+        Raises:
+            ValueError: If the engine has no state manager
+        """
+        if self.state_manager is None:
+            raise ValueError("Resuming from a checkpoint requires a state manager")
+
+        context, data = self.state_manager.restore_from_checkpoint(checkpoint_id)
+        workflow_id = workflow_id or data.get("workflow_id") or str(uuid.uuid4())
+        results = [
+            ActionResult(result["success"], result["message"], result.get("data"))
+            for result in data.get("results", [])
+        ]
+
+        self._workflow_locks[workflow_id] = threading.Lock()
+        self._cancel_events[workflow_id] = threading.Event()
+        self._register_workflow(workflow_id, actions, context, data.get("current_index", 0), results)
+        self.logger.info(f"Resuming workflow {workflow_id} at action {data.get('current_index', 0)}")
+
+        return self._run_workflow(workflow_id)
+
     def _run_workflow(self, workflow_id: str) -> Dict[str, Any]:
         """
         Run a workflow with the given ID
@@ -141,15 +279,28 @@ class WorkflowEngine(WorkflowEngineInterface):
         workflow = self._workflows[workflow_id]
         actions = workflow["actions"]
         context = workflow["context"]
-        results = []
+        results = list(workflow["results"])
+        start_index = workflow["current_index"]
+        schedule = self._create_checkpoint_schedule()
+
+        # Lease a browser for the run (kept while the workflow is paused); if
+        # none can be leased the run fails without executing any action
+        lease_error = None
+        try:
+            driver = self._lease_driver(workflow)
+        except Exception as e:
+            self.logger.error(f"Could not lease a browser for workflow {workflow_id}: {str(e)}")
+            driver = None
+            lease_error = f"Could not lease a browser: {str(e)}"
 
         # Mark workflow as running
         with self._workflow_locks[workflow_id]:
             workflow["status"] = WorkflowStatus.RUNNING
             self._running_workflows.add(workflow_id)
 
-        # Transition context to running state
-        context.state.transition_to(ExecutionStateEnum.RUNNING)
+        # Transition context to running state (a resumed or restored context already is)
+        if context.state.current_state != ExecutionStateEnum.RUNNING:
+            context.state.transition_to(ExecutionStateEnum.RUNNING)
 
         # Dispatch workflow started event
         self._dispatch_workflow_event(
@@ -159,15 +310,18 @@ class WorkflowEngine(WorkflowEngineInterface):
         )
 
         # Execute each action in sequence
-        success = True
-        error_message = None
+        success = lease_error is None
+        error_message = lease_error
+
+        for i in range(start_index if success else len(actions), len(actions)):
+            action = actions[i]
 
-        for i, action in enumerate(actions):
             # Check if workflow should be paused or aborted
             with self._workflow_locks[workflow_id]:
                 if workflow_id in self._paused_workflows:
                     # Workflow is paused, save current index and return
                     workflow["current_index"] = i
+                    workflow["results"] = results
                     workflow["status"] = WorkflowStatus.PAUSED
                     return {
                         "workflow_id": workflow_id,
@@ -180,7 +334,12 @@ class WorkflowEngine(WorkflowEngineInterface):
                 if workflow_id not in self._running_workflows:
                     # Workflow was aborted
                     workflow["status"] = WorkflowStatus.ABORTED
-                    context.state.transition_to(ExecutionStateEnum.ABORTED)
+                    if context.state.current_state != ExecutionStateEnum.ABORTED:
+                        context.state.transition_to(ExecutionStateEnum.ABORTED)
+                    self._release_driver(workflow)
+                    self._end_checkpoint_chain(workflow_id)
+                    self._flush_screenshots(workflow_id)
+                    self._cancel_events.pop(workflow_id, None)
                     self._dispatch_workflow_event(
                         WorkflowEventType.WORKFLOW_ABORTED,
                         workflow_id
@@ -196,42 +355,65 @@ class WorkflowEngine(WorkflowEngineInterface):
                 # Update current index
                 workflow["current_index"] = i
 
-            # Dispatch action started event
-            self._dispatch_action_event(
-                WorkflowEventType.ACTION_STARTED,
-                workflow_id,
-                action,
-                i
-            )
+            if schedule is not None:
+                self._checkpoint_if_due(workflow, schedule, action, results)
 
             # Execute the action
             try:
-                result = self.execute_action(action, context)
-                results.append(result)
-
-                if result.success:
-                    # Dispatch action completed event
-                    self._dispatch_action_event(
-                        WorkflowEventType.ACTION_COMPLETED,
-                        workflow_id,
-                        action,
-                        i,
-                        result
-                    )
+                if isinstance(action, DomBatchAction) and action.actions:
+                    # Batched actions run in one script call; report each of them
+                    steps = zip(action.actions, self._execute_batch(
+                        action, context, self._cancel_events.get(workflow_id), workflow_id, driver
+                    ))
                 else:
-                    # Action failed
-                    success = False
-                    error_message = f"Action failed: {result.message}"
-                    
-                    # Dispatch action failed event
+                    # Dispatch action started event
                     self._dispatch_action_event(
-                        WorkflowEventType.ACTION_FAILED,
+                        WorkflowEventType.ACTION_STARTED,
                         workflow_id,
                         action,
-                        i,
-                        result
+                        i
                     )
-                    
+                    steps = [(action, self.execute_action(
+                        action, context, self._cancel_events.get(workflow_id), workflow_id, driver
+                    ))]
+
+                for step_action, result in steps:
+                    if step_action is not action:
+                        self._dispatch_action_event(
+                            WorkflowEventType.ACTION_STARTED,
+                            workflow_id,
+                            step_action,
+                            i
+                        )
+                    results.append(result)
+                    if schedule is not None:
+                        schedule.action_finished()
+
+                    if result.success:
+                        # Dispatch action completed event
+                        self._dispatch_action_event(
+                            WorkflowEventType.ACTION_COMPLETED,
+                            workflow_id,
+                            step_action,
+                            i,
+                            result
+                        )
+                    else:
+                        # Action failed
+                        success = False
+                        error_message = f"Action failed: {result.message}"
+
+                        # Dispatch action failed event
+                        self._dispatch_action_event(
+                            WorkflowEventType.ACTION_FAILED,
+                            workflow_id,
+                            step_action,
+                            i,
+                            result
+                        )
+                        break
+
+                if not success:
                     # Stop execution on first failure
                     break
             except Exception as e:
@@ -256,8 +438,14 @@ class WorkflowEngine(WorkflowEngineInterface):
                 # Stop execution on exception
                 break
 
+        # Screenshot paths in the results exist by the time the run is reported as ended
+        self._flush_screenshots(workflow_id)
+
         # Update workflow status and context state
         with self._workflow_locks[workflow_id]:
+            self._release_driver(workflow)
+            self._end_checkpoint_chain(workflow_id)
+            self._cancel_events.pop(workflow_id, None)
             if success:
                 workflow["status"] = WorkflowStatus.COMPLETED
                 context.state.transition_to(ExecutionStateEnum.COMPLETED)
@@ -368,11 +556,17 @@ class WorkflowEngine(WorkflowEngineInterface):
                 return False
 
             # Remove from running and paused workflows
+            was_paused = workflow_id in self._paused_workflows
             if workflow_id in self._running_workflows:
                 self._running_workflows.remove(workflow_id)
             if workflow_id in self._paused_workflows:
                 self._paused_workflows.remove(workflow_id)
 
+            # Wake up any action waiting on the workflow
+            cancel_event = self._cancel_events.pop(workflow_id, None)
+            if cancel_event is not None:
+                cancel_event.set()
+
             # Update workflow status
             workflow = self._workflows[workflow_id]
             workflow["status"] = WorkflowStatus.ABORTED
@@ -380,6 +574,12 @@ class WorkflowEngine(WorkflowEngineInterface):
             # Update context state
             context = workflow["context"]
             context.state.transition_to(ExecutionStateEnum.ABORTED)
+
+            # A paused workflow has no run left to return its browser and context
+            if was_paused:
+                self._release_driver(workflow)
+                self._end_checkpoint_chain(workflow_id)
+                self._flush_screenshots(workflow_id)
             
             # Dispatch workflow aborted event
             self._dispatch_workflow_event(
@@ -409,7 +609,10 @@ class WorkflowEngine(WorkflowEngineInterface):
             "current_index": workflow["current_index"],
             "total_actions": len(workflow["actions"]),
             "completed_actions": min(workflow["current_index"], len(workflow["actions"])),
-            "context_state": workflow["context"].state.current_state.name
+            "context_state": workflow["context"].state.current_state.name,
+            "last_checkpoint_id": workflow.get("last_checkpoint_id"),
+            "checkpoint_failures": workflow.get("checkpoint_failures", 0),
+            "last_checkpoint_error": workflow.get("last_checkpoint_error")
         }
 
     def get_workflow_statistics(self, workflow_id: str) -> Optional[WorkflowStatistics]:
@@ -452,6 +655,150 @@ class WorkflowEngine(WorkflowEngineInterface):
         """
         self._event_dispatcher.remove_listener(event_type, listener)
 
+    def _lease_driver(self, workflow: Dict[str, Any]) -> Optional[Any]:
+        """
+        Get the browser driver of a workflow run, leasing one from the pool if needed
+
+        Args:
+            workflow: Workflow state
+
+        Returns:
+            Leased driver, or None if there is no pool or the context has its own driver
+        """
+        lease = workflow.get("driver_lease")
+        if lease is not None:
+            return lease.driver
+        if self.driver_pool is None or workflow["context"].variables.has("driver"):
+            return None
+        lease = self.driver_pool.acquire()
+        workflow["driver_lease"] = lease
+        self.logger.debug(f"Leased browser for workflow {workflow['id']} after {lease.wait_time:.3f}s")
+        return lease.driver
+
+    def _register_workflow(
+        self,
+        workflow_id: str,
+        actions: List[BaseAction],
+        context: ExecutionContext,
+        current_index: int = 0,
+        results: Optional[List[ActionResult]] = None
+    ) -> None:
+        """
+        Initialize the state and statistics of a workflow run
+
+        Args:
+            workflow_id: ID of the workflow
+            actions: Actions of the workflow
+            context: Execution context of the run
+            current_index: Index of the first action to run
+            results: Results of the actions before current_index
+        """
+        if self.batch_dom_actions:
+            actions = group_dom_actions(actions)
+
+        # Initialize workflow state
+        self._workflows[workflow_id] = {
+            "id": workflow_id,
+            "actions": actions,
+            "context": context,
+            "current_index": current_index,
+            "status": WorkflowStatus.PENDING,
+            "results": results or [],
+            "checkpoint_failures": 0
+        }
+
+        # Create statistics collector
+        self._statistics[workflow_id] = WorkflowStatistics()
+
+    def _create_checkpoint_schedule(self) -> Optional[CheckpointSchedule]:
+        """
+        Create the checkpoint schedule of a workflow run
+
+        Returns:
+            Schedule, or None if the engine takes no automatic checkpoints
+        """
+        if self.state_manager is None or self.checkpoint_policy is None:
+            return None
+        return self.checkpoint_policy.create_schedule()
+
+    def _checkpoint_if_due(
+        self,
+        workflow: Dict[str, Any],
+        schedule: CheckpointSchedule,
+        action: BaseAction,
+        results: List[ActionResult]
+    ) -> None:
+        """
+        Checkpoint a workflow before an action if its policy says so
+
+        A failed checkpoint is logged and counted in the workflow status, and
+        the run continues; as it is not recorded in the schedule, the
+        checkpoint is tried again before the next action.
+
+        Args:
+            workflow: Workflow state
+            schedule: Checkpoint schedule of the run
+            action: Action about to run
+            results: Results of the actions run so far
+        """
+        reason = schedule.checkpoint_reason(action)
+        if reason is None:
+            return
+
+        data = {
+            "workflow_id": workflow["id"],
+            "current_index": workflow["current_index"],
+            "results": [
+                {"success": result.success, "message": result.message, "data": result.data}
+                for result in results
+            ],
+            "reason": reason
+        }
+        started = time.perf_counter()
+        try:
+            workflow["last_checkpoint_id"] = self.state_manager.create_checkpoint(
+                workflow["id"], workflow["context"], data
+            )
+        except Exception as e:
+            self.logger.warning(f"Automatic checkpoint of workflow {workflow['id']} failed: {str(e)}")
+            workflow["checkpoint_failures"] += 1
+            workflow["last_checkpoint_error"] = str(e)
+            return
+        schedule.checkpoint_taken(time.perf_counter() - started)
+
+    def _end_checkpoint_chain(self, workflow_id: str) -> None:
+        """
+        Let the state manager drop the context of a run that ended
+
+        Args:
+            workflow_id: ID of the workflow
+        """
+        if self.state_manager is not None:
+            self.state_manager.end_chain(workflow_id)
+
+    def _flush_screenshots(self, workflow_id: str) -> None:
+        """
+        Wait for the screenshots queued by the shared screenshot managers to be written
+
+        Args:
+            workflow_id: ID of the workflow that ended
+        """
+        if ScreenshotManager is None:
+            return
+        if not ScreenshotManager.flush_all(self.screenshot_flush_timeout):
+            self.logger.warning(f"Screenshots of workflow {workflow_id} still pending after flush timeout")
+
+    def _release_driver(self, workflow: Dict[str, Any]) -> None:
+        """
+        Return the browser driver leased for a workflow to the pool
+
+        Args:
+            workflow: Workflow state
+        """
+        lease = workflow.pop("driver_lease", None)
+        if lease is not None:
+            lease.release()
+
     def _dispatch_workflow_event(
         self,
         event_type: WorkflowEventType,
@@ -30,7 +30,7 @@ class VariableAdapter:
             variables = []
             
             # Convert backend variables to UI variables
-            for name, value in self.variable_storage._variables[scope].items():
+            for name, value in self.variable_storage.get_all(scope).items():
                 variables.append(UIVariable(
                     name=name,
                     value=value,
@@ -78,6 +78,39 @@ class TestClickAction(unittest.TestCase):
         mock_driver.find_element_by_css_selector.assert_called_once_with("#submit")
         mock_element.click.assert_called_once()
 
+    def test_click_locates_element_without_page_generation(self):
+        """Test that clicks do not reuse elements when the page generation is not tracked"""
+        # Arrange
+        mock_driver = MagicMock()
+        first = ClickAction(description="Focus name", selector="#name")
+        second = ClickAction(description="Click name again", selector="#name")
+
+        # Act
+        first.execute({"driver": mock_driver})
+        result = second.execute({"driver": mock_driver})
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertEqual(mock_driver.find_element_by_css_selector.call_count, 2)
+        self.assertFalse(result.data)
+
+    def test_click_reuses_element_of_same_page_generation(self):
+        """Test that a click reuses an element located on the same page generation and bumps it"""
+        # Arrange
+        mock_driver = MagicMock()
+        first = ClickAction(description="Focus name", selector="#name")
+        second = ClickAction(description="Click name again", selector="#name")
+
+        # Act
+        first_result = first.execute({"driver": mock_driver, "page_generation": 1})
+        second.execute({"driver": mock_driver, "page_generation": 1})
+        second.execute({"driver": mock_driver, "page_generation": first_result.data["page_generation"]})
+
+        # Assert
+        self.assertEqual(first_result.data, {"page_generation": 2})
+        self.assertEqual(mock_driver.find_element_by_css_selector.call_count, 2)
+        self.assertEqual(mock_driver.find_element_by_css_selector.return_value.click.call_count, 3)
+
     def test_click_action_execution_failure_no_driver(self):
         """Test ClickAction execution with no driver in context"""
         # Arrange
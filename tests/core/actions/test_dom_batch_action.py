@@ -0,0 +1,270 @@
+"""Tests for the DomBatchAction and DOM action grouping"""
+import unittest
+from unittest.mock import MagicMock
+from typing import Dict, Any
+
+from src.core.actions.base_action import BaseAction
+from src.core.actions.action_interface import ActionResult
+from src.core.actions.action_factory import ActionFactory
+from src.core.actions.click_action import ClickAction
+from src.core.actions.for_each_action import ForEachAction
+from src.core.actions.dom_batch_action import DomBatchAction, group_dom_actions, execute_expanded
+
+
+class RecordingAction(BaseAction):
+    """Non-batchable action recording its executions"""
+
+    def __init__(self, description: str = "Record"):
+        """Initialize the action"""
+        super().__init__(description)
+        self.executions = 0
+
+    @property
+    def type(self) -> str:
+        """Get the action type"""
+        return "recording"
+
+    def _execute(self, context: Dict[str, Any]) -> ActionResult:
+        """Execute the action"""
+        self.executions += 1
+        return ActionResult.create_success("Recorded")
+
+
+class TestGroupDomActions(unittest.TestCase):
+    """Test cases for group_dom_actions"""
+
+    def test_groups_runs_of_batchable_actions(self):
+        """Test that consecutive clicks are grouped and other actions are kept"""
+        # Arrange
+        click_a = ClickAction("Click A", "#a")
+        click_b = ClickAction("Click B", "#b")
+        record = RecordingAction()
+        click_c = ClickAction("Click C", "#c")
+
+        # Act
+        grouped = group_dom_actions([click_a, click_b, record, click_c])
+
+        # Assert
+        self.assertEqual(len(grouped), 3)
+        self.assertIsInstance(grouped[0], DomBatchAction)
+        self.assertEqual(grouped[0].actions, [click_a, click_b])
+        self.assertIs(grouped[1], record)
+        self.assertIs(grouped[2], click_c)
+
+    def test_min_batch_size(self):
+        """Test that runs shorter than the minimum are not grouped"""
+        # Arrange
+        actions = [ClickAction("Click A", "#a"), ClickAction("Click B", "#b")]
+
+        # Act
+        grouped = group_dom_actions(actions, min_batch_size=3)
+
+        # Assert
+        self.assertEqual(grouped, actions)
+
+
+class TestDomBatchAction(unittest.TestCase):
+    """Test cases for the DomBatchAction"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.click_a = ClickAction("Click A", "#a")
+        self.click_b = ClickAction("Click B", "#b")
+        self.click_c = ClickAction("Click C", "#c")
+        self.batch = DomBatchAction("Batch", [self.click_a, self.click_b, self.click_c])
+        self.driver = MagicMock()
+        # Other tests may have reset the registry
+        ActionFactory.get_instance().register_action_type("click", ClickAction)
+
+    def test_runs_all_steps_in_one_script_call(self):
+        """Test that the batch makes one round-trip and reports each action"""
+        # Arrange
+        self.driver.execute_script.return_value = [{"ok": True}, {"ok": True}, {"ok": True}]
+
+        # Act
+        result = self.batch.execute({"driver": self.driver})
+
+        # Assert
+        self.assertTrue(result.success)
+        self.driver.execute_script.assert_called_once()
+        steps = self.driver.execute_script.call_args[0][1]
+        self.assertEqual(steps, [
+            {"op": "click", "selector": "#a"},
+            {"op": "click", "selector": "#b"},
+            {"op": "click", "selector": "#c"}
+        ])
+        self.driver.find_element_by_css_selector.assert_not_called()
+        self.assertEqual(
+            [r.message for r in result.data["results"]],
+            ["Clicked element: #a", "Clicked element: #b", "Clicked element: #c"]
+        )
+
+    def test_failed_step_falls_back_to_individual_execution(self):
+        """Test that the steps from the failed one on are executed individually"""
+        # Arrange
+        self.driver.execute_script.return_value = [{"ok": True}, {"ok": False, "error": "Element not found: #b"}]
+
+        # Act
+        results = self.batch.execute_batch({"driver": self.driver})
+
+        # Assert
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r.success for r in results))
+        selectors = [c[0][0] for c in self.driver.find_element_by_css_selector.call_args_list]
+        self.assertNotIn("#a", selectors)
+        self.assertIn("#b", selectors)
+        self.assertIn("#c", selectors)
+
+    def test_batched_steps_bump_page_generation(self):
+        """Test that actions run after batched steps do not reuse elements located before them"""
+        # Arrange
+        self.driver.execute_script.return_value = [{"ok": True}, {"ok": False, "error": "Element not found: #b"}]
+        ClickAction("Locate B", "#b").execute({"driver": self.driver, "page_generation": 1})
+        self.driver.find_element_by_css_selector.reset_mock()
+
+        # Act
+        results = self.batch.execute_batch({"driver": self.driver, "page_generation": 1})
+
+        # Assert
+        self.assertEqual(results[0].data, {"page_generation": 2})
+        self.assertEqual(results[1].data, {"page_generation": 3})
+        selectors = [c[0][0] for c in self.driver.find_element_by_css_selector.call_args_list]
+        self.assertEqual(selectors, ["#b", "#c"])
+
+    def _fail_script(self, progress):
+        """Make the batch script raise, with the page reporting the given progress"""
+        def execute_script(script, *args):
+            if len(args) == 2:
+                raise Exception("unexpected alert open")
+            if isinstance(progress, Exception):
+                raise progress
+            return progress
+        self.driver.execute_script.side_effect = execute_script
+
+    def test_script_error_before_any_step_falls_back_and_stops_at_failure(self):
+        """Test that a script failing before its first step runs the actions individually"""
+        # Arrange
+        self._fail_script({"started": 0, "done": 0})
+        self.driver.find_element_by_css_selector.side_effect = [MagicMock(), Exception("not found")]
+
+        # Act
+        result = self.batch.execute({"driver": self.driver})
+
+        # Assert
+        self.assertFalse(result.success)
+        self.assertEqual(len(result.data["results"]), 2)
+        self.assertIn("not found", result.data["failed_result"].message)
+
+    def test_script_error_after_completed_steps_resumes_after_them(self):
+        """Test that only the steps the script did not start are executed individually"""
+        # Arrange
+        self._fail_script({"started": 2, "done": 2})
+
+        # Act
+        results = self.batch.execute_batch({"driver": self.driver})
+
+        # Assert
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(r.success for r in results))
+        selectors = [c[0][0] for c in self.driver.find_element_by_css_selector.call_args_list]
+        self.assertEqual(set(selectors), {"#c"})
+
+    def test_interrupted_step_is_not_replayed(self):
+        """Test that a step that started but did not complete fails instead of running again"""
+        # Arrange
+        self._fail_script({"started": 2, "done": 1})
+
+        # Act
+        results = self.batch.execute_batch({"driver": self.driver})
+
+        # Assert
+        self.assertEqual([r.success for r in results], [True, False])
+        self.assertIn("Click B", results[1].message)
+        self.driver.find_element_by_css_selector.assert_not_called()
+
+    def test_unknown_progress_is_not_replayed(self):
+        """Test that a batch fails without replaying when its progress cannot be read"""
+        # Arrange
+        self._fail_script(Exception("unexpected alert open"))
+
+        # Act
+        results = self.batch.execute_batch({"driver": self.driver})
+
+        # Assert
+        self.assertEqual(len(results), 1)
+        self.assertFalse(results[0].success)
+        self.driver.find_element_by_css_selector.assert_not_called()
+
+    def test_serialization_round_trip(self):
+        """Test serializing and deserializing a batch"""
+        # Arrange
+        data = self.batch.to_dict()
+
+        # Act
+        restored = DomBatchAction.from_dict(data)
+
+        # Assert
+        self.assertEqual(data["type"], "dom_batch")
+        self.assertEqual([a.selector for a in restored.actions], ["#a", "#b", "#c"])
+
+    def test_execute_expanded(self):
+        """Test that execute_expanded reports one result per batched action"""
+        # Arrange
+        self.driver.execute_script.return_value = [{"ok": True}] * 3
+        record = RecordingAction()
+
+        # Act
+        batch_results = execute_expanded(self.batch, {"driver": self.driver})
+        single_results = execute_expanded(record, {})
+
+        # Assert
+        self.assertEqual(len(batch_results), 3)
+        self.assertEqual(len(single_results), 1)
+        self.assertEqual(record.executions, 1)
+
+
+class TestForEachDomBatching(unittest.TestCase):
+    """Test cases for DOM batching in for-each bodies"""
+
+    def test_for_each_batches_body(self):
+        """Test that each iteration runs its clicks in one script call"""
+        # Arrange
+        ActionFactory.get_instance().register_action_type("click", ClickAction)
+        driver = MagicMock()
+        driver.execute_script.return_value = [{"ok": True}, {"ok": True}]
+        action = ForEachAction(
+            "Loop", "items", "item",
+            [ClickAction("Click A", "#a"), ClickAction("Click B", "#b")],
+            batch_dom_actions=True
+        )
+
+        # Act
+        result = action.execute({"driver": driver, "items": [1, 2, 3]})
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertEqual(driver.execute_script.call_count, 3)
+        self.assertEqual([len(r) for r in result.data["results"]], [2, 2, 2])
+        self.assertTrue(ForEachAction.from_dict(action.to_dict()).batch_dom_actions)
+
+    def test_for_each_body_does_not_reuse_elements_after_click(self):
+        """Test that a lookup after a click in a loop body locates its element again"""
+        # Arrange
+        driver = MagicMock()
+        action = ForEachAction(
+            "Loop", "items", "item",
+            [ClickAction("Open", "#row"), ClickAction("Click again", "#row")]
+        )
+        context = {"driver": driver, "items": [1, 2], "page_generation": 1}
+
+        # Act
+        result = action.execute(context)
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertEqual(driver.find_element_by_css_selector.call_count, 4)
+        self.assertEqual(context["page_generation"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,8 @@ from unittest.mock import MagicMock, patch
 
 from src.core.actions.screenshot_action import ScreenshotAction
 from src.core.utils.screenshot_capture import CaptureMode
+from src.core.utils.screenshot_manager import ScreenshotManager
+from src.core.utils.screenshot_retention import RetentionPolicy
 
 
 class TestScreenshotAction(unittest.TestCase):
@@ -206,6 +208,108 @@ class TestScreenshotAction(unittest.TestCase):
         self.assertEqual(action.region, (10, 20, 100, 50))
         self.assertEqual(action.screenshot_dir, self.screenshot_dir)
 
+    @patch('src.core.utils.screenshot_manager.ScreenshotManager.capture_and_save')
+    def test_async_writes(self, mock_capture_and_save):
+        """Test that async actions write in the background through a long-lived manager"""
+        # Arrange
+        mock_capture_and_save.return_value = os.path.join(self.screenshot_dir, "test_async.png")
+        action = ScreenshotAction(
+            description="Capture full screen",
+            name="test_async",
+            screenshot_dir=self.screenshot_dir,
+            async_writes=True
+        )
+
+        # Act
+        action.execute(self.context)
+        action.execute(self.context)
+        restored = ScreenshotAction.from_dict(action.to_dict())
+
+        # Assert
+        self.assertTrue(mock_capture_and_save.call_args[1]["background"])
+        self.assertIs(
+            ScreenshotManager.shared(self.screenshot_dir),
+            ScreenshotManager.shared(self.screenshot_dir)
+        )
+        self.assertTrue(restored.async_writes)
+
+    @patch('src.core.utils.screenshot_manager.ScreenshotManager.capture_and_save')
+    def test_encoding_profile(self, mock_capture_and_save):
+        """Test that the selected encoding profile is passed to the manager"""
+        # Arrange
+        mock_capture_and_save.return_value = os.path.join(self.screenshot_dir, "test_encoded.webp")
+        action = ScreenshotAction(
+            description="Capture full screen",
+            name="test_encoded",
+            screenshot_dir=self.screenshot_dir,
+            encoding="webp"
+        )
+
+        # Act
+        action.execute(self.context)
+        restored = ScreenshotAction.from_dict(action.to_dict())
+
+        # Assert
+        self.assertEqual(mock_capture_and_save.call_args[1]["encoding"], "webp")
+        self.assertEqual(restored.encoding, "webp")
+
+    def test_unknown_encoding_profile(self):
+        """Test that unknown encoding profiles are rejected"""
+        with self.assertRaises(ValueError):
+            ScreenshotAction(
+                description="Capture full screen",
+                name="test_encoded",
+                encoding="no-such-profile"
+            )
+
+    @patch('src.core.utils.screenshot_manager.ScreenshotManager.capture_and_save')
+    def test_near_duplicate_threshold(self, mock_capture_and_save):
+        """Test that the near-duplicate threshold reaches the deduplicating storage"""
+        # Arrange
+        mock_capture_and_save.return_value = os.path.join(self.screenshot_dir, "test_dedup.png")
+        screenshot_dir = os.path.join(self.screenshot_dir, "dedup")
+        action = ScreenshotAction(
+            description="Capture full screen",
+            name="test_dedup",
+            screenshot_dir=screenshot_dir,
+            deduplicate=True,
+            near_duplicate_threshold=3
+        )
+
+        # Act
+        action.execute(self.context)
+        restored = ScreenshotAction.from_dict(action.to_dict())
+
+        # Assert
+        storage = ScreenshotManager.shared(screenshot_dir, content_addressed=True).storage
+        self.assertEqual(storage.near_duplicate_threshold, 3)
+        self.assertEqual(restored.near_duplicate_threshold, 3)
+        with self.assertRaises(ValueError):
+            ScreenshotAction("Capture", "test", near_duplicate_threshold=3)
+
+    @patch('src.core.utils.screenshot_manager.ScreenshotManager.capture_and_save')
+    def test_retention_policy(self, mock_capture_and_save):
+        """Test that the action starts retention on the directory's shared manager"""
+        # Arrange
+        mock_capture_and_save.return_value = os.path.join(self.screenshot_dir, "test_retained.png")
+        screenshot_dir = os.path.join(self.screenshot_dir, "retained")
+        action = ScreenshotAction(
+            description="Capture full screen",
+            name="test_retained",
+            screenshot_dir=screenshot_dir,
+            retention=RetentionPolicy(max_per_workflow=5)
+        )
+
+        # Act
+        action.execute(self.context)
+        restored = ScreenshotAction.from_dict(action.to_dict())
+
+        # Assert
+        manager = ScreenshotManager.shared(screenshot_dir)
+        self.addCleanup(manager.stop_retention)
+        self.assertEqual(manager.retention.policy.max_per_workflow, 5)
+        self.assertEqual(restored.retention.to_dict(), action.retention.to_dict())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,6 +8,7 @@ from src.core.actions.action_interface import ActionResult
 from src.core.actions.switch_case_action import SwitchCaseAction, CaseBranch
 from src.core.actions.action_factory import ActionFactory
 from src.core.conditions.condition_interface import ConditionInterface, ConditionResult
+from src.core.conditions.element_exists_condition import ElementExistsCondition
 
 
 # Test condition for switch-case action tests
@@ -189,6 +190,32 @@ class TestSwitchCaseAction(unittest.TestCase):
         self.assertTrue(case1_action.executed)
         self.assertIn("failed", result.message.lower())
 
+    def test_execute_batch_dom_probes(self):
+        """Test that DOM-based cases are resolved with one script call"""
+        # Arrange
+        driver = MagicMock()
+        driver.execute_script.return_value = {
+            "#a": {"exists": False, "count": 0, "text": None, "attributes": {}},
+            "#b": {"exists": True, "count": 1, "text": "", "attributes": {}},
+            "#c": {"exists": True, "count": 1, "text": "", "attributes": {}}
+        }
+        case_actions = [TestAction(), TestAction(), TestAction()]
+        cases = [
+            CaseBranch(ElementExistsCondition(selector), [case_action], selector)
+            for selector, case_action in zip(["#a", "#b", "#c"], case_actions)
+        ]
+        action = SwitchCaseAction("Test switch-case", cases, batch_dom_probes=True)
+
+        # Act
+        result = action.execute({"driver": driver})
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertEqual(result.data["branch"], "#b")
+        self.assertTrue(case_actions[1].executed)
+        driver.execute_script.assert_called_once()
+        driver.find_elements_by_css_selector.assert_not_called()
+
     def test_serialization(self):
         """Test serializing a SwitchCaseAction to dict"""
         # Arrange
@@ -0,0 +1,80 @@
+"""Tests for the wait for condition action"""
+import unittest
+from typing import Dict, Any
+
+from src.core.actions.wait_for_condition_action import WaitForConditionAction
+from src.core.conditions.condition_interface import ConditionInterface, ConditionResult
+from src.core.conditions.condition_waiter import PollingStrategy
+
+
+class CountdownCondition(ConditionInterface):
+    """Condition that becomes true after a number of evaluations"""
+
+    def __init__(self, ready_after: int):
+        """Initialize the test condition"""
+        self.ready_after = ready_after
+        self.evaluations = 0
+
+    def evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
+        """Evaluate the condition"""
+        self.evaluations += 1
+        return ConditionResult.create_success(self.evaluations >= self.ready_after)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the condition to a dictionary"""
+        return {"type": "countdown"}
+
+
+class TestWaitForConditionAction(unittest.TestCase):
+    """Test cases for the WaitForConditionAction class"""
+
+    def test_execute_condition_met(self):
+        """Test that the action succeeds once the condition is met"""
+        # Arrange
+        action = WaitForConditionAction(
+            "Wait for banner", CountdownCondition(2), timeout=1.0, initial_interval=0.001
+        )
+
+        # Act
+        result = action.execute({})
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertEqual(result.data["polls"], 2)
+
+    def test_execute_timeout(self):
+        """Test that the action fails when the condition is not met in time"""
+        # Arrange
+        action = WaitForConditionAction(
+            "Wait for banner", CountdownCondition(10000), timeout=0.02,
+            initial_interval=0.005, max_interval=0.005
+        )
+
+        # Act
+        result = action.execute({})
+
+        # Assert
+        self.assertFalse(result.success)
+        self.assertIn("Timed out", result.message)
+
+    def test_serialization(self):
+        """Test serializing the action to a dictionary"""
+        # Arrange
+        action = WaitForConditionAction(
+            "Wait for banner", CountdownCondition(1), timeout=5.0,
+            strategy=PollingStrategy.EXPONENTIAL, action_id="wait-id"
+        )
+
+        # Act
+        data = action.to_dict()
+
+        # Assert
+        self.assertEqual(data["type"], "wait_for_condition")
+        self.assertEqual(data["id"], "wait-id")
+        self.assertEqual(data["timeout"], 5.0)
+        self.assertEqual(data["strategy"], "EXPONENTIAL")
+        self.assertEqual(data["condition"], {"type": "countdown"})
+
+
+if __name__ == "__main__":
+    unittest.main()
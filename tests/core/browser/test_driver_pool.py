@@ -0,0 +1,233 @@
+"""Tests for the driver pool"""
+import threading
+import unittest
+
+from src.core.browser.driver_pool import DriverPool
+from src.core.browser.fake_driver import FakeDriver
+
+
+class TestDriverPool(unittest.TestCase):
+    """Test cases for the DriverPool class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.launched = []
+        self.pool = DriverPool(self._launch, size=2, max_uses=3)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.pool.close()
+
+    def _launch(self) -> FakeDriver:
+        """Launch a fake driver and remember it"""
+        driver = FakeDriver()
+        self.launched.append(driver)
+        return driver
+
+    def test_start_prelaunches_sessions(self):
+        """Test that start() fills the pool before any lease"""
+        # Act
+        self.pool.start()
+
+        # Assert
+        metrics = self.pool.get_metrics()
+        self.assertEqual(len(self.launched), 2)
+        self.assertEqual(metrics["idle"], 2)
+        self.assertEqual(metrics["launches"], 2)
+
+    def test_lease_reuses_warm_session(self):
+        """Test that a released session is leased again instead of launching a new one"""
+        # Arrange
+        self.pool.start()
+
+        # Act
+        with self.pool.acquire() as first:
+            pass
+        with self.pool.acquire() as second:
+            pass
+
+        # Assert
+        self.assertEqual(len(self.launched), 2)
+        self.assertIn(first, self.launched)
+        self.assertIn(second, self.launched)
+        self.assertEqual(self.pool.get_metrics()["leases"], 2)
+
+    def test_reset_between_leases(self):
+        """Test that windows, cookies and storage are cleared when a lease ends"""
+        # Arrange
+        lease = self.pool.acquire()
+        driver = lease.driver
+        driver.get("https://example.com")
+        driver.add_cookie({"name": "session", "value": "abc"})
+        driver.local_storage["key"] = "value"
+        driver.session_storage["key"] = "value"
+        driver.switch_to.window(driver.open_window())
+
+        # Act
+        lease.release()
+
+        # Assert
+        self.assertEqual(len(driver.window_handles), 1)
+        self.assertEqual(driver.current_window_handle, driver.window_handles[0])
+        self.assertEqual(driver.get_cookies(), [])
+        self.assertEqual(driver.local_storage, {})
+        self.assertEqual(driver.session_storage, {})
+        self.assertEqual(driver.current_url, "about:blank")
+
+    def test_reset_clears_every_visited_origin(self):
+        """Test that cookies and storage of all origins a run visited are cleared"""
+        # Arrange
+        lease = self.pool.acquire()
+        driver = lease.driver
+        for url in ("https://a.example.com/login", "https://b.example.org/"):
+            driver.get(url)
+            driver.add_cookie({"name": "session", "value": url})
+            driver.local_storage["key"] = url
+            driver.session_storage["key"] = url
+        popup = driver.open_window()
+        driver.switch_to.window(popup)
+        driver.get("https://c.example.net/")
+        driver.local_storage["key"] = "popup"
+
+        # Act
+        lease.release()
+        second = self.pool.acquire().driver
+
+        # Assert
+        self.assertIs(second, driver)
+        for url in ("https://a.example.com/", "https://b.example.org/", "https://c.example.net/"):
+            driver.get(url)
+            self.assertEqual(driver.get_cookies(), [])
+            self.assertEqual(driver.local_storage, {})
+            self.assertEqual(driver.session_storage, {})
+
+    def test_session_without_devtools_is_replaced(self):
+        """Test that a session that cannot be cleared browser-wide is not leased again"""
+        # Arrange
+        class PlainDriver(FakeDriver):
+            @property
+            def execute_cdp_cmd(self):
+                raise AttributeError("execute_cdp_cmd")
+
+        pool = DriverPool(PlainDriver, size=1)
+        lease = pool.acquire()
+
+        # Act
+        lease.release()
+        second = pool.acquire(timeout=5)
+
+        # Assert
+        self.assertIsNot(second.driver, lease.driver)
+        self.assertTrue(lease.driver.quit_called)
+        second.release()
+        pool.close()
+
+    def test_recycle_after_max_uses(self):
+        """Test that a session is replaced after max_uses leases"""
+        # Arrange
+        pool = DriverPool(self._launch, size=1, max_uses=2)
+
+        # Act
+        for _ in range(2):
+            pool.acquire().release()
+        lease = pool.acquire(timeout=5)
+
+        # Assert
+        self.assertTrue(self.launched[0].quit_called)
+        self.assertIs(lease.driver, self.launched[1])
+        self.assertEqual(pool.get_metrics()["recycled"], 1)
+        lease.release()
+        pool.close()
+
+    def test_crashed_session_replaced(self):
+        """Test that a session that crashed while idle is not leased"""
+        # Arrange
+        pool = DriverPool(self._launch, size=1)
+        pool.start()
+        self.launched[0].crash()
+
+        # Act
+        lease = pool.acquire(timeout=5)
+
+        # Assert
+        self.assertIs(lease.driver, self.launched[1])
+        self.assertEqual(pool.get_metrics()["crashed"], 1)
+        lease.release()
+        pool.close()
+
+    def test_crash_during_lease(self):
+        """Test that a session that crashed during its lease is replaced on release"""
+        # Arrange
+        pool = DriverPool(self._launch, size=1)
+        lease = pool.acquire()
+
+        # Act
+        lease.driver.crash()
+        lease.release()
+        replacement = pool.acquire(timeout=5)
+
+        # Assert
+        self.assertIsNot(replacement.driver, lease.driver)
+        self.assertEqual(pool.get_metrics()["crashed"], 1)
+        replacement.release()
+        pool.close()
+
+    def test_wait_for_session(self):
+        """Test that acquire waits for a release when every session is leased"""
+        # Arrange
+        pool = DriverPool(self._launch, size=1)
+        lease = pool.acquire()
+        acquired = []
+
+        def acquire():
+            acquired.append(pool.acquire(timeout=5))
+
+        # Act
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        lease.release()
+        thread.join(5)
+
+        # Assert
+        self.assertIs(acquired[0].driver, lease.driver)
+        self.assertGreaterEqual(pool.get_metrics()["wait_time_max"], 0.0)
+        acquired[0].release()
+        pool.close()
+
+    def test_acquire_timeout(self):
+        """Test that acquire gives up after the timeout"""
+        # Arrange
+        pool = DriverPool(self._launch, size=1)
+        lease = pool.acquire()
+
+        # Act & Assert
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+        lease.release()
+        pool.close()
+
+    def test_close(self):
+        """Test that closing quits idle sessions and sessions released afterwards"""
+        # Arrange
+        self.pool.start()
+        lease = self.pool.acquire()
+
+        # Act
+        self.pool.close()
+        lease.release()
+
+        # Assert
+        self.assertTrue(all(driver.quit_called for driver in self.launched))
+        with self.assertRaises(RuntimeError):
+            self.pool.acquire()
+
+    def test_invalid_parameters(self):
+        """Test that invalid pool settings are rejected"""
+        with self.assertRaises(ValueError):
+            DriverPool(self._launch, size=0)
+        with self.assertRaises(ValueError):
+            DriverPool(self._launch, max_uses=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Tests for adaptive cost-based ordering of composite conditions"""
+import time
+import unittest
+from typing import Dict, Any, List
+
+from src.core.conditions.condition_interface import ConditionResult
+from src.core.conditions.base_condition import BaseCondition
+from src.core.conditions.composite_conditions import AndCondition, OrCondition
+
+
+class ProbeCondition(BaseCondition[bool]):
+    """Condition with a fixed value and cost that records its evaluations"""
+
+    def __init__(self, name: str, value: bool, cost: float, log: List[str], pure: bool = True):
+        """Initialize the probe condition"""
+        super().__init__(name)
+        self.name = name
+        self.value = value
+        self.cost = cost
+        self.log = log
+        self.pure = pure
+
+    @property
+    def type(self) -> str:
+        """Get the condition type"""
+        return "probe"
+
+    @property
+    def is_pure(self) -> bool:
+        """Get whether the condition is free of side effects"""
+        return self.pure
+
+    def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
+        """Evaluate the condition"""
+        self.log.append(self.name)
+        if self.cost:
+            time.sleep(self.cost)
+        return ConditionResult.create_success(self.value)
+
+
+class TestAdaptiveOrdering(unittest.TestCase):
+    """Test cases for adaptive AND/OR ordering"""
+
+    def test_declaration_order_by_default(self):
+        """Test that subconditions are evaluated in declaration order when not adaptive"""
+        # Arrange
+        log: List[str] = []
+        condition = AndCondition(
+            ProbeCondition("dom", True, 0.0, log),
+            ProbeCondition("var", False, 0.0, log)
+        )
+
+        # Act
+        condition.evaluate({})
+        condition.evaluate({})
+
+        # Assert
+        self.assertEqual(log, ["dom", "var", "dom", "var"])
+
+    def test_and_moves_cheap_false_condition_first(self):
+        """Test that an adaptive AND learns to evaluate the cheap short-circuiting child first"""
+        # Arrange
+        log: List[str] = []
+        condition = AndCondition(
+            ProbeCondition("dom", True, 0.005, log),
+            ProbeCondition("var", False, 0.0, log),
+            adaptive=True
+        )
+
+        # Act
+        for _ in range(3):
+            result = condition.evaluate({})
+        log.clear()
+        condition.evaluate({})
+
+        # Assert
+        self.assertFalse(result.value)
+        self.assertEqual(log, ["var"])
+
+    def test_or_moves_cheap_true_condition_first(self):
+        """Test that an adaptive OR learns to evaluate the cheap short-circuiting child first"""
+        # Arrange
+        log: List[str] = []
+        condition = OrCondition(
+            ProbeCondition("dom", False, 0.005, log),
+            ProbeCondition("var", True, 0.0, log),
+            adaptive=True
+        )
+
+        # Act
+        for _ in range(3):
+            result = condition.evaluate({})
+        log.clear()
+        condition.evaluate({})
+
+        # Assert
+        self.assertTrue(result.value)
+        self.assertEqual(log, ["var"])
+
+    def test_impure_children_are_not_moved(self):
+        """Test that impure subconditions keep their position and act as barriers"""
+        # Arrange
+        log: List[str] = []
+        condition = AndCondition(
+            ProbeCondition("slow", True, 0.005, log),
+            ProbeCondition("side_effect", True, 0.0, log, pure=False),
+            ProbeCondition("fast", False, 0.0, log),
+            adaptive=True
+        )
+
+        # Act
+        for _ in range(3):
+            condition.evaluate({})
+        log.clear()
+        condition.evaluate({})
+
+        # Assert
+        self.assertEqual(log, ["slow", "side_effect", "fast"])
+
+    def test_child_statistics(self):
+        """Test that runtime statistics are recorded for each subcondition"""
+        # Arrange
+        log: List[str] = []
+        condition = AndCondition(
+            ProbeCondition("a", True, 0.0, log),
+            ProbeCondition("b", True, 0.0, log),
+            adaptive=True
+        )
+
+        # Act
+        condition.evaluate({})
+        condition.evaluate({})
+        statistics = condition.get_child_statistics()
+
+        # Assert
+        self.assertEqual(statistics[0]["evaluations"], 2)
+        self.assertEqual(statistics[1]["true_rate"], 1.0)
+        self.assertTrue(condition.is_pure)
+        self.assertTrue(condition.to_dict()["adaptive"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""Tests for condition result memoization"""
+import threading
+import unittest
+from typing import Dict, Any
+from unittest.mock import MagicMock
+
+from src.core.conditions.condition_interface import ConditionResult
+from src.core.conditions.base_condition import BaseCondition
+from src.core.conditions.condition_cache import ConditionCache
+from src.core.conditions.comparison_condition import ComparisonCondition, ComparisonOperator
+from src.core.conditions.composite_conditions import AndCondition
+from src.core.conditions.element_exists_condition import ElementExistsCondition
+
+
+class CountingCondition(BaseCondition[bool]):
+    """Condition that reads one variable and counts its evaluations"""
+
+    def __init__(self, variable: str):
+        """Initialize the counting condition"""
+        super().__init__("Counting condition")
+        self.variable = variable
+        self.evaluations = 0
+
+    @property
+    def type(self) -> str:
+        """Get the condition type"""
+        return "counting"
+
+    @property
+    def dependencies(self):
+        """Get the variables read by the condition"""
+        return {self.variable}
+
+    def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
+        """Evaluate the condition"""
+        self.evaluations += 1
+        return ConditionResult.create_success(bool(context.get(self.variable)))
+
+
+class TestConditionCache(unittest.TestCase):
+    """Test cases for condition memoization"""
+
+    def test_memoization_disabled_by_default(self):
+        """Test that conditions are re-evaluated when memoization is not enabled"""
+        # Arrange
+        condition = CountingCondition("flag")
+        context = {"flag": True}
+
+        # Act
+        condition.evaluate(context)
+        condition.evaluate(context)
+
+        # Assert
+        self.assertIsNone(condition.memo_cache)
+        self.assertEqual(condition.evaluations, 2)
+
+    def test_reuses_result_while_variables_unchanged(self):
+        """Test that the cached result is reused when the dependencies have not changed"""
+        # Arrange
+        condition = CountingCondition("flag")
+        cache = condition.enable_memoization()
+        context = {"flag": True, "other": 1}
+
+        # Act
+        first = condition.evaluate(context)
+        context["other"] = 2
+        second = condition.evaluate(context)
+
+        # Assert
+        self.assertTrue(first.value)
+        self.assertIs(first, second)
+        self.assertEqual(condition.evaluations, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_reevaluates_when_variable_changes(self):
+        """Test that changing a dependency invalidates the cached result"""
+        # Arrange
+        condition = CountingCondition("flag")
+        condition.enable_memoization()
+        context = {"flag": True}
+
+        # Act
+        condition.evaluate(context)
+        context["flag"] = False
+        result = condition.evaluate(context)
+
+        # Assert
+        self.assertFalse(result.value)
+        self.assertEqual(condition.evaluations, 2)
+
+    def test_detects_in_place_mutation(self):
+        """Test that mutating a list dependency in place invalidates the cached result"""
+        # Arrange
+        condition = ComparisonCondition("$items", ComparisonOperator.CONTAINS, "b")
+        condition.enable_memoization()
+        context = {"items": ["a"]}
+
+        # Act
+        first = condition.evaluate(context)
+        context["items"].append("b")
+        second = condition.evaluate(context)
+
+        # Assert
+        self.assertFalse(first.value)
+        self.assertTrue(second.value)
+
+    def test_failures_are_not_cached(self):
+        """Test that failed evaluations are retried"""
+        # Arrange
+        condition = ComparisonCondition("$missing", ComparisonOperator.EQUAL, 1)
+        cache = condition.enable_memoization()
+
+        # Act
+        condition.evaluate({})
+        condition.evaluate({})
+
+        # Assert
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.get_stats()["entries"], 0)
+
+    def test_dom_condition_requires_page_generation(self):
+        """Test that DOM conditions are only memoized with a page generation counter"""
+        # Arrange
+        condition = ElementExistsCondition("#banner")
+        condition.enable_memoization()
+        driver = MagicMock()
+        driver.find_elements_by_css_selector.return_value = [MagicMock()]
+
+        # Act
+        condition.evaluate({"driver": driver})
+        condition.evaluate({"driver": driver})
+        condition.evaluate({"driver": driver, "page_generation": 1})
+        condition.evaluate({"driver": driver, "page_generation": 1})
+        condition.evaluate({"driver": driver, "page_generation": 2})
+
+        # Assert
+        self.assertEqual(driver.find_elements_by_css_selector.call_count, 4)
+
+    def test_composite_dependencies(self):
+        """Test that composite conditions combine the dependencies of their subconditions"""
+        # Arrange
+        condition = AndCondition(CountingCondition("a"), CountingCondition("b"))
+
+        # Act & Assert
+        self.assertEqual(condition.dependencies, {"a", "b"})
+        self.assertFalse(condition.depends_on_dom)
+
+    def test_shared_cache_is_thread_safe(self):
+        """Test that a shared cache can be used from several threads"""
+        # Arrange
+        cache = ConditionCache()
+        conditions = [CountingCondition("flag") for _ in range(4)]
+        for condition in conditions:
+            condition.enable_memoization(cache)
+        context = {"flag": True}
+
+        def worker(condition):
+            for _ in range(100):
+                condition.evaluate(context)
+
+        threads = [threading.Thread(target=worker, args=(c,)) for c in conditions]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 400)
+        self.assertEqual(stats["misses"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""Tests for the condition wait engine"""
+import threading
+import time
+import unittest
+from typing import Dict, Any
+from unittest.mock import MagicMock
+
+from src.core.conditions.condition_interface import ConditionResult
+from src.core.conditions.base_condition import BaseCondition
+from src.core.conditions.condition_waiter import ConditionWaiter, PollingStrategy
+
+
+class ReadyAfterCondition(BaseCondition[bool]):
+    """Condition that becomes true after a number of evaluations"""
+
+    def __init__(self, ready_after: int, dom: bool = False):
+        """Initialize the condition"""
+        super().__init__("Ready after condition")
+        self.ready_after = ready_after
+        self.dom = dom
+        self.evaluations = 0
+
+    @property
+    def type(self) -> str:
+        """Get the condition type"""
+        return "ready_after"
+
+    @property
+    def depends_on_dom(self) -> bool:
+        """Get whether the condition reads the page"""
+        return self.dom
+
+    def _evaluate(self, context: Dict[str, Any]) -> ConditionResult[bool]:
+        """Evaluate the condition"""
+        self.evaluations += 1
+        return ConditionResult.create_success(self.evaluations >= self.ready_after)
+
+
+class TestConditionWaiter(unittest.TestCase):
+    """Test cases for the ConditionWaiter class"""
+
+    def test_returns_when_condition_met(self):
+        """Test that the wait ends as soon as the condition is met"""
+        # Arrange
+        waiter = ConditionWaiter(timeout=1.0, initial_interval=0.001, max_interval=0.01)
+        condition = ReadyAfterCondition(3)
+
+        # Act
+        result = waiter.wait(condition, {})
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertTrue(result.value)
+        self.assertEqual(waiter.last_wait["polls"], 3)
+
+    def test_timeout(self):
+        """Test that the wait gives up at the deadline"""
+        # Arrange
+        waiter = ConditionWaiter(timeout=0.05, initial_interval=0.01, max_interval=0.02)
+        condition = ReadyAfterCondition(1000)
+
+        # Act
+        start = time.monotonic()
+        result = waiter.wait(condition, {})
+        elapsed = time.monotonic() - start
+
+        # Assert
+        self.assertTrue(result.success)
+        self.assertFalse(result.value)
+        self.assertIn("Timed out", result.message)
+        self.assertLess(elapsed, 0.5)
+
+    def test_exponential_backoff_reduces_polls(self):
+        """Test that exponential polling needs fewer polls than fixed polling"""
+        # Arrange
+        fixed = ConditionWaiter(timeout=0.1, strategy=PollingStrategy.FIXED,
+                                initial_interval=0.005, max_interval=0.1)
+        exponential = ConditionWaiter(timeout=0.1, strategy=PollingStrategy.EXPONENTIAL,
+                                      initial_interval=0.005, max_interval=0.1)
+
+        # Act
+        fixed.wait(ReadyAfterCondition(1000), {})
+        exponential.wait(ReadyAfterCondition(1000), {})
+
+        # Assert
+        self.assertLess(exponential.last_wait["polls"], fixed.last_wait["polls"])
+
+    def test_cancel_event_in_context(self):
+        """Test that setting the context cancel event aborts the wait"""
+        # Arrange
+        waiter = ConditionWaiter(timeout=5.0, strategy=PollingStrategy.FIXED,
+                                 initial_interval=0.5, max_interval=0.5)
+        cancel_event = threading.Event()
+        threading.Timer(0.05, cancel_event.set).start()
+
+        # Act
+        start = time.monotonic()
+        result = waiter.wait(ReadyAfterCondition(1000), {"cancel_event": cancel_event})
+
+        # Assert
+        self.assertFalse(result.success)
+        self.assertIn("cancelled", result.message)
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_mutation_observer_between_polls(self):
+        """Test that DOM conditions wait for page mutations instead of sleeping"""
+        # Arrange
+        waiter = ConditionWaiter(timeout=1.0, initial_interval=0.01, use_mutation_observer=True)
+        driver = MagicMock()
+        driver.execute_async_script.return_value = True
+
+        # Act
+        result = waiter.wait(ReadyAfterCondition(3, dom=True), {"driver": driver})
+
+        # Assert
+        self.assertTrue(result.value)
+        self.assertEqual(driver.execute_async_script.call_count, 2)
+        self.assertEqual(waiter.last_wait["observer_polls"], 2)
+
+    def test_constant_mutations_do_not_spin(self):
+        """Test that polls woken by mutations are spaced by the minimum observer interval"""
+        # Arrange
+        waiter = ConditionWaiter(
+            timeout=0.3, initial_interval=0.1, use_mutation_observer=True, min_observer_interval=0.05
+        )
+        driver = MagicMock()
+        driver.execute_async_script.return_value = True
+
+        # Act
+        result = waiter.wait(ReadyAfterCondition(1000, dom=True), {"driver": driver})
+
+        # Assert
+        self.assertFalse(result.value)
+        self.assertLessEqual(waiter.last_wait["polls"], 8)
+
+    def test_mutation_observer_fallback(self):
+        """Test that the waiter sleeps when the driver cannot run async scripts"""
+        # Arrange
+        waiter = ConditionWaiter(timeout=1.0, initial_interval=0.001, use_mutation_observer=True)
+        driver = MagicMock()
+        driver.execute_async_script.side_effect = Exception("unsupported")
+
+        # Act
+        result = waiter.wait(ReadyAfterCondition(3, dom=True), {"driver": driver})
+
+        # Assert
+        self.assertTrue(result.value)
+        self.assertEqual(driver.execute_async_script.call_count, 1)
+
+    def test_adaptive_learns_ready_time(self):
+        """Test that adaptive polling remembers how long a condition took"""
+        # Arrange
+        waiter = ConditionWaiter(timeout=1.0, strategy=PollingStrategy.ADAPTIVE,
+                                 initial_interval=0.001, max_interval=0.01)
+        condition = ReadyAfterCondition(3)
+
+        # Act
+        waiter.wait(condition, {})
+
+        # Assert
+        self.assertIsNotNone(waiter.get_expected_ready_time(condition))
+
+    def test_invalid_parameters(self):
+        """Test that invalid timing parameters are rejected"""
+        with self.assertRaises(ValueError):
+            ConditionWaiter(timeout=-1)
+        with self.assertRaises(ValueError):
+            ConditionWaiter(initial_interval=1.0, max_interval=0.5)
+        with self.assertRaises(ValueError):
+            ConditionWaiter(backoff_factor=0.5)
+        with self.assertRaises(ValueError):
+            ConditionWaiter(min_observer_interval=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
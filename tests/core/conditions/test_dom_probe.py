@@ -0,0 +1,109 @@
+"""Tests for batched DOM probing"""
+import unittest
+from unittest.mock import MagicMock
+
+from src.core.conditions.dom_probe import DomProbe, dom_probe_scope, DOM_PROBE_KEY
+from src.core.conditions.element_exists_condition import ElementExistsCondition
+from src.core.conditions.text_contains_condition import TextContainsCondition
+from src.core.conditions.composite_conditions import AndCondition, NotCondition
+
+
+def make_driver(results):
+    """Create a mock driver whose probe script returns the given results"""
+    driver = MagicMock()
+    driver.execute_script.return_value = results
+    return driver
+
+
+class TestDomProbe(unittest.TestCase):
+    """Test cases for the DomProbe class"""
+
+    def test_collect_selectors_from_tree(self):
+        """Test collecting the selectors of a nested condition tree"""
+        # Arrange
+        tree = AndCondition(
+            ElementExistsCondition("#a"),
+            NotCondition(TextContainsCondition("#b", "x")),
+            ElementExistsCondition("#a")
+        )
+
+        # Act
+        selectors = DomProbe.collect_selectors([tree, ElementExistsCondition("#c")])
+
+        # Assert
+        self.assertEqual(selectors, ["#a", "#b", "#c"])
+
+    def test_resolve_uses_one_round_trip(self):
+        """Test that all selectors are resolved with a single script call"""
+        # Arrange
+        driver = make_driver({
+            "#a": {"exists": True, "count": 1, "text": "Hello", "attributes": {}},
+            "#b": {"exists": False, "count": 0, "text": None, "attributes": {}}
+        })
+        probe = DomProbe(driver)
+
+        # Act
+        probe.add_selectors(["#a", "#b"])
+        probe.resolve()
+
+        # Assert
+        driver.execute_script.assert_called_once()
+        self.assertEqual(driver.execute_script.call_args[0][1], ["#a", "#b"])
+        self.assertTrue(probe.get("#a")["exists"])
+        self.assertFalse(probe.get("#b")["exists"])
+        self.assertEqual(probe.round_trips, 1)
+
+    def test_conditions_use_probe_in_scope(self):
+        """Test that element and text conditions read the probe instead of the driver"""
+        # Arrange
+        driver = make_driver({
+            "#a": {"exists": True, "count": 1, "text": "Hello World", "attributes": {}},
+            "#b": {"exists": False, "count": 0, "text": None, "attributes": {}}
+        })
+        exists = ElementExistsCondition("#b")
+        contains = TextContainsCondition("#a", "world")
+        context = {"driver": driver}
+
+        # Act
+        with dom_probe_scope(context, [exists, contains]):
+            exists_result = exists.evaluate(context)
+            contains_result = contains.evaluate(context)
+
+        # Assert
+        self.assertFalse(exists_result.value)
+        self.assertTrue(contains_result.value)
+        driver.find_elements_by_css_selector.assert_not_called()
+        self.assertNotIn(DOM_PROBE_KEY, context)
+
+    def test_fallback_when_probe_fails(self):
+        """Test that conditions query the driver when the probe script fails"""
+        # Arrange
+        driver = MagicMock()
+        driver.execute_script.side_effect = Exception("script error")
+        driver.find_elements_by_css_selector.return_value = [MagicMock()]
+        condition = ElementExistsCondition("#a")
+        context = {"driver": driver}
+
+        # Act
+        with dom_probe_scope(context, [condition]):
+            result = condition.evaluate(context)
+
+        # Assert
+        self.assertTrue(result.value)
+        driver.find_elements_by_css_selector.assert_called_once_with("#a")
+
+    def test_scope_without_driver(self):
+        """Test that the scope is a no-op without a driver"""
+        # Arrange
+        context = {}
+
+        # Act
+        with dom_probe_scope(context, [ElementExistsCondition("#a")]) as probe:
+            pass
+
+        # Assert
+        self.assertIsNone(probe)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,6 +70,23 @@ class TestElementExistsCondition(unittest.TestCase):
         self.assertFalse(result.value)
         mock_driver.find_elements_by_css_selector.assert_called_once_with("#test-element")
 
+    def test_evaluate_element_removed_on_same_page_generation(self):
+        """Test that an element removed by a script is noticed without a page generation change"""
+        # Arrange
+        condition = ElementExistsCondition(selector="#spinner")
+        mock_driver = MagicMock()
+        mock_driver.find_elements_by_css_selector.side_effect = [[MagicMock()], []]
+        context = {"driver": mock_driver, "page_generation": 1}
+
+        # Act
+        first = condition.evaluate(context)
+        second = condition.evaluate(context)
+
+        # Assert
+        self.assertTrue(first.value)
+        self.assertFalse(second.value)
+        self.assertEqual(mock_driver.find_elements_by_css_selector.call_count, 2)
+
     def test_evaluate_no_driver(self):
         """Test evaluating with no driver in the context"""
         # Arrange
@@ -152,6 +152,27 @@ class TestTextContainsCondition(unittest.TestCase):
         self.assertFalse(result.value)
         self.assertIn("No browser driver in context", result.message)
 
+    def test_evaluate_with_page_generation_reuses_element(self):
+        """Test that the element is located once per page generation and re-read when stale"""
+        # Arrange
+        condition = TextContainsCondition(selector="#status", text="done")
+        stale_error = type("StaleElementReferenceException", (Exception,), {})
+        stale = MagicMock()
+        type(stale).text = property(lambda self: (_ for _ in ()).throw(stale_error()))
+        fresh = MagicMock()
+        fresh.text = "Status: done"
+        mock_driver = MagicMock()
+        mock_driver.find_elements_by_css_selector.side_effect = [[fresh], [stale], [fresh]]
+
+        # Act
+        first = condition.evaluate({"driver": mock_driver, "page_generation": 1})
+        second = condition.evaluate({"driver": mock_driver, "page_generation": 1})
+        third = condition.evaluate({"driver": mock_driver, "page_generation": 2})
+
+        # Assert
+        self.assertTrue(first.value and second.value and third.value)
+        self.assertEqual(mock_driver.find_elements_by_css_selector.call_count, 3)
+
     def test_evaluate_driver_exception(self):
         """Test evaluating when the driver raises an exception"""
         # Arrange
@@ -1,4 +1,6 @@
 """Tests for the ExecutionContext class"""
+import copy
+import pickle
 import unittest
 from unittest.mock import MagicMock
 
@@ -259,5 +261,42 @@ class TestExecutionContext(unittest.TestCase):
         self.assertEqual(deserialized_child.variables.get("child_var"), "child_value")
 
 
+    def test_context_snapshot(self):
+        """Test that a context snapshot keeps the state and variables it was taken with"""
+        # Arrange
+        context = ExecutionContext()
+        context.variables.set("count", 1)
+
+        # Act
+        snapshot = context.snapshot()
+        context.variables.set("count", 2)
+        context.state.transition_to(ExecutionStateEnum.RUNNING)
+
+        # Assert
+        self.assertEqual(snapshot.id, context.id)
+        self.assertEqual(snapshot.current_state, ExecutionStateEnum.CREATED)
+        self.assertEqual(snapshot.variables.get("count"), 1)
+
+
+    def test_pickle_and_deepcopy_round_trip(self):
+        """Test that a context survives pickling and deep copying"""
+        # Arrange
+        context = ExecutionContext()
+        context.variables.set("rows", [1, 2])
+        context.variables.snapshot()
+
+        # Act
+        unpickled = pickle.loads(pickle.dumps(context))
+        copied = copy.deepcopy(context)
+        unpickled.variables.set("rows", [3])
+        copied.variables.set("extra", True)
+
+        # Assert
+        self.assertEqual(unpickled.id, context.id)
+        self.assertEqual(unpickled.variables.get("rows"), [3])
+        self.assertEqual(copied.variables.get("rows"), [1, 2])
+        self.assertEqual(context.variables.get_all(), {"rows": [1, 2]})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,131 @@
+"""Tests for variables shared between processes"""
+import pickle
+import unittest
+import multiprocessing
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.context.shared_variables import SharedVariablePublisher, SharedValue, SharedVariableHandle
+from src.core.context.variable_storage import VariableStorage
+
+
+def _read_in_worker(shared: SharedValue, results) -> None:
+    """Read a shared value through a variable storage in a worker process"""
+    storage = VariableStorage()
+    storage.set("table", shared)
+    results.put(storage.get("table")["rows"][42])
+
+
+def _read_context_in_worker(context: ExecutionContext, results) -> None:
+    """Read a shared value from an execution context in a worker process"""
+    results.put(context.variables.get("table")["rows"][42])
+
+
+class TestSharedVariables(unittest.TestCase):
+    """Test cases for the SharedVariablePublisher and SharedValue classes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.publisher = SharedVariablePublisher()
+        self.table = {"rows": [{"id": i, "name": f"row {i}"} for i in range(1000)]}
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.publisher.close()
+
+    def test_storage_reads_published_value_without_copying(self):
+        """Test that a shared value is read from the segment and not copied on each read"""
+        # Arrange
+        storage = VariableStorage()
+        storage.set("table", self.publisher.publish("table", self.table))
+
+        # Act
+        first = storage.get("table")
+        second = storage.get("table")
+
+        # Assert
+        self.assertEqual(first, self.table)
+        self.assertIs(first, second)
+
+    def test_bytes_are_read_only_views(self):
+        """Test that published bytes are read as a read-only view of the segment"""
+        # Arrange
+        shared = self.publisher.publish("blob", b"abc" * 1000)
+
+        # Act
+        value = shared.get()
+
+        # Assert
+        self.assertIsInstance(value, memoryview)
+        self.assertTrue(value.readonly)
+        self.assertEqual(value[:6].tobytes(), b"abcabc")
+        value.release()
+
+    def test_pickles_as_handle(self):
+        """Test that pickling a shared value sends the handle rather than the value"""
+        # Arrange
+        shared = self.publisher.publish("table", self.table)
+
+        # Act
+        data = pickle.dumps(shared)
+        restored = pickle.loads(data)
+
+        # Assert
+        self.assertLess(len(data), len(pickle.dumps(self.table)) // 10)
+        self.assertEqual(restored.handle.to_dict(), shared.handle.to_dict())
+        self.assertEqual(restored.get(), self.table)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "fork is not available")
+    def test_worker_process_reads_value(self):
+        """Test that another process reads the published value from shared memory"""
+        # Arrange
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        shared = self.publisher.publish("table", self.table)
+
+        # Act
+        worker = context.Process(target=_read_in_worker, args=(shared, results))
+        worker.start()
+        row = results.get(timeout=10)
+        worker.join(10)
+
+        # Assert
+        self.assertEqual(row, {"id": 42, "name": "row 42"})
+        self.assertEqual(worker.exitcode, 0)
+
+    def test_spawned_worker_reads_value_from_context(self):
+        """Test that an execution context holding a shared value can be sent to a spawned worker"""
+        # Arrange
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        execution_context = ExecutionContext()
+        execution_context.variables.set("table", self.publisher.publish("table", self.table))
+
+        # Act
+        worker = context.Process(target=_read_context_in_worker, args=(execution_context, results))
+        worker.start()
+        row = results.get(timeout=30)
+        worker.join(30)
+
+        # Assert
+        self.assertEqual(row, {"id": 42, "name": "row 42"})
+        self.assertEqual(worker.exitcode, 0)
+        self.assertLess(len(pickle.dumps(execution_context)), len(pickle.dumps(self.table)))
+
+    def test_unpublish_removes_segment(self):
+        """Test that an unpublished value can no longer be attached"""
+        # Arrange
+        handle = self.publisher.publish("table", self.table).handle
+
+        # Act
+        removed = self.publisher.unpublish("table")
+
+        # Assert
+        self.assertTrue(removed)
+        self.assertIsNone(self.publisher.get("table"))
+        self.assertEqual(self.publisher.total_bytes, 0)
+        with self.assertRaises(FileNotFoundError):
+            SharedValue(SharedVariableHandle.from_dict(handle.to_dict())).get()
+
+
+if __name__ == "__main__":
+    unittest.main()
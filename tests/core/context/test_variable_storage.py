@@ -2,7 +2,7 @@
 import unittest
 from unittest.mock import MagicMock
 
-from src.core.context.variable_storage import VariableStorage, VariableScope, VariableChangeEvent
+from src.core.context.variable_storage import VariableStorage, VariableScope, VariableChangeEvent, LazyValue
 
 
 class TestVariableStorage(unittest.TestCase):
@@ -265,5 +265,134 @@ class TestVariableStorage(unittest.TestCase):
         self.assertEqual(deserialized.get("var3"), "value3")
 
 
+class TestVariableSnapshot(unittest.TestCase):
+    """Test cases for variable storage snapshots"""
+
+    def test_snapshot_is_isolated_from_later_changes(self):
+        """Test that sets, deletes and clears after a snapshot do not show in it"""
+        # Arrange
+        storage = VariableStorage()
+        storage.set("count", 1)
+        storage.set("name", "alice", VariableScope.GLOBAL)
+        storage.set("temp", True, VariableScope.LOCAL)
+
+        # Act
+        snapshot = storage.snapshot()
+        storage.set("count", 2)
+        storage.set("added", "x")
+        storage.delete("name")
+        storage.clear_scope(VariableScope.LOCAL)
+
+        # Assert
+        self.assertEqual(snapshot.get("count"), 1)
+        self.assertEqual(snapshot.get("name"), "alice")
+        self.assertTrue(snapshot.has("temp", VariableScope.LOCAL))
+        self.assertFalse(snapshot.has("added"))
+        self.assertEqual(snapshot.get_names(), {"count", "name", "temp"})
+        self.assertEqual(storage.get("count"), 2)
+        self.assertFalse(storage.has("temp"))
+
+    def test_snapshot_shares_scopes_until_written(self):
+        """Test that taking a snapshot copies nothing and only written scopes are copied"""
+        # Arrange
+        storage = VariableStorage()
+        storage.set("count", 1)
+        storage.set("name", "alice", VariableScope.GLOBAL)
+        global_scope = storage._variables[VariableScope.GLOBAL]
+
+        # Act
+        snapshot = storage.snapshot()
+        storage.set("count", 2)
+
+        # Assert
+        self.assertIs(storage._variables[VariableScope.GLOBAL], global_scope)
+        self.assertIsNot(storage._variables[VariableScope.WORKFLOW], snapshot.get_scope(VariableScope.WORKFLOW))
+        self.assertEqual(snapshot.count(), 2)
+
+    def test_snapshot_scope_is_read_only(self):
+        """Test that a snapshot's scope view cannot be modified"""
+        # Arrange
+        storage = VariableStorage()
+        storage.set("count", 1)
+        snapshot = storage.snapshot()
+
+        # Act & Assert
+        with self.assertRaises(TypeError):
+            snapshot.get_scope(VariableScope.WORKFLOW)["count"] = 5
+
+    def test_version_and_parent(self):
+        """Test that the version counts changes and the parent's variables are visible"""
+        # Arrange
+        parent = VariableStorage()
+        parent.set("inherited", "yes")
+        storage = VariableStorage(parent=parent)
+        version = storage.version
+
+        # Act
+        storage.set("own", 1)
+        snapshot = storage.snapshot()
+
+        # Assert
+        self.assertEqual(snapshot.version, version + 1)
+        self.assertEqual(snapshot.get("inherited"), "yes")
+        self.assertEqual(snapshot.get_all(), {"inherited": "yes", "own": 1})
+
+
+class TestLazyVariables(unittest.TestCase):
+    """Test cases for lazily loaded variables"""
+
+    def test_load_replaces_scopes_without_notifying(self):
+        """Test that a bulk load replaces the scopes and fires no events"""
+        # Arrange
+        storage = VariableStorage()
+        storage.set("old", 1)
+        events = []
+        storage.add_variable_change_listener(events.append)
+
+        # Act
+        storage.load({VariableScope.WORKFLOW: {"new": 2}, VariableScope.LOCAL: {"temp": 3}})
+
+        # Assert
+        self.assertEqual(events, [])
+        self.assertEqual(storage.get_all(), {"new": 2, "temp": 3})
+
+    def test_lazy_value_loads_once_on_read(self):
+        """Test that a lazy value is loaded on the first read only"""
+        # Arrange
+        calls = []
+        lazy = LazyValue(lambda: calls.append(1) or {"rows": [1, 2]})
+        storage = VariableStorage()
+        storage.load({VariableScope.WORKFLOW: {"data": lazy}})
+
+        # Act
+        has_data = storage.has("data")
+        first = storage.get("data")
+        first["rows"].append(3)
+        second = storage.get_all()
+
+        # Assert
+        self.assertTrue(has_data)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second, {"data": {"rows": [1, 2]}})
+
+    def test_overwrite_event_loads_old_value_on_access(self):
+        """Test that replacing a lazy value loads it only if a listener reads the old value"""
+        # Arrange
+        lazy = LazyValue(lambda: "old")
+        storage = VariableStorage()
+        storage.load({VariableScope.WORKFLOW: {"data": lazy}})
+        events = []
+        storage.add_variable_change_listener(events.append)
+
+        # Act
+        storage.set("data", "new")
+        loaded_after_set = lazy.loaded
+
+        # Assert
+        self.assertFalse(loaded_after_set)
+        self.assertEqual(events[0].old_value, "old")
+        self.assertEqual(storage.to_dict()["variables"]["WORKFLOW"], {"data": "new"})
+
+
 if __name__ == "__main__":
     unittest.main()
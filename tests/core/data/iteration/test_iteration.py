@@ -5,6 +5,8 @@ from typing import Dict, Any, List
 
 from src.core.data.iteration.iterator import DataIterator, DataIterationResult
 from src.core.data.iteration.context import DataIterationContext
+from src.core.data.mapping.variable_mapper import VariableMapper
+from src.core.context.variable_storage import VariableStorage
 
 
 class TestDataIterationResult(unittest.TestCase):
@@ -99,6 +101,45 @@ class TestDataIterator(unittest.TestCase):
         self.assertEqual(results[1].record["name"], "Bob")
         self.assertEqual(results[2].record["name"], "Charlie")
         
+    def test_iterate_batched_mapping(self):
+        """Test iterating with records mapped in batches"""
+        # Create a data iterator with a real mapper and a batch size that splits the records
+        mapper = VariableMapper()
+        mapper.add_simple_mapping("name")
+        iterator = DataIterator(self.data_source, mapper, batch_size=2)
+        
+        # Create an execute function that always succeeds
+        def execute_func(context):
+            return {"success": True, "message": f"Processed {context['name']}"}
+            
+        # Iterate through the data
+        results = list(iterator.iterate(execute_func, {"base": 1}))
+        
+        # Check the results
+        self.assertEqual([result.record_index for result in results], [0, 1, 2])
+        self.assertEqual(
+            [result.message for result in results],
+            ["Processed Alice", "Processed Bob", "Processed Charlie"]
+        )
+        
+    def test_iterate_batched_mapping_with_variables_object(self):
+        """Test that records mapped into a shared variables object each see their own values"""
+        # Create a data iterator with a batch size covering every record
+        mapper = VariableMapper()
+        mapper.add_simple_mapping("name")
+        iterator = DataIterator(self.data_source, mapper, batch_size=3)
+        variables = VariableStorage()
+        
+        # Create an execute function that reads the mapped variable
+        def execute_func(context):
+            return {"success": True, "message": context["variables"].get("name")}
+            
+        # Iterate through the data
+        results = list(iterator.iterate(execute_func, {"variables": variables}))
+        
+        # Check that each record ran with its own value
+        self.assertEqual([result.message for result in results], ["Alice", "Bob", "Charlie"])
+        
     def test_iterate_failure(self):
         """Test iterating with failed executions"""
         # Create a data iterator
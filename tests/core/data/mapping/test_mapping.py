@@ -3,6 +3,7 @@ import unittest
 from unittest.mock import MagicMock
 from typing import Dict, Any
 
+from src.core.data.mapping import mapper as mapper_module
 from src.core.data.mapping.mapper import FieldMapping
 from src.core.data.mapping.variable_mapper import VariableMapper
 
@@ -75,6 +76,50 @@ class TestFieldMapping(unittest.TestCase):
         self.assertEqual(value, "error")
 
 
+class TestFieldMappingColumn(unittest.TestCase):
+    """Test cases for column-wise field mapping"""
+    
+    def test_apply_column_matches_apply(self):
+        """Test that column mapping gives the same values as per-record mapping"""
+        # Create a field mapping with a transform that fails for some values
+        mapping = FieldMapping("age", "user_age", int, default_value=-1)
+        records = [{"age": "30"}, {"age": "abc"}, {}, {"age": None}]
+        
+        # Apply the mapping both ways
+        column = mapping.apply_column(records)
+        
+        # Check the values
+        self.assertEqual(column, [mapping.apply(record) for record in records])
+        self.assertEqual(column, [30, -1, -1, None])
+        
+    def test_apply_column_vectorized(self):
+        """Test that a vectorized transform is called once for the whole column"""
+        if mapper_module.np is None:
+            self.skipTest("NumPy is not installed")
+        
+        # Create a vectorized mapping
+        transform = MagicMock(side_effect=lambda values: values * 2)
+        mapping = FieldMapping("n", "double", transform, vectorized=True)
+        
+        # Apply the mapping
+        column = mapping.apply_column([{"n": 1}, {"n": 2}, {"n": None}])
+        
+        # Check the values
+        self.assertEqual(column, [2, 4, None])
+        transform.assert_called_once()
+        
+    def test_apply_column_vectorized_fallback(self):
+        """Test that a vectorized mapping falls back to per-element transforms"""
+        # Create a mapping whose transform only works on scalars
+        mapping = FieldMapping("name", "upper", lambda value: value.upper(), vectorized=True)
+        
+        # Apply the mapping
+        column = mapping.apply_column([{"name": "alice"}, {"name": "bob"}])
+        
+        # Check the values
+        self.assertEqual(column, ["ALICE", "BOB"])
+
+
 class TestVariableMapper(unittest.TestCase):
     """Test cases for the VariableMapper class"""
     
@@ -168,6 +213,44 @@ class TestVariableMapper(unittest.TestCase):
         variables.set.assert_any_call("username", "Alice")
         variables.set.assert_any_call("user_age", 30)
         
+    def test_map_batch(self):
+        """Test mapping a batch of records to overlays of the base context"""
+        # Create a mapper
+        mapper = VariableMapper()
+        mapper.add_simple_mapping("name", "username")
+        mapper.add_simple_mapping("age", "user_age", int)
+        
+        # Create records and a base context
+        records = [{"name": "Alice", "age": "30"}, {"name": "Bob", "age": "25"}, {"name": "Carol"}]
+        context = {"base": "value"}
+        
+        # Map the batch with a chunk size that splits the records
+        results = mapper.map_batch(records, context, chunk_size=2)
+        
+        # Check the results match per-record mapping
+        self.assertEqual(len(results), 3)
+        for record, result in zip(records, results):
+            self.assertEqual(dict(result), mapper.map_record(record, context))
+        
+        # Check that writes stay in the overlay
+        results[0]["extra"] = 1
+        self.assertNotIn("extra", context)
+        self.assertNotIn("extra", results[1])
+        
+    def test_map_batch_with_variables_object(self):
+        """Test that a batch with a variables object falls back to per-record mapping"""
+        # Create a mapper
+        mapper = VariableMapper()
+        mapper.add_simple_mapping("name", "username")
+        variables = MagicMock()
+        
+        # Map the batch
+        mapper.map_batch([{"name": "Alice"}, {"name": "Bob"}], {"variables": variables})
+        
+        # Check that the variables object was updated
+        variables.set.assert_any_call("username", "Alice")
+        variables.set.assert_any_call("username", "Bob")
+        
     def test_get_field_mappings(self):
         """Test getting the field mappings"""
         # Create a mapper
@@ -141,3 +141,19 @@ def test_wait_and_retry_strategy(mock_sleep):
     
     assert result.success is False
     assert "Maximum retry attempts" in result.message
+
+
+@patch("time.sleep")
+def test_wait_and_retry_strategy_backoff(mock_sleep):
+    """Test wait and retry strategy with exponential backoff"""
+    strategy = WaitAndRetryStrategy(max_retries=5, wait_seconds=0.5, backoff_factor=2.0, max_wait_seconds=1.5)
+    error = Error(error_type=ErrorType.ELEMENT_NOT_FOUND, message="Element not found")
+    
+    # The wait doubles on each retry and is capped
+    assert strategy.get_wait_seconds(0) == 0.5
+    assert strategy.get_wait_seconds(1) == 1.0
+    assert strategy.get_wait_seconds(3) == 1.5
+    
+    result = strategy.recover(error, {"retry_count": 1})
+    assert result.data["wait_seconds"] == 1.0
+    mock_sleep.assert_called_once_with(1.0)
@@ -0,0 +1,150 @@
+"""Tests for the checkpoint manager"""
+import os
+import unittest
+import tempfile
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.context.variable_storage import VariableScope
+from src.core.state.checkpoint_manager import CheckpointManager
+
+
+class TestCheckpointManager(unittest.TestCase):
+    """Test cases for the CheckpointManager class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = CheckpointManager(self.temp_dir.name)
+        self.context = ExecutionContext()
+        self.context.variables.set("count", 1)
+        self.context.variables.set("user", "alice", VariableScope.GLOBAL)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_create_and_restore(self):
+        """Test restoring the context and data of a full checkpoint"""
+        # Arrange
+        checkpoint_id = self.manager.create_checkpoint("wf", self.context, {"current_index": 3}, "start")
+
+        # Act
+        context, data = self.manager.restore_from_checkpoint(checkpoint_id)
+
+        # Assert
+        self.assertEqual(data, {"current_index": 3})
+        self.assertEqual(context.id, self.context.id)
+        self.assertEqual(context.variables.get("count"), 1)
+        self.assertEqual(context.variables.get_scope("user"), VariableScope.GLOBAL)
+        self.assertEqual(self.manager.get_checkpoint_by_name("wf", "start")["id"], checkpoint_id)
+
+
+class TestDeltaCheckpoints(unittest.TestCase):
+    """Test cases for delta checkpoints"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = CheckpointManager(self.temp_dir.name, delta_checkpoints=True, max_chain_length=3)
+        self.rows = [os.urandom(16).hex() for _ in range(500)]
+        self.context = ExecutionContext()
+        self.context.variables.set("rows", self.rows)
+        self.context.variables.set("count", 0)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.manager.end_chain("wf")
+        self.temp_dir.cleanup()
+
+    def _context_size(self, checkpoint_id: str) -> int:
+        """Get the size of a checkpoint's context file"""
+        return os.path.getsize(os.path.join(self.temp_dir.name, f"{checkpoint_id}.context"))
+
+    def test_delta_saves_only_changes(self):
+        """Test that a delta checkpoint is small and restores the full context"""
+        # Arrange
+        base_id = self.manager.create_checkpoint("wf", self.context, {"current_index": 0})
+        self.context.variables.set("count", 1)
+        self.context.variables.set("status", "running", VariableScope.LOCAL)
+
+        # Act
+        delta_id = self.manager.create_checkpoint("wf", self.context, {"current_index": 1})
+        context, data = self.manager.restore_from_checkpoint(delta_id)
+
+        # Assert
+        self.assertLess(self._context_size(delta_id) * 10, self._context_size(base_id))
+        self.assertEqual(self.manager.get_checkpoint(delta_id).get_data(), {"current_index": 1})
+        self.assertEqual(context.variables.get("rows"), self.rows)
+        self.assertEqual(context.variables.get("count"), 1)
+        self.assertEqual(context.variables.get_scope("status"), VariableScope.LOCAL)
+
+    def test_replays_chain_with_deletions(self):
+        """Test that restoring replays every delta of the chain in order"""
+        # Arrange
+        self.manager.create_checkpoint("wf", self.context, {})
+        self.context.variables.set("count", 1)
+        first_id = self.manager.create_checkpoint("wf", self.context, {})
+        self.context.variables.delete("rows")
+        self.context.variables.set("count", 2)
+        second_id = self.manager.create_checkpoint("wf", self.context, {})
+
+        # Act
+        first, _ = self.manager.restore_from_checkpoint(first_id)
+        second, _ = self.manager.restore_from_checkpoint(second_id)
+
+        # Assert
+        self.assertEqual(first.variables.get("count"), 1)
+        self.assertTrue(first.variables.has("rows"))
+        self.assertEqual(second.variables.get("count"), 2)
+        self.assertFalse(second.variables.has("rows"))
+
+    def test_long_chain_starts_new_base(self):
+        """Test that a full checkpoint follows max_chain_length deltas"""
+        # Arrange
+        ids = []
+        for i in range(5):
+            self.context.variables.set("count", i)
+            ids.append(self.manager.create_checkpoint("wf", self.context, {}))
+
+        # Act
+        by_id = {c["id"]: c for c in self.manager.get_checkpoints_for_workflow("wf")}
+
+        # Assert
+        self.assertIsNone(by_id[ids[0]]["parent_id"])
+        self.assertEqual(by_id[ids[3]]["parent_id"], ids[2])
+        self.assertIsNone(by_id[ids[4]]["parent_id"])
+
+    def test_other_context_starts_new_base(self):
+        """Test that checkpointing a different context saves it in full"""
+        # Arrange
+        self.manager.create_checkpoint("wf", self.context, {})
+        other = ExecutionContext()
+        other.variables.set("count", 5)
+
+        # Act
+        checkpoint_id = self.manager.create_checkpoint("wf", other, {})
+        context, _ = self.manager.restore_from_checkpoint(checkpoint_id)
+
+        # Assert
+        self.assertFalse(context.variables.has("rows"))
+        self.assertEqual(context.variables.get("count"), 5)
+
+    def test_deleting_base_keeps_deltas_restorable(self):
+        """Test that deltas of a deleted checkpoint are rewritten in full"""
+        # Arrange
+        base_id = self.manager.create_checkpoint("wf", self.context, {})
+        self.context.variables.set("count", 1)
+        delta_id = self.manager.create_checkpoint("wf", self.context, {})
+
+        # Act
+        deleted = self.manager.delete_checkpoint(base_id)
+        context, _ = self.manager.restore_from_checkpoint(delta_id)
+
+        # Assert
+        self.assertTrue(deleted)
+        self.assertEqual(context.variables.get("rows"), self.rows)
+        self.assertEqual(context.variables.get("count"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
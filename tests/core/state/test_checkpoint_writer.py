@@ -0,0 +1,257 @@
+"""Tests for the background checkpoint writer"""
+import os
+import unittest
+import tempfile
+import threading
+from unittest.mock import patch
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.state.atomic_write import Durability, write_atomic
+from src.core.state.checkpoint_manager import CheckpointManager
+from src.core.state.checkpoint_writer import CheckpointWriter
+from src.core.state.sqlite_state_store import SqliteCheckpointManager
+from src.core.state.state_management_factory import StateManagementFactory
+
+
+class TestCheckpointWriter(unittest.TestCase):
+    """Test cases for the CheckpointWriter class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = CheckpointManager(self.temp_dir.name, delta_checkpoints=True)
+        self.writer = CheckpointWriter(self.manager)
+        self.context = ExecutionContext()
+        self.context.variables.set("count", 0)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.writer.close()
+        self.manager.end_chain("wf")
+        self.temp_dir.cleanup()
+
+    def _block_writes(self) -> threading.Event:
+        """Make the worker wait inside its next write until the returned event is set"""
+        release = threading.Event()
+        started = threading.Event()
+        write = self.manager.write_checkpoint
+
+        def blocked_write(pending, sync_directory=True):
+            started.set()
+            release.wait(5)
+            write(pending, sync_directory)
+
+        patcher = patch.object(self.manager, "write_checkpoint", side_effect=blocked_write)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(release.set)
+        self.writer.submit("wf", self.context, {"current_index": 0})
+        started.wait(5)
+        return release
+
+    def test_flush_writes_submitted_checkpoint(self):
+        """Test that a submitted checkpoint can be restored after a flush"""
+        # Arrange
+        checkpoint_id = self.writer.submit("wf", self.context, {"current_index": 1}, "start")
+
+        # Act
+        flushed = self.writer.flush(5)
+
+        # Assert
+        self.assertTrue(flushed)
+        context, data = self.manager.restore_from_checkpoint(checkpoint_id)
+        self.assertEqual(data, {"current_index": 1})
+        self.assertEqual(context.variables.get("count"), 0)
+
+    def test_coalesces_queued_checkpoints(self):
+        """Test that queued unnamed checkpoints of a workflow are replaced by the latest one"""
+        # Arrange
+        release = self._block_writes()
+        ids = []
+        for count in range(1, 4):
+            self.context.variables.set("count", count)
+            ids.append(self.writer.submit("wf", self.context, {"current_index": count}))
+
+        # Act
+        release.set()
+        self.writer.flush(5)
+
+        # Assert
+        metrics = self.writer.get_metrics()
+        self.assertEqual(metrics["coalesced"], 2)
+        self.assertEqual(metrics["written"], 2)
+        self.assertEqual(metrics["pending"], 0)
+        self.assertEqual(len(self.manager.get_checkpoints_for_workflow("wf")), 2)
+        context, data = self.manager.restore_from_checkpoint(ids[-1])
+        self.assertEqual(data, {"current_index": 3})
+        self.assertEqual(context.variables.get("count"), 3)
+
+    def test_named_checkpoints_are_not_coalesced(self):
+        """Test that a queued named checkpoint is still written"""
+        # Arrange
+        release = self._block_writes()
+        self.writer.submit("wf", self.context, {}, "named")
+        self.context.variables.set("count", 5)
+        latest_id = self.writer.submit("wf", self.context, {})
+
+        # Act
+        release.set()
+        self.writer.flush(5)
+
+        # Assert
+        self.assertEqual(self.writer.get_metrics()["coalesced"], 0)
+        self.assertIsNotNone(self.manager.get_checkpoint_by_name("wf", "named"))
+        context, _ = self.manager.restore_from_checkpoint(latest_id)
+        self.assertEqual(context.variables.get("count"), 5)
+
+    def test_failed_write_is_rebased(self):
+        """Test that a delta based on a checkpoint that failed to write still restores"""
+        # Arrange
+        write = self.manager.write_checkpoint
+        calls = []
+
+        def failing_first_write(pending, sync_directory=True):
+            calls.append(pending.checkpoint_id)
+            if len(calls) == 2:
+                raise IOError("disk full")
+            write(pending, sync_directory)
+
+        with patch.object(self.manager, "write_checkpoint", side_effect=failing_first_write):
+            self.writer.submit("wf", self.context, {})
+            self.writer.flush(5)
+            self.context.variables.set("count", 1)
+            self.writer.submit("wf", self.context, {})
+            self.writer.flush(5)
+            self.context.variables.set("name", "x")
+            last_id = self.writer.submit("wf", self.context, {})
+
+            # Act
+            self.writer.flush(5)
+
+        # Assert
+        self.assertEqual(self.writer.get_metrics()["failed"], 1)
+        context, _ = self.manager.restore_from_checkpoint(last_id)
+        self.assertEqual(context.variables.get("count"), 1)
+        self.assertEqual(context.variables.get("name"), "x")
+
+    def test_failed_batch_falls_back_with_sqlite_manager(self):
+        """Test that a database-backed manager is retried one by one without syncing a directory"""
+        # Arrange
+        manager = SqliteCheckpointManager(
+            os.path.join(self.temp_dir.name, "checkpoints.sqlite3"), durability=Durability.FULL
+        )
+        writer = CheckpointWriter(manager)
+        self.addCleanup(manager.close)
+        self.addCleanup(writer.close)
+        write_batch = manager.write_checkpoints
+        calls = []
+
+        def failing_first_batch(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise OSError("database is locked")
+            write_batch(batch)
+
+        with patch.object(manager, "write_checkpoints", side_effect=failing_first_batch):
+            checkpoint_id = writer.submit("wf", self.context, {"current_index": 1})
+
+            # Act
+            flushed = writer.flush(5)
+
+        # Assert
+        self.assertTrue(flushed)
+        self.assertEqual(writer.get_metrics()["written"], 1)
+        self.assertEqual(manager.restore_from_checkpoint(checkpoint_id)[1], {"current_index": 1})
+
+    def test_unexpected_error_does_not_stop_worker(self):
+        """Test that an error escaping a batch write is counted and the worker keeps going"""
+        # Arrange
+        write_batch = self.writer._write_batch
+        calls = []
+
+        def failing_first_batch(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise RuntimeError("unexpected")
+            return write_batch(batch)
+
+        with patch.object(self.writer, "_write_batch", side_effect=failing_first_batch):
+            self.writer.submit("wf", self.context, {}, "lost")
+            first_flush = self.writer.flush(5)
+            self.context.variables.set("count", 1)
+            checkpoint_id = self.writer.submit("wf", self.context, {}, "written")
+
+            # Act
+            second_flush = self.writer.flush(5)
+
+        # Assert
+        self.assertTrue(first_flush)
+        self.assertTrue(second_flush)
+        metrics = self.writer.get_metrics()
+        self.assertEqual((metrics["failed"], metrics["written"], metrics["pending"]), (1, 1, 0))
+        context, _ = self.manager.restore_from_checkpoint(checkpoint_id)
+        self.assertEqual(context.variables.get("count"), 1)
+
+    def test_close_writes_queue_and_rejects_submissions(self):
+        """Test that close drains the queue and the writer cannot be used afterwards"""
+        # Arrange
+        checkpoint_id = self.writer.submit("wf", self.context, {})
+
+        # Act
+        closed = self.writer.close(5)
+
+        # Assert
+        self.assertTrue(closed)
+        self.assertTrue(os.path.exists(self.manager.get_checkpoint_file(checkpoint_id)))
+        with self.assertRaises(RuntimeError):
+            self.writer.submit("wf", self.context, {})
+
+
+class TestAsyncWorkflowStateManager(unittest.TestCase):
+    """Test cases for asynchronous checkpoints in the workflow state manager"""
+
+    def test_restore_waits_for_pending_write(self):
+        """Test that restoring an asynchronously created checkpoint works at once"""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_manager = StateManagementFactory.create_workflow_state_manager(
+                os.path.join(temp_dir, "states"),
+                os.path.join(temp_dir, "checkpoints"),
+                async_checkpoints=True
+            )
+            context = ExecutionContext()
+            context.variables.set("count", 7)
+
+            # Act
+            checkpoint_id = state_manager.create_checkpoint("wf", context, {"current_index": 2})
+            restored, data = state_manager.restore_from_checkpoint(checkpoint_id)
+
+            # Assert
+            self.assertEqual(data, {"current_index": 2})
+            self.assertEqual(restored.variables.get("count"), 7)
+            self.assertTrue(state_manager.flush(5))
+
+
+class TestWriteAtomic(unittest.TestCase):
+    """Test cases for write_atomic"""
+
+    def test_failed_write_keeps_old_file(self):
+        """Test that an interrupted write leaves the old contents and no temporary file"""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "state.bin")
+            write_atomic(file_path, b"old", Durability.FULL)
+
+            # Act
+            with patch("src.core.state.atomic_write.os.replace", side_effect=OSError("crash")):
+                with self.assertRaises(OSError):
+                    write_atomic(file_path, b"new", Durability.FILE)
+
+            # Assert
+            with open(file_path, "rb") as f:
+                self.assertEqual(f.read(), b"old")
+            self.assertEqual(os.listdir(temp_dir), ["state.bin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""Tests for encoding and lazily restoring execution contexts"""
+import os
+import unittest
+import tempfile
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.context.shared_variables import SharedVariablePublisher
+from src.core.context.variable_storage import VariableScope
+from src.core.state.checkpoint_manager import CheckpointManager
+from src.core.state.context_data import (
+    EncodedValue, capture_context, pack_context_data, unpack_context_data, restore_context
+)
+from src.core.state.state_codec import StateCodec
+from src.core.state.state_persistence import StatePersistence
+
+
+class TestContextData(unittest.TestCase):
+    """Test cases for packing and restoring context data"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.context = ExecutionContext()
+        self.context.variables.set("table", [{"id": i} for i in range(100)])
+        self.context.variables.set("index", 3, VariableScope.LOCAL)
+
+    def _round_trip(self, codec: StateCodec) -> ExecutionContext:
+        """Pack, encode, decode and restore the test context"""
+        data = codec.encode(pack_context_data(capture_context(self.context), codec))
+        return restore_context(unpack_context_data(StateCodec.decode(data)))
+
+    def test_restore_decodes_variables_on_first_read(self):
+        """Test that restored variables stay encoded until they are read"""
+        # Arrange
+        restored = self._round_trip(StateCodec())
+        table = restored.variables.snapshot().get_scope(VariableScope.WORKFLOW)["table"]
+
+        # Act
+        loaded_before = table.loaded
+        value = restored.variables.get("table")
+
+        # Assert
+        self.assertIsInstance(table, EncodedValue)
+        self.assertFalse(loaded_before)
+        self.assertTrue(table.loaded)
+        self.assertEqual(value, self.context.variables.get("table"))
+        self.assertEqual(restored.variables.get("index"), 3)
+        self.assertEqual(restored.id, self.context.id)
+
+    def test_restore_does_not_notify_listeners(self):
+        """Test that restoring loads the variables in bulk"""
+        # Arrange
+        restored = ExecutionContext()
+        events = []
+        restored.variables.add_variable_change_listener(events.append)
+        data = unpack_context_data(StateCodec.decode(
+            StateCodec().encode(pack_context_data(capture_context(self.context), StateCodec()))
+        ))
+
+        # Act
+        restored.variables.load({VariableScope[name.upper()]: scope_vars
+                                 for name, scope_vars in data["variables"].items()})
+
+        # Assert
+        self.assertEqual(events, [])
+        self.assertEqual(restored.variables.get_names(), {"table", "index"})
+
+    def test_repacking_keeps_unread_values_encoded(self):
+        """Test that saving a restored context again does not decode unread variables"""
+        # Arrange
+        codec = StateCodec()
+        restored = self._round_trip(codec)
+        table = restored.variables.snapshot().get_scope(VariableScope.WORKFLOW)["table"]
+
+        # Act
+        packed = pack_context_data(capture_context(restored), codec)
+
+        # Assert
+        self.assertFalse(table.loaded)
+        self.assertIs(packed["variables"]["workflow"]["table"], table.data)
+
+    def test_json_keeps_variables_inline(self):
+        """Test that JSON data holds plain values and restores eagerly"""
+        # Arrange
+        codec = StateCodec(format="json")
+
+        # Act
+        packed = pack_context_data(capture_context(self.context), codec)
+        restored = self._round_trip(codec)
+
+        # Assert
+        self.assertNotIn("encoded", packed)
+        self.assertEqual(packed["variables"]["local"], {"index": 3})
+        self.assertEqual(restored.variables.get_all(), self.context.variables.get_all())
+
+    def test_shared_bytes_are_saved_by_value(self):
+        """Test that a restored context keeps shared bytes after the segment is gone"""
+        # Arrange
+        with SharedVariablePublisher() as publisher:
+            self.context.variables.set("blob", publisher.publish("blob", b"xyz" * 100))
+            packed = pack_context_data(capture_context(self.context), StateCodec())
+            self.context.variables.delete("blob")
+
+        # Act
+        restored = restore_context(unpack_context_data(StateCodec.decode(StateCodec().encode(packed))))
+
+        # Assert
+        self.assertEqual(restored.variables.get("blob"), b"xyz" * 100)
+
+
+class TestLazyRestore(unittest.TestCase):
+    """Test cases for lazy restores from state files and checkpoints"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.context = ExecutionContext()
+        self.context.variables.set("table", list(range(1000)))
+        self.context.variables.set("count", 0)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_load_state_is_lazy(self):
+        """Test that a loaded state decodes only the variables that are read"""
+        # Arrange
+        persistence = StatePersistence(self.temp_dir.name)
+        file_path = persistence.save_state("wf", self.context)
+
+        # Act
+        loaded = persistence.load_state(file_path)
+        count = loaded.variables.get("count")
+
+        # Assert
+        self.assertEqual(count, 0)
+        self.assertFalse(loaded.variables.snapshot().get_scope(VariableScope.WORKFLOW)["table"].loaded)
+        self.assertEqual(loaded.variables.get("table"), list(range(1000)))
+
+    def test_delta_chain_restores_lazily(self):
+        """Test that variables replayed from a delta chain are decoded on access"""
+        # Arrange
+        manager = CheckpointManager(self.temp_dir.name, delta_checkpoints=True)
+        manager.create_checkpoint("wf", self.context, {"current_index": 0})
+        self.context.variables.set("count", 1)
+        checkpoint_id = manager.create_checkpoint("wf", self.context, {"current_index": 1})
+        manager.end_chain("wf")
+
+        # Act
+        restored, data = manager.restore_from_checkpoint(checkpoint_id)
+
+        # Assert
+        self.assertEqual(data, {"current_index": 1})
+        scope = restored.variables.snapshot().get_scope(VariableScope.WORKFLOW)
+        self.assertFalse(scope["table"].loaded)
+        self.assertEqual(restored.variables.get("count"), 1)
+        self.assertEqual(restored.variables.get("table"), list(range(1000)))
+        self.assertTrue(os.path.exists(manager.get_checkpoint_file(checkpoint_id)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""Tests for the SQLite state and checkpoint storage"""
+import os
+import unittest
+import tempfile
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.context.variable_storage import VariableScope
+from src.core.state.checkpoint_writer import CheckpointWriter
+from src.core.state.sqlite_state_store import SqliteStatePersistence, SqliteCheckpointManager
+from src.core.state.state_management_factory import StateManagementFactory
+
+
+class TestSqliteStatePersistence(unittest.TestCase):
+    """Test cases for the SqliteStatePersistence class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.persistence = SqliteStatePersistence(os.path.join(self.temp_dir.name, "states.sqlite3"))
+        self.context = ExecutionContext()
+        self.context.variables.set("count", 1)
+        self.context.variables.set("user", "alice", VariableScope.GLOBAL)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.persistence.close()
+        self.temp_dir.cleanup()
+
+    def test_save_and_load(self):
+        """Test loading a saved state by its reference"""
+        # Arrange
+        reference = self.persistence.save_state("wf", self.context)
+
+        # Act
+        context = self.persistence.load_state(reference)
+
+        # Assert
+        self.assertEqual(context.id, self.context.id)
+        self.assertEqual(context.variables.get("count"), 1)
+        self.assertEqual(context.variables.get_scope("user"), VariableScope.GLOBAL)
+        self.assertEqual(self.persistence.get_latest_state_file("wf"), reference)
+
+    def test_load_missing_or_invalid_reference(self):
+        """Test that unknown and malformed references are rejected"""
+        # Act & Assert
+        with self.assertRaises(FileNotFoundError):
+            self.persistence.load_state("state:999")
+        with self.assertRaises(ValueError):
+            self.persistence.load_state("/tmp/wf_20240101_000000_000.state")
+
+    def test_cleanup_keeps_newest_states(self):
+        """Test that cleanup deletes all but the newest states of the workflow"""
+        # Arrange
+        references = self.persistence.save_states([("wf", self.context)] * 5)
+        other = self.persistence.save_state("other", self.context)
+
+        # Act
+        removed = self.persistence.cleanup_old_states("wf", max_states=2)
+
+        # Assert
+        self.assertEqual(removed, 3)
+        self.assertEqual(self.persistence.get_state_files("wf"), references[:-3:-1])
+        self.assertEqual(self.persistence.get_state_files("other"), [other])
+
+
+class TestSqliteCheckpointManager(unittest.TestCase):
+    """Test cases for the SqliteCheckpointManager class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manager = SqliteCheckpointManager(os.path.join(self.temp_dir.name, "checkpoints.sqlite3"))
+        self.context = ExecutionContext()
+        self.context.variables.set("count", 1)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.manager.close()
+        self.temp_dir.cleanup()
+
+    def test_create_and_restore(self):
+        """Test restoring the context and data of a checkpoint"""
+        # Arrange
+        checkpoint_id = self.manager.create_checkpoint("wf", self.context, {"current_index": 3}, "start")
+        self.context.variables.set("count", 2)
+
+        # Act
+        context, data = self.manager.restore_from_checkpoint(checkpoint_id)
+
+        # Assert
+        self.assertEqual(data, {"current_index": 3})
+        self.assertEqual(context.variables.get("count"), 1)
+        self.assertEqual(self.manager.get_checkpoint_by_name("wf", "start")["id"], checkpoint_id)
+        self.assertEqual(self.manager.get_checkpoint(checkpoint_id).get_name(), "start")
+
+    def test_delete_and_cleanup(self):
+        """Test deleting single checkpoints and old checkpoints in bulk"""
+        # Arrange
+        ids = [self.manager.create_checkpoint("wf", self.context, {"current_index": i}) for i in range(5)]
+
+        # Act
+        deleted = self.manager.delete_checkpoint(ids[0])
+        removed = self.manager.cleanup_old_checkpoints("wf", max_checkpoints=2)
+
+        # Assert
+        self.assertTrue(deleted)
+        self.assertFalse(self.manager.delete_checkpoint(ids[0]))
+        self.assertEqual(removed, 2)
+        self.assertEqual([c["id"] for c in self.manager.get_checkpoints_for_workflow("wf")], ids[:-3:-1])
+        with self.assertRaises(FileNotFoundError):
+            self.manager.restore_from_checkpoint(ids[0])
+
+    def test_background_writer_batches(self):
+        """Test that the checkpoint writer works with the SQLite manager"""
+        # Arrange
+        writer = CheckpointWriter(self.manager)
+
+        # Act
+        checkpoint_ids = [writer.submit("wf", self.context, {}, f"cp{i}") for i in range(3)]
+        writer.close(5)
+
+        # Assert
+        self.assertEqual(writer.get_metrics()["written"], 3)
+        stored = {c["id"] for c in self.manager.get_checkpoints_for_workflow("wf")}
+        self.assertEqual(stored, set(checkpoint_ids))
+
+
+class TestFactoryBackends(unittest.TestCase):
+    """Test cases for selecting the storage backend in the factory"""
+
+    def test_sqlite_backend(self):
+        """Test that the factory creates SQLite components in the given directories"""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Act
+            state_manager = StateManagementFactory.create_workflow_state_manager(
+                os.path.join(temp_dir, "states"), os.path.join(temp_dir, "checkpoints"), backend="sqlite"
+            )
+            reference = state_manager.save_workflow_state("wf", ExecutionContext())
+
+            # Assert
+            self.assertTrue(reference.startswith("state:"))
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, "states", SqliteStatePersistence.DATABASE_NAME)))
+            self.assertEqual(state_manager.get_latest_state("wf"), reference)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is rejected"""
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            StateManagementFactory.create_state_persistence("states", backend="redis")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""Tests for the state codec"""
+import json
+import unittest
+import tempfile
+import os
+from datetime import datetime
+
+from src.core.state import state_codec
+from src.core.state.state_codec import StateCodec, MAGIC
+
+
+class TestStateCodec(unittest.TestCase):
+    """Test cases for the StateCodec class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.payload = {
+            "rows": [{"id": i, "name": f"row {i}"} for i in range(500)],
+            "when": datetime(2024, 1, 2, 3, 4, 5),
+            "raw": b"\x00\x01",
+            "tags": {"a", "b"}
+        }
+
+    def test_pickle_round_trip_keeps_non_json_values(self):
+        """Test that the binary format keeps datetimes, bytes and sets"""
+        # Arrange
+        codec = StateCodec()
+
+        # Act
+        data = codec.encode(self.payload)
+        decoded = StateCodec.decode(data)
+
+        # Assert
+        self.assertTrue(data.startswith(MAGIC))
+        self.assertEqual(decoded, self.payload)
+
+    def test_compressed_is_smaller_than_indented_json(self):
+        """Test that encoded data is much smaller than the legacy format"""
+        # Arrange
+        payload = {"rows": self.payload["rows"]}
+        legacy = json.dumps(payload, indent=2).encode("utf-8")
+
+        # Act
+        data = StateCodec().encode(payload)
+
+        # Assert
+        self.assertLess(len(data) * 4, len(legacy))
+
+    def test_json_format(self):
+        """Test encoding with the JSON format and no compression"""
+        # Arrange
+        codec = StateCodec(format="json", compression="none")
+
+        # Act
+        decoded = codec.decode(codec.encode({"a": [1, 2]}))
+
+        # Assert
+        self.assertEqual(decoded, {"a": [1, 2]})
+
+    def test_reads_legacy_json_file(self):
+        """Test that files without a header are read as JSON"""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "old.state")
+            with open(path, 'w') as f:
+                json.dump({"workflow_id": "wf"}, f, indent=2)
+
+            # Act
+            decoded = StateCodec().read(path)
+
+        # Assert
+        self.assertEqual(decoded, {"workflow_id": "wf"})
+
+    def test_reads_any_codec(self):
+        """Test that a codec reads data written with other settings"""
+        # Arrange
+        data = StateCodec(format="json", compression="zlib").encode([1, 2, 3])
+
+        # Act
+        decoded = StateCodec(format="pickle", compression="none").decode(data)
+
+        # Assert
+        self.assertEqual(decoded, [1, 2, 3])
+
+    def test_invalid_settings(self):
+        """Test that unknown formats and compressions are rejected"""
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            StateCodec(format="xml")
+        with self.assertRaises(ValueError):
+            StateCodec(compression="lz4")
+
+    def test_rejects_newer_version(self):
+        """Test that data from a newer header version is rejected"""
+        # Arrange
+        data = bytearray(StateCodec().encode({}))
+        data[len(MAGIC)] = 99
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            StateCodec.decode(bytes(data))
+
+    @unittest.skipIf(state_codec.zstandard is not None, "zstandard is installed")
+    def test_zstd_requires_zstandard(self):
+        """Test that zstd compression needs the optional package"""
+        # Act & Assert
+        with self.assertRaises(ImportError):
+            StateCodec(compression="zstd")
+
+    @unittest.skipIf(state_codec.zstandard is None, "zstandard is not installed")
+    def test_zstd_round_trip(self):
+        """Test zstd compression"""
+        # Arrange
+        codec = StateCodec(compression="zstd")
+
+        # Act
+        decoded = codec.decode(codec.encode(self.payload))
+
+        # Assert
+        self.assertEqual(decoded, self.payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Tests for the state index"""
+import os
+import unittest
+import tempfile
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.state.state_index import StateIndex
+from src.core.state.state_codec import StateCodec
+from src.core.state.checkpoint_manager import CheckpointManager
+from src.core.state.state_persistence import StatePersistence
+
+
+class TestStateIndex(unittest.TestCase):
+    """Test cases for the StateIndex class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = StateIndex(os.path.join(self.temp_dir.name, "index.sqlite3"))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def _record(self, checkpoint_id: str, workflow_id: str, minute: int, name: str = None) -> dict:
+        """Create a checkpoint record"""
+        return {
+            "id": checkpoint_id,
+            "workflow_id": workflow_id,
+            "timestamp": f"2024-01-01T00:{minute:02d}:00",
+            "name": name,
+            "data": {"current_index": minute},
+            "parent_id": None
+        }
+
+    def test_checkpoint_queries(self):
+        """Test per-workflow, by-name and latest-N checkpoint queries"""
+        # Arrange
+        self.index.add_checkpoint(self._record("a", "wf", 1, "start"))
+        self.index.add_checkpoint(self._record("b", "wf", 2))
+        self.index.add_checkpoint(self._record("c", "wf", 3, "start"))
+        self.index.add_checkpoint(self._record("d", "other", 4))
+
+        # Act
+        all_records = self.index.get_checkpoints("wf")
+        latest = self.index.get_checkpoints("wf", limit=2)
+        named = self.index.get_checkpoints("wf", name="start", limit=1)
+
+        # Assert
+        self.assertEqual([r["id"] for r in all_records], ["c", "b", "a"])
+        self.assertEqual([r["id"] for r in latest], ["c", "b"])
+        self.assertEqual(named[0]["id"], "c")
+        self.assertEqual(named[0]["data"], {"current_index": 3})
+
+    def test_remove_checkpoints(self):
+        """Test removing checkpoint records"""
+        # Arrange
+        self.index.add_checkpoint(self._record("a", "wf", 1))
+        self.index.add_checkpoint(self._record("b", "wf", 2))
+
+        # Act
+        removed = self.index.remove_checkpoints(["a"])
+
+        # Assert
+        self.assertEqual(removed, 1)
+        self.assertEqual([r["id"] for r in self.index.get_checkpoints("wf")], ["b"])
+
+    def test_state_queries(self):
+        """Test latest-N and offset state file queries"""
+        # Arrange
+        for i in range(5):
+            self.index.add_state(f"wf_{i}.state", "wf", created_at=float(i))
+        self.index.add_state("other.state", "other", created_at=10.0)
+
+        # Act
+        latest = self.index.get_state_files("wf", limit=2)
+        older = self.index.get_state_files("wf", offset=3)
+
+        # Assert
+        self.assertEqual(latest, ["wf_4.state", "wf_3.state"])
+        self.assertEqual(older, ["wf_1.state", "wf_0.state"])
+
+    def test_rebuild(self):
+        """Test indexing files written before the index existed"""
+        # Arrange
+        codec = StateCodec()
+        codec.write(os.path.join(self.temp_dir.name, "a.checkpoint"), self._record("a", "wf", 1))
+        open(os.path.join(self.temp_dir.name, "a.context"), 'wb').close()
+        open(os.path.join(self.temp_dir.name, "my_wf_20240101_000000_000.state"), 'wb').close()
+
+        # Act
+        checkpoints = self.index.rebuild_checkpoints(self.temp_dir.name, codec)
+        states = self.index.rebuild_states(self.temp_dir.name)
+
+        # Assert
+        self.assertEqual((checkpoints, states), (1, 1))
+        self.assertEqual(self.index.get_checkpoints("wf")[0]["id"], "a")
+        self.assertEqual(len(self.index.get_state_files("my_wf")), 1)
+
+
+class TestIndexedManagers(unittest.TestCase):
+    """Test cases for the checkpoint manager and state persistence with an index"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.context = ExecutionContext()
+        self.context.variables.set("count", 1)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_checkpoint_manager_uses_index(self):
+        """Test that checkpoint listings come from the index"""
+        # Arrange
+        manager = CheckpointManager(self.temp_dir.name, use_index=True)
+        first = manager.create_checkpoint("wf", self.context, {}, "first")
+        second = manager.create_checkpoint("wf", self.context, {})
+
+        # Act
+        os.remove(manager.get_checkpoint_file(first))  # listings must not read the files
+        listed = [c["id"] for c in manager.get_checkpoints_for_workflow("wf")]
+        by_name = manager.get_checkpoint_by_name("wf", "first")
+
+        # Assert
+        self.assertEqual(set(listed), {first, second})
+        self.assertEqual(by_name["id"], first)
+        self.assertTrue(manager.delete_checkpoint(second))
+        self.assertEqual([c["id"] for c in manager.get_checkpoints_for_workflow("wf")], [first])
+
+    def test_checkpoint_index_is_rebuilt(self):
+        """Test that existing checkpoints are indexed when the index is first used"""
+        # Arrange
+        checkpoint_id = CheckpointManager(self.temp_dir.name).create_checkpoint("wf", self.context, {})
+
+        # Act
+        manager = CheckpointManager(self.temp_dir.name, use_index=True)
+
+        # Assert
+        self.assertEqual(manager.get_checkpoints_for_workflow("wf", limit=1)[0]["id"], checkpoint_id)
+
+    def test_state_persistence_uses_index(self):
+        """Test latest state and cleanup with an index"""
+        # Arrange
+        persistence = StatePersistence(self.temp_dir.name, use_index=True)
+        paths = []
+        for i in range(4):
+            self.context.variables.set("count", i)
+            paths.append(persistence.save_state("wf", self.context))
+            persistence.index.add_state(paths[-1], "wf", created_at=float(i))
+
+        # Act
+        latest = persistence.get_latest_state_file("wf")
+        removed = persistence.cleanup_old_states("wf", max_states=1)
+
+        # Assert
+        self.assertEqual(latest, paths[-1])
+        self.assertEqual(removed, 3)
+        self.assertEqual(persistence.get_state_files("wf"), [paths[-1]])
+        self.assertEqual(persistence.load_state(latest).variables.get("count"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for the state persistence"""
+import os
+import json
+import unittest
+import tempfile
+from datetime import datetime
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.context.variable_storage import VariableScope
+from src.core.state.state_persistence import StatePersistence
+from src.core.state.state_codec import StateCodec
+
+
+class TestStatePersistence(unittest.TestCase):
+    """Test cases for the StatePersistence class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.persistence = StatePersistence(self.temp_dir.name)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_save_and_load(self):
+        """Test saving and loading a context with non-JSON values"""
+        # Arrange
+        context = ExecutionContext()
+        context.variables.set("started", datetime(2024, 5, 6, 7, 8, 9))
+        context.variables.set("user", "alice", VariableScope.GLOBAL)
+
+        # Act
+        path = self.persistence.save_state("wf", context)
+        loaded = self.persistence.load_state(path)
+
+        # Assert
+        self.assertEqual(loaded.id, context.id)
+        self.assertEqual(loaded.variables.get("started"), datetime(2024, 5, 6, 7, 8, 9))
+        self.assertEqual(loaded.variables.get_scope("user"), VariableScope.GLOBAL)
+        self.assertEqual(self.persistence.get_latest_state_file("wf"), path)
+
+    def test_loads_legacy_json_state(self):
+        """Test loading a state file in the original JSON format"""
+        # Arrange
+        context = ExecutionContext()
+        path = os.path.join(self.temp_dir.name, "wf_20240101_000000_000.state")
+        with open(path, 'w') as f:
+            json.dump({
+                "workflow_id": "wf",
+                "timestamp": "2024-01-01T00:00:00",
+                "context": {
+                    "id": "ctx",
+                    "state": context.state.to_dict(),
+                    "variables": {"global": {}, "workflow": {"count": 3}, "local": {}}
+                }
+            }, f, indent=2)
+
+        # Act
+        loaded = self.persistence.load_state(path)
+
+        # Assert
+        self.assertEqual(loaded.id, "ctx")
+        self.assertEqual(loaded.variables.get("count"), 3)
+
+    def test_json_codec(self):
+        """Test saving with the JSON codec"""
+        # Arrange
+        persistence = StatePersistence(self.temp_dir.name, StateCodec(format="json", compression="none"))
+        context = ExecutionContext()
+        context.variables.set("count", 1)
+
+        # Act
+        loaded = persistence.load_state(persistence.save_state("wf", context))
+
+        # Assert
+        self.assertEqual(loaded.variables.get("count"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
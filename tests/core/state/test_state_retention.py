@@ -0,0 +1,222 @@
+"""Tests for the state retention service"""
+import os
+import time
+import unittest
+import tempfile
+from datetime import datetime
+
+from src.core.context.execution_context import ExecutionContext
+from src.core.state.checkpoint_manager import CheckpointManager
+from src.core.state.state_persistence import StatePersistence
+from src.core.state.sqlite_state_store import SqliteStatePersistence, SqliteCheckpointManager
+from src.core.state.state_retention import StateRetentionPolicy, StateRetentionService
+
+
+class TestStateRetentionPolicy(unittest.TestCase):
+    """Test cases for the StateRetentionPolicy class"""
+
+    def test_hourly_and_daily_thinning(self):
+        """Test that the newest item of each recent hour and day is kept"""
+        # Arrange
+        times = [
+            datetime(2024, 5, 3, 12, 50), datetime(2024, 5, 3, 12, 10), datetime(2024, 5, 3, 11, 30),
+            datetime(2024, 5, 3, 9, 0), datetime(2024, 5, 2, 18, 0), datetime(2024, 5, 2, 8, 0),
+            datetime(2024, 5, 1, 8, 0)
+        ]
+        policy = StateRetentionPolicy(keep_hourly=2, keep_daily=2)
+
+        # Act
+        kept = policy.select_kept([t.timestamp() for t in times])
+
+        # Assert
+        self.assertEqual(kept, {0, 2, 4})
+
+    def test_no_thinning_rules_keep_everything(self):
+        """Test that a size-only policy removes nothing by count"""
+        # Arrange
+        policy = StateRetentionPolicy(max_total_bytes=100)
+
+        # Act
+        kept = policy.select_kept([3.0, 2.0, 1.0])
+
+        # Assert
+        self.assertFalse(policy.thins)
+        self.assertEqual(kept, {0, 1, 2})
+
+
+class TestStateRetentionService(unittest.TestCase):
+    """Test cases for the StateRetentionService class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.persistence = StatePersistence(os.path.join(self.temp_dir.name, "states"), use_index=True)
+        self.manager = CheckpointManager(
+            os.path.join(self.temp_dir.name, "checkpoints"), delta_checkpoints=True, use_index=True
+        )
+        self.context = ExecutionContext()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.manager.end_chain("wf")
+        self.persistence.index.close()
+        self.manager.index.close()
+        self.temp_dir.cleanup()
+
+    def _add_state(self, name: str, created_at: float, size: int = 100, workflow_id: str = "wf") -> str:
+        """Write a state file of the given size and index it"""
+        path = os.path.join(self.persistence.state_dir, f"{name}.state")
+        with open(path, 'wb') as f:
+            f.write(b"x" * size)
+        self.persistence.index.add_state(path, workflow_id, created_at, size)
+        return path
+
+    def test_requires_index(self):
+        """Test that the service needs indexed components"""
+        # Arrange
+        persistence = StatePersistence(os.path.join(self.temp_dir.name, "plain"))
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            StateRetentionService(StateRetentionPolicy(keep_last=1), state_persistence=persistence)
+
+    def test_keep_last_states(self):
+        """Test that old state files are removed and the reclaimed space reported"""
+        # Arrange
+        paths = [self._add_state(f"s{i}", 1000.0 + i) for i in range(5)]
+        other = self._add_state("other", 1.0, workflow_id="other")
+        service = StateRetentionService(
+            StateRetentionPolicy(keep_last=2), state_persistence=self.persistence, batch_size=2, batch_pause=0
+        )
+
+        # Act
+        result = service.run_once()
+
+        # Assert
+        self.assertEqual(result, {"states_removed": 3, "checkpoints_removed": 0, "bytes_reclaimed": 300})
+        self.assertEqual(self.persistence.get_state_files("wf"), [paths[4], paths[3]])
+        self.assertFalse(any(os.path.exists(path) for path in paths[:3]))
+        self.assertTrue(os.path.exists(other))
+        self.assertEqual(service.get_metrics()["bytes_reclaimed"], 300)
+
+    def test_max_total_bytes(self):
+        """Test that the oldest items are removed until the size limit is met"""
+        # Arrange
+        for i in range(4):
+            self._add_state(f"a{i}", 1000.0 + i)
+        newest_b = self._add_state("b0", 500.0, workflow_id="b")
+        service = StateRetentionService(
+            StateRetentionPolicy(max_total_bytes=250), state_persistence=self.persistence, batch_pause=0
+        )
+
+        # Act
+        result = service.run_once()
+
+        # Assert
+        self.assertEqual(result["states_removed"], 3)
+        self.assertEqual(self.persistence.index.state_bytes(), 200)
+        self.assertTrue(os.path.exists(newest_b))
+
+    def test_keep_last_checkpoints_with_deltas(self):
+        """Test that removing old checkpoints keeps the remaining deltas restorable"""
+        # Arrange
+        ids = []
+        for i in range(5):
+            self.context.variables.set("count", i)
+            ids.append(self.manager.create_checkpoint("wf", self.context, {"current_index": i}, "first" if i == 0 else None))
+        service = StateRetentionService(
+            StateRetentionPolicy(keep_last=2), checkpoint_manager=self.manager, batch_pause=0
+        )
+
+        # Act
+        result = service.run_once()
+
+        # Assert
+        self.assertEqual(result["checkpoints_removed"], 2)
+        remaining = [c["id"] for c in self.manager.get_checkpoints_for_workflow("wf")]
+        self.assertEqual(set(remaining), {ids[0], ids[3], ids[4]})
+        context, data = self.manager.restore_from_checkpoint(ids[3])
+        self.assertEqual(context.variables.get("count"), 3)
+        self.assertEqual(data, {"current_index": 3})
+
+    def test_background_run(self):
+        """Test that the background thread enforces the policy"""
+        # Arrange
+        old = self._add_state("old", 1.0)
+        newest = self._add_state("new", 2.0)
+        service = StateRetentionService(
+            StateRetentionPolicy(keep_last=1), state_persistence=self.persistence, interval=0.01
+        )
+
+        # Act
+        service.start()
+        deadline = time.time() + 5
+        while os.path.exists(old) and time.time() < deadline:
+            time.sleep(0.01)
+        service.stop(timeout=5)
+
+        # Assert
+        self.assertFalse(service.is_running)
+        self.assertEqual(self.persistence.get_state_files("wf"), [newest])
+
+
+class TestSqliteStateRetention(unittest.TestCase):
+    """Test cases for the StateRetentionService with the SQLite backends"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.persistence = SqliteStatePersistence(os.path.join(self.temp_dir.name, "states.sqlite3"))
+        self.manager = SqliteCheckpointManager(os.path.join(self.temp_dir.name, "checkpoints.sqlite3"))
+        self.context = ExecutionContext()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.persistence.close()
+        self.manager.close()
+        self.temp_dir.cleanup()
+
+    def test_keep_last_states(self):
+        """Test that old states are deleted from the database and the reclaimed space reported"""
+        # Arrange
+        references = [self.persistence.save_state("wf", self.context) for _ in range(4)]
+        other = self.persistence.save_state("other", self.context)
+        before = self.persistence.state_bytes()
+        service = StateRetentionService(
+            StateRetentionPolicy(keep_last=1), state_persistence=self.persistence, batch_size=2, batch_pause=0
+        )
+
+        # Act
+        result = service.run_once()
+
+        # Assert
+        self.assertEqual(result["states_removed"], 3)
+        self.assertEqual(result["bytes_reclaimed"], before - self.persistence.state_bytes())
+        self.assertEqual(self.persistence.get_state_files("wf"), [references[3]])
+        self.assertEqual(self.persistence.get_state_files("other"), [other])
+
+    def test_max_total_bytes_checkpoints(self):
+        """Test that the oldest unnamed checkpoints are deleted until the size limit is met"""
+        # Arrange
+        ids = [
+            self.manager.create_checkpoint("wf", self.context, {"current_index": i}, "start" if i == 0 else None)
+            for i in range(5)
+        ]
+        sizes = {entry["id"]: entry["size_bytes"] for entry in self.manager.get_checkpoint_entries("wf")}
+        limit = sizes[ids[0]] + sizes[ids[3]] + sizes[ids[4]]
+        service = StateRetentionService(
+            StateRetentionPolicy(max_total_bytes=limit), checkpoint_manager=self.manager,
+            batch_size=1, batch_pause=0
+        )
+
+        # Act
+        result = service.run_once()
+
+        # Assert
+        self.assertEqual(result["checkpoints_removed"], 2)
+        remaining = [c["id"] for c in self.manager.get_checkpoints_for_workflow("wf")]
+        self.assertEqual(set(remaining), {ids[0], ids[3], ids[4]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""Tests for the content-addressed screenshot storage"""
+import os
+import random
+import unittest
+import tempfile
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from src.core.utils.content_addressed_storage import ContentAddressedStorage, perceptual_hash
+
+
+def make_png(color=(20, 120, 220), text: str = "", box=(10, 10, 60, 40)) -> bytes:
+    """Create PNG bytes of a page-like image"""
+    image = Image.new("RGB", (120, 80), color)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle(box, fill=(255, 255, 255))
+    if text:
+        draw.text((90, 65), text, fill=(0, 0, 0))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestContentAddressedStorage(unittest.TestCase):
+    """Test cases for the ContentAddressedStorage class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ContentAddressedStorage(self.temp_dir.name)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_identical_captures_share_one_blob(self):
+        """Test that identical screenshots are stored once"""
+        # Arrange
+        png_data = make_png()
+
+        # Act
+        first = self.storage.save_png_bytes(png_data, "page", {"row": 1})
+        second = self.storage.save_png_bytes(png_data, "page", {"row": 2})
+
+        # Assert
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.storage.get_blob_hash(first), self.storage.get_blob_hash(second))
+        stats = self.storage.get_stats()
+        self.assertEqual(stats["captures"], 2)
+        self.assertEqual(stats["unique_blobs"], 1)
+        self.assertEqual(stats["bytes_deduplicated"], len(png_data))
+        with open(second, 'rb') as f:
+            self.assertEqual(f.read(), png_data)
+
+    def test_metadata_comes_from_manifest(self):
+        """Test that capture metadata is kept without sidecar files"""
+        # Act
+        path = self.storage.save_png_bytes(make_png(), "page", {"row": 7})
+
+        # Assert
+        self.assertFalse(os.path.exists(path + ".json"))
+        metadata = self.storage.get_metadata(path)
+        self.assertEqual(metadata["row"], 7)
+        self.assertEqual(metadata["width"], 120)
+
+    def test_manifest_reloaded(self):
+        """Test that records and blobs are known after reopening the storage"""
+        # Arrange
+        png_data = make_png()
+        path = self.storage.save_png_bytes(png_data, "page", {"row": 1})
+
+        # Act
+        reopened = ContentAddressedStorage(self.temp_dir.name)
+        reopened.save_png_bytes(png_data, "page")
+
+        # Assert
+        self.assertEqual(reopened.get_metadata(path)["row"], 1)
+        self.assertEqual(reopened.get_stats()["bytes_written"], 0)
+
+    def test_near_duplicates_share_blob(self):
+        """Test that captures differing only slightly reuse the stored blob"""
+        # Arrange
+        storage = ContentAddressedStorage(self.temp_dir.name, near_duplicate_threshold=4)
+
+        # Act
+        first = storage.save_png_bytes(make_png(text="12:00"), "page")
+        second = storage.save_png_bytes(make_png(text="12:01"), "page")
+        third = storage.save_png_bytes(make_png(box=(50, 30, 110, 75)), "page")
+
+        # Assert
+        self.assertEqual(storage.get_blob_hash(first), storage.get_blob_hash(second))
+        self.assertNotEqual(storage.get_blob_hash(first), storage.get_blob_hash(third))
+
+    def test_collect_garbage(self):
+        """Test that blobs without remaining captures are removed"""
+        # Arrange
+        kept = self.storage.save_png_bytes(make_png(), "kept")
+        removed = self.storage.save_png_bytes(make_png(color=(0, 0, 0)), "removed")
+        removed_blob = self.storage.get_blob_path(self.storage.get_blob_hash(removed))
+        os.remove(removed)
+
+        # Act
+        reclaimed = self.storage.collect_garbage()
+
+        # Assert
+        self.assertGreater(reclaimed, 0)
+        self.assertFalse(os.path.exists(removed_blob))
+        self.assertTrue(os.path.exists(self.storage.get_blob_path(self.storage.get_blob_hash(kept))))
+        self.assertEqual(self.storage.get_screenshots(), [kept])
+
+    def test_manifest_compacted_on_forget(self):
+        """Test that deleted captures are dropped from the manifest"""
+        # Arrange
+        paths = [self.storage.save_png_bytes(make_png(color=(i, 0, 0)), "page") for i in range(5)]
+        for path in paths[:4]:
+            os.remove(path)
+
+        # Act
+        self.storage.forget(paths[:4])
+
+        # Assert
+        with open(self.storage.manifest_path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        reopened = ContentAddressedStorage(self.temp_dir.name)
+        self.assertEqual(reopened.get_stats()["captures"], 1)
+        self.assertEqual(reopened.get_screenshots(), [paths[4]])
+
+    def test_catalog_replaces_manifest(self):
+        """Test that with a catalog, captures and blobs are recorded in the catalog only"""
+        # Arrange
+        png_data = make_png()
+        old_path = self.storage.save_png_bytes(png_data, "page", {"row": 1})
+        storage = ContentAddressedStorage(self.temp_dir.name, use_catalog=True)
+
+        # Act
+        path = storage.save_png_bytes(png_data, "page", {"row": 2})
+        reopened = ContentAddressedStorage(self.temp_dir.name, use_catalog=True)
+
+        # Assert
+        self.assertFalse(os.path.exists(storage.manifest_path))
+        self.assertEqual(storage.get_stats()["bytes_written"], 0)
+        self.assertEqual(reopened.get_blob_hash(path), reopened.get_blob_hash(old_path))
+        self.assertEqual(reopened.get_metadata(old_path)["row"], 1)
+        self.assertEqual(reopened.get_stats()["captures"], 2)
+        self.assertEqual(reopened.get_stats()["unique_blobs"], 1)
+
+    def test_near_duplicate_index_finds_every_hash_within_threshold(self):
+        """Test that the banded index finds stored hashes within the threshold"""
+        # Arrange
+        rng = random.Random(7)
+        storage = ContentAddressedStorage(self.temp_dir.name, near_duplicate_threshold=6)
+        hashes = [rng.getrandbits(64) for _ in range(500)]
+        for i, phash in enumerate(hashes):
+            storage._remember_blob(f"blob{i}", phash)
+
+        # Act
+        found = []
+        for i in range(0, 500, 25):
+            query = hashes[i]
+            for bit in rng.sample(range(64), 6):
+                query ^= 1 << bit
+            found.append(storage._find_near_duplicate(query))
+
+        # Assert
+        self.assertEqual(found, [f"blob{i}" for i in range(0, 500, 25)])
+
+    def test_perceptual_hash_is_stable(self):
+        """Test that the perceptual hash of identical images is identical"""
+        # Arrange
+        image = Image.open(BytesIO(make_png()))
+
+        # Act & Assert
+        self.assertEqual(perceptual_hash(image), perceptual_hash(image.copy()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests for the element cache"""
+import unittest
+from unittest.mock import MagicMock
+
+from src.core.utils.element_cache import ElementCache, get_element_cache, is_stale_error
+
+
+class StaleElementReferenceException(Exception):
+    """Stand-in for Selenium's stale element error"""
+    pass
+
+
+class TestElementCache(unittest.TestCase):
+    """Test cases for the ElementCache class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.driver = MagicMock()
+        self.cache = ElementCache()
+
+    def test_find_element_reuses_element(self):
+        """Test that a located element is reused for the same selector"""
+        # Act
+        first = self.cache.find_element(self.driver, "#name")
+        second = self.cache.find_element(self.driver, "#name")
+
+        # Assert
+        self.assertIs(first, second)
+        self.driver.find_element_by_css_selector.assert_called_once_with("#name")
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+    def test_empty_results_not_cached(self):
+        """Test that selectors matching nothing are queried again"""
+        # Arrange
+        self.driver.find_elements_by_css_selector.return_value = []
+
+        # Act
+        self.cache.find_elements(self.driver, "#missing")
+        self.cache.find_elements(self.driver, "#missing")
+
+        # Assert
+        self.assertEqual(self.driver.find_elements_by_css_selector.call_count, 2)
+
+    def test_stale_element_retried(self):
+        """Test that a stale cached element is located again and the operation retried"""
+        # Arrange
+        stale = MagicMock()
+        stale.click.side_effect = StaleElementReferenceException("stale")
+        fresh = MagicMock()
+        self.driver.find_element_by_css_selector.side_effect = [stale, fresh]
+        self.cache.find_element(self.driver, "#submit")
+
+        # Act
+        self.cache.with_element(self.driver, "#submit", lambda element: element.click())
+
+        # Assert
+        fresh.click.assert_called_once()
+        self.assertEqual(self.cache.get_stats()["stale_retries"], 1)
+
+    def test_other_errors_not_retried(self):
+        """Test that errors other than staleness are raised"""
+        # Arrange
+        element = self.driver.find_element_by_css_selector.return_value
+        element.click.side_effect = RuntimeError("not clickable")
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            self.cache.with_element(self.driver, "#submit", lambda e: e.click())
+        self.driver.find_element_by_css_selector.assert_called_once()
+
+    def test_page_generation_change_clears(self):
+        """Test that a new page generation clears the cache"""
+        # Arrange
+        self.cache.sync_generation(1)
+        self.cache.find_element(self.driver, "#name")
+
+        # Act
+        self.cache.sync_generation(1)
+        self.cache.find_element(self.driver, "#name")
+        self.cache.sync_generation(2)
+        self.cache.find_element(self.driver, "#name")
+
+        # Assert
+        self.assertEqual(self.driver.find_element_by_css_selector.call_count, 2)
+
+    def test_shared_per_driver(self):
+        """Test that the cache is shared by everything using a driver"""
+        # Act
+        cache = get_element_cache({"driver": self.driver})
+
+        # Assert
+        self.assertIs(cache, ElementCache.for_driver(self.driver))
+        self.assertIsNot(cache, ElementCache.for_driver(MagicMock()))
+        self.assertIsNone(get_element_cache({"driver": self.driver}, require_generation=True))
+        self.assertIsNone(get_element_cache({}))
+
+    def test_invalidate_driver(self):
+        """Test forgetting the elements of a driver after navigation"""
+        # Arrange
+        cache = ElementCache.for_driver(self.driver)
+        cache.find_element(self.driver, "#name")
+
+        # Act
+        ElementCache.invalidate_driver(self.driver)
+
+        # Assert
+        self.assertEqual(cache.get_stats()["entries"], 0)
+
+    def test_is_stale_error(self):
+        """Test recognising stale element errors by class name"""
+        self.assertTrue(is_stale_error(StaleElementReferenceException()))
+        self.assertFalse(is_stale_error(ValueError()))
+
+
+if __name__ == "__main__":
+    unittest.main()
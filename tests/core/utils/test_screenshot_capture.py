@@ -1,8 +1,8 @@
 """Tests for the screenshot capture functionality"""
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
-from src.core.utils.screenshot_capture import ScreenshotCapture, CaptureMode
+from src.core.utils.screenshot_capture import ScreenshotCapture, CaptureMode, read_png_size
 
 
 class TestScreenshotCapture(unittest.TestCase):
@@ -123,5 +123,86 @@ class TestScreenshotCapture(unittest.TestCase):
         self.assertEqual(self.mock_image.crop.call_count, 2)
 
 
+    def test_read_png_size(self):
+        """Test reading the size of a PNG from its header"""
+        # Arrange
+        header = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\x0dIHDR" + b"\x00\x00\x05\x00\x00\x00\x02\xd0"
+
+        # Act
+        size = read_png_size(header)
+
+        # Assert
+        self.assertEqual(size, (1280, 720))
+
+    def test_read_png_size_invalid(self):
+        """Test reading the size of data that is not a PNG"""
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            read_png_size(b"GIF89a" + b"\x00" * 20)
+
+
+    def test_capture_element_native(self):
+        """Test that the driver's element screenshot is used when available"""
+        # Arrange
+        self.mock_element.screenshot_as_png = b'element_png'
+
+        # Act
+        raw = self.capture.grab(self.mock_driver, CaptureMode.ELEMENT, self.mock_element)
+
+        # Assert
+        self.assertEqual(raw.png_data, b'element_png')
+        self.assertFalse(raw.needs_decode)
+        self.mock_driver.get_screenshot_as_png.assert_not_called()
+
+    def test_capture_element_clip(self):
+        """Test that a DevTools clip capture is used when element screenshots are unsupported"""
+        # Arrange
+        type(self.mock_element).screenshot_as_png = PropertyMock(side_effect=Exception("unsupported"))
+        self.mock_driver.execute_script.return_value = {
+            "left": 10, "top": 20, "width": 100, "height": 50, "scrollX": 0, "scrollY": 300, "dpr": 2
+        }
+        self.mock_driver.execute_cdp_cmd.return_value = {"data": "Y2xpcA=="}
+
+        # Act
+        raw = self.capture.grab(self.mock_driver, CaptureMode.ELEMENT, self.mock_element)
+
+        # Assert
+        self.assertEqual(raw.png_data, b'clip')
+        clip = self.mock_driver.execute_cdp_cmd.call_args[0][1]["clip"]
+        self.assertEqual((clip["x"], clip["y"]), (10, 320))
+        self.mock_driver.get_screenshot_as_png.assert_not_called()
+
+    def test_capture_element_crop_uses_viewport_and_pixel_ratio(self):
+        """Test that the crop fallback uses the viewport rectangle scaled by the pixel ratio"""
+        # Arrange
+        driver = MagicMock(spec=["get_screenshot_as_png", "execute_script"])
+        driver.get_screenshot_as_png.return_value = b'page'
+        driver.execute_script.return_value = {
+            "left": 10, "top": 20, "width": 100, "height": 50, "scrollX": 0, "scrollY": 300, "dpr": 2
+        }
+
+        # Act
+        raw = self.capture.grab(driver, CaptureMode.ELEMENT, self.mock_element)
+
+        # Assert
+        self.assertEqual(raw.box, (20, 40, 220, 140))
+
+    @patch('src.core.utils.screenshot_capture.Image')
+    def test_capture_regions_decodes_once(self, mock_image_module):
+        """Test that a batch of regions shares one screenshot"""
+        # Arrange
+        self.mock_driver.get_screenshot_as_png.return_value = b'fake_png_data'
+        mock_image_module.open.return_value = self.mock_image
+
+        # Act
+        results = self.capture.capture_regions(self.mock_driver, [(0, 0, 5, 5), (5, 5, 10, 10)])
+
+        # Assert
+        self.assertEqual(len(results), 2)
+        self.mock_driver.get_screenshot_as_png.assert_called_once()
+        mock_image_module.open.assert_called_once()
+        self.assertEqual(self.mock_image.crop.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,176 @@
+"""Tests for the screenshot catalog"""
+import os
+import json
+import unittest
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
+from src.core.utils.screenshot_catalog import ScreenshotCatalog
+from src.core.utils.screenshot_storage import ScreenshotStorage
+
+
+def make_png() -> bytes:
+    """Create PNG bytes of a small image"""
+    buffer = BytesIO()
+    Image.new("RGB", (16, 8)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestScreenshotCatalog(unittest.TestCase):
+    """Test cases for the ScreenshotCatalog class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.catalog = ScreenshotCatalog(os.path.join(self.temp_dir.name, "catalog.sqlite3"))
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.catalog.close()
+        self.temp_dir.cleanup()
+
+    def test_query_by_workflow_action_and_name(self):
+        """Test filtering screenshots by the indexed fields"""
+        # Arrange
+        self.catalog.add("a.png", "login", {"workflow_id": "wf-1", "action_id": "act-1"}, created_at=100)
+        self.catalog.add("b.png", "login", {"workflow_id": "wf-2", "action_id": "act-1"}, created_at=200)
+        self.catalog.add("c.png", "checkout", {"workflow_id": "wf-1", "action_id": "act-2"}, created_at=300)
+
+        # Act
+        by_workflow = self.catalog.query(workflow_id="wf-1")
+        by_action = self.catalog.query(action_id="act-1")
+        by_name = self.catalog.query(name="checkout")
+
+        # Assert
+        self.assertEqual(by_workflow, [os.path.abspath("c.png"), os.path.abspath("a.png")])
+        self.assertEqual(by_action, [os.path.abspath("b.png"), os.path.abspath("a.png")])
+        self.assertEqual(by_name, [os.path.abspath("c.png")])
+
+    def test_latest_and_range(self):
+        """Test the latest screenshot and time-range queries"""
+        # Arrange
+        for i in range(5):
+            self.catalog.add(f"shot_{i}.png", "shot", {}, created_at=100 + i)
+
+        # Act
+        latest = self.catalog.latest()
+        in_range = self.catalog.query(start=101, end=103, newest_first=False)
+
+        # Assert
+        self.assertEqual(latest, os.path.abspath("shot_4.png"))
+        self.assertEqual(in_range, [os.path.abspath("shot_1.png"), os.path.abspath("shot_2.png")])
+
+    def test_workflow_overflow(self):
+        """Test finding screenshots beyond the newest N per workflow"""
+        # Arrange
+        for i in range(3):
+            self.catalog.add(f"a_{i}.png", "a", {"workflow_id": "wf-1"}, created_at=100 + i)
+        self.catalog.add("b.png", "b", {"workflow_id": "wf-2"}, created_at=50)
+        self.catalog.add("c.png", "c", {}, created_at=10)
+
+        # Act
+        overflow = self.catalog.query_workflow_overflow(1)
+
+        # Assert
+        self.assertEqual([r["path"] for r in overflow], [os.path.abspath("a_0.png"), os.path.abspath("a_1.png")])
+
+    def test_size_overflow(self):
+        """Test finding the oldest screenshots over a total size limit"""
+        # Arrange
+        for i in range(4):
+            self.catalog.add(f"s_{i}.png", "s", {}, created_at=100 + i, size_bytes=10)
+
+        # Act
+        overflow = self.catalog.query_size_overflow(25)
+
+        # Assert
+        self.assertEqual(self.catalog.total_bytes(), 40)
+        self.assertEqual([r["path"] for r in overflow], [os.path.abspath("s_0.png"), os.path.abspath("s_1.png")])
+
+    def test_remove(self):
+        """Test removing screenshots from the catalog"""
+        # Arrange
+        self.catalog.add("a.png", "a", {"key": "value"}, created_at=1)
+
+        # Act
+        removed = self.catalog.remove(["a.png"])
+
+        # Assert
+        self.assertEqual(removed, 1)
+        self.assertIsNone(self.catalog.get_metadata("a.png"))
+        self.assertEqual(self.catalog.count(), 0)
+
+    def test_rebuild_from_directory(self):
+        """Test indexing screenshots that were saved before the catalog existed"""
+        # Arrange
+        path = os.path.join(self.temp_dir.name, "login_20240101_120000_000.png")
+        with open(path, 'wb') as f:
+            f.write(make_png())
+        with open(path + ".json", 'w') as f:
+            json.dump({"action_id": "act-1", "timestamp": "2024-01-01T12:00:00"}, f)
+
+        # Act
+        added = self.catalog.rebuild(self.temp_dir.name)
+
+        # Assert
+        self.assertEqual(added, 1)
+        record = self.catalog.query_records(action_id="act-1")[0]
+        self.assertEqual(record["name"], "login")
+
+    def test_name_from_filename(self):
+        """Test recovering the base name from generated filenames"""
+        self.assertEqual(ScreenshotCatalog.name_from_filename("my_shot_20240101_120000_000.png"), "my_shot")
+        self.assertEqual(ScreenshotCatalog.name_from_filename("my_shot_20240101_120000_000_2.png"), "my_shot")
+        self.assertEqual(ScreenshotCatalog.name_from_filename("other.png"), "other")
+
+
+class TestScreenshotStorageCatalog(unittest.TestCase):
+    """Test cases for ScreenshotStorage with a catalog"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ScreenshotStorage(self.temp_dir.name, use_catalog=True)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.storage.catalog.close()
+        self.temp_dir.cleanup()
+
+    def test_metadata_from_catalog(self):
+        """Test that metadata is stored in the catalog instead of sidecar files"""
+        # Act
+        path = self.storage.save_png_bytes(make_png(), "login", {"workflow_id": "wf-1"})
+
+        # Assert
+        self.assertFalse(os.path.exists(path + ".json"))
+        self.assertEqual(self.storage.get_metadata(path)["workflow_id"], "wf-1")
+        self.assertEqual(self.storage.query_screenshots(workflow_id="wf-1"), [os.path.abspath(path)])
+        self.assertEqual(self.storage.get_latest_screenshot(), os.path.abspath(path))
+
+    def test_forget(self):
+        """Test dropping deleted screenshots from the catalog"""
+        # Arrange
+        path = self.storage.save_png_bytes(make_png(), "login")
+        os.remove(path)
+
+        # Act
+        self.storage.forget([path])
+
+        # Assert
+        self.assertEqual(self.storage.get_screenshots(), [])
+
+    def test_query_without_catalog(self):
+        """Test that queries need a catalog"""
+        # Arrange
+        storage = ScreenshotStorage(self.temp_dir.name)
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            storage.query_screenshots(name="login")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""Tests for screenshot encoding profiles"""
+import os
+import unittest
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
+from src.core.utils.screenshot_encoding import EncodingProfile, EncodingProfileRegistry
+from src.core.utils.screenshot_storage import ScreenshotStorage
+from src.core.utils.content_addressed_storage import ContentAddressedStorage
+
+
+def make_png(size=(200, 100)) -> bytes:
+    """Create PNG bytes of a colored image"""
+    buffer = BytesIO()
+    Image.new("RGBA", size, (200, 40, 40, 255)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestEncodingProfile(unittest.TestCase):
+    """Test cases for the EncodingProfile class"""
+
+    def test_downscale_keeps_aspect_ratio(self):
+        """Test that scale and maximum dimensions shrink the image proportionally"""
+        # Arrange
+        image = Image.new("RGB", (200, 100))
+
+        # Act
+        scaled = EncodingProfile(scale=0.5).prepare(image)
+        bounded = EncodingProfile(max_width=50).prepare(image)
+        unchanged = EncodingProfile(max_width=400).prepare(image)
+
+        # Assert
+        self.assertEqual(scaled.size, (100, 50))
+        self.assertEqual(bounded.size, (50, 25))
+        self.assertIs(unchanged, image)
+
+    def test_grayscale_and_jpeg_modes(self):
+        """Test the color conversions for grayscale and JPEG"""
+        # Arrange
+        image = Image.new("RGBA", (10, 10))
+
+        # Act & Assert
+        self.assertEqual(EncodingProfile(grayscale=True).prepare(image).mode, "L")
+        self.assertEqual(EncodingProfile("jpeg").prepare(image).mode, "RGB")
+
+    def test_passthrough(self):
+        """Test which profiles can keep the driver's PNG bytes"""
+        self.assertTrue(EncodingProfile().is_passthrough)
+        self.assertFalse(EncodingProfile(compress_level=1).is_passthrough)
+        self.assertFalse(EncodingProfile("webp").is_passthrough)
+
+    def test_invalid_settings(self):
+        """Test that out-of-range settings are rejected"""
+        with self.assertRaises(ValueError):
+            EncodingProfile("gif")
+        with self.assertRaises(ValueError):
+            EncodingProfile("jpeg", quality=0)
+        with self.assertRaises(ValueError):
+            EncodingProfile(compress_level=10)
+        with self.assertRaises(ValueError):
+            EncodingProfile(scale=2)
+
+    def test_serialization(self):
+        """Test converting a profile to and from a dictionary"""
+        # Arrange
+        profile = EncodingProfile("jpg", quality=60, max_height=720, grayscale=True)
+
+        # Act
+        restored = EncodingProfile.from_dict(profile.to_dict())
+
+        # Assert
+        self.assertEqual(restored.to_dict(), profile.to_dict())
+        self.assertEqual(restored.extension, ".jpg")
+
+
+class TestEncodingProfileRegistry(unittest.TestCase):
+    """Test cases for the EncodingProfileRegistry class"""
+
+    def tearDown(self):
+        """Restore the default profile"""
+        EncodingProfileRegistry.set_default("png")
+
+    def test_resolve(self):
+        """Test resolving names, dictionaries and the default"""
+        self.assertEqual(EncodingProfileRegistry.get("webp").format, "webp")
+        self.assertEqual(EncodingProfileRegistry.get({"format": "jpeg"}).format, "jpeg")
+        self.assertTrue(EncodingProfileRegistry.get().is_passthrough)
+        with self.assertRaises(ValueError):
+            EncodingProfileRegistry.get("no-such-profile")
+
+    def test_register_and_set_default(self):
+        """Test registering a profile and making it the global default"""
+        # Arrange
+        profile = EncodingProfile("webp", quality=50, max_width=640)
+
+        # Act
+        EncodingProfileRegistry.register("audit", profile)
+        EncodingProfileRegistry.set_default("audit")
+
+        # Assert
+        self.assertIn("audit", EncodingProfileRegistry.get_registered_names())
+        self.assertIs(EncodingProfileRegistry.get(), profile)
+
+
+class TestStorageEncoding(unittest.TestCase):
+    """Test cases for saving screenshots with encoding profiles"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_save_png_bytes_reencodes(self):
+        """Test that driver PNG bytes are converted when the profile requires it"""
+        # Arrange
+        storage = ScreenshotStorage(self.temp_dir.name)
+
+        # Act
+        path = storage.save_png_bytes(make_png(), "page", {"key": "value"}, encoding="thumbnail")
+
+        # Assert
+        self.assertTrue(path.endswith(".jpg"))
+        with Image.open(path) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (100, 50)))
+        self.assertEqual(storage.get_metadata(path)["width"], 100)
+        self.assertEqual(storage.get_screenshots(), [path])
+
+    def test_storage_profile(self):
+        """Test that the storage's profile applies when none is given per call"""
+        # Arrange
+        storage = ScreenshotStorage(self.temp_dir.name, encoding=EncodingProfile("webp", quality=70))
+
+        # Act
+        path = storage.save_image(Image.new("RGB", (20, 10)), "page")
+
+        # Assert
+        self.assertTrue(path.endswith(".webp"))
+        with Image.open(path) as image:
+            self.assertEqual(image.format, "WEBP")
+
+    def test_content_addressed_blobs_use_profile_format(self):
+        """Test that deduplicated blobs are stored in the profile's format"""
+        # Arrange
+        storage = ContentAddressedStorage(self.temp_dir.name)
+
+        # Act
+        first = storage.save_png_bytes(make_png(), "page", encoding="webp")
+        second = storage.save_png_bytes(make_png(), "page", encoding="webp")
+
+        # Assert
+        blob_hash = storage.get_blob_hash(first)
+        self.assertEqual(blob_hash, storage.get_blob_hash(second))
+        self.assertTrue(os.path.exists(storage.get_blob_path(blob_hash, ".webp")))
+        os.remove(first)
+        os.remove(second)
+        self.assertGreater(storage.collect_garbage(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
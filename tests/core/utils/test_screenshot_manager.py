@@ -6,7 +6,7 @@ from unittest.mock import MagicMock
 from PIL import Image
 
 from src.core.utils.screenshot_manager import ScreenshotManager
-from src.core.utils.screenshot_capture import CaptureMode, ScreenshotCapture
+from src.core.utils.screenshot_capture import CaptureMode, ScreenshotCapture, RawCapture
 from src.core.utils.screenshot_storage import ScreenshotStorage
 from src.core.utils.screenshot_cleaner import ScreenshotCleaner
 
@@ -46,8 +46,11 @@ class TestScreenshotManager(unittest.TestCase):
         # Set up mock capture to return mock image
         self.mock_capture.capture.return_value = self.mock_image
 
+        self.mock_capture.grab.return_value = RawCapture(b"png-bytes")
+
         # Set up mock storage to return a file path
         self.mock_storage.save_image.return_value = os.path.join(self.screenshot_dir, "test_screenshot.png")
+        self.mock_storage.save_png_bytes.return_value = os.path.join(self.screenshot_dir, "test_screenshot.png")
 
     def tearDown(self):
         """Clean up after tests"""
@@ -62,12 +65,11 @@ class TestScreenshotManager(unittest.TestCase):
             mode=CaptureMode.FULL_SCREEN
         )
 
-        # Assert
-        self.mock_capture.capture.assert_called_once_with(
-            self.mock_driver, CaptureMode.FULL_SCREEN, None, None
-        )
-        self.mock_storage.save_image.assert_called_once_with(
-            self.mock_image, "test_full_screen", None
+        # Assert - full screen captures are written without decoding
+        self.mock_capture.grab.assert_called_once_with(self.mock_driver, CaptureMode.FULL_SCREEN)
+        self.mock_capture.capture.assert_not_called()
+        self.mock_storage.save_png_bytes.assert_called_once_with(
+            b"png-bytes", "test_full_screen", None, encoding=None
         )
         self.assertEqual(result, os.path.join(self.screenshot_dir, "test_screenshot.png"))
 
@@ -86,7 +88,7 @@ class TestScreenshotManager(unittest.TestCase):
             self.mock_driver, CaptureMode.ELEMENT, self.mock_element, None
         )
         self.mock_storage.save_image.assert_called_once_with(
-            self.mock_image, "test_element", None
+            self.mock_image, "test_element", None, encoding=None
         )
         self.assertEqual(result, os.path.join(self.screenshot_dir, "test_screenshot.png"))
 
@@ -108,7 +110,7 @@ class TestScreenshotManager(unittest.TestCase):
             self.mock_driver, CaptureMode.REGION, None, region
         )
         self.mock_storage.save_image.assert_called_once_with(
-            self.mock_image, "test_region", None
+            self.mock_image, "test_region", None, encoding=None
         )
         self.assertEqual(result, os.path.join(self.screenshot_dir, "test_screenshot.png"))
 
@@ -126,11 +128,9 @@ class TestScreenshotManager(unittest.TestCase):
         )
 
         # Assert
-        self.mock_capture.capture.assert_called_once_with(
-            self.mock_driver, CaptureMode.FULL_SCREEN, None, None
-        )
-        self.mock_storage.save_image.assert_called_once_with(
-            self.mock_image, "test_metadata", metadata
+        self.mock_capture.grab.assert_called_once_with(self.mock_driver, CaptureMode.FULL_SCREEN)
+        self.mock_storage.save_png_bytes.assert_called_once_with(
+            b"png-bytes", "test_metadata", metadata, encoding=None
         )
         self.assertEqual(result, os.path.join(self.screenshot_dir, "test_screenshot.png"))
 
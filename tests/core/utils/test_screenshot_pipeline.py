@@ -0,0 +1,255 @@
+"""Tests for the background screenshot pipeline"""
+import os
+import json
+import shutil
+import threading
+import time
+import unittest
+import tempfile
+from io import BytesIO
+from unittest.mock import MagicMock
+
+from PIL import Image
+
+from src.core.utils.screenshot_capture import ScreenshotCapture, CaptureMode, RawCapture
+from src.core.utils.screenshot_storage import ScreenshotStorage
+from src.core.utils.screenshot_pipeline import ScreenshotPipeline
+from src.core.utils.screenshot_manager import ScreenshotManager
+from src.core.utils.screenshot_retention import RetentionPolicy
+
+
+def make_png(width: int = 40, height: int = 30) -> bytes:
+    """Create PNG bytes of a solid image"""
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (200, 10, 10)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestScreenshotPipeline(unittest.TestCase):
+    """Test cases for the ScreenshotPipeline class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ScreenshotStorage(self.temp_dir.name)
+        self.pipeline = ScreenshotPipeline(self.storage, ScreenshotCapture(), max_workers=2, queue_limit=4)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.pipeline.shutdown()
+        self.temp_dir.cleanup()
+
+    def test_submit_writes_in_background(self):
+        """Test that submitted captures are decoded, cropped and written"""
+        # Arrange
+        raw = RawCapture(make_png(), box=(0, 0, 10, 5))
+
+        # Act
+        path = self.pipeline.submit(raw, "banner", {"action_id": "a1"})
+        drained = self.pipeline.flush(timeout=5)
+
+        # Assert
+        self.assertTrue(drained)
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (10, 5))
+        with open(path + ".json") as f:
+            self.assertEqual(json.load(f)["action_id"], "a1")
+        self.assertEqual(self.pipeline.get_stats()["completed"], 1)
+
+    def test_full_page_written_without_decoding(self):
+        """Test that captures without a crop box are written as the original bytes"""
+        # Arrange
+        png_data = make_png(64, 48)
+        capture = MagicMock()
+        pipeline = ScreenshotPipeline(self.storage, capture)
+
+        # Act
+        path = pipeline.submit(RawCapture(png_data), "page", {})
+        pipeline.flush(timeout=5)
+        pipeline.shutdown()
+
+        # Assert
+        capture.decode.assert_not_called()
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), png_data)
+
+    def test_submit_regions(self):
+        """Test that a batch of regions is cropped from one screenshot"""
+        # Act
+        paths = self.pipeline.submit_regions(make_png(), [(0, 0, 4, 4), (0, 0, 8, 6)], "banner", {})
+        self.pipeline.flush(timeout=5)
+
+        # Assert
+        self.assertEqual(len(paths), 2)
+        with Image.open(paths[1]) as image:
+            self.assertEqual(image.size, (8, 6))
+        self.assertEqual(self.pipeline.get_stats()["completed"], 2)
+
+    def test_unique_paths_for_same_name(self):
+        """Test that captures submitted in quick succession get distinct paths"""
+        # Act
+        paths = [self.pipeline.submit(RawCapture(make_png()), "same") for _ in range(10)]
+        self.pipeline.flush(timeout=5)
+
+        # Assert
+        self.assertEqual(len(set(paths)), 10)
+        for path in paths:
+            self.assertTrue(os.path.exists(path))
+
+    def test_queue_limit_blocks_submit(self):
+        """Test that submit blocks once the queue limit is reached"""
+        # Arrange
+        release = threading.Event()
+        capture = MagicMock()
+        capture.decode.side_effect = lambda raw: release.wait(5) and Image.new("RGB", (2, 2))
+        pipeline = ScreenshotPipeline(self.storage, capture, max_workers=1, queue_limit=2)
+        for _ in range(2):
+            pipeline.submit(RawCapture(b"", box=(0, 0, 1, 1)), "slow")
+        blocked = threading.Thread(target=pipeline.submit, args=(RawCapture(b"", box=(0, 0, 1, 1)), "slow"))
+
+        # Act
+        blocked.start()
+        blocked.join(0.1)
+        was_blocked = blocked.is_alive()
+        release.set()
+        blocked.join(5)
+        pipeline.flush(timeout=5)
+        pipeline.shutdown()
+
+        # Assert
+        self.assertTrue(was_blocked)
+        self.assertEqual(pipeline.get_stats()["completed"], 3)
+
+    def test_failed_write_is_recorded(self):
+        """Test that a capture that cannot be decoded is counted as failed"""
+        # Act
+        self.pipeline.submit(RawCapture(b"not a png", box=(0, 0, 1, 1)), "broken")
+        self.pipeline.flush(timeout=5)
+
+        # Assert
+        self.assertEqual(self.pipeline.get_stats()["failed"], 1)
+        self.assertEqual(len(self.pipeline.errors), 1)
+
+    def test_invalid_parameters(self):
+        """Test that invalid pool sizes are rejected"""
+        with self.assertRaises(ValueError):
+            ScreenshotPipeline(self.storage, ScreenshotCapture(), max_workers=0)
+        with self.assertRaises(ValueError):
+            ScreenshotPipeline(self.storage, ScreenshotCapture(), queue_limit=0)
+
+
+class TestScreenshotManagerBackground(unittest.TestCase):
+    """Test cases for background writes through the ScreenshotManager"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.driver = MagicMock()
+        self.driver.get_screenshot_as_png.return_value = make_png()
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_capture_and_save_background(self):
+        """Test that background captures only grab the bytes before returning"""
+        # Arrange
+        manager = ScreenshotManager(self.temp_dir.name, async_writes=True)
+        element = MagicMock()
+        element.location = {'x': 5, 'y': 5}
+        element.size = {'width': 20, 'height': 10}
+
+        # Act
+        path = manager.capture_and_save(self.driver, "element", mode=CaptureMode.ELEMENT, element=element)
+        drained = manager.flush(timeout=5)
+        manager.close()
+
+        # Assert
+        self.assertTrue(drained)
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (20, 10))
+        self.driver.get_screenshot_as_png.assert_called_once()
+
+    def test_capture_regions_and_save(self):
+        """Test that region batches are saved from a single driver screenshot"""
+        # Arrange
+        manager = ScreenshotManager(self.temp_dir.name)
+
+        # Act
+        paths = manager.capture_regions_and_save(self.driver, "region", [(0, 0, 4, 4), (4, 4, 8, 8)])
+
+        # Assert
+        self.assertEqual(len(set(paths)), 2)
+        self.driver.get_screenshot_as_png.assert_called_once()
+
+    def test_shared_manager_is_reused(self):
+        """Test that the shared manager of a directory is long-lived"""
+        # Act
+        first = ScreenshotManager.shared(self.temp_dir.name)
+        second = ScreenshotManager.shared(self.temp_dir.name)
+
+        # Assert
+        self.assertIs(first, second)
+
+    def test_replaced_shared_manager_is_closed(self):
+        """Test that replacing the shared manager of a removed directory stops the old workers"""
+        # Arrange
+        screenshot_dir = os.path.join(self.temp_dir.name, "replaced")
+        first = ScreenshotManager.shared(screenshot_dir)
+        first.capture_and_save(self.driver, "queued", background=True)
+        pipeline = first.pipeline
+        first.flush(timeout=5)
+        shutil.rmtree(screenshot_dir)
+
+        # Act
+        second = ScreenshotManager.shared(screenshot_dir)
+
+        # Assert
+        self.assertIsNot(second, first)
+        self.assertIsNone(first._pipeline)
+        with self.assertRaises(RuntimeError):
+            pipeline._executor.submit(print)
+
+    def test_shared_manager_enforces_retention(self):
+        """Test that a retention policy passed to shared() is enforced without starting it separately"""
+        # Arrange
+        screenshot_dir = os.path.join(self.temp_dir.name, "retained")
+        manager = ScreenshotManager.shared(
+            screenshot_dir, retention=RetentionPolicy(max_age_seconds=0), retention_interval=0.01
+        )
+        self.addCleanup(manager.stop_retention)
+
+        # Act
+        path = manager.capture_and_save(self.driver, "expired")
+        manager.flush(timeout=5)
+        deadline = time.time() + 5
+        while os.path.exists(path) and time.time() < deadline:
+            time.sleep(0.01)
+
+        # Assert
+        self.assertTrue(manager.retention.is_running)
+        self.assertFalse(os.path.exists(path))
+        self.assertIs(ScreenshotManager.shared(screenshot_dir, retention=RetentionPolicy()).retention,
+                      manager.retention)
+
+    def test_flush_on_workflow_end(self):
+        """Test that the registered listener flushes the shared managers when a workflow ends"""
+        # Arrange
+        engine = MagicMock()
+        manager = ScreenshotManager.shared(self.temp_dir.name)
+        manager.capture_and_save(self.driver, "queued", background=True)
+        ScreenshotManager.flush_on_workflow_end(engine, timeout=5)
+        listener = engine.add_event_listener.call_args[0][1]
+        event = MagicMock(workflow_id="wf-1")
+        event.event_type.name = "WORKFLOW_COMPLETED"
+
+        # Act
+        listener(event)
+
+        # Assert
+        self.assertEqual(manager.pipeline.pending, 0)
+        self.assertEqual(len(manager.get_screenshots()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
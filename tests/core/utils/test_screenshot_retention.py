@@ -0,0 +1,137 @@
+"""Tests for the screenshot retention service"""
+import os
+import time
+import unittest
+import tempfile
+
+from src.core.utils.screenshot_storage import ScreenshotStorage
+from src.core.utils.screenshot_retention import RetentionPolicy, ScreenshotRetentionService
+
+
+class TestScreenshotRetentionService(unittest.TestCase):
+    """Test cases for the ScreenshotRetentionService class"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ScreenshotStorage(self.temp_dir.name, use_catalog=True)
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.storage.catalog.close()
+        self.temp_dir.cleanup()
+
+    def _add(self, name: str, created_at: float, size: int = 10, workflow_id: str = None) -> str:
+        """Write a screenshot file of the given size and index it"""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(b"x" * size)
+        metadata = {"workflow_id": workflow_id} if workflow_id else {}
+        self.storage.catalog.add(path, name, metadata, created_at=created_at, size_bytes=size)
+        return path
+
+    def test_requires_catalog(self):
+        """Test that the service needs a catalogued storage"""
+        # Arrange
+        storage = ScreenshotStorage(self.temp_dir.name)
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            ScreenshotRetentionService(storage, RetentionPolicy(max_age_seconds=1))
+
+    def test_max_age(self):
+        """Test removing screenshots older than the maximum age"""
+        # Arrange
+        now = time.time()
+        old = self._add("old.png", now - 100)
+        new = self._add("new.png", now)
+        service = ScreenshotRetentionService(self.storage, RetentionPolicy(max_age_seconds=50))
+
+        # Act
+        result = service.run_once()
+
+        # Assert
+        self.assertEqual(result, {"files_removed": 1, "bytes_reclaimed": 10})
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+        self.assertEqual(self.storage.get_screenshots(), [os.path.abspath(new)])
+
+    def test_max_total_bytes_in_batches(self):
+        """Test deleting the oldest screenshots in batches until under the size limit"""
+        # Arrange
+        paths = [self._add(f"shot_{i}.png", 100 + i) for i in range(7)]
+        policy = RetentionPolicy(max_total_bytes=20)
+        service = ScreenshotRetentionService(self.storage, policy, batch_size=2, batch_pause=0)
+
+        # Act
+        service.run_once()
+
+        # Assert
+        self.assertEqual([os.path.exists(p) for p in paths], [False] * 5 + [True] * 2)
+        self.assertEqual(self.storage.catalog.total_bytes(), 20)
+
+    def test_max_per_workflow(self):
+        """Test keeping only the newest screenshots of each workflow"""
+        # Arrange
+        first = self._add("a_0.png", 100, workflow_id="wf-1")
+        second = self._add("a_1.png", 101, workflow_id="wf-1")
+        other = self._add("b_0.png", 50, workflow_id="wf-2")
+        service = ScreenshotRetentionService(self.storage, RetentionPolicy(max_per_workflow=1))
+
+        # Act
+        service.run_once()
+
+        # Assert
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+        self.assertTrue(os.path.exists(other))
+
+    def test_metrics(self):
+        """Test that runs and reclaimed bytes are recorded"""
+        # Arrange
+        self._add("old.png", 1, size=25)
+        service = ScreenshotRetentionService(self.storage, RetentionPolicy(max_age_seconds=10))
+
+        # Act
+        service.run_once()
+        service.run_once()
+
+        # Assert
+        metrics = service.get_metrics()
+        self.assertEqual(metrics["runs"], 2)
+        self.assertEqual(metrics["files_removed"], 1)
+        self.assertEqual(metrics["bytes_reclaimed"], 25)
+        self.assertEqual(metrics["last_run_bytes_reclaimed"], 0)
+        self.assertIsNotNone(metrics["last_run_at"])
+
+    def test_background_thread(self):
+        """Test enforcing the policy on the background thread"""
+        # Arrange
+        old = self._add("old.png", 1)
+        service = ScreenshotRetentionService(self.storage, RetentionPolicy(max_age_seconds=10), interval=0.01)
+
+        # Act
+        service.start()
+        deadline = time.time() + 5
+        while os.path.exists(old) and time.time() < deadline:
+            time.sleep(0.01)
+        service.stop(timeout=5)
+
+        # Assert
+        self.assertFalse(os.path.exists(old))
+        self.assertFalse(service.is_running)
+
+    def test_policy_serialization(self):
+        """Test converting a policy to and from a dictionary"""
+        # Arrange
+        policy = RetentionPolicy(max_total_bytes=1024, max_per_workflow=5)
+
+        # Act
+        restored = RetentionPolicy.from_dict(policy.to_dict())
+
+        # Assert
+        self.assertEqual(restored.to_dict(), policy.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
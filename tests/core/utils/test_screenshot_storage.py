@@ -163,6 +163,39 @@ class TestScreenshotStorage(unittest.TestCase):
         self.assertTrue(filename.startswith("test_name_with_invalid_chars"))
         self.assertTrue(filename.endswith(".png"))
 
+    def test_save_png_bytes(self):
+        """Test saving PNG bytes without decoding them"""
+        # Arrange
+        from io import BytesIO
+        buffer = BytesIO()
+        Image.new("RGB", (32, 16)).save(buffer, format="PNG")
+        png_data = buffer.getvalue()
+
+        # Act
+        result = self.storage.save_png_bytes(png_data, "test_bytes", {"key": "value"})
+
+        # Assert
+        with open(result, 'rb') as f:
+            self.assertEqual(f.read(), png_data)
+        metadata = self.storage.get_metadata(result)
+        self.assertEqual(metadata["width"], 32)
+        self.assertEqual(metadata["height"], 16)
+
+    def test_write_keeps_caller_metadata(self):
+        """Test that writing a screenshot does not change the metadata passed in"""
+        # Arrange
+        from io import BytesIO
+        buffer = BytesIO()
+        Image.new("RGB", (32, 16)).save(buffer, format="PNG")
+        metadata = {"key": "value"}
+
+        # Act
+        self.storage.save_png_bytes(buffer.getvalue(), "from_bytes", metadata)
+        self.storage.save_image(Image.new("RGB", (8, 8)), "from_image", metadata)
+
+        # Assert
+        self.assertEqual(metadata, {"key": "value"})
+
 
 if __name__ == "__main__":
     unittest.main()
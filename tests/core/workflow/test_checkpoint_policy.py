@@ -0,0 +1,156 @@
+"""Tests for the checkpoint policy"""
+import unittest
+from typing import Dict, Any
+
+from src.core.actions.action_interface import ActionResult
+from src.core.actions.base_action import BaseAction
+from src.core.workflow.checkpoint_policy import CheckpointPolicy
+
+
+class StubAction(BaseAction):
+    """Action of a configurable type"""
+
+    def __init__(self, action_type: str = "stub"):
+        """Initialize the action"""
+        super().__init__("Stub")
+        self._type = action_type
+
+    @property
+    def type(self) -> str:
+        """Get the action type"""
+        return self._type
+
+    def _execute(self, context: Dict[str, Any]) -> ActionResult:
+        """Execute the action"""
+        return ActionResult.create_success("Done")
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self):
+        """Start at zero"""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Get the current time"""
+        return self.now
+
+
+class TestCheckpointPolicy(unittest.TestCase):
+    """Test cases for the CheckpointPolicy and CheckpointSchedule classes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.clock = FakeClock()
+        self.action = StubAction()
+
+    def test_every_n_actions(self):
+        """Test that a checkpoint is due after every N actions"""
+        # Arrange
+        schedule = CheckpointPolicy(every_n_actions=2).create_schedule(self.clock)
+        reasons = []
+
+        # Act
+        for _ in range(5):
+            reason = schedule.checkpoint_reason(self.action)
+            reasons.append(reason)
+            if reason:
+                schedule.checkpoint_taken(0.0)
+            schedule.action_finished()
+
+        # Assert
+        self.assertEqual(reasons, [None, None, "actions", None, "actions"])
+
+    def test_every_seconds(self):
+        """Test that a checkpoint is due once the interval has passed"""
+        # Arrange
+        schedule = CheckpointPolicy(every_seconds=10).create_schedule(self.clock)
+        schedule.action_finished()
+
+        # Act
+        self.clock.now = 5
+        early = schedule.checkpoint_reason(self.action)
+        self.clock.now = 10
+        due = schedule.checkpoint_reason(self.action)
+
+        # Assert
+        self.assertIsNone(early)
+        self.assertEqual(due, "interval")
+
+    def test_expensive_actions(self):
+        """Test that expensive actions are checkpointed regardless of the overhead budget"""
+        # Arrange
+        policy = CheckpointPolicy(expensive_action_types=["upload"], max_overhead_percent=1)
+        schedule = policy.create_schedule(self.clock)
+        schedule.action_finished()
+        schedule.checkpoint_taken(5.0)
+        schedule.action_finished()
+
+        # Act
+        reason = schedule.checkpoint_reason(StubAction("upload"))
+
+        # Assert
+        self.assertEqual(reason, "expensive")
+        self.assertIsNone(schedule.checkpoint_reason(self.action))
+
+    def test_overhead_budget(self):
+        """Test that adaptive checkpoints wait until the run can afford them"""
+        # Arrange
+        schedule = CheckpointPolicy(max_overhead_percent=10).create_schedule(self.clock)
+        schedule.action_finished()
+        self.assertEqual(schedule.checkpoint_reason(self.action), "overhead")
+        schedule.checkpoint_taken(0.5)
+        schedule.action_finished()
+
+        # Act
+        self.clock.now = 4
+        early = schedule.checkpoint_reason(self.action)
+        self.clock.now = 5
+        due = schedule.checkpoint_reason(self.action)
+
+        # Assert
+        self.assertIsNone(early)
+        self.assertEqual(due, "overhead")
+        self.assertAlmostEqual(schedule.estimated_cost, 0.5)
+
+    def test_overhead_budget_postpones_periodic_checkpoints(self):
+        """Test that the overhead limit holds back the action trigger"""
+        # Arrange
+        schedule = CheckpointPolicy(every_n_actions=1, max_overhead_percent=50).create_schedule(self.clock)
+        schedule.action_finished()
+        schedule.checkpoint_taken(2.0)
+        schedule.action_finished()
+
+        # Act
+        self.clock.now = 1
+        postponed = schedule.checkpoint_reason(self.action)
+        self.clock.now = 4
+        due = schedule.checkpoint_reason(self.action)
+
+        # Assert
+        self.assertIsNone(postponed)
+        self.assertEqual(due, "actions")
+
+    def test_invalid_settings(self):
+        """Test that out-of-range settings are rejected"""
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            CheckpointPolicy(every_n_actions=0)
+        with self.assertRaises(ValueError):
+            CheckpointPolicy(max_overhead_percent=100)
+
+    def test_serialization_round_trip(self):
+        """Test converting a policy to a dictionary and back"""
+        # Arrange
+        policy = CheckpointPolicy(every_n_actions=5, every_seconds=30, expensive_action_types=["upload"])
+
+        # Act
+        restored = CheckpointPolicy.from_dict(policy.to_dict())
+
+        # Assert
+        self.assertEqual(restored.to_dict(), policy.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
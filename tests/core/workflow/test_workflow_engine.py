@@ -1,13 +1,26 @@
 """Tests for the workflow engine"""
+import os
+import time
 import unittest
+import tempfile
+from io import BytesIO
 from unittest.mock import MagicMock, patch
 from typing import Dict, Any
 
+from PIL import Image
+
 from src.core.actions.action_interface import ActionResult
 from src.core.actions.base_action import BaseAction
+from src.core.actions.click_action import ClickAction
+from src.core.actions.screenshot_action import ScreenshotAction
+from src.core.browser.driver_pool import DriverPool
+from src.core.browser.fake_driver import FakeDriver
 from src.core.context.execution_context import ExecutionContext
 from src.core.context.execution_state import ExecutionStateEnum
+from src.core.state.state_management_factory import StateManagementFactory
+from src.core.workflow.checkpoint_policy import CheckpointPolicy
 from src.core.workflow.workflow_engine import WorkflowEngine, WorkflowStatus
+from src.core.utils.screenshot_manager import ScreenshotManager
 from src.core.workflow.workflow_event import WorkflowEventType
 
 
@@ -315,6 +328,126 @@ class TestWorkflowEngine(unittest.TestCase):
             ExecutionStateEnum.ABORTED
         )
 
+    def test_cancel_events_removed_when_runs_end(self):
+        """Test that completed and aborted runs do not leave their cancel events behind"""
+        # Arrange
+        engine = self.engine
+
+        class AbortingAction(TestAction):
+            def _execute(self, context: Dict[str, Any]) -> ActionResult:
+                engine.abort_workflow("aborted")
+                return super()._execute(context)
+
+        # Act
+        engine.execute_workflow([TestAction("Action 1")], ExecutionContext(), "completed")
+        aborted = engine.execute_workflow(
+            [AbortingAction("Abort"), TestAction("Action 2")], ExecutionContext(), "aborted"
+        )
+
+        # Assert
+        self.assertEqual(aborted["message"], "Workflow aborted")
+        self.assertNotIn("completed", engine._cancel_events)
+        self.assertNotIn("aborted", engine._cancel_events)
+
+    def test_queued_screenshots_written_when_run_ends(self):
+        """Test that a screenshot written in the background exists once execute_workflow returns"""
+        # Arrange
+        driver = MagicMock()
+        driver.get_screenshot_as_png.return_value = self._png()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        screenshot_dir = os.path.join(temp_dir.name, "screenshots")
+        action = ScreenshotAction("Capture", "page", screenshot_dir=screenshot_dir, async_writes=True)
+        manager = ScreenshotManager.shared(screenshot_dir)
+        write = manager.storage.write_png_bytes
+
+        def slow_write(*args, **kwargs):
+            time.sleep(0.2)
+            return write(*args, **kwargs)
+
+        # Act
+        with patch.object(manager.storage, "write_png_bytes", side_effect=slow_write):
+            result = self.engine.execute_workflow([action], {"driver": driver})
+
+        # Assert
+        self.assertTrue(result["success"])
+        self.assertTrue(os.path.exists(result["results"][0].data["screenshot_path"]))
+
+    @staticmethod
+    def _png() -> bytes:
+        """Create PNG bytes of a small image"""
+        buffer = BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def test_driver_pool_lease(self):
+        """Test that each run leases a driver from the pool and returns it at the end"""
+        # Arrange
+        pool = DriverPool(FakeDriver, size=1)
+        engine = WorkflowEngine(driver_pool=pool)
+        drivers = []
+
+        class DriverAction(TestAction):
+            def _execute(self, context: Dict[str, Any]) -> ActionResult:
+                drivers.append(context.get("driver"))
+                return ActionResult.create_success("Used driver")
+
+        # Act
+        engine.execute_workflow([DriverAction("Action 1"), DriverAction("Action 2")], ExecutionContext())
+        engine.execute_workflow([DriverAction("Action 3")], ExecutionContext())
+
+        # Assert
+        self.assertIsInstance(drivers[0], FakeDriver)
+        self.assertEqual(drivers, [drivers[0]] * 3)
+        metrics = pool.get_metrics()
+        self.assertEqual(metrics["leases"], 2)
+        self.assertEqual(metrics["leased"], 0)
+        pool.close()
+
+    def test_driver_pool_failure_fails_workflow(self):
+        """Test that a run that cannot lease a browser fails instead of raising"""
+        # Arrange
+        pool = DriverPool(FakeDriver, size=1)
+        pool.close()
+        engine = WorkflowEngine(driver_pool=pool)
+        action = TestAction("Action 1")
+        context = ExecutionContext()
+
+        # Act
+        result = engine.execute_workflow([action], context)
+
+        # Assert
+        self.assertFalse(result["success"])
+        self.assertIn("Driver pool is closed", result["message"])
+        self.assertFalse(action.executed)
+        self.assertEqual(context.state.current_state, ExecutionStateEnum.FAILED)
+
+    def test_batched_dom_actions_report_own_results(self):
+        """Test that each batched DOM action gets its own result and events"""
+        # Arrange
+        driver = MagicMock()
+        driver.execute_script.return_value = [{"ok": True}, {"ok": True}]
+        pool = DriverPool(lambda: driver, size=1)
+        engine = WorkflowEngine(driver_pool=pool, batch_dom_actions=True)
+        context = ExecutionContext()
+        actions = [ClickAction("Click a", "#a"), ClickAction("Click b", "#b")]
+        completed = []
+        engine.add_event_listener(
+            WorkflowEventType.ACTION_COMPLETED, lambda event: completed.append(event.data["action_id"])
+        )
+
+        # Act
+        result = engine.execute_workflow(actions, context)
+
+        # Assert
+        self.assertTrue(result["success"])
+        self.assertEqual(driver.find_element_by_css_selector.call_count, 0)
+        self.assertEqual([action_result.message for action_result in result["results"]],
+                         ["Clicked element: #a", "Clicked element: #b"])
+        self.assertEqual(completed, [action.id for action in actions])
+        self.assertNotIn("results", context.variables.get_names())
+        pool.close()
+
     def test_event_listeners(self):
         """Test adding and removing event listeners"""
         # Arrange
@@ -354,5 +487,110 @@ class TestWorkflowEngine(unittest.TestCase):
         listener2.assert_not_called()
 
 
+class TestWorkflowEngineCheckpoints(unittest.TestCase):
+    """Test cases for automatic checkpoints of the workflow engine"""
+
+    def setUp(self):
+        """Set up test environment"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_manager = StateManagementFactory.create_workflow_state_manager(
+            os.path.join(self.temp_dir.name, "states"),
+            os.path.join(self.temp_dir.name, "checkpoints")
+        )
+
+    def tearDown(self):
+        """Clean up after tests"""
+        self.temp_dir.cleanup()
+
+    def test_checkpoints_every_n_actions(self):
+        """Test that the engine checkpoints the run with its position and results"""
+        # Arrange
+        engine = WorkflowEngine(
+            state_manager=self.state_manager,
+            checkpoint_policy=CheckpointPolicy(every_n_actions=2)
+        )
+        actions = [TestAction(f"Action {i}") for i in range(5)]
+
+        # Act
+        result = engine.execute_workflow(actions, ExecutionContext(), "wf")
+
+        # Assert
+        self.assertTrue(result["success"])
+        checkpoints = self.state_manager.get_checkpoints("wf")
+        self.assertEqual(sorted(c["data"]["current_index"] for c in checkpoints), [2, 4])
+        latest = engine.get_workflow_status("wf")["last_checkpoint_id"]
+        _, data = self.state_manager.restore_from_checkpoint(latest)
+        self.assertEqual(data["current_index"], 4)
+        self.assertEqual(len(data["results"]), 4)
+
+    def test_completed_run_ends_delta_chain(self):
+        """Test that the checkpoint manager lets go of a run's context when it ends"""
+        # Arrange
+        checkpoint_manager = StateManagementFactory.create_checkpoint_manager(
+            os.path.join(self.temp_dir.name, "delta"), delta_checkpoints=True
+        )
+        state_manager = StateManagementFactory.create_workflow_state_manager(
+            os.path.join(self.temp_dir.name, "states"), checkpoint_manager=checkpoint_manager
+        )
+        engine = WorkflowEngine(
+            state_manager=state_manager,
+            checkpoint_policy=CheckpointPolicy(every_n_actions=1)
+        )
+        actions = [TestAction(f"Action {i}") for i in range(3)]
+
+        # Act
+        result = engine.execute_workflow(actions, ExecutionContext(), "wf")
+
+        # Assert
+        self.assertTrue(result["success"])
+        self.assertEqual(len(state_manager.get_checkpoints("wf")), 2)
+        self.assertEqual(checkpoint_manager._chains, {})
+
+    def test_failed_checkpoint_is_recorded_and_retried(self):
+        """Test that a failed checkpoint shows in the status and is tried again"""
+        # Arrange
+        state_manager = MagicMock()
+        state_manager.create_checkpoint.side_effect = [IOError("disk full"), "checkpoint-1"]
+        engine = WorkflowEngine(
+            state_manager=state_manager,
+            checkpoint_policy=CheckpointPolicy(every_n_actions=2)
+        )
+        actions = [TestAction(f"Action {i}") for i in range(4)]
+
+        # Act
+        result = engine.execute_workflow(actions, ExecutionContext(), "wf")
+
+        # Assert
+        self.assertTrue(result["success"])
+        indexes = [call.args[2]["current_index"] for call in state_manager.create_checkpoint.call_args_list]
+        self.assertEqual(indexes, [2, 3])
+        status = engine.get_workflow_status("wf")
+        self.assertEqual(status["checkpoint_failures"], 1)
+        self.assertEqual(status["last_checkpoint_error"], "disk full")
+        self.assertEqual(status["last_checkpoint_id"], "checkpoint-1")
+
+    def test_resume_from_checkpoint(self):
+        """Test that a run restored from a checkpoint only repeats the actions after it"""
+        # Arrange
+        engine = WorkflowEngine(
+            state_manager=self.state_manager,
+            checkpoint_policy=CheckpointPolicy(expensive_action_types=["test_action"])
+        )
+        failing = [TestAction("Action 1"), TestAction("Action 2"), TestAction("Action 3", should_succeed=False)]
+        engine.execute_workflow(failing, ExecutionContext(), "wf")
+        checkpoint_id = engine.get_workflow_status("wf")["last_checkpoint_id"]
+        actions = [TestAction("Action 1"), TestAction("Action 2"), TestAction("Action 3")]
+
+        # Act
+        result = WorkflowEngine(state_manager=self.state_manager).resume_from_checkpoint(checkpoint_id, actions)
+
+        # Assert
+        self.assertTrue(result["success"])
+        self.assertEqual(result["workflow_id"], "wf")
+        self.assertEqual([a.executed for a in actions], [False, False, True])
+        self.assertEqual(len(result["results"]), 3)
+        self.assertTrue(result["results"][0].success)
+
+
 if __name__ == "__main__":
     unittest.main()